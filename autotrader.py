@@ -18,6 +18,9 @@ import requests
 from datetime import datetime
 from dotenv import load_dotenv
 
+from src.data_collectors.candle_store import get_candle_store
+from src.exchanges.rate_limiter import RateLimitedExchange, get_rate_limiter
+
 # Telegram entegrasyonu için
 try:
     import telegram
@@ -122,7 +125,7 @@ def setup_binance():
                 logger.warning("Futures hesabında kullanılabilir USDT bakiyesi bulunamadı!")
                 print("❌ Futures hesabında USDT bakiyesi bulunamadı!")
                 
-            return exchange
+            return RateLimitedExchange(exchange, get_rate_limiter('binance_futures'))
             
         except Exception as e:
             logger.error(f"Futures bakiyesi alınırken hata: {e}")
@@ -150,7 +153,7 @@ def setup_binance():
             except Exception as sub_e:
                 logger.error(f"Alternatif bakiye kontrolünde hata: {sub_e}")
             
-            return exchange
+            return RateLimitedExchange(exchange, get_rate_limiter('binance_futures'))
             
     except Exception as e:
         logger.error(f"Binance API bağlantısı başarısız: {e}")
@@ -267,7 +270,7 @@ def get_ai_analysis(exchange, symbol, timeframe='1d'):
 def get_technical_signals(exchange, symbol, timeframe='4h'):
     try:
         # OHLCV verileri al
-        ohlcv = exchange.fetch_ohlcv(symbol, timeframe, limit=100)
+        ohlcv = get_candle_store().get_ohlcv(exchange, symbol, timeframe, limit=100)
         df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
         
         # EMA hesapla
@@ -1,12 +1,13 @@
-from anthropic import Anthropic, AnthropicError
 import asyncio
 import logging
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import os
 import json
 import traceback
 from datetime import datetime
 import re
+from src.analysis.ai_cache import get_ai_cache
+from src.analysis.ai_client import get_ai_client, gather_cancellable
 
 # Web araştırma entegrasyonu
 try:
@@ -39,13 +40,14 @@ class AIAnalyzer:
         self.web_researcher = None
         
         try:
-            self.client = Anthropic(api_key=self.api_key)
+            # Paylaşılan async istemci: eşzamanlılık sınırı, zaman aşımı ve yeniden deneme
+            self.client = get_ai_client()
             self.max_tokens = 2000
-            self.cache_dir = "cache/ai_analysis"
-            self.cache_duration = 86400  # 24 saat (saniye cinsinden)
             
-            # Cache dizinini oluştur
-            os.makedirs(self.cache_dir, exist_ok=True)
+            # Girdi rejimine göre anahtarlanan önbellek (bellek + cache/ai_analysis disk katmanı)
+            self.cache = get_ai_cache()
+            self.cache_dir = self.cache.cache_dir
+            self.cache_duration = self.cache.ttl
         except Exception as e:
             self.logger.error(f"Anthropic istemcisi oluşturulurken hata: {e}")
             raise
@@ -139,22 +141,26 @@ class AIAnalyzer:
                 except Exception as e:
                     self.logger.error(f"Web araştırması hatası: {e}")
             
+            # Aynı piyasa rejimi (fiyat kovası, RSI/MACD bandı, trend, araştırma) için önceki yanıt
+            cache_key = self.cache.key(symbol, technical_data, web_research_data)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self.logger.info(f"AI analizi önbellekten: {symbol}")
+                return {**cached, "cached": True}
+            
             # Prompt oluştur
             prompt = self.generate_ai_prompt(symbol, technical_data, web_research_data)
             
-            # AI'dan yanıt al (Anthropic API'yi doğru şekilde çağır)
+            # AI'dan yanıt al (event loop'u bloklamadan; iptal edilirse istek de kapanır)
+            response = None
             try:
-                # Burada await kullanmıyoruz çünkü Anthropic API'nin newer versiyonunda bu method senkron
-                response = self.client.messages.create(
-                    model="claude-3-7-sonnet-20250219",  # Claude 3.7 Sonnet modeli kullan
-                    max_tokens=500,  # Az token kullanmak için limit
-                    messages=[
-                        {"role": "user", "content": prompt}
-                    ]
+                response = await self.client.create_message(
+                    prompt,
+                    max_tokens=500  # Az token kullanmak için limit
                 )
                 
                 # Yanıtı işle
-                analysis_text = response.content[0].text
+                analysis_text = response['text']
             except Exception as api_error:
                 self.logger.error(f"Anthropic API hatası: {str(api_error)}")
                 # Hata durumunda basit bir analiz metni oluştur
@@ -169,6 +175,12 @@ class AIAnalyzer:
                 "timestamp": datetime.now().isoformat()
             }
             
+            # Yalnızca gerçek yanıtlar önbelleğe girer
+            if response is not None:
+                usage = response.get('usage') or {}
+                self.cache.put(cache_key, result,
+                               tokens=int(usage.get('input_tokens') or 0) + int(usage.get('output_tokens') or 0))
+            
             return result
             
         except Exception as e:
@@ -181,10 +193,14 @@ class AIAnalyzer:
                 "timestamp": datetime.now().isoformat()
             }
     
-    async def analyze_multiple_coins(self, opportunities: List[Dict]) -> List[Dict]:
+    async def analyze_multiple_coins(self, opportunities: List[Dict],
+                                     stop: Optional[asyncio.Event] = None) -> List[Dict]:
         """
         Birden fazla coin için AI analizi yap
         Tarama sonuçlarına dayanarak detaylı analiz yapar
+        
+        Coinler aynı anda analiz edilir (eşzamanlılık AI istemcisinde sınırlı);
+        stop set edilirse bitmemiş analizler iptal edilir ve sonuçlara girmez.
         """
         try:
             self.logger.info(f"Çoklu coin AI analizi başlatılıyor... {len(opportunities)} coin")
@@ -197,16 +213,17 @@ class AIAnalyzer:
                 reverse=True
             )[:5]
             
-            for opportunity in top_opportunities:
-                symbol = opportunity.get('symbol')
-                if not symbol:
+            top_opportunities = [opportunity for opportunity in top_opportunities if opportunity.get('symbol')]
+            self.logger.info(f"AI analizi yapılıyor: {', '.join(opp['symbol'] for opp in top_opportunities)}")
+            
+            # AI analizlerini aynı anda yap
+            ai_results = await gather_cancellable(
+                [self.analyze_opportunity(opp['symbol'], opp.copy()) for opp in top_opportunities], stop)
+            
+            for opportunity, ai_result in zip(top_opportunities, ai_results):
+                if isinstance(ai_result, BaseException):
+                    # İptal edilen (veya beklenmedik şekilde başarısız olan) analiz atlanır
                     continue
-                    
-                self.logger.info(f"AI analizi yapılıyor: {symbol}")
-                
-                # AI analizi yap
-                technical_data = opportunity.copy()
-                ai_result = await self.analyze_opportunity(symbol, technical_data)
                 
                 # Sonuçları birleştir
                 result = opportunity.copy()
@@ -0,0 +1,308 @@
+"""
+Girdi içeriğiyle adreslenen AI analiz önbelleği.
+
+AIAnalyzer'ın `cache/ai_analysis` dizini ve 24 saatlik süresi vardı ama
+girdiler teknik verilere göre anahtarlanmıyordu: eski ya da başka bir piyasa
+durumuna ait yanıt yeniden kullanılabiliyor, neredeyse aynı istemler ise yine
+API çağrısına mal oluyordu.
+
+Anahtar, istemin normalize edilmiş girdilerinin özetidir:
+- sembol ve istem şablonu sürümü
+- fiyat kovası (logaritmik, varsayılan %1 genişlik)
+- RSI bandı (aşırı satım / zayıf / nötr / güçlü / aşırı alım), MACD bandı
+  (sıfırın üstü/altı, sinyalin üstü/altı), Bollinger bandı
+- trend ve sinyal etiketleri
+- web araştırması özeti (varsa)
+
+Aynı rejimdeki tekrar istekler (ör. art arda /aianalysis) anında döner;
+band veya trend değişince anahtar da değişir ve yanıt yeniden üretilir.
+
+İki katman vardır: boyutla sınırlı LRU bellek katmanı ve süreçler arası
+paylaşılan disk katmanı (JSON, atomik yazma). Her iki katmanda girdiler TTL
+sonunda geçersizdir. `stats` isabet oranını ve isabetlerle tasarruf edilen
+token sayısını tutar.
+"""
+import os
+import json
+import math
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# generate_ai_prompt şablonu değişirse artırılır; eski girdiler kullanılmaz
+PROMPT_VERSION = 1
+
+KEY_LENGTH = 32
+
+
+def _number(value) -> Optional[float]:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+def price_bucket(price, step: float = 0.01) -> Optional[int]:
+    """Fiyatın logaritmik kovası: ardışık kovalar arasında `step` oranında fark var"""
+    price = _number(price)
+    if price is None or price <= 0:
+        return None
+    return math.floor(math.log(price) / math.log1p(step))
+
+
+def rsi_band(rsi) -> Optional[str]:
+    """RSI bandı (analiz eşikleriyle aynı: 30 / 45 / 55 / 70)"""
+    rsi = _number(rsi)
+    if rsi is None:
+        return None
+    if rsi < 30:
+        return 'oversold'
+    if rsi < 45:
+        return 'weak'
+    if rsi <= 55:
+        return 'neutral'
+    if rsi <= 70:
+        return 'strong'
+    return 'overbought'
+
+
+def macd_band(macd, signal=None) -> Optional[str]:
+    """MACD'nin sıfıra ve (varsa) sinyal çizgisine göre konumu"""
+    macd = _number(macd)
+    if macd is None:
+        return None
+    band = 'pos' if macd > 0 else 'neg'
+    signal = _number(signal)
+    if signal is not None:
+        band += '_above' if macd > signal else '_below'
+    return band
+
+
+def bb_band(position) -> Optional[str]:
+    position = _number(position)
+    if position is None:
+        return None
+    return 'upper' if position > 80 else 'lower' if position < 20 else 'mid'
+
+
+def research_digest(research: Optional[Dict]) -> str:
+    """Web araştırması verisinin kısa özeti (yoksa boş)"""
+    if not research:
+        return ''
+    encoded = json.dumps(research, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha1(encoded.encode()).hexdigest()[:16]
+
+
+def normalize_inputs(symbol: str, technical_data: Dict, research: Optional[Dict] = None,
+                     price_step: float = 0.01) -> Dict:
+    """AI isteminin piyasa rejimini belirleyen, kovalanmış girdileri"""
+    price = technical_data.get('current_price', technical_data.get('price'))
+    return {
+        'v': PROMPT_VERSION,
+        'symbol': symbol.replace('/', '').upper(),
+        'price': price_bucket(price, price_step),
+        'rsi': rsi_band(technical_data.get('rsi')),
+        'macd': macd_band(technical_data.get('macd'), technical_data.get('macd_signal')),
+        'bb': bb_band(technical_data.get('bb_position')),
+        'trend': str(technical_data.get('trend') or ''),
+        'signal': str(technical_data.get('signal') or ''),
+        'research': research_digest(research),
+    }
+
+
+def cache_key(symbol: str, technical_data: Dict, research: Optional[Dict] = None,
+              price_step: float = 0.01) -> str:
+    """Normalize edilmiş girdilerin özeti (önbellek anahtarı)"""
+    encoded = json.dumps(normalize_inputs(symbol, technical_data, research, price_step), sort_keys=True)
+    return hashlib.sha256(encoded.encode()).hexdigest()[:KEY_LENGTH]
+
+
+class AICache:
+    """Anahtar -> AI analiz sonucu; LRU + TTL bellek katmanı ve atomik disk katmanı"""
+
+    def __init__(self, max_entries: int = 512, ttl: float = 86400, cache_dir: Optional[str] = 'cache/ai_analysis',
+                 max_disk_entries: int = 5000, price_step: float = 0.01, clock: Callable[[], float] = time.time):
+        """
+        Args:
+            max_entries: Bellekte tutulacak en fazla girdi; aşılınca en eski kullanılan atılır
+            ttl: Girdinin geçerlilik süresi (saniye)
+            cache_dir: Disk katmanının dizini (None: yalnızca bellek)
+            max_disk_entries: Diskte tutulacak en fazla dosya; budamada en eskiler silinir
+            price_step: Fiyat kovası genişliği (oran)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.cache_dir = cache_dir
+        self.max_disk_entries = max_disk_entries
+        self.price_step = price_step
+        self.clock = clock
+        self._entries: 'OrderedDict[str, Tuple[float, int, Dict]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0,
+                      'writes': 0, 'saved_tokens': 0}
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.stats['hits'] + self.stats['misses']
+        return self.stats['hits'] / total if total else 0.0
+
+    def key(self, symbol: str, technical_data: Dict, research: Optional[Dict] = None) -> str:
+        return cache_key(symbol, technical_data, research, self.price_step)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Geçerli girdi (önce bellek, sonra disk); yoksa None"""
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                return self._hit(entry)
+            stale = entry is not None
+            if stale:
+                del self._entries[key]
+                self.stats['expired'] += 1
+
+        if stale:
+            # Disk kopyası aynı anda yazıldı, onun da süresi dolmuştur
+            entry = None
+            if self.cache_dir:
+                self._remove(self._path(key))
+        else:
+            entry = self._read(key, now)
+        with self._lock:
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            self.stats['disk_hits'] += 1
+            self._insert(key, entry)
+            return self._hit(entry)
+
+    def _hit(self, entry: Tuple[float, int, Dict]) -> Dict:
+        self.stats['hits'] += 1
+        self.stats['saved_tokens'] += entry[1]
+        return dict(entry[2])
+
+    def put(self, key: str, value: Dict, tokens: int = 0):
+        """
+        Sonucu sakla.
+
+        Args:
+            tokens: Sonucu üretmek için harcanan token (isabetlerde tasarruf sayılır)
+        """
+        entry = (self.clock() + self.ttl, int(tokens), dict(value))
+        with self._lock:
+            self._insert(key, entry)
+            self.stats['writes'] += 1
+            prune = self.cache_dir and self.stats['writes'] % 64 == 0
+        if self.cache_dir:
+            self._write(key, entry)
+            if prune:
+                self.prune_disk()
+
+    def _insert(self, key: str, entry: Tuple[float, int, Dict]):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def _read(self, key: str, now: float) -> Optional[Tuple[float, int, Dict]]:
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                payload = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"AI önbellek dosyası okunamadı ({path}): {str(e)}")
+            return None
+        if payload.get('expires_at', 0) <= now:
+            with self._lock:
+                self.stats['expired'] += 1
+            self._remove(path)
+            return None
+        return payload['expires_at'], int(payload.get('tokens', 0)), payload['value']
+
+    def _write(self, key: str, entry: Tuple[float, int, Dict]):
+        """Girdiyi atomik olarak diske yaz (diğer süreçler yarım dosya görmez)"""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        expires_at, tokens, value = entry
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'key': key, 'expires_at': expires_at, 'tokens': tokens, 'value': value},
+                          f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"AI önbellek dosyası yazılamadı ({path}): {str(e)}")
+            self._remove(tmp_path)
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def prune_disk(self):
+        """Disk katmanını sınırla: süresi geçmiş (mtime + ttl) ve fazla (en eski) dosyaları sil"""
+        if not self.cache_dir:
+            return
+        try:
+            # Yalnızca bu önbelleğin (anahtar adlı) dosyaları; eski sembol adlı dosyalara dokunulmaz
+            files = [entry for entry in os.scandir(self.cache_dir)
+                     if entry.name.endswith('.json') and len(entry.name) == KEY_LENGTH + 5]
+        except OSError:
+            return
+        files.sort(key=lambda entry: entry.stat().st_mtime)
+        now = self.clock()
+        keep = len(files)
+        for entry in files:
+            if keep > self.max_disk_entries or entry.stat().st_mtime + self.ttl <= now:
+                self._remove(entry.path)
+                keep -= 1
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, 'entries': len(self._entries), 'hit_ratio': round(self.hit_ratio, 3)}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_cache: Optional[AICache] = None
+_cache_lock = threading.Lock()
+
+
+def get_ai_cache() -> AICache:
+    """
+    Süreç genelinde paylaşılan AICache.
+
+    AI_CACHE_SIZE (512), AI_CACHE_TTL (86400 s), AI_CACHE_DIR ('cache/ai_analysis',
+    boş değer disk katmanını kapatır) ve AI_CACHE_PRICE_STEP (0.01) ile yapılandırılır.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = AICache(max_entries=int(os.getenv('AI_CACHE_SIZE', '512')),
+                                 ttl=float(os.getenv('AI_CACHE_TTL', '86400')),
+                                 cache_dir=os.getenv('AI_CACHE_DIR', 'cache/ai_analysis') or None,
+                                 price_step=float(os.getenv('AI_CACHE_PRICE_STEP', '0.01')))
+    return _cache
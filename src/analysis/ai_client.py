@@ -0,0 +1,299 @@
+"""
+Anthropic messages API için bloklamayan AI yürütme katmanı.
+
+AIAnalyzer senkron `Anthropic` istemcisini event loop içinde çağırıyordu: her
+çağrı loop'u saniyelerce kilitliyor, zenginleştirme coin coin sırayla
+yapılıyordu. AIClient /v1/messages uç noktasını paylaşılan aiohttp oturumu
+üzerinden çağırır:
+
+- Eş zamanlı istek sayısı `concurrency` ile sınırlanır; çağıranlar istekleri
+  serbestçe gather edebilir, fazlası sırada bekler.
+- Her deneme `timeout` saniyeyle sınırlıdır.
+- 429/5xx/529 (aşırı yük), zaman aşımı ve bağlantı hataları üstel geri
+  çekilme + tam jitter ile yeniden denenir; `retry-after` başlığına uyulur.
+- Görev iptal edilirse (ör. kullanıcı isteği bıraktı) uçuştaki HTTP isteği
+  kapatılır ve sıra hakkı bırakılır; `gather_cancellable` bir durdurma
+  sinyaliyle bekleyen tüm çağrıları iptal eder.
+- Deneme gecikmeleri `latency` histogramında, sırada bekleme ve token
+  kullanımı `stats` içinde tutulur.
+
+Adres ANTHROPIC_BASE_URL ile değiştirilebilir (testlerde yerel sahte sunucu).
+"""
+import os
+import time
+import random
+import asyncio
+import logging
+import aiohttp
+from typing import Awaitable, Dict, Iterable, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = 'https://api.anthropic.com'
+DEFAULT_MODEL = 'claude-3-7-sonnet-20250219'
+API_VERSION = '2023-06-01'
+
+# Yeniden denenecek HTTP durumları (529: Anthropic aşırı yük)
+RETRY_STATUSES = frozenset({408, 409, 429, 500, 502, 503, 504, 529})
+
+
+class AIClientError(Exception):
+    """Yeniden denemelerden sonra da başarısız olan AI isteği"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class _RetryableError(Exception):
+    def __init__(self, message: str, status: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class LatencyHistogram:
+    """Sabit kovalı gecikme histogramı (saniye)"""
+
+    BUCKETS = (0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+    def __init__(self, buckets: Sequence[float] = BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # son kova: en büyük sınırın üstü
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        index = next((i for i, bound in enumerate(self.buckets) if seconds <= bound), len(self.buckets))
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q: float) -> float:
+        """q (0-1) yüzdeliğinin düştüğü kovanın üst sınırı (taşma kovasında gözlenen en büyük değer)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.buckets[index] if index < len(self.buckets) else self.max
+        return self.max
+
+    def snapshot(self) -> Dict:
+        labels = [f"<={bound:g}s" for bound in self.buckets] + [f">{self.buckets[-1]:g}s"]
+        return {
+            'count': self.count,
+            'mean': round(self.total / self.count, 3) if self.count else 0.0,
+            'max': round(self.max, 3),
+            'p50': self.percentile(0.5),
+            'p90': self.percentile(0.9),
+            'p99': self.percentile(0.99),
+            'buckets': dict(zip(labels, self.counts)),
+        }
+
+
+class AIClient:
+    """Sınırlı eşzamanlılıkla, zaman aşımı ve yeniden denemeyle çalışan async messages istemcisi"""
+
+    def __init__(self, api_key: str, base_url: Optional[str] = None, model: str = DEFAULT_MODEL,
+                 concurrency: int = 4, timeout: float = 60.0, max_retries: int = 3,
+                 backoff: float = 1.0, max_backoff: float = 20.0):
+        """
+        Args:
+            concurrency: Aynı anda en fazla kaç istek gönderileceği
+            timeout: Tek deneme için saniye cinsinden zaman aşımı
+            max_retries: Yeniden denenebilir hatalarda en fazla tekrar sayısı
+            backoff: İlk geri çekilme üst sınırı (her denemede iki katına çıkar)
+            max_backoff: Geri çekilme üst sınırı
+        """
+        self.api_key = api_key
+        self.base_url = (base_url or DEFAULT_BASE_URL).rstrip('/')
+        self.model = model
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.latency = LatencyHistogram()
+        self.stats = {'requests': 0, 'succeeded': 0, 'failed': 0, 'retries': 0, 'timeouts': 0,
+                      'cancelled': 0, 'input_tokens': 0, 'output_tokens': 0, 'queue_wait': 0.0}
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Oturumu (gerekirse) çalışan event loop için oluştur"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Farklı bir event loop'tan çağrıldık; eski loop'a bağlı oturum kullanılamaz
+            if self._session is not None and not self._session.closed:
+                try:
+                    await self._session.close()
+                except Exception as e:
+                    logger.debug(f"Eski AI oturumu kapatılırken hata: {str(e)}")
+            self._session = None
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def create_message(self, prompt: str, max_tokens: int = 500, model: Optional[str] = None,
+                             system: Optional[str] = None) -> Dict:
+        """
+        Tek kullanıcı mesajıyla messages isteği gönder.
+
+        Returns:
+            {'text', 'model', 'stop_reason', 'usage': {'input_tokens', 'output_tokens'}}
+
+        Raises:
+            AIClientError: Yeniden denenemeyen hata veya denemeler tükendi
+        """
+        self.stats['requests'] += 1
+        session = await self._get_session()
+        payload = {'model': model or self.model, 'max_tokens': max_tokens,
+                   'messages': [{'role': 'user', 'content': prompt}]}
+        if system:
+            payload['system'] = system
+
+        queued = time.perf_counter()
+        try:
+            async with self._semaphore:
+                self.stats['queue_wait'] += time.perf_counter() - queued
+                data = await self._send(session, payload)
+        except asyncio.CancelledError:
+            self.stats['cancelled'] += 1
+            raise
+        except AIClientError:
+            self.stats['failed'] += 1
+            raise
+
+        usage = data.get('usage') or {}
+        self.stats['succeeded'] += 1
+        self.stats['input_tokens'] += int(usage.get('input_tokens') or 0)
+        self.stats['output_tokens'] += int(usage.get('output_tokens') or 0)
+        text = ''.join(block.get('text', '') for block in data.get('content') or [] if block.get('type') == 'text')
+        return {'text': text, 'model': data.get('model'), 'stop_reason': data.get('stop_reason'), 'usage': usage}
+
+    async def _send(self, session: aiohttp.ClientSession, payload: Dict) -> Dict:
+        """İsteği yeniden denemelerle gönder (sıra hakkı çağıranda tutulur)"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await self._post(session, payload)
+            except _RetryableError as e:
+                if attempt == self.max_retries:
+                    raise AIClientError(f"AI isteği {attempt + 1} denemede başarısız: {str(e)}", e.status) from e
+                delay = self.retry_delay(attempt, e.retry_after)
+                logger.warning(f"AI isteği yeniden denenecek ({str(e)}), {delay:.2f}s sonra")
+                self.stats['retries'] += 1
+                await asyncio.sleep(delay)
+
+    async def _post(self, session: aiohttp.ClientSession, payload: Dict) -> Dict:
+        """Tek deneme; süresi (başarılı veya değil) latency histogramına yazılır"""
+        headers = {'x-api-key': self.api_key, 'anthropic-version': API_VERSION, 'content-type': 'application/json'}
+        started = time.perf_counter()
+        try:
+            async with session.post(f"{self.base_url}/v1/messages", json=payload, headers=headers,
+                                    timeout=aiohttp.ClientTimeout(total=self.timeout)) as response:
+                if response.status == 200:
+                    return await response.json()
+                body = (await response.text())[:300]
+                if response.status in RETRY_STATUSES:
+                    raise _RetryableError(f"HTTP {response.status}: {body}", response.status,
+                                          _retry_after(response.headers.get('retry-after')))
+                raise AIClientError(f"HTTP {response.status}: {body}", response.status)
+        except asyncio.TimeoutError as e:
+            self.stats['timeouts'] += 1
+            raise _RetryableError(f"{self.timeout:g}s zaman aşımı") from e
+        except aiohttp.ClientError as e:
+            raise _RetryableError(f"bağlantı hatası: {str(e)}") from e
+        finally:
+            self.latency.observe(time.perf_counter() - started)
+
+    def retry_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Tam jitter'lı üstel geri çekilme; sunucu retry-after verdiyse en az o kadar"""
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        return max(delay, retry_after or 0.0)
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, 'queue_wait': round(self.stats['queue_wait'], 3), 'latency': self.latency.snapshot()}
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+async def gather_cancellable(aws: Iterable[Awaitable], stop: Optional[asyncio.Event] = None) -> List:
+    """
+    Çağrıları aynı anda çalıştır; sonuçlar sırayla döner.
+
+    Hatalar sonuç yerine istisna nesnesi olarak döner. stop set edilirse
+    bitmemiş çağrılar iptal edilir ve yerlerine asyncio.CancelledError döner.
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    if not tasks:
+        return []
+    stop_wait = asyncio.ensure_future(stop.wait()) if stop is not None else None
+    try:
+        pending = set(tasks)
+        while pending:
+            waiting = pending | {stop_wait} if stop_wait is not None else pending
+            done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+            pending -= done
+            if stop_wait is not None and stop_wait in done:
+                break
+    finally:
+        if stop_wait is not None:
+            stop_wait.cancel()
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        # İptal edilen görevlerin temizliğini (HTTP bağlantısı, sıra hakkı) bekle
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    return [asyncio.CancelledError() if task.cancelled() else task.exception() or task.result()
+            for task in tasks]
+
+
+_client: Optional[AIClient] = None
+
+
+def get_ai_client() -> AIClient:
+    """
+    Süreç genelinde paylaşılan AIClient.
+
+    ANTHROPIC_API_KEY, ANTHROPIC_BASE_URL, AI_MODEL, AI_CONCURRENCY (varsayılan 4),
+    AI_TIMEOUT (60s) ve AI_MAX_RETRIES (3) ile yapılandırılır.
+    """
+    global _client
+    if _client is None:
+        _client = AIClient(api_key=os.getenv('ANTHROPIC_API_KEY', ''),
+                           base_url=os.getenv('ANTHROPIC_BASE_URL'),
+                           model=os.getenv('AI_MODEL', DEFAULT_MODEL),
+                           concurrency=int(os.getenv('AI_CONCURRENCY', '4')),
+                           timeout=float(os.getenv('AI_TIMEOUT', '60')),
+                           max_retries=int(os.getenv('AI_MAX_RETRIES', '3')))
+    return _client
+
+
+async def stop_ai_client():
+    """Paylaşılan AI istemcisinin bağlantılarını kapat"""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
@@ -0,0 +1,249 @@
+"""
+Sürekli çalışan arka plan tarayıcısı ve anlık sunulan fırsat tablosu.
+
+Her /scan, yenile butonu ve /multiscan tüm piyasayı baştan tarıyordu; aynı
+anda gelen kullanıcılar aynı taramayı tekrar tekrar başlatıyordu. Burada her
+tarama işi (ör. 'scan:4h') bir zaman dilimine bağlıdır: arka plan döngüsü
+mum kapanışından `settle_seconds` sonra yeniden tarar ve puanlanmış evreni
+bellekte tutar. Komutlar bu anlık görüntüden, tarama zamanıyla birlikte
+milisaniyeler içinde yanıtlanır.
+
+- Anlık görüntü son kapanmış mumdan sonra başlamış bir taramaya aitse
+  tazedir. En fazla bir mum gerideyse (yenileme sürerken) yine sunulur ve
+  gerekirse arka planda yenileme tetiklenir.
+- Görüntü yoksa veya daha eskiyse çağıran yeni taramayı bekler. Taramalar
+  SingleFlight üzerinden geçer; aynı iş için aynı anda yalnızca bir tam
+  piyasa taraması çalışır, diğer çağıranlar onun sonucunu bekler.
+- Tarama sürerken son ilerleme güncellemesi `progress()` ile okunabilir.
+"""
+import os
+import time
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional
+from src.data_collectors.candle_store import timeframe_to_ms
+from src.exchanges.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# scan(report) -> fırsat listesi; report(update) ilerleme güncellemesini bildirir
+ScanFunction = Callable[[Callable[[Dict], None]], Awaitable[List[Dict]]]
+
+
+def last_closed_open(timeframe: str, now_ms: Optional[int] = None) -> int:
+    """Son kapanmış mumun açılış zamanı (ms, borsa hizalı)"""
+    now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+    step = timeframe_to_ms(timeframe)
+    return (now_ms // step) * step - step
+
+
+class BackgroundScanner:
+    """Zaman dilimine bağlı tarama işlerinin anlık görüntülerini tutar ve yeniler"""
+
+    def __init__(self, settle_seconds: float = 5.0, retry_seconds: float = 60.0):
+        """
+        Args:
+            settle_seconds: Mum kapanışından sonra taramaya başlamadan beklenen süre
+            retry_seconds: Başarısız taramadan sonra yeniden deneme aralığı
+        """
+        self.settle_seconds = settle_seconds
+        self.retry_seconds = retry_seconds
+        self._jobs: Dict[str, Dict] = {}
+        self._snapshots: Dict[str, Dict] = {}
+        self._progress: Dict[str, Dict] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._flight = SingleFlight()
+        self._running = False
+        self.stats = {'scans': 0, 'failed': 0, 'served': 0, 'waited': 0}
+
+    def register(self, name: str, scan: ScanFunction, timeframe: str, background: bool = True):
+        """
+        Tarama işi ekle (aynı adla tekrar çağrılırsa değiştirilir).
+
+        Args:
+            scan: async scan(report) -> fırsat listesi
+            timeframe: Yenileme temposu (bu zaman diliminin her mum kapanışı)
+            background: False ise yalnızca istek geldiğinde taranır
+        """
+        timeframe_to_ms(timeframe)  # geçersiz zaman dilimini erken yakala
+        self._jobs[name] = {'scan': scan, 'timeframe': timeframe, 'background': background}
+        if self._running and background and name not in self._tasks:
+            self._tasks[name] = asyncio.ensure_future(self._loop(name))
+
+    @property
+    def jobs(self) -> List[str]:
+        return list(self._jobs)
+
+    def start(self) -> 'BackgroundScanner':
+        """Arka plan işlerinin döngülerini başlat (event loop içinde çağrılmalı)"""
+        self._running = True
+        for name, job in self._jobs.items():
+            if job['background'] and name not in self._tasks:
+                self._tasks[name] = asyncio.ensure_future(self._loop(name))
+        if self._tasks:
+            logger.info(f"Arka plan tarayıcısı başlatıldı: {', '.join(self._tasks)}")
+        return self
+
+    async def stop(self):
+        """Döngüleri durdur (çalışan taramalar da iptal edilir)"""
+        self._running = False
+        tasks, self._tasks = list(self._tasks.values()), {}
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._flight.clear()
+
+    # ------------------------------------------------------------------
+    # Anlık görüntüler
+    # ------------------------------------------------------------------
+
+    def snapshot(self, name: str) -> Optional[Dict]:
+        """İşin son tamamlanmış taraması (tazeliğine bakılmaksızın)"""
+        return self._snapshots.get(name)
+
+    def progress(self, name: str) -> Optional[Dict]:
+        """Süren taramanın son ilerleme güncellemesi (tarama yoksa None)"""
+        return self._progress.get(name)
+
+    def lag(self, name: str, snapshot: Optional[Dict] = None, now_ms: Optional[int] = None) -> Optional[int]:
+        """Görüntünün son kapanmış mumdan kaç mum geride olduğu (görüntü yoksa None)"""
+        snapshot = snapshot or self._snapshots.get(name)
+        if snapshot is None:
+            return None
+        timeframe = self._jobs[name]['timeframe']
+        behind = last_closed_open(timeframe, now_ms) - snapshot['candle_time']
+        return max(0, behind // timeframe_to_ms(timeframe))
+
+    def peek(self, name: str) -> Optional[Dict]:
+        """
+        Hemen sunulabilecek görüntü: taze veya en fazla bir mum geride.
+
+        Görüntü eskiyse ve tarama çalışmıyorsa arka planda yenileme başlatılır.
+        """
+        snapshot = self._snapshots.get(name)
+        lag = self.lag(name, snapshot)
+        if lag is None or lag > 1:
+            return None
+        if lag and not self.scanning(name):
+            self._refresh_later(name)
+        self.stats['served'] += 1
+        return snapshot
+
+    def scanning(self, name: str) -> bool:
+        return name in self._progress
+
+    async def get(self, name: str, force: bool = False) -> Dict:
+        """
+        Sunulabilir görüntü varsa onu, yoksa (veya force ise) ortak taramanın sonucunu döndür.
+
+        Aynı iş için eşzamanlı çağrılar tek bir taramayı paylaşır; bekleyen
+        çağıranın iptal edilmesi taramayı durdurmaz.
+        """
+        if name not in self._jobs:
+            raise KeyError(f"Tanımsız tarama işi: {name}")
+        if not force:
+            snapshot = self.peek(name)
+            if snapshot is not None:
+                return snapshot
+        self.stats['waited'] += 1
+        return await self._flight.do(name, lambda: self._scan(name))
+
+    def _refresh_later(self, name: str):
+        task = asyncio.ensure_future(self._flight.do(name, lambda: self._scan(name)))
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    async def _scan(self, name: str) -> Dict:
+        job = self._jobs[name]
+        candle_time = last_closed_open(job['timeframe'])
+        started = time.time()
+        self._progress[name] = {}
+
+        def report(update: Dict):
+            self._progress[name] = update
+
+        try:
+            opportunities = await job['scan'](report)
+        except Exception:
+            self.stats['failed'] += 1
+            raise
+        finally:
+            last = self._progress.pop(name, None) or {}
+
+        snapshot = {
+            'name': name,
+            'timeframe': job['timeframe'],
+            'opportunities': opportunities,
+            'candle_time': candle_time,
+            'scanned_at': time.time(),
+            'duration': time.time() - started,
+            'scanned': last.get('total', len(opportunities)),
+        }
+        self._snapshots[name] = snapshot
+        self.stats['scans'] += 1
+        logger.info(f"{name} taraması {snapshot['duration']:.1f}s sürdü, {len(opportunities)} fırsat")
+        return snapshot
+
+    # ------------------------------------------------------------------
+    # Arka plan döngüsü
+    # ------------------------------------------------------------------
+
+    def _seconds_until_next_close(self, timeframe: str) -> float:
+        now_ms = int(time.time() * 1000)
+        step = timeframe_to_ms(timeframe)
+        return ((now_ms // step + 1) * step - now_ms) / 1000 + self.settle_seconds
+
+    async def _loop(self, name: str):
+        timeframe = self._jobs[name]['timeframe']
+        while True:
+            try:
+                await self.get(name)
+                delay = self._seconds_until_next_close(timeframe)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"{name} arka plan taraması başarısız: {str(e)}")
+                delay = min(self.retry_seconds, self._seconds_until_next_close(timeframe))
+            await asyncio.sleep(delay)
+
+
+def format_freshness(snapshot: Dict, now: Optional[float] = None) -> str:
+    """'🕒 3 dk önce tarandı (4h mumu 12:00 UTC)' biçiminde tazelik notu"""
+    age = max(0.0, (time.time() if now is None else now) - snapshot['scanned_at'])
+    if age < 60:
+        age_text = f"{age:.0f} sn"
+    elif age < 3600:
+        age_text = f"{age / 60:.0f} dk"
+    else:
+        age_text = f"{age / 3600:.1f} sa"
+    candle = time.strftime('%H:%M', time.gmtime(snapshot['candle_time'] / 1000))
+    return f"🕒 {age_text} önce tarandı ({snapshot['timeframe']} mumu {candle} UTC)"
+
+
+_scanner: Optional[BackgroundScanner] = None
+
+
+def get_background_scanner() -> BackgroundScanner:
+    """Süreç genelinde paylaşılan BackgroundScanner örneğini döndür"""
+    global _scanner
+    if _scanner is None:
+        _scanner = BackgroundScanner(settle_seconds=float(os.getenv('BACKGROUND_SCAN_SETTLE', '5')))
+    return _scanner
+
+
+def background_scan_enabled(name: str) -> bool:
+    """
+    İşin arka planda sürekli taranıp taranmayacağı.
+
+    BACKGROUND_SCAN=0 tüm döngüleri kapatır; BACKGROUND_SCAN_JOBS virgülle
+    ayrılmış iş adlarıyla sınırlar (varsayılan: hepsi).
+    """
+    if os.getenv('BACKGROUND_SCAN', '1') == '0':
+        return False
+    jobs = os.getenv('BACKGROUND_SCAN_JOBS')
+    return not jobs or name in {job.strip() for job in jobs.split(',')}
+
+
+async def stop_background_scanner():
+    """Paylaşılan arka plan tarayıcısını durdur"""
+    if _scanner is not None:
+        await _scanner.stop()
@@ -1,6 +1,153 @@
 import numpy as np
 import pandas as pd
 from typing import Dict, List, Optional, Tuple
+from src.analysis import indicator_engine as ie
+
+# recognize_patterns'ın döndürdüğü sıra
+PATTERN_NAMES = (
+    'doji', 'hammer', 'inverted_hammer', 'shooting_star', 'hanging_man',
+    'bullish_engulfing', 'bearish_engulfing', 'morning_star', 'evening_star',
+    'three_white_soldiers', 'three_black_crows',
+)
+BULLISH_PATTERNS = ('hammer', 'inverted_hammer', 'bullish_engulfing', 'morning_star', 'three_white_soldiers')
+BEARISH_PATTERNS = ('shooting_star', 'hanging_man', 'bearish_engulfing', 'evening_star', 'three_black_crows')
+STRONG_PATTERNS = ('morning_star', 'three_white_soldiers', 'evening_star', 'three_black_crows')
+
+
+def _shift(values: np.ndarray, k: int) -> np.ndarray:
+    """Son eksende kaydır: k > 0 iken out[i] = values[i-k], k < 0 iken values[i+|k|]; taşan yerler NaN"""
+    out = np.full_like(values, np.nan)
+    if k == 0:
+        out[...] = values
+    elif abs(k) < values.shape[-1]:
+        if k > 0:
+            out[..., k:] = values[..., :-k]
+        else:
+            out[..., :k] = values[..., -k:]
+    return out
+
+
+def trend_masks(close, window: int = 4) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Her mum için önceki `window` kapanışın (i-window .. i-1) yükseliş/düşüş maskesi.
+
+    Eski polyfit kontrolüyle aynı: son kapanış ilkinden yüksek/düşük ve
+    doğrusal regresyon eğimi pozitif/negatif. Eğimin işareti yalnızca
+    merkezlenmiş ağırlıklı toplamdan gelir, polyfit çağrısı gerekmez.
+    """
+    close = ie._as_float(close)
+    weights = np.arange(window) - (window - 1) / 2
+    slope = np.zeros_like(close)
+    for k, weight in enumerate(weights):
+        slope = slope + weight * _shift(close, window - k)
+    first, last = _shift(close, window), _shift(close, 1)
+    return (last > first) & (slope > 0), (last < first) & (slope < 0)
+
+
+def pattern_masks(open_, high, low, close) -> Dict[str, np.ndarray]:
+    """
+    On bir formasyonun boolean maskeleri (tek seri veya (sembol, N) matris).
+
+    Maske eski _find_* döngülerinin raporladığı indekste True olur: tek
+    mumlu formasyonlarda o mum, yıldız ve üçlü asker/karga formasyonlarında
+    ilk mum. Trend koşulu gereken formasyonlar ilk 4 mumda, yıldızlar son iki
+    mumda, üçlü formasyonlar son üç mumda eski döngü aralıklarıyla aynı
+    şekilde aranmaz.
+    """
+    open_, high, low, close = ie._as_float(open_), ie._as_float(high), ie._as_float(low), ie._as_float(close)
+    n = close.shape[-1]
+
+    body = np.abs(close - open_)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        body_pct = body / (high - low) * 100
+    upper_shadow = high - np.maximum(open_, close)
+    lower_shadow = np.minimum(open_, close) - low
+    bullish = close > open_
+    bearish = ~bullish
+    uptrend, downtrend = trend_masks(close, window=4)
+
+    long_lower = (lower_shadow > 2 * body) & (upper_shadow < 0.3 * body) & (body_pct < 40)
+    long_upper = (upper_shadow > 2 * body) & (lower_shadow < 0.3 * body) & (body_pct < 40)
+
+    # Kaydırılmış yön: 1 yeşil, 0 kırmızı, NaN seri dışı
+    direction = bullish.astype(np.float64)
+    prev_open, prev_close, prev_direction = _shift(open_, 1), _shift(close, 1), _shift(direction, 1)
+
+    # Sonraki mumlar (yıldız ve üçlü formasyonlar başlangıç mumuna raporlanır)
+    next_open, next_close, next_direction = _shift(open_, -1), _shift(close, -1), _shift(direction, -1)
+    next2_open, next2_close, next2_direction = _shift(open_, -2), _shift(close, -2), _shift(direction, -2)
+    next_body_pct = _shift(body_pct, -1)
+    midpoint = (open_ + close) / 2
+
+    # Eski döngüler üçlü formasyonlarda range(len - 3) kullanıyordu
+    triple_range = np.arange(n) < n - 3
+
+    return {
+        'doji': (body_pct < 5) & (upper_shadow > 0) & (lower_shadow > 0),
+        'hammer': downtrend & long_lower,
+        'inverted_hammer': downtrend & long_upper,
+        'shooting_star': uptrend & long_upper,
+        'hanging_man': uptrend & long_lower,
+        'bullish_engulfing': (prev_direction == 0) & bullish & (open_ < prev_close) & (close > prev_open),
+        'bearish_engulfing': (prev_direction == 1) & bearish & (open_ > prev_close) & (close < prev_open),
+        'morning_star': downtrend & bearish & (next_body_pct < 10) & (next2_direction == 1) & (next2_close > midpoint),
+        'evening_star': uptrend & bullish & (next_body_pct < 10) & (next2_direction == 0) & (next2_close < midpoint),
+        'three_white_soldiers': triple_range & bullish & (next_direction == 1) & (next2_direction == 1)
+                                & (next_close > close) & (next2_close > next_close)
+                                & (next_open > open_) & (next2_open > next_open),
+        'three_black_crows': triple_range & bearish & (next_direction == 0) & (next2_direction == 0)
+                             & (next_close < close) & (next2_close < next_close)
+                             & (next_open < open_) & (next2_open < next_open),
+    }
+
+
+def _ohlc_columns(block: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """(4, sembol, N) OHLC veya stack_ohlcv'nin (6, sembol, N) OHLCV bloğundan sütunlar"""
+    block = ie._as_float(block)
+    if block.shape[0] == 6:
+        block = block[1:5]
+    elif block.shape[0] != 4:
+        raise ValueError(f"OHLC bloğu (4, sembol, N) veya (6, sembol, N) olmalı, gelen: {block.shape}")
+    return block[0], block[1], block[2], block[3]
+
+
+def screen_patterns(block, symbols: List[str], last_n: int = 3,
+                    window: Optional[int] = None) -> Dict[str, List[str]]:
+    """
+    Çok sembollü tarama: son `last_n` mumda her formasyonu gösteren semboller.
+
+    Args:
+        block: (4, sembol, N) OHLC ya da (6, sembol, N) OHLCV dizisi
+        symbols: Bloktaki satırların sembolleri
+        last_n: Formasyonun aranacağı son mum sayısı
+        window: Verilirse formasyonlar yalnızca son `window` mumda aranır
+            (window=5, analyze_recent_patterns ile aynı sonucu verir)
+
+    Returns:
+        Dict[str, List[str]]: {formasyon_adı: [semboller]}, boş formasyonlar hariç
+    """
+    open_, high, low, close = _ohlc_columns(block)
+    if window is not None:
+        open_, high, low, close = (col[..., -window:] for col in (open_, high, low, close))
+    if close.shape[-1] < 5:
+        return {}
+
+    result = {}
+    for name, mask in pattern_masks(open_, high, low, close).items():
+        hits = np.flatnonzero(mask[..., -last_n:].any(axis=-1))
+        if hits.size:
+            result[name] = [symbols[i] for i in hits]
+    return result
+
+
+def screen_ohlcv(ohlcv_by_symbol: Dict[str, list], last_n: int = 3, window: Optional[int] = None,
+                 min_length: int = 5) -> Dict[str, List[str]]:
+    """screen_patterns'ın {sembol: ccxt mumları} sözlüğü için sürümü (uzunluk gruplarını birleştirir)"""
+    result: Dict[str, List[str]] = {}
+    for symbols, block in ie.stack_ohlcv(ohlcv_by_symbol, min_length=min_length).values():
+        for name, hits in screen_patterns(block, symbols, last_n=last_n, window=window).items():
+            result.setdefault(name, []).extend(hits)
+    return {name: result[name] for name in PATTERN_NAMES if name in result}
 
 
 class CandlestickPatternRecognizer:
@@ -34,38 +181,9 @@ class CandlestickPatternRecognizer:
         if len(df) < 5:
             return {}
             
-        # Gövde ve gölge hesaplamaları
-        df = df.copy()
-        df['body'] = abs(df['close'] - df['open'])
-        df['body_pct'] = df['body'] / (df['high'] - df['low']) * 100
-        df['upper_shadow'] = df.apply(lambda x: x['high'] - max(x['open'], x['close']), axis=1)
-        df['lower_shadow'] = df.apply(lambda x: min(x['open'], x['close']) - x['low'], axis=1)
-        df['is_bullish'] = df['close'] > df['open']
-        
-        patterns = {}
-        
-        # Doji tanıma
-        patterns['doji'] = self._find_doji(df)
-        
-        # Hammer ve Inverted Hammer
-        patterns['hammer'] = self._find_hammer(df)
-        patterns['inverted_hammer'] = self._find_inverted_hammer(df)
-        
-        # Shooting Star ve Hanging Man
-        patterns['shooting_star'] = self._find_shooting_star(df)
-        patterns['hanging_man'] = self._find_hanging_man(df)
-        
-        # Engulfing formasyonları
-        patterns['bullish_engulfing'] = self._find_bullish_engulfing(df)
-        patterns['bearish_engulfing'] = self._find_bearish_engulfing(df)
-        
-        # Morning Star ve Evening Star
-        patterns['morning_star'] = self._find_morning_star(df)
-        patterns['evening_star'] = self._find_evening_star(df)
-        
-        # Three White Soldiers ve Three Black Crows
-        patterns['three_white_soldiers'] = self._find_three_white_soldiers(df)
-        patterns['three_black_crows'] = self._find_three_black_crows(df)
+        # Tüm formasyonlar tek geçişte, dizi maskeleri olarak
+        masks = pattern_masks(df['open'], df['high'], df['low'], df['close'])
+        patterns = {name: np.flatnonzero(masks[name]).tolist() for name in PATTERN_NAMES}
         
         return {k: v for k, v in patterns.items() if v}  # Boş listeleri kaldır
     
@@ -92,9 +210,6 @@ class CandlestickPatternRecognizer:
             return {'patterns': [], 'signal': 'NEUTRAL', 'confidence': 0}
         
         # Sinyal ve güven puanı hesapla
-        bullish_patterns = ['hammer', 'inverted_hammer', 'bullish_engulfing', 'morning_star', 'three_white_soldiers']
-        bearish_patterns = ['shooting_star', 'hanging_man', 'bearish_engulfing', 'evening_star', 'three_black_crows']
-        
         bullish_score = 0
         bearish_score = 0
         detected_patterns = []
@@ -113,10 +228,10 @@ class CandlestickPatternRecognizer:
             })
             
             # Formasyona göre puan ekle
-            if pattern in bullish_patterns:
-                bullish_score += 1 if pattern not in ['morning_star', 'three_white_soldiers'] else 2
-            elif pattern in bearish_patterns:
-                bearish_score += 1 if pattern not in ['evening_star', 'three_black_crows'] else 2
+            if pattern in BULLISH_PATTERNS:
+                bullish_score += 2 if pattern in STRONG_PATTERNS else 1
+            elif pattern in BEARISH_PATTERNS:
+                bearish_score += 2 if pattern in STRONG_PATTERNS else 1
         
         # Sinyal belirle
         signal = 'NEUTRAL'
@@ -134,201 +249,6 @@ class CandlestickPatternRecognizer:
             'signal': signal,
             'confidence': confidence
         }
-    
-    def _find_doji(self, df: pd.DataFrame) -> List[int]:
-        """Doji formasyonlarını bulur"""
-        doji_indices = []
-        for i in range(len(df)):
-            if df['body_pct'].iloc[i] < 5:  # Gövde çok küçük
-                if df['upper_shadow'].iloc[i] > 0 and df['lower_shadow'].iloc[i] > 0:
-                    doji_indices.append(i)
-        return doji_indices
-    
-    def _find_hammer(self, df: pd.DataFrame) -> List[int]:
-        """Hammer formasyonlarını bulur"""
-        hammer_indices = []
-        for i in range(4, len(df)):
-            # Öncesinde düşüş trendi olmalı
-            if not self._is_downtrend(df, i, window=4):
-                continue
-                
-            current = df.iloc[i]
-            if (current['lower_shadow'] > 2 * current['body'] and  # Alt gölge gövdenin 2 katından uzun
-                current['upper_shadow'] < 0.3 * current['body'] and  # Üst gölge çok kısa
-                current['body_pct'] < 40):  # Gövde çok büyük değil
-                hammer_indices.append(i)
-        return hammer_indices
-    
-    def _find_inverted_hammer(self, df: pd.DataFrame) -> List[int]:
-        """Inverted Hammer formasyonlarını bulur"""
-        inv_hammer_indices = []
-        for i in range(4, len(df)):
-            # Öncesinde düşüş trendi olmalı
-            if not self._is_downtrend(df, i, window=4):
-                continue
-                
-            current = df.iloc[i]
-            if (current['upper_shadow'] > 2 * current['body'] and  # Üst gölge gövdenin 2 katından uzun
-                current['lower_shadow'] < 0.3 * current['body'] and  # Alt gölge çok kısa
-                current['body_pct'] < 40):  # Gövde çok büyük değil
-                inv_hammer_indices.append(i)
-        return inv_hammer_indices
-    
-    def _find_shooting_star(self, df: pd.DataFrame) -> List[int]:
-        """Shooting Star formasyonlarını bulur"""
-        shooting_star_indices = []
-        for i in range(4, len(df)):
-            # Öncesinde yükseliş trendi olmalı
-            if not self._is_uptrend(df, i, window=4):
-                continue
-                
-            current = df.iloc[i]
-            if (current['upper_shadow'] > 2 * current['body'] and  # Üst gölge gövdenin 2 katından uzun
-                current['lower_shadow'] < 0.3 * current['body'] and  # Alt gölge çok kısa
-                current['body_pct'] < 40):  # Gövde çok büyük değil
-                shooting_star_indices.append(i)
-        return shooting_star_indices
-    
-    def _find_hanging_man(self, df: pd.DataFrame) -> List[int]:
-        """Hanging Man formasyonlarını bulur"""
-        hanging_man_indices = []
-        for i in range(4, len(df)):
-            # Öncesinde yükseliş trendi olmalı
-            if not self._is_uptrend(df, i, window=4):
-                continue
-                
-            current = df.iloc[i]
-            if (current['lower_shadow'] > 2 * current['body'] and  # Alt gölge gövdenin 2 katından uzun
-                current['upper_shadow'] < 0.3 * current['body'] and  # Üst gölge çok kısa
-                current['body_pct'] < 40):  # Gövde çok büyük değil
-                hanging_man_indices.append(i)
-        return hanging_man_indices
-    
-    def _find_bullish_engulfing(self, df: pd.DataFrame) -> List[int]:
-        """Bullish Engulfing formasyonlarını bulur"""
-        bullish_engulfing_indices = []
-        for i in range(1, len(df)):
-            prev = df.iloc[i-1]
-            current = df.iloc[i]
-            
-            if (not prev['is_bullish'] and current['is_bullish'] and  # Önceki kırmızı, şimdiki yeşil
-                current['open'] < prev['close'] and  # Şimdiki açılış önceki kapanışın altında
-                current['close'] > prev['open']):  # Şimdiki kapanış önceki açılışın üstünde
-                bullish_engulfing_indices.append(i)
-        return bullish_engulfing_indices
-    
-    def _find_bearish_engulfing(self, df: pd.DataFrame) -> List[int]:
-        """Bearish Engulfing formasyonlarını bulur"""
-        bearish_engulfing_indices = []
-        for i in range(1, len(df)):
-            prev = df.iloc[i-1]
-            current = df.iloc[i]
-            
-            if (prev['is_bullish'] and not current['is_bullish'] and  # Önceki yeşil, şimdiki kırmızı
-                current['open'] > prev['close'] and  # Şimdiki açılış önceki kapanışın üstünde
-                current['close'] < prev['open']):  # Şimdiki kapanış önceki açılışın altında
-                bearish_engulfing_indices.append(i)
-        return bearish_engulfing_indices
-    
-    def _find_morning_star(self, df: pd.DataFrame) -> List[int]:
-        """Morning Star formasyonunu bulur"""
-        morning_star_indices = []
-        for i in range(4, len(df) - 2):
-            # En az 3 mum gerekiyor
-            if i + 2 >= len(df):
-                continue
-                
-            # Öncesinde düşüş trendi olmalı
-            if not self._is_downtrend(df, i, window=4):
-                continue
-                
-            first = df.iloc[i]
-            middle = df.iloc[i+1]
-            last = df.iloc[i+2]
-            
-            if (not first['is_bullish'] and  # İlk mum kırmızı
-                middle['body_pct'] < 10 and  # Orta mum küçük gövdeli (doji benzeri)
-                last['is_bullish'] and  # Son mum yeşil
-                last['close'] > (first['open'] + first['close']) / 2):  # Son mum ilk mumun ortasını geçiyor
-                morning_star_indices.append(i)
-        return morning_star_indices
-    
-    def _find_evening_star(self, df: pd.DataFrame) -> List[int]:
-        """Evening Star formasyonunu bulur"""
-        evening_star_indices = []
-        for i in range(4, len(df) - 2):
-            # En az 3 mum gerekiyor
-            if i + 2 >= len(df):
-                continue
-                
-            # Öncesinde yükseliş trendi olmalı
-            if not self._is_uptrend(df, i, window=4):
-                continue
-                
-            first = df.iloc[i]
-            middle = df.iloc[i+1]
-            last = df.iloc[i+2]
-            
-            if (first['is_bullish'] and  # İlk mum yeşil
-                middle['body_pct'] < 10 and  # Orta mum küçük gövdeli (doji benzeri)
-                not last['is_bullish'] and  # Son mum kırmızı
-                last['close'] < (first['open'] + first['close']) / 2):  # Son mum ilk mumun ortasının altında
-                evening_star_indices.append(i)
-        return evening_star_indices
-    
-    def _find_three_white_soldiers(self, df: pd.DataFrame) -> List[int]:
-        """Three White Soldiers formasyonunu bulur"""
-        three_white_indices = []
-        for i in range(len(df) - 3):
-            # En az 3 mum gerekiyor
-            if i + 2 >= len(df):
-                continue
-                
-            first = df.iloc[i]
-            second = df.iloc[i+1]
-            third = df.iloc[i+2]
-            
-            if (first['is_bullish'] and second['is_bullish'] and third['is_bullish'] and  # Üç mum da yeşil
-                second['close'] > first['close'] and third['close'] > second['close'] and  # Her mum bir öncekinden yüksek kapanıyor
-                second['open'] > first['open'] and third['open'] > second['open']):  # Her mum bir öncekinden yüksek açılıyor
-                three_white_indices.append(i)
-        return three_white_indices
-    
-    def _find_three_black_crows(self, df: pd.DataFrame) -> List[int]:
-        """Three Black Crows formasyonunu bulur"""
-        three_black_indices = []
-        for i in range(len(df) - 3):
-            # En az 3 mum gerekiyor
-            if i + 2 >= len(df):
-                continue
-                
-            first = df.iloc[i]
-            second = df.iloc[i+1]
-            third = df.iloc[i+2]
-            
-            if (not first['is_bullish'] and not second['is_bullish'] and not third['is_bullish'] and  # Üç mum da kırmızı
-                second['close'] < first['close'] and third['close'] < second['close'] and  # Her mum bir öncekinden düşük kapanıyor
-                second['open'] < first['open'] and third['open'] < second['open']):  # Her mum bir öncekinden düşük açılıyor
-                three_black_indices.append(i)
-        return three_black_indices
-    
-    def _is_uptrend(self, df: pd.DataFrame, idx: int, window: int = 4) -> bool:
-        """Belirli bir pozisyonda yükseliş trendi olup olmadığını kontrol eder"""
-        if idx < window:
-            return False
-            
-        # Son window kadar mumun kapanış fiyatlarını kontrol et
-        closes = df['close'].iloc[idx-window:idx].values
-        return closes[-1] > closes[0] and np.polyfit(range(len(closes)), closes, 1)[0] > 0
-    
-    def _is_downtrend(self, df: pd.DataFrame, idx: int, window: int = 4) -> bool:
-        """Belirli bir pozisyonda düşüş trendi olup olmadığını kontrol eder"""
-        if idx < window:
-            return False
-            
-        # Son window kadar mumun kapanış fiyatlarını kontrol et
-        closes = df['close'].iloc[idx-window:idx].values
-        return closes[-1] < closes[0] and np.polyfit(range(len(closes)), closes, 1)[0] < 0
 
 
 # Kullanım örneği
@@ -0,0 +1,201 @@
+"""
+Kapanmış mum anahtarlı gösterge önbelleği.
+
+Aynı (sembol, zaman dilimi) göstergeleri bir tarama içinde ve art arda gelen
+taramalarda (/scan, /multiscan, /aianalysis, analyze_opportunity) tekrar
+tekrar hesaplanıyordu. Göstergeler yalnızca yeni bir mum kapandığında
+değişecek şekilde kapanmış mumlar üzerinden hesaplanır ve
+(sembol, zaman dilimi, son kapanmış mumun timestamp'i, mum sayısı,
+parametre özeti) anahtarıyla saklanır. Sembol 'BTC/USDT' ve 'BTCUSDT'
+biçimlerinde aynı girdiye düşecek şekilde normalize edilir. EMA, MACD ve
+RSI gibi özyinelemeli göstergeler pencere uzunluğuna bağlı olduğundan
+farklı derinlikte çekilmiş seriler ayrı girdilerde tutulur.
+
+Oluşmakta olan son mum hesaba katılmaz; böylece aynı anahtar her zaman aynı
+değerleri verir ve mum kapanana kadar sinyaller yeniden boyanmaz. Anlık fiyat
+gereken yerlerde ticker fiyatı ya da ham mum listesi kullanılmalıdır.
+
+Önbellek boyutla sınırlıdır (LRU); hit/miss/eviction sayaçları `stats`
+içinde tutulur.
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+from src.analysis import indicator_engine as ie
+from src.data_collectors.candle_store import timeframe_to_ms
+
+# compute_features'ın sabit parametreleri; tanımlar değişirse eski girdiler geçersiz olur
+DEFAULT_PARAMS = {
+    'rsi': 14, 'macd': (12, 26, 9), 'ema': (9, 20, 21, 50, 200), 'bollinger': (20, 2.0),
+    'atr': 14, 'adx': 14, 'stoch_rsi': (14, 3, 3), 'volume': 20,
+}
+
+
+def params_key(params: Optional[Dict]) -> str:
+    """Parametre sözlüğünün kısa, sıralamadan bağımsız özeti"""
+    encoded = json.dumps(params or {}, sort_keys=True, default=str)
+    return hashlib.sha1(encoded.encode()).hexdigest()[:12]
+
+
+_DEFAULT_KEY = params_key(DEFAULT_PARAMS)
+
+
+def cache_symbol(symbol: str) -> str:
+    """Önbellek anahtarı için sembol: 'BTC/USDT', 'BTC/USDT:USDT' ve 'BTCUSDT' -> 'BTCUSDT'"""
+    return symbol.split(':')[0].replace('/', '').upper()
+
+
+def closed_columns(ohlcv, timeframe: str, now_ms: Optional[int] = None) -> np.ndarray:
+    """Mumların (6, N) sütun dizisi, oluşmakta olan son mum hariç"""
+    data = ie.to_columns(ohlcv)
+    if not data.shape[1]:
+        return data
+    now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+    closed = data[0] + timeframe_to_ms(timeframe) <= now_ms
+    return data[:, :int(np.count_nonzero(closed))]
+
+
+class FeatureCache:
+    """(sembol, zaman dilimi, son kapanmış mum, mum sayısı, parametre özeti) -> gösterge sözlüğü"""
+
+    def __init__(self, max_entries: int = 2048):
+        """
+        Args:
+            max_entries: Saklanacak en fazla girdi; aşılınca en eski kullanılan atılır
+        """
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Tuple, Dict[str, np.ndarray]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.stats['hits'] + self.stats['misses']
+        return self.stats['hits'] / total if total else 0.0
+
+    def _lookup(self, key: Tuple) -> Optional[Dict[str, np.ndarray]]:
+        with self._lock:
+            features = self._entries.get(key)
+            if features is None:
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return features
+
+    def _store(self, key: Tuple, features: Dict[str, np.ndarray]):
+        with self._lock:
+            self._entries[key] = features
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    @staticmethod
+    def _key(symbol: str, timeframe: str, data: np.ndarray, digest: str) -> Optional[Tuple]:
+        if not data.shape[1]:
+            return None
+        return cache_symbol(symbol), timeframe, int(data[0, -1]), data.shape[1], digest
+
+    def get_features(self, symbol: str, timeframe: str, ohlcv,
+                     compute: Optional[Callable[[np.ndarray], Dict[str, np.ndarray]]] = None,
+                     params: Optional[Dict] = None, now_ms: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Sembolün kapanmış mumlar üzerinden göstergeleri.
+
+        Args:
+            ohlcv: ccxt mum listesi, (6, N) dizi veya DataFrame (son mum açık olabilir)
+            compute: (6, N) diziden gösterge sözlüğü üreten fonksiyon;
+                verilmezse indicator_engine.compute_features
+            params: compute'un parametreleri (anahtara özet olarak girer)
+
+        Dönen diziler önbellekle paylaşılır, yerinde değiştirilmemelidir.
+        """
+        data = closed_columns(ohlcv, timeframe, now_ms)
+        if compute is None:
+            compute, digest = ie.compute_features, _DEFAULT_KEY
+        else:
+            digest = params_key({'compute': getattr(compute, '__qualname__', repr(compute)), **(params or {})})
+
+        key = self._key(symbol, timeframe, data, digest)
+        if key is None:
+            return compute(data)
+        features = self._lookup(key)
+        if features is None:
+            features = compute(data)
+            self._store(key, features)
+        return features
+
+    def get_many(self, timeframe: str, ohlcv_by_symbol: Dict[str, list], min_length: int = 30,
+                 now_ms: Optional[int] = None) -> Dict[str, Tuple[Dict[str, np.ndarray], np.ndarray]]:
+        """
+        Birden çok sembolün varsayılan göstergeleri; önbellekte olmayanlar
+        sembol × mum matrisleri üzerinde tek seferde hesaplanır.
+
+        `min_length` ham mum sayısına uygulanır (açık mum dahil).
+
+        Returns:
+            Sembol -> (gösterge sözlüğü, kapanmış mumların (6, N) dizisi)
+        """
+        results = {}
+        missing = {}
+        for symbol, ohlcv in ohlcv_by_symbol.items():
+            if ohlcv is None or len(ohlcv) < min_length:
+                continue
+            data = closed_columns(ohlcv, timeframe, now_ms)
+            key = self._key(symbol, timeframe, data, _DEFAULT_KEY)
+            if key is None:
+                continue
+            features = self._lookup(key)
+            if features is None:
+                missing[symbol] = (key, data)
+            else:
+                results[symbol] = (features, data)
+
+        blocks = ie.stack_ohlcv({symbol: data for symbol, (_, data) in missing.items()}, min_length=1)
+        for symbols, block in blocks.values():
+            batch = ie._features_from_columns(block)
+            for i, symbol in enumerate(symbols):
+                features = {name: values[i].copy() for name, values in batch.items()}
+                key, data = missing[symbol]
+                self._store(key, features)
+                results[symbol] = (features, data)
+        return {symbol: results[symbol] for symbol in ohlcv_by_symbol if symbol in results}
+
+    def indicator_table(self, timeframe: str, ohlcv_by_symbol: Dict[str, list], min_length: int = 30,
+                        volume_window: int = 10, now_ms: Optional[int] = None) -> ie.IndicatorTable:
+        """indicator_engine.build_indicator_table'ın önbellekli, kapanmış mum sürümü"""
+        cached = self.get_many(timeframe, ohlcv_by_symbol, min_length, now_ms)
+        symbols = list(cached)
+        if not symbols:
+            return ie.IndicatorTable([])
+        names = next(iter(cached.values()))[0].keys()
+        columns = {name: np.array([cached[symbol][0][name][-1] for symbol in symbols]) for name in names}
+        columns['avg_volume'] = np.array([cached[symbol][1][5][-volume_window:].mean() for symbol in symbols])
+        return ie.IndicatorTable(symbols, columns)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_cache: Optional[FeatureCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_feature_cache() -> FeatureCache:
+    """Süreç genelinde paylaşılan FeatureCache örneğini döndür"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = FeatureCache(max_entries=int(os.getenv('FEATURE_CACHE_SIZE', '2048')))
+    return _cache
@@ -0,0 +1,433 @@
+"""
+Tek, NumPy ile vektörleştirilmiş teknik gösterge motoru.
+
+RSI, MACD, EMA, Bollinger ve ATR daha önce analizörlerin her birinde ayrı ayrı
+(kimi pandas rolling, kimi Python döngüsü ile) yazılmıştı. Tüm analizörler
+artık bu modülü çağırır.
+
+Tüm fonksiyonlar son eksen (axis=-1) boyunca çalışır: tek sembol için 1-D
+(N,) dizi, çoklu sembol için 2-D (sembol, N) matris verilebilir. Isınma
+dönemindeki değerler NaN'dır.
+
+Tanımlar:
+- EMA: pandas ewm(span=period, adjust=False) ile aynı (ilk değerle başlar)
+- RSI / ATR / ADX: Wilder yumuşatması (ilk değer basit ortalama)
+- Bollinger: popülasyon standart sapması (ddof=0)
+"""
+import numpy as np
+from typing import Dict, List, Optional, Tuple, Union
+
+try:
+    from scipy.signal import lfilter
+except ImportError:  # scipy yoksa özyinelemeli filtreler döngüyle hesaplanır
+    lfilter = None
+
+OHLCV_INDEX = {'timestamp': 0, 'open': 1, 'high': 2, 'low': 3, 'close': 4, 'volume': 5}
+
+
+def _as_float(values) -> np.ndarray:
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def _recursive_filter(values: np.ndarray, alpha: float, initial: np.ndarray) -> np.ndarray:
+    """
+    y[n] = alpha * x[n] + (1 - alpha) * y[n-1], y[-1] = initial.
+
+    scipy varsa C hızında lfilter, yoksa eksen boyunca döngü kullanılır.
+    """
+    if values.shape[-1] == 0:
+        return values.copy()
+    if lfilter is not None:
+        zi = ((1.0 - alpha) * np.asarray(initial, dtype=np.float64))[..., np.newaxis]
+        out, _ = lfilter([alpha], [1.0, alpha - 1.0], values, axis=-1, zi=zi)
+        return out
+    out = np.empty_like(values)
+    prev = np.asarray(initial, dtype=np.float64)
+    for i in range(values.shape[-1]):
+        prev = alpha * values[..., i] + (1.0 - alpha) * prev
+        out[..., i] = prev
+    return out
+
+
+def ema(values, period: int) -> np.ndarray:
+    """Üstel hareketli ortalama (adjust=False)"""
+    values = _as_float(values)
+    if values.shape[-1] == 0:
+        return values.copy()
+    alpha = 2.0 / (period + 1.0)
+    return _recursive_filter(values, alpha, values[..., 0])
+
+
+def rma(values, period: int) -> np.ndarray:
+    """Wilder hareketli ortalaması; ilk değer ilk `period` elemanın ortalaması"""
+    values = _as_float(values)
+    out = np.full_like(values, np.nan)
+    if values.shape[-1] < period:
+        return out
+    seed = values[..., :period].mean(axis=-1)
+    out[..., period - 1] = seed
+    out[..., period:] = _recursive_filter(values[..., period:], 1.0 / period, seed)
+    return out
+
+
+def sma(values, period: int) -> np.ndarray:
+    """Basit hareketli ortalama (kümülatif toplam ile)"""
+    values = _as_float(values)
+    out = np.full_like(values, np.nan)
+    if values.shape[-1] < period:
+        return out
+    csum = np.cumsum(values, axis=-1)
+    out[..., period - 1] = csum[..., period - 1]
+    out[..., period:] = csum[..., period:] - csum[..., :-period]
+    out[..., period - 1:] /= period
+    return out
+
+
+def rolling_std(values, period: int) -> np.ndarray:
+    """Kayan pencere standart sapması (ddof=0)"""
+    values = _as_float(values)
+    out = np.full_like(values, np.nan)
+    if values.shape[-1] < period:
+        return out
+    windows = np.lib.stride_tricks.sliding_window_view(values, period, axis=-1)
+    out[..., period - 1:] = windows.std(axis=-1)
+    return out
+
+
+def rolling_max(values, period: int) -> np.ndarray:
+    values = _as_float(values)
+    out = np.full_like(values, np.nan)
+    if values.shape[-1] < period:
+        return out
+    out[..., period - 1:] = np.lib.stride_tricks.sliding_window_view(values, period, axis=-1).max(axis=-1)
+    return out
+
+
+def rolling_min(values, period: int) -> np.ndarray:
+    values = _as_float(values)
+    out = np.full_like(values, np.nan)
+    if values.shape[-1] < period:
+        return out
+    out[..., period - 1:] = np.lib.stride_tricks.sliding_window_view(values, period, axis=-1).min(axis=-1)
+    return out
+
+
+def rsi(close, period: int = 14) -> np.ndarray:
+    """Wilder RSI"""
+    close = _as_float(close)
+    out = np.full_like(close, np.nan)
+    if close.shape[-1] <= period:
+        return out
+    delta = np.diff(close, axis=-1)
+    avg_gain = rma(np.clip(delta, 0, None), period)
+    avg_loss = rma(np.clip(-delta, 0, None), period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = avg_gain / avg_loss
+        values = 100.0 - 100.0 / (1.0 + rs)
+    # Hiç kayıp yoksa RSI 100, hiç hareket yoksa 50
+    values = np.where(avg_loss == 0, np.where(avg_gain == 0, 50.0, 100.0), values)
+    values = np.where(np.isnan(avg_gain), np.nan, values)
+    out[..., 1:] = values
+    return out
+
+
+def macd(close, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """MACD çizgisi, sinyal çizgisi ve histogram"""
+    close = _as_float(close)
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(line, signal)
+    return line, signal_line, line - signal_line
+
+
+def bollinger(close, period: int = 20, num_std: float = 2.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Bollinger bantları: (üst, orta, alt)"""
+    middle = sma(close, period)
+    std = rolling_std(close, period)
+    return middle + num_std * std, middle, middle - num_std * std
+
+
+def true_range(high, low, close) -> np.ndarray:
+    high, low, close = _as_float(high), _as_float(low), _as_float(close)
+    prev_close = np.concatenate([close[..., :1], close[..., :-1]], axis=-1)
+    return np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+
+def atr(high, low, close, period: int = 14) -> np.ndarray:
+    """Wilder ATR"""
+    return rma(true_range(high, low, close), period)
+
+
+def adx(high, low, close, period: int = 14) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Wilder ADX: (adx, +DI, -DI)"""
+    high, low = _as_float(high), _as_float(low)
+    up_move = np.diff(high, axis=-1, prepend=high[..., :1])
+    down_move = -np.diff(low, axis=-1, prepend=low[..., :1])
+    plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
+    minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
+
+    tr_smooth = rma(true_range(high, low, close), period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        plus_di = 100.0 * rma(plus_dm, period) / tr_smooth
+        minus_di = 100.0 * rma(minus_dm, period) / tr_smooth
+        di_sum = plus_di + minus_di
+        dx = np.where(di_sum > 0, 100.0 * np.abs(plus_di - minus_di) / di_sum, 0.0)
+    dx = np.where(np.isnan(plus_di), np.nan, dx)
+
+    adx_values = np.full_like(dx, np.nan)
+    start = period - 1
+    if dx.shape[-1] >= start + period:
+        adx_values[..., start:] = rma(dx[..., start:], period)
+    return adx_values, plus_di, minus_di
+
+
+def stoch_rsi(close, period: int = 14, k_period: int = 3, d_period: int = 3) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Stochastic RSI: (ham değer, %K, %D) 0-100 ölçeğinde"""
+    rsi_values = rsi(close, period)
+    low = rolling_min(rsi_values, period)
+    high = rolling_max(rsi_values, period)
+    span = high - low
+    with np.errstate(divide='ignore', invalid='ignore'):
+        raw = np.where(span > 0, 100.0 * (rsi_values - low) / span, 50.0)
+    raw = np.where(np.isnan(span), np.nan, raw)
+    k = _nan_sma(raw, k_period)
+    d = _nan_sma(k, d_period)
+    return raw, k, d
+
+
+def stochastic(high, low, close, k_period: int = 14, d_period: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+    """Stochastic osilatörü: (%K, %D) 0-100 ölçeğinde"""
+    close = _as_float(close)
+    low_min = rolling_min(low, k_period)
+    high_max = rolling_max(high, k_period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        k = 100.0 * (close - low_min) / (high_max - low_min)
+    return k, _nan_sma(k, d_period)
+
+
+def _nan_sma(values: np.ndarray, period: int) -> np.ndarray:
+    """Başında NaN olan seriler için SMA (NaN'lar ısınma kabul edilir)"""
+    out = np.full_like(values, np.nan)
+    if values.shape[-1] < period:
+        return out
+    windows = np.lib.stride_tricks.sliding_window_view(values, period, axis=-1)
+    out[..., period - 1:] = windows.mean(axis=-1)
+    return out
+
+
+def volume_ratio(volume, period: int = 20) -> np.ndarray:
+    """Her mumun hacminin önceki `period` mumun ortalamasına oranı"""
+    volume = _as_float(volume)
+    previous_avg = np.full_like(volume, np.nan)
+    previous_avg[..., 1:] = sma(volume, period)[..., :-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(previous_avg > 0, volume / previous_avg, np.nan)
+
+
+def obv(close, volume) -> np.ndarray:
+    """On Balance Volume (ilk değer ilk mumun hacmi)"""
+    close, volume = _as_float(close), _as_float(volume)
+    direction = np.sign(np.diff(close, axis=-1))
+    out = np.empty_like(volume)
+    out[..., :1] = volume[..., :1]
+    out[..., 1:] = direction * volume[..., 1:]
+    return np.cumsum(out, axis=-1)
+
+
+def vwap(high, low, close, volume, period: Optional[int] = None) -> np.ndarray:
+    """Hacim ağırlıklı ortalama fiyat: kümülatif ya da (period verilirse) kayan pencereli"""
+    typical_price = (_as_float(high) + _as_float(low) + _as_float(close)) / 3
+    volume = _as_float(volume)
+    if period is not None:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return sma(typical_price * volume, period) / sma(volume, period)
+    cumulative_vol = np.cumsum(volume, axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(cumulative_vol > 0, np.cumsum(typical_price * volume, axis=-1) / cumulative_vol, typical_price)
+
+
+def to_columns(ohlcv) -> np.ndarray:
+    """
+    ccxt mum listesi, (N, 6) / (6, N) dizi, OHLCVArray veya DataFrame'i
+    sütun bazlı (6, N) float64 diziye çevir.
+    """
+    if hasattr(ohlcv, 'as_columns'):
+        return ohlcv.as_columns()
+    if hasattr(ohlcv, 'columns'):
+        if 'timestamp' in ohlcv.columns:
+            timestamps = ohlcv['timestamp'].to_numpy()
+            if np.issubdtype(timestamps.dtype, np.datetime64):
+                timestamps = timestamps.astype('datetime64[ms]').astype(np.int64)
+        elif np.issubdtype(ohlcv.index.dtype, np.datetime64):
+            # mplfinance biçimi: timestamp index
+            timestamps = ohlcv.index.to_numpy().astype('datetime64[ms]').astype(np.int64)
+        else:
+            timestamps = np.arange(len(ohlcv))
+        return np.vstack([
+            np.asarray(timestamps, dtype=np.float64),
+            *[ohlcv[col].to_numpy(dtype=np.float64) for col in ('open', 'high', 'low', 'close', 'volume')]
+        ])
+    arr = np.asarray(ohlcv, dtype=np.float64)
+    if arr.ndim == 2 and arr.shape[0] == 6 and arr.shape[1] != 6:
+        return np.ascontiguousarray(arr)
+    return np.ascontiguousarray(arr[:, :6].T)
+
+
+def compute_features(ohlcv: Union[np.ndarray, list]) -> Dict[str, np.ndarray]:
+    """
+    Bir sembolün tüm gösterge setini tek geçişte hesapla.
+
+    Args:
+        ohlcv: ccxt mum listesi, (6, N) dizi veya OHLCV DataFrame'i
+
+    Returns:
+        Gösterge adı -> (N,) dizi sözlüğü
+    """
+    return _features_from_columns(to_columns(ohlcv))
+
+
+def _features_from_columns(data: np.ndarray) -> Dict[str, np.ndarray]:
+    """(6, N) veya (6, sembol, N) sütun dizisinden gösterge seti"""
+    high, low, close, volume = data[2], data[3], data[4], data[5]
+
+    macd_line, macd_signal, macd_hist = macd(close)
+    bb_upper, bb_middle, bb_lower = bollinger(close)
+    adx_values, plus_di, minus_di = adx(high, low, close)
+    stoch_raw, stoch_k, stoch_d = stoch_rsi(close)
+
+    return {
+        'close': close,
+        'rsi': rsi(close),
+        'macd': macd_line,
+        'macd_signal': macd_signal,
+        'macd_hist': macd_hist,
+        'ema9': ema(close, 9),
+        'ema20': ema(close, 20),
+        'ema21': ema(close, 21),
+        'ema50': ema(close, 50),
+        'ema200': ema(close, 200),
+        'bb_upper': bb_upper,
+        'bb_middle': bb_middle,
+        'bb_lower': bb_lower,
+        'atr': atr(high, low, close),
+        'adx': adx_values,
+        'plus_di': plus_di,
+        'minus_di': minus_di,
+        'stoch_rsi': stoch_raw,
+        'stoch_k': stoch_k,
+        'stoch_d': stoch_d,
+        'volume_sma': sma(volume, 20),
+        'volume_ratio': volume_ratio(volume),
+    }
+
+
+def stack_ohlcv(ohlcv_by_symbol: Dict[str, list], min_length: int = 30) -> Dict[int, Tuple[List[str], np.ndarray]]:
+    """
+    Sembollerin mumlarını (6, sembol, N) matrislerine yığ.
+
+    Seriler son muma göre hizalıdır (aynı limitle çekilmiş son N mum). Yeni
+    listelenmiş coinler gibi daha kısa seriler kırpılıp tüm evreni küçültmesin
+    diye her uzunluk kendi grubunda yığılır; normal bir taramada tek grup olur.
+    `min_length`'ten kısa seriler atlanır.
+
+    Returns:
+        Uzunluk -> (semboller, (6, sembol, N) dizi)
+    """
+    groups: Dict[int, Tuple[List[str], list]] = {}
+    for symbol, ohlcv in ohlcv_by_symbol.items():
+        if ohlcv is None or len(ohlcv) < min_length:
+            continue
+        data = to_columns(ohlcv)
+        symbols, arrays = groups.setdefault(data.shape[1], ([], []))
+        symbols.append(symbol)
+        arrays.append(data)
+    return {length: (symbols, np.stack(arrays, axis=1)) for length, (symbols, arrays) in groups.items()}
+
+
+class IndicatorTable:
+    """
+    Sütun bazlı tarama sonucu: her sembol bir satır, her gösterge bir sütun.
+
+    Sütunlar (sembol,) uzunluğunda dizilerdir; puanlama gibi adımlar satır
+    satır dolaşmak yerine tüm evren üzerinde tek seferde çalışır.
+    """
+
+    def __init__(self, symbols: List[str], columns: Optional[Dict[str, np.ndarray]] = None):
+        self.symbols = list(symbols)
+        self.columns: Dict[str, np.ndarray] = dict(columns or {})
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.columns
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def __setitem__(self, name: str, values):
+        values = np.asarray(values)
+        if values.ndim == 0:
+            values = np.full(len(self), values)
+        if values.shape != (len(self),):
+            raise ValueError(f"{name} sütunu {len(self)} satır olmalı, {values.shape} verildi")
+        self.columns[name] = values
+
+    def select(self, mask) -> 'IndicatorTable':
+        """Maske veya indeks dizisiyle satır seç"""
+        index = np.flatnonzero(mask) if np.asarray(mask).dtype == bool else np.asarray(mask, dtype=int)
+        return IndicatorTable([self.symbols[i] for i in index],
+                              {name: values[index] for name, values in self.columns.items()})
+
+    def sort(self, column: str, descending: bool = True) -> 'IndicatorTable':
+        order = np.argsort(self.columns[column], kind='stable')
+        return self.select(order[::-1] if descending else order)
+
+    def row(self, i: int) -> Dict:
+        """Tek satırı Python skalerleriyle sözlük olarak döndür"""
+        row = {'symbol': self.symbols[i]}
+        row.update({name: values[i].item() for name, values in self.columns.items()})
+        return row
+
+    def rows(self):
+        for i in range(len(self)):
+            yield self.row(i)
+
+    @classmethod
+    def concat(cls, tables: List['IndicatorTable']) -> 'IndicatorTable':
+        tables = [table for table in tables if len(table)]
+        if not tables:
+            return cls([])
+        names = set(tables[0].columns).intersection(*(table.columns for table in tables[1:]))
+        return cls([symbol for table in tables for symbol in table.symbols],
+                   {name: np.concatenate([table.columns[name] for table in tables]) for name in names})
+
+
+def build_indicator_table(ohlcv_by_symbol: Dict[str, list], min_length: int = 30,
+                          volume_window: int = 10) -> IndicatorTable:
+    """
+    Tüm sembollerin göstergelerini sembol × mum matrisleri üzerinde tek
+    seferde hesaplayıp son değerleri sütun bazlı tabloya yaz.
+
+    Args:
+        ohlcv_by_symbol: Sembol -> ccxt mum listesi
+        min_length: Bundan kısa seriler tabloya alınmaz
+        volume_window: `avg_volume` sütunu için son mum sayısı
+
+    Returns:
+        IndicatorTable (sütunlar: compute_features anahtarları + avg_volume)
+    """
+    tables = []
+    for symbols, data in stack_ohlcv(ohlcv_by_symbol, min_length).values():
+        features = _features_from_columns(data)
+        columns = {name: values[:, -1] for name, values in features.items()}
+        columns['avg_volume'] = data[5][:, -volume_window:].mean(axis=-1)
+        tables.append(IndicatorTable(symbols, columns))
+    return IndicatorTable.concat(tables)
+
+
+def last(values, default: float = 0.0) -> float:
+    """Serinin son değerini float olarak döndür (NaN ise varsayılan)"""
+    values = np.asarray(values, dtype=np.float64)
+    if values.size == 0 or np.isnan(values[-1]):
+        return default
+    return float(values[-1])
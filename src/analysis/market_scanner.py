@@ -1,23 +1,15 @@
 from typing import List, Dict
-import ccxt.async_support as ccxt_async
 import pandas as pd
-import asyncio
 import numpy as np
-from ta.trend import EMAIndicator, MACD
-from ta.momentum import RSIIndicator, StochRSIIndicator
-from ta.volatility import BollingerBands
-from ta.volume import VolumeWeightedAveragePrice
 from datetime import datetime
+from src.exchanges.gateway import get_gateway
+from src.analysis import indicator_engine as ie
 
 class MarketScanner:
     def __init__(self):
         """Initialize the market scanner with extended signals."""
-        self.exchange = ccxt_async.binance({
-            'enableRateLimit': True,
-            'options': {
-                'defaultType': 'spot'
-            }
-        })
+        # Paylaşılan gateway: rate limit ağırlık bütçesi ve tekrar denemeler orada
+        self.exchange = get_gateway()
         self.min_volume = 50000  # Minimum 50k USDT hacim (daha fazla coin tarayabilmek için düşürüldü)
         self.min_price = 0.000001
 
@@ -195,8 +187,6 @@ class MarketScanner:
                 'bollinger_breakout': [],
                 'stoch_oversold': []
             }
-        finally:
-            await self.exchange.close()
 
     async def get_ticker(self, symbol: str) -> Dict:
         """Sembol için ticker verilerini al."""
@@ -214,10 +204,6 @@ class MarketScanner:
             return ticker
 
         except Exception as e:
-            if 'ERR_RATE_LIMIT' in str(e):
-                print(f"⏳ Rate limit - {symbol} için bekleniyor...")
-                await asyncio.sleep(1)
-                return await self.get_ticker(symbol)
             print(f"❌ Ticker hatası {symbol}: {str(e)}")
             return None
 
@@ -234,41 +220,29 @@ class MarketScanner:
             return df
 
         except Exception as e:
-            if 'ERR_RATE_LIMIT' in str(e):
-                print(f"⏳ Rate limit - {symbol} için bekleniyor...")
-                await asyncio.sleep(1)
-                return await self.get_ohlcv(symbol)
             print(f"❌ OHLCV hatası {symbol}: {str(e)}")
             return None
 
     def _calculate_indicators(self, df: pd.DataFrame) -> dict:
         """Teknik göstergeleri hesapla."""
         try:
-            # RSI
-            rsi = RSIIndicator(df['close'], window=14)
-            current_rsi = float(rsi.rsi().iloc[-1])
+            features = ie.compute_features(df)
+            current_rsi = float(features['rsi'][-1])
 
             # EMA20, EMA50
-            ema20 = float(EMAIndicator(df['close'], window=20).ema_indicator().iloc[-1])
-            ema50 = float(EMAIndicator(df['close'], window=50).ema_indicator().iloc[-1])
+            ema20 = float(features['ema20'][-1])
+            ema50 = float(features['ema50'][-1])
 
             # MACD
-            macd = MACD(df['close'], window_slow=26, window_fast=12, window_sign=9)
-            current_macd = float(macd.macd().iloc[-1])
-            current_signal = float(macd.macd_signal().iloc[-1])
+            current_macd = float(features['macd'][-1])
+            current_signal = float(features['macd_signal'][-1])
 
             # VWAP
-            vwap = float(VolumeWeightedAveragePrice(
-                high=df['high'],
-                low=df['low'],
-                close=df['close'],
-                volume=df['volume']
-            ).volume_weighted_average_price().iloc[-1])
+            vwap = float(ie.vwap(df['high'], df['low'], df['close'], df['volume'], period=14)[-1])
 
             # Bollinger Bands (20, 2)
-            bb_indicator = BollingerBands(df['close'], window=20, window_dev=2)
-            bb_upper = float(bb_indicator.bollinger_hband().iloc[-1])
-            bb_lower = float(bb_indicator.bollinger_lband().iloc[-1])
+            bb_upper = float(features['bb_upper'][-1])
+            bb_lower = float(features['bb_lower'][-1])
 
             # Hacim değişimi
             recent_vol = float(df['volume'].iloc[-3:].mean())
@@ -428,15 +402,15 @@ class MarketScanner:
     def _check_stoch_rsi_signal(self, df: pd.DataFrame) -> str:
         """
         Stochastic RSI ile basit oversold/overbought örneği:
-        stoch_rsi < 0.2 -> oversold,
-        stoch_rsi > 0.8 -> overbought
+        stoch_rsi < 20 -> oversold,
+        stoch_rsi > 80 -> overbought
         """
         try:
-            stoch = StochRSIIndicator(close=df['close'], window=14, smooth1=3, smooth2=3)
-            stoch_rsi = stoch.stochrsi_k().iloc[-1]  # 0-1 arasında değer
-            if stoch_rsi < 0.2:
+            _, stoch_k, _ = ie.stoch_rsi(df['close'].to_numpy())
+            stoch_rsi = stoch_k[-1]  # 0-100 arasında değer
+            if stoch_rsi < 20:
                 return 'oversold'
-            elif stoch_rsi > 0.8:
+            elif stoch_rsi > 80:
                 return 'overbought'
             else:
                 return 'neutral'
@@ -455,20 +429,19 @@ class MarketScanner:
             'is_squeeze_breakout': False
         }
         try:
-            bb = BollingerBands(df['close'], window=20, window_dev=2)
-            band_width = bb.bollinger_hband().iloc[-1] - bb.bollinger_lband().iloc[-1]
-            middle_band = bb.bollinger_mavg().iloc[-1]
+            bb_upper, _, bb_lower = ie.bollinger(df['close'].to_numpy())
+            band_widths = bb_upper - bb_lower
+            band_width = band_widths[-1]
             close_price = df['close'].iloc[-1]
 
             # Basit bir eşik: band genişliği son 20 mumun ortalamasının %50 altına inmişse
-            all_band_widths = (bb.bollinger_hband() - bb.bollinger_lband()).iloc[-20:]
-            avg_band_width = all_band_widths.mean()
+            avg_band_width = np.nanmean(band_widths[-20:])
             if band_width < avg_band_width * 0.5:
                 result['is_squeeze'] = True
 
             # Breakout: close_price üst bandın (veya alt bandın) dışına çıkmışsa
             # ya da yakınından hızlı uzaklaşıyorsa
-            upper_band = bb.bollinger_hband().iloc[-1]
+            upper_band = bb_upper[-1]
             if close_price > upper_band * 1.01:  # %1 üstüne çıkması
                 result['is_squeeze_breakout'] = True
 
@@ -487,12 +460,12 @@ class MarketScanner:
         """
         try:
             # Örnek: 50 ve 200 EMAsı
-            ema50 = EMAIndicator(df['close'], window=50).ema_indicator()
-            ema200 = EMAIndicator(df['close'], window=200).ema_indicator()
+            close = df['close'].to_numpy()
+            ema50, ema200 = ie.ema(close, 50), ie.ema(close, 200)
 
             # Son iki değerde kesişim analizi
-            prev50, prev200 = ema50.iloc[-2], ema200.iloc[-2]
-            curr50, curr200 = ema50.iloc[-1], ema200.iloc[-1]
+            prev50, prev200 = ema50[-2], ema200[-2]
+            curr50, curr200 = ema50[-1], ema200[-1]
 
             # Golden Cross: Önce küçük, şimdi büyük
             if prev50 < prev200 and curr50 > curr200:
@@ -556,8 +529,6 @@ class MarketScanner:
                                 **analysis
                             })
 
-                    await asyncio.sleep(0.1)  # Rate limit
-
                 except Exception as e:
                     print(f"Coin tarama hatası {symbol}: {str(e)}")
                     continue
@@ -1,3 +1,4 @@
+import os
 import asyncio
 import logging
 import pandas as pd
@@ -6,11 +7,24 @@ import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 from datetime import datetime, timedelta
 from io import BytesIO
-import ccxt
 import mplfinance as mpf
-from typing import List, Dict, Optional, Any, Tuple
+from typing import AsyncIterator, List, Dict, Optional, Any, Tuple
+from contextlib import aclosing
 import time
 from src.exchanges.binance_client import BinanceClient
+from src.data_collectors.candle_store import get_candle_store
+from src.data_collectors.resampler import get_timeframes_async
+from src.exchanges.gateway import get_gateway
+from src.analysis import indicator_engine as ie
+from src.analysis.feature_cache import closed_columns, get_feature_cache
+from src.analysis.timeframe_table import TimeframeTable, combined_scores, rank
+from src.analysis.worker_pool import get_worker_pool
+from src.analysis.scan_pipeline import ScanPipeline
+
+# /multiscan zaman dilimleri (büyükten küçüğe, ilki birleştirmenin tabanı) ve mum sayıları;
+# 1h mumları 15m serisinden türetilir
+SCAN_LIMITS = {'1w': 60, '4h': 200, '1h': 200, '15m': 200}
+
 
 class MultiTimeframeAnalyzer:
     """
@@ -21,13 +35,8 @@ class MultiTimeframeAnalyzer:
         """Initialize the analyzer with necessary components"""
         self.logger = logger or logging.getLogger('MultiTimeframeAnalyzer')
         
-        # Exchange bağlantısı için
-        self.exchange = ccxt.binance({
-            'enableRateLimit': True,
-            'options': {
-                'defaultType': 'spot'
-            }
-        })
+        # Paylaşılan, bloklamayan exchange gateway'i
+        self.exchange = get_gateway()
         
         # Teknik analiz parametreleri
         self.rsi_period = 14
@@ -64,7 +73,7 @@ class MultiTimeframeAnalyzer:
         """İşlem yapılabilir sembolleri al"""
         try:
             # USDT çiftlerini al
-            markets = self.exchange.load_markets()
+            markets = await self.exchange.load_markets()
             usdt_symbols = [
                 symbol for symbol in markets.keys() 
                 if symbol.endswith('/USDT') and not symbol.endswith('BEAR/USDT') 
@@ -90,18 +99,30 @@ class MultiTimeframeAnalyzer:
                 ccxt_symbol = symbol
                 
             # Candlestick verilerini al
-            ohlcv = self.exchange.fetch_ohlcv(ccxt_symbol, timeframe, limit=limit)
-            
-            # Pandas DataFrame'e dönüştür
-            df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            df.set_index('timestamp', inplace=True)
+            candles = await get_candle_store().get_array_async(self.exchange, ccxt_symbol, timeframe, limit=limit)
             
-            return df
+            # Pandas DataFrame'e dönüştür (timestamp index)
+            return candles.to_dataframe(index=True)
         except Exception as e:
             self.logger.error(f"Kline verisi alma hatası ({symbol}, {timeframe}): {str(e)}")
             return pd.DataFrame()
     
+    async def get_multi_klines(self, symbol: str, limits: Dict[str, int]) -> Dict[str, pd.DataFrame]:
+        """
+        Birden çok zaman dilimi için kline verileri; üst zaman dilimleri alt zaman
+        dilimi serilerinden türetilir, borsaya yalnızca kapsanamayan derinlik için gidilir.
+        
+        Args:
+            limits: Zaman dilimi -> mum sayısı (ör. {'1w': 20, '4h': 60, '1h': 48, '15m': 96})
+        """
+        try:
+            ccxt_symbol = symbol if '/' in symbol else f"{symbol[:-4]}/USDT"
+            candles = await get_timeframes_async(self.exchange, ccxt_symbol, limits)
+            return {timeframe: data.to_dataframe(index=True) for timeframe, data in candles.items()}
+        except Exception as e:
+            self.logger.error(f"Kline verisi alma hatası ({symbol}, {', '.join(limits)}): {str(e)}")
+            return {timeframe: pd.DataFrame() for timeframe in limits}
+    
     async def get_ticker(self, symbol: str) -> Dict:
         """Belirli bir sembol için ticker verisi al"""
         try:
@@ -111,16 +132,20 @@ class MultiTimeframeAnalyzer:
             else:
                 ccxt_symbol = symbol
                 
-            # Ticker verilerini al - DÜZELTME: await kullanmıyoruz çünkü ccxt burada senkron
-            ticker = self.exchange.fetch_ticker(ccxt_symbol)
+            # Ticker verilerini al
+            ticker = await self.exchange.fetch_ticker(ccxt_symbol)
             
             return ticker
         except Exception as e:
             self.logger.error(f"Ticker verisi alma hatası ({symbol}): {str(e)}")
             return {}
     
-    async def scan_market(self, symbols=None, interval="4h", worker_count=None):
-        """Belirtilen aralıkta piyasayı çoklu işlemci ile tarar ve fırsatları döndürür"""
+    async def scan_market(self, symbols=None, interval="4h", worker_count=None, report=None):
+        """
+        Belirtilen aralıkta piyasayı çoklu işlemci ile tarar ve fırsatları döndürür.
+        
+        report verilirse her parçadan sonra analyze_market_stream ilerlemesiyle çağrılır.
+        """
         try:
             # Başlangıç zamanını kaydet (performans ölçümü için)
             import time
@@ -130,9 +155,7 @@ class MultiTimeframeAnalyzer:
             
             # Market verilerini al
             try:
-                # self.client yerine self.exchange kullanıyoruz çünkü bu sınıfta tanımlı
-                # Ve senkron fetch_tickers kullanıyoruz
-                tickers = self.exchange.fetch_tickers()
+                tickers = await self.exchange.fetch_tickers()
                 ticker_data = []
                 for symbol, ticker in tickers.items():
                     if symbol.endswith('/USDT'):  # CCXT format
@@ -158,20 +181,10 @@ class MultiTimeframeAnalyzer:
             # DEBUG: Alınan coin sayısını göster    
             self.logger.info(f"🔍 Toplam {len(ticker_data)} coin verisi alındı")
             
-            # Çalışan CPU sayısını belirle (belirtilmemişse)
-            if worker_count is None:
-                # Kullanılabilir işlemci sayısının 1 eksiğini kullan (sistemin responsif kalması için)
-                import multiprocessing
-                worker_count = max(1, multiprocessing.cpu_count() - 1)
-                self.logger.info(f"🔄 Tarama {worker_count} işlemci ile yapılıyor...")
-            
-            # DEBUG: Eski tek işlemci ile geçen süre bilgisini ekle
-            self.logger.info(f"⏰ Tahmini eski süre: ~{len(ticker_data) * 0.2:.1f} saniye olacaktı (tek işlemci ile)")
-            
-            # Fırsatları çoklu işlemci ile analiz et
+            # Fırsatları işçi havuzunda analiz et (worker_count None ise havuzun işçi sayısı kullanılır)
             self.logger.info(f"🚀 Çoklu işlemci analizi başlatılıyor...")
             # self.analyzer yerine kendini (self) kullan çünkü metodlar bu sınıfta tanımlı
-            opportunities = await self.analyze_market_parallel(ticker_data, interval, worker_count)
+            opportunities = await self.analyze_market_parallel(ticker_data, interval, worker_count, report)
             
             # İşlem süresi hesaplama
             analysis_end_time = time.time()
@@ -195,15 +208,10 @@ class MultiTimeframeAnalyzer:
             total_time = ai_end_time - start_time
             
             # DEBUG: Performans özeti
-            estimated_old_time = len(ticker_data) * 0.2  # Tahmini eski süre
-            speedup = estimated_old_time / total_time
-            
             self.logger.info(f"\n📊 PERFORMANS ÖZETİ:")
             self.logger.info(f"⏱️ Teknik analiz süresi: {analysis_time:.2f} saniye")
             self.logger.info(f"🤖 AI analiz süresi: {ai_time:.2f} saniye")
             self.logger.info(f"⏰️ Toplam süre: {total_time:.2f} saniye")
-            self.logger.info(f"🚀 Hızlanma oranı: {speedup:.2f}x ({worker_count} işlemci ile)")
-            self.logger.info(f"💡 İşlemci başına: {analysis_time/worker_count:.2f} saniye")
             self.logger.info(f"\n==== 📊 ÇOKLU İŞLEMCİ TARAMA TAMAMLANDI ====\n")
             
             return enriched_opportunities
@@ -226,60 +234,11 @@ class MultiTimeframeAnalyzer:
         """
         try:
             self.logger.info(f"{timeframe} zaman dilimi için {len(symbols)} sembol analiz ediliyor...")
-            results = []
             
             # Her sembol için paralel analiz
             async def analyze_single_symbol(symbol):
-                try:
-                    # Tarihi veriyi al
-                    df = await self.get_klines(symbol, timeframe=timeframe, limit=200)
-                    if df is None or len(df) < 30:  # En az 30 mum gerekli
-                        return None
-                    
-                    # Göstergeleri hesapla
-                    indicators = self.calculate_indicators(df)
-                    if indicators is None:
-                        return None
-                    
-                    # Trend analizi yap
-                    trend, trend_strength = self.analyze_trend(df, indicators)
-                    
-                    # Stop/Target hesapla
-                    current_price = df['close'].iloc[-1]
-                    stop_price, target_price = 0, 0
-                    risk_reward = 0
-                    
-                    if trend in ['BULLISH', 'STRONGLY_BULLISH', 'BEARISH', 'STRONGLY_BEARISH']:
-                        direction = "LONG" if trend in ['BULLISH', 'STRONGLY_BULLISH'] else "SHORT"
-                        stop_price, target_price = self.calculate_stop_and_target(df, trend, current_price, direction=direction)
-                        
-                        # Risk/Ödül oranını hesapla
-                        if direction == "LONG":
-                            risk = current_price - stop_price if stop_price > 0 else 1
-                            reward = target_price - current_price if target_price > 0 else 0
-                        else:
-                            risk = stop_price - current_price if stop_price > 0 else 1
-                            reward = current_price - target_price if target_price > 0 else 0
-                        
-                        risk_reward = reward / risk if risk > 0 else 0
-                    
-                    # Analiz sonucunu döndür
-                    return {
-                        'symbol': symbol,
-                        'timeframe': timeframe,
-                        'trend': trend,
-                        'trend_strength': trend_strength,
-                        'indicators': indicators,
-                        'current_price': current_price,
-                        'volume': df['volume'].iloc[-1],
-                        'stop_price': stop_price,
-                        'target_price': target_price,
-                        'risk_reward': risk_reward,
-                        'trend_descriptions': indicators.get('trend_messages', [])[:3] if indicators else []
-                    }
-                except Exception as e:
-                    self.logger.error(f"{timeframe} - {symbol} analiz hatası: {str(e)}")
-                    return None
+                df = await self.get_klines(symbol, timeframe=timeframe, limit=200)
+                return self._analyze_frame(symbol, timeframe, df)
             
             # Sembolleri paralel olarak analiz et
             tasks = [analyze_single_symbol(symbol) for symbol in symbols]
@@ -297,67 +256,117 @@ class MultiTimeframeAnalyzer:
             self.logger.error(traceback.format_exc())
             return []
 
-    def calculate_indicators(self, df: pd.DataFrame) -> Dict:
-        """Teknik göstergeleri hesapla"""
-        # RSI hesapla
-        delta = df['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=self.rsi_period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=self.rsi_period).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
+    def _analyze_frame(self, symbol: str, timeframe: str, df: pd.DataFrame) -> Optional[Dict]:
+        """
+        Tek sembolün tek zaman dilimi analizi (saf hesaplama, işçi süreçte de çalışır).
         
-        # MACD hesapla
-        exp1 = df['close'].ewm(span=12, adjust=False).mean()
-        exp2 = df['close'].ewm(span=26, adjust=False).mean()
-        macd = exp1 - exp2
-        signal = macd.ewm(span=9, adjust=False).mean()
-        histogram = macd - signal
+        Returns:
+            Trend, göstergeler ve stop/hedef içeren sonuç; veri yetersizse None
+        """
+        try:
+            if df is None or len(df) < 30:  # En az 30 mum gerekli
+                return None
+            
+            # Göstergeleri hesapla
+            indicators = self.calculate_indicators(df, symbol, timeframe)
+            if indicators is None:
+                return None
+            
+            # Trend analizi yap
+            trend, trend_strength = self.analyze_trend(df, indicators)
+            
+            # Stop/Target hesapla
+            current_price = df['close'].iloc[-1]
+            stop_price, target_price = 0, 0
+            risk_reward = 0
+            
+            if trend in ['BULLISH', 'STRONGLY_BULLISH', 'BEARISH', 'STRONGLY_BEARISH']:
+                direction = "LONG" if trend in ['BULLISH', 'STRONGLY_BULLISH'] else "SHORT"
+                stop_price, target_price = self.calculate_stop_and_target(df, trend, current_price, direction=direction)
+                
+                # Risk/Ödül oranını hesapla
+                if direction == "LONG":
+                    risk = current_price - stop_price if stop_price > 0 else 1
+                    reward = target_price - current_price if target_price > 0 else 0
+                else:
+                    risk = stop_price - current_price if stop_price > 0 else 1
+                    reward = current_price - target_price if target_price > 0 else 0
+                
+                risk_reward = reward / risk if risk > 0 else 0
+            
+            # Analiz sonucunu döndür
+            return {
+                'symbol': symbol,
+                'timeframe': timeframe,
+                'trend': trend,
+                'trend_strength': trend_strength,
+                'indicators': indicators,
+                'current_price': current_price,
+                'volume': df['volume'].iloc[-1],
+                'stop_price': stop_price,
+                'target_price': target_price,
+                'risk_reward': risk_reward,
+                'trend_descriptions': indicators.get('trend_messages', [])[:3] if indicators else []
+            }
+        except Exception as e:
+            self.logger.error(f"{timeframe} - {symbol} analiz hatası: {str(e)}")
+            return None
+
+    def _frame_features(self, data: np.ndarray) -> Dict[str, np.ndarray]:
+        """calculate_indicators'ın gösterge serileri, (6, N) sütunlardan"""
+        high, low, close, volume = data[2], data[3], data[4], data[5]
+        features = {'rsi': ie.rsi(close, self.rsi_period)}
+        features['macd'], features['macd_signal'], features['macd_hist'] = ie.macd(close)
+        features['bb_upper'], features['bb_middle'], features['bb_lower'] = ie.bollinger((high + low + close) / 3)
+        for period in self.ema_periods:
+            features[f'ema{period}'] = ie.ema(close, period)
+        features['stoch_k'], features['stoch_d'] = ie.stochastic(high, low, close)
+        features['volume_ma'] = ie.sma(volume, 20)
+        return features
+
+    def calculate_indicators(self, df: pd.DataFrame, symbol: Optional[str] = None,
+                             timeframe: Optional[str] = None) -> Dict:
+        """
+        Teknik göstergeleri hesapla (indicator_engine ile, /scan ile aynı tanımlar)
         
-        # Bollinger Bands hesapla
-        typical_price = (df['high'] + df['low'] + df['close']) / 3
-        bb_middle = typical_price.rolling(window=20).mean()
-        bb_std = typical_price.rolling(window=20).std()
-        bb_upper = bb_middle + (2 * bb_std)
-        bb_lower = bb_middle - (2 * bb_std)
+        symbol ve timeframe verilirse göstergeler kapanmış mumlardan, gösterge
+        önbelleği üzerinden alınır (/scan ve /aianalysis ile aynı önbellek).
+        """
+        if symbol and timeframe:
+            data = closed_columns(df, timeframe)
+            features = get_feature_cache().get_features(
+                symbol, timeframe, data, compute=self._frame_features,
+                params={'rsi': self.rsi_period, 'ema': self.ema_periods})
+        else:
+            data = ie.to_columns(df)
+            features = self._frame_features(data)
         
         # BB pozisyonu hesapla: %B = (Price - Lower BB) / (Upper BB - Lower BB)
-        last_close = df['close'].iloc[-1]
-        last_lower = bb_lower.iloc[-1]
-        last_upper = bb_upper.iloc[-1]
-        bb_range = last_upper - last_lower
-        bb_position = ((last_close - last_lower) / bb_range) * 100 if bb_range > 0 else 50
+        last_close = data[4][-1]
+        bb_upper, bb_lower = features['bb_upper'][-1], features['bb_lower'][-1]
+        bb_range = bb_upper - bb_lower
+        bb_position = ((last_close - bb_lower) / bb_range) * 100 if bb_range > 0 else 50
         
-        # EMA hesapla
-        emas = {}
-        for period in self.ema_periods:
-            emas[f'ema{period}'] = df['close'].ewm(span=period, adjust=False).mean().iloc[-1]
-        
-        # Stochastic Oscillator hesapla
-        low_min = df['low'].rolling(window=14).min()
-        high_max = df['high'].rolling(window=14).max()
-        k = 100 * ((df['close'] - low_min) / (high_max - low_min))
-        d = k.rolling(window=3).mean()
+        # EMA'lar
+        emas = {f'ema{period}': float(features[f'ema{period}'][-1]) for period in self.ema_periods}
         
         # Hacim değişimi
-        volume_ma = df['volume'].rolling(window=20).mean()
-        current_volume = df['volume'].iloc[-1]
-        volume_change = ((current_volume - volume_ma.iloc[-1]) / volume_ma.iloc[-1]) * 100 if volume_ma.iloc[-1] > 0 else 0
+        volume_ma = features['volume_ma'][-1]
+        current_volume = data[5][-1]
+        volume_change = ((current_volume - volume_ma) / volume_ma) * 100 if volume_ma > 0 else 0
         
         # Sonuçları döndür
-        return {
-            "rsi": rsi.iloc[-1],
-            "macd": macd.iloc[-1],
-            "macd_signal": signal.iloc[-1],
-            "macd_hist": histogram.iloc[-1],
-            "bb_upper": bb_upper.iloc[-1],
-            "bb_middle": bb_middle.iloc[-1],
-            "bb_lower": bb_lower.iloc[-1],
+        result = {name: float(features[name][-1]) for name in
+                  ('rsi', 'macd', 'macd_signal', 'macd_hist', 'bb_upper', 'bb_middle', 'bb_lower')}
+        result.update({
             "bb_position": bb_position,
             "emas": emas,
-            "stoch_k": k.iloc[-1],
-            "stoch_d": d.iloc[-1],
+            "stoch_k": float(features['stoch_k'][-1]),
+            "stoch_d": float(features['stoch_d'][-1]),
             "volume_change": volume_change
-        }
+        })
+        return result
+
     def calculate_stop_and_target(self, df: pd.DataFrame, trend: str, current_price: float, direction="LONG") -> Tuple[float, float]:
         """Stop-loss ve hedef fiyat seviyelerini hesapla"""
         try:
@@ -372,12 +381,7 @@ class MultiTimeframeAnalyzer:
             low = recent_df['low'].values
             close = recent_df['close'].values
             
-            tr1 = np.abs(high - low)
-            tr2 = np.abs(high - np.roll(close, 1))
-            tr3 = np.abs(low - np.roll(close, 1))
-            
-            tr = np.vstack([tr1, tr2, tr3])
-            atr = np.mean(np.max(tr, axis=0))
+            atr = np.mean(ie.true_range(high, low, close))
             
             # Son N mumun en yüksek ve en düşük değerlerini bul
             if direction == "LONG":
@@ -434,121 +438,80 @@ class MultiTimeframeAnalyzer:
             self.logger.error(f"Stop ve target hesaplama hatası: {str(e)}")
             return 0, 0
 
-    def _combine_timeframe_results(self, previous_results, new_results, prev_prefix, new_prefix):
-        """İki farklı zaman dilimi analiz sonuçlarını birleştirir"""
-        try:
-            combined_results = []
-            
-            # Önceki sonuçları döngüye al
-            for prev in previous_results:
-                symbol = prev['symbol']
-                
-                # Bu sembol için yeni sonucu bul
-                new = next((n for n in new_results if n['symbol'] == symbol), None)
-                
-                # Yeni sonuç bulunamazsa, sadece önceki ile devam et
-                if new is None:
-                    result = prev.copy()
-                    # Yeni zaman dilimi için varsayılan değerler
-                    result[f'{new_prefix}_trend'] = 'UNKNOWN'
-                    result[f'{new_prefix}_trend_strength'] = 0
-                    # Varsayılan puanı koru veya hesapla
-                    if 'opportunity_score' not in result:
-                        # Sadece trendlere göre puan hesapla
-                        trend = prev.get(f'{prev_prefix}_trend', 'NEUTRAL')
-                        if trend in ['STRONGLY_BULLISH', 'STRONGLY_BEARISH']:
-                            result['opportunity_score'] = 60
-                        elif trend in ['BULLISH', 'BEARISH']:
-                            result['opportunity_score'] = 40
-                        else:
-                            result['opportunity_score'] = 20
-                else:
-                    # Tüm sonuçları birleştir
-                    result = prev.copy()
-                    
-                    # Yeni zaman dilimi alanlarını kopyala
-                    result[f'{new_prefix}_trend'] = new['trend']
-                    result[f'{new_prefix}_trend_strength'] = new['trend_strength']
-                    result[f'{new_prefix}_indicators'] = new['indicators']
-                    
-                    # Price ve Volume bilgilerini güncelle
-                    result['current_price'] = new['current_price']
-                    result[f'{new_prefix}_volume'] = new['volume']
-                    
-                    # Stop/Target bilgilerini ekle
-                    if new['stop_price'] > 0:
-                        result['stop_price'] = new['stop_price']
-                        result['target_price'] = new['target_price']
-                        result['risk_reward'] = new['risk_reward']
-                    
-                    # Trend açıklamalarını ekle
-                    if 'trend_descriptions' in new:
-                        result[f'{new_prefix}_trend_descriptions'] = new['trend_descriptions']
-                    
-                    # Fırsat puanını hesapla veya güncelle
-                    score = result.get('opportunity_score', 0)
-                    
-                    # Önceki trend puanı
-                    prev_trend = prev.get(f'{prev_prefix}_trend', 'NEUTRAL')
-                    
-                    # Yeni trend puanı
-                    new_trend = new['trend']
-                    
-                    # LONG fırsatları için
-                    if prev_trend in ['BULLISH', 'STRONGLY_BULLISH']:
-                        if new_trend == 'STRONGLY_BULLISH':
-                            score += 25
-                        elif new_trend == 'BULLISH':
-                            score += 15
-                        elif new_trend == 'NEUTRAL':
-                            score += 5
-                        elif new_trend == 'BEARISH':
-                            score -= 10
-                        elif new_trend == 'STRONGLY_BEARISH':
-                            score -= 20
-                    
-                    # SHORT fırsatları için
-                    elif prev_trend in ['BEARISH', 'STRONGLY_BEARISH']:
-                        if new_trend == 'STRONGLY_BEARISH':
-                            score += 25
-                        elif new_trend == 'BEARISH':
-                            score += 15
-                        elif new_trend == 'NEUTRAL':
-                            score += 5
-                        elif new_trend == 'BULLISH':
-                            score -= 10
-                        elif new_trend == 'STRONGLY_BULLISH':
-                            score -= 20
-                    
-                    # Risk/Ödül oranına göre bonus
-                    if 'risk_reward' in new and new['risk_reward'] > 0:
-                        risk_reward = new['risk_reward']
-                        if risk_reward >= 3:  # 3:1 veya daha iyi ise
-                            score += 10
-                        elif risk_reward >= 2:  # 2:1 veya daha iyi ise
-                            score += 5
-                    
-                    # Puanı 0-100 arasına sınırla
-                    result['opportunity_score'] = min(max(score, 0), 100)
-                
-                combined_results.append(result)
-            
-            return combined_results
+    def _combine_timeframe_results(self, results_by_timeframe: Dict[str, List[Dict]]) -> TimeframeTable:
+        """
+        Zaman dilimi sonuçlarını sembol anahtarlı sütunlu tabloda birleştirir (doğrusal).
+        
+        Args:
+            results_by_timeframe: Büyükten küçüğe zaman dilimi -> analyze_timeframe sonuçları
             
-        except Exception as e:
-            self.logger.error(f"Zaman dilimi sonuçlarını birleştirme hatası: {str(e)}")
-            import traceback
-            self.logger.error(traceback.format_exc())
-            return previous_results  # Hata durumunda önceki sonuçları döndür
+        Returns:
+            TimeframeTable; puanlar combined_scores(table) ile tek seferde hesaplanır
+        """
+        table = TimeframeTable(list(results_by_timeframe))
+        for timeframe, results in results_by_timeframe.items():
+            table.extend(timeframe, results)
+        return table
+
+    def _table_records(self, table: TimeframeTable, rows, scores: np.ndarray, primary: str,
+                       coins: Dict[str, Dict], limit: Optional[int] = None) -> List[Dict]:
+        """
+        Tablonun seçili satırları için fırsat sözlükleri (yalnızca gösterilecek satırlar kurulur).
+        
+        Sinyal, trend, RSI/MACD ve stop/hedef ana zaman diliminden (primary) alınır;
+        yönü olmayan satırlar atlanır. limit verilirse o kadar fırsat kurulunca durulur.
+        """
+        stop = table.column(primary, 'stop_price')
+        target = table.column(primary, 'target_price')
+        risk_reward = table.column(primary, 'risk_reward')
+        strength = table.column(primary, 'trend_strength')
+        
+        records = []
+        for position in rows:
+            if limit is not None and len(records) >= limit:
+                break
+            trend = table.trend(primary, position)
+            if trend in ('BULLISH', 'STRONGLY_BULLISH'):
+                signal = 'LONG'
+            elif trend in ('BEARISH', 'STRONGLY_BEARISH'):
+                signal = 'SHORT'
+            else:
+                continue
+            
+            symbol = table.symbols[position]
+            coin = coins.get(symbol, {})
+            extras = table.extras(primary, position)
+            indicators = extras['indicators']
+            record = {
+                'symbol': symbol,
+                'price': float(coin.get('price') or table.column(primary, 'current_price')[position]),
+                'volume': float(coin.get('volume') or 0),
+                'change': coin.get('change', 0),
+                'rsi': round(float(indicators.get('rsi', 0)), 2),
+                'macd': round(float(indicators.get('macd', 0)), 4),
+                'macd_signal': round(float(indicators.get('macd_signal', 0)), 4),
+                'trend': trend,
+                'trend_strength': float(strength[position]),
+                'stop_loss': float(stop[position]),
+                'target': float(target[position]),
+                'risk_reward_ratio': round(float(risk_reward[position]), 2),
+                'signal': signal,
+                'opportunity_score': round(float(scores[position]), 1),
+                'trend_descriptions': extras['trend_descriptions'],
+            }
+            for timeframe in table.timeframes:
+                record[f'{timeframe}_trend'] = table.trend(timeframe, position)
+                record[f'{timeframe}_trend_strength'] = float(np.nan_to_num(
+                    table.column(timeframe, 'trend_strength')[position]))
+            records.append(record)
+        return records
 
     async def generate_multi_timeframe_chart(self, symbol: str) -> BytesIO:
         """Çoklu zaman dilimi grafiği oluştur"""
         try:
-            # Dört farklı zaman dilimi için veri al
-            weekly_data = await self.get_klines(symbol, "1w", limit=20)
-            h4_data = await self.get_klines(symbol, "4h", limit=60)  # Son 10 gün
-            hourly_data = await self.get_klines(symbol, "1h", limit=48)
-            m15_data = await self.get_klines(symbol, "15m", limit=96)
+            # Dört farklı zaman dilimi için veri al (1h ve 4h, 15m serisinden türetilir)
+            klines = await self.get_multi_klines(symbol, {'1w': 20, '4h': 60, '1h': 48, '15m': 96})  # 4h: son 10 gün
+            weekly_data, h4_data, hourly_data, m15_data = klines['1w'], klines['4h'], klines['1h'], klines['15m']
             
             if weekly_data.empty or h4_data.empty or hourly_data.empty or m15_data.empty:
                 self.logger.error(f"Grafik için veri alınamadı: {symbol}")
@@ -593,20 +556,15 @@ class MultiTimeframeAnalyzer:
             mpf.plot(df, type='candle', style='yahoo', ax=ax, no_xgrid=True, ylim=(df['low'].min()*0.99, df['high'].max()*1.01))
             
             # EMA'ları ekle
-            ema9 = df['close'].ewm(span=9, adjust=False).mean()
-            ema20 = df['close'].ewm(span=20, adjust=False).mean()
-            ema50 = df['close'].ewm(span=50, adjust=False).mean()
+            data = ie.to_columns(df)
+            ema9, ema20, ema50 = (ie.ema(data[4], period) for period in (9, 20, 50))
             
             ax.plot(df.index, ema9, 'blue', linewidth=1, alpha=0.8, label='EMA9')
             ax.plot(df.index, ema20, 'orange', linewidth=1, alpha=0.8, label='EMA20')
             ax.plot(df.index, ema50, 'red', linewidth=1, alpha=0.8, label='EMA50')
             
             # Bollinger Bands ekle
-            typical_price = (df['high'] + df['low'] + df['close']) / 3
-            bb_middle = typical_price.rolling(window=20).mean()
-            bb_std = typical_price.rolling(window=20).std()
-            bb_upper = bb_middle + (2 * bb_std)
-            bb_lower = bb_middle - (2 * bb_std)
+            bb_upper, bb_middle, bb_lower = ie.bollinger((data[2] + data[3] + data[4]) / 3)
             
             ax.plot(df.index, bb_upper, 'g--', linewidth=1, alpha=0.5)
             ax.plot(df.index, bb_middle, 'g-', linewidth=1, alpha=0.5)
@@ -679,8 +637,8 @@ class MultiTimeframeAnalyzer:
                 
             self.logger.info(f"En popüler {limit} sembol alınıyor...")
             
-            # CCXT ile tüm işlemleri al - ccxt senkron API kullanıyor, await kullanmıyoruz
-            markets = self.exchange.load_markets()
+            # CCXT ile tüm marketleri al (gateway marketleri bir kez yükler)
+            markets = await self.exchange.load_markets()
             
             # Quote currency ile eşleşen sembolleri filtrele (örn: USDT)
             usdt_markets = [
@@ -695,8 +653,7 @@ class MultiTimeframeAnalyzer:
             
             # 24 saatlik işlem hacmine göre sırala
             try:
-                # DÜZELTME: await kullanmıyoruz - ccxt senkron API
-                tickers = self.exchange.fetch_tickers()
+                tickers = await self.exchange.fetch_tickers()
                 
                 # Her market için hacim bilgisini al
                 market_volumes = []
@@ -973,108 +930,124 @@ class MultiTimeframeAnalyzer:
             self.logger.error(traceback.format_exc())
             return "NEUTRAL", 0
 
-    async def analyze_market_parallel(self, ticker_data, interval="4h", worker_count=1):
+    async def analyze_market_parallel(self, ticker_data, interval="4h", worker_count=None, report=None):
         """
-        Çoklu işlemci kullanarak market analizi yapar
+        Tüm evrenin çoklu zaman dilimi analizi.
+        
+        Her coinin 1w/4h/1h/15m mumları sınırlı eşzamanlılıkla çekilir (1h, 15m
+        serisinden türetilir), zaman dilimi analizleri işçi havuzunda parçalar
+        halinde yapılır. Sonuçlar sütunlu tabloda birleştirilir ve fırsat puanı
+        tüm semboller için vektörel olarak hesaplanır.
+        
+        Args:
+            ticker_data: {'symbol', 'price', 'volume', 'change'} listesi
+            interval: Sinyal, stop/hedef ve RSI'ın alındığı ana zaman dilimi
+            worker_count: Aynı anda işlenen parça sayısı (varsayılan: havuzdaki işçi sayısı)
+            report: Her parçadan sonra ilerleme güncellemesiyle çağrılır
         """
         try:
-            import asyncio
-            import concurrent.futures
-            from functools import partial
-
-            # Analiz edilecek coinleri filtrele
-            filtered_data = []
-            for coin in ticker_data:
-                symbol = coin.get('symbol')
-                
-                # Sadece USDT çiftlerini ve geçerli olanları dahil et
-                if symbol and symbol.endswith('USDT'):
-                    price = float(coin.get('price', 0))
-                    volume = float(coin.get('volume', 0))
-                    
-                    # Fiyat ve hacim filtresi
-                    if price > 0.00001 and volume > 1000000:  # Min 0.00001 USDT ve 1M USDT hacim
-                        filtered_data.append(coin)
-            
-            self.logger.info(f"Filtreleme sonrası {len(filtered_data)} coin analiz edilecek")
-            
-            if not filtered_data:
-                return []
-            
-            # Analiz fonksiyonu
-            def analyze_single_coin(coin_data):
-                try:
-                    symbol = coin_data.get('symbol')
-                    price = float(coin_data.get('price', 0))
-                    volume = float(coin_data.get('volume', 0))
-                    
-                    # ccxt kütüphanesi ile kline verilerini al
-                    ohlcv = self.exchange.fetch_ohlcv(symbol, interval, limit=100)
-                    if not ohlcv or len(ohlcv) < 50:
-                        return None
-                        
-                    # DataFrame'e dönüştür
-                    import pandas as pd
-                    import numpy as np
-                    
-                    df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-                    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-                    
-                    # Teknik göstergeleri hesapla
-                    rsi = self.calculate_rsi(df['close'])
-                    macd, signal, hist = self.calculate_macd(df['close'])
-                    
-                    # Trend analizi
-                    trend_result = self.analyze_trend(df)
-                    
-                    # Stop loss ve hedef hesapla
-                    stop_loss, target, risk_reward = self.calculate_risk_reward(df, trend_result['trend'])
-                    
-                    # Sonucu oluştur
-                    result = {
-                        'symbol': symbol,
-                        'price': price,
-                        'volume': volume,
-                        'change': coin_data.get('change', 0),
-                        'rsi': round(float(rsi.iloc[-1]), 2),
-                        'macd': round(float(macd.iloc[-1]), 4),
-                        'macd_signal': round(float(signal.iloc[-1]), 4),
-                        'trend': trend_result['trend'],
-                        'trend_strength': trend_result['strength'],
-                        'stop_loss': stop_loss,
-                        'target': target,
-                        'risk_reward_ratio': risk_reward,
-                        'signal': 'LONG' if trend_result['trend'] in ['BULLISH', 'STRONGLY_BULLISH'] else 
-                                 'SHORT' if trend_result['trend'] in ['BEARISH', 'STRONGLY_BEARISH'] else 'NEUTRAL',
-                        'opportunity_score': trend_result['strength'] * 100 * (risk_reward if risk_reward > 0 else 0.1)
-                    }
-                    
-                    return result
-                    
-                except Exception as e:
-                    return None
-            
-            # İşlemci havuzu oluştur
             results = []
-            with concurrent.futures.ProcessPoolExecutor(max_workers=worker_count) as executor:
-                futures = [executor.submit(analyze_single_coin, coin) for coin in filtered_data]
-                for future in concurrent.futures.as_completed(futures):
-                    try:
-                        result = future.result()
-                        if result:
-                            results.append(result)
-                    except Exception as e:
-                        self.logger.warning(f"İşlemci havuzu hatası: {str(e)}")
-            
-            # Sonuçları fırsat skoruna göre sırala
-            results.sort(key=lambda x: x['opportunity_score'], reverse=True)
-            
+            async with aclosing(self.analyze_market_stream(ticker_data, interval, worker_count, top_k=None)) as updates:
+                async for update in updates:
+                    results = update['top']
+                    if report is not None:
+                        report(update)
             return results
             
         except Exception as e:
             self.logger.error(f"Parallel analyze hatası: {str(e)}")
+            import traceback
+            self.logger.error(traceback.format_exc())
             return []
 
+    async def analyze_market_stream(self, ticker_data, interval="4h", worker_count=None,
+                                    top_k: Optional[int] = 10) -> AsyncIterator[Dict]:
+        """
+        analyze_market_parallel'in akış sürümü: her parça tabloya eklendiğinde ilerleme verir.
+        
+        Puanlar her parçadan sonra o ana kadarki tablo için yeniden hesaplanır;
+        tüketici döngüden erken çıkıp üreteci kapatırsa (aclose) bekleyen
+        getirme ve analiz işleri iptal edilir.
+        
+        Yields:
+            {'new': bu parçada bulunan fırsatlar, 'top': puana göre ilk top_k fırsat
+             (top_k None ise tümü), 'found': toplam fırsat, 'scanned': işlenen coin,
+             'total': filtre sonrası coin, 'elapsed': geçen süre (s)}
+        """
+        start_time = time.time()
+        
+        # Analiz edilecek coinleri filtrele
+        filtered_data = []
+        for coin in ticker_data:
+            symbol = coin.get('symbol')
+            
+            # Sadece USDT çiftlerini ve geçerli olanları dahil et
+            if symbol and symbol.endswith('USDT'):
+                price = float(coin.get('price') or 0)
+                volume = float(coin.get('volume') or 0)
+                
+                # Fiyat ve hacim filtresi
+                if price > 0.00001 and volume > 1000000:  # Min 0.00001 USDT ve 1M USDT hacim
+                    filtered_data.append(coin)
+        
+        self.logger.info(f"Filtreleme sonrası {len(filtered_data)} coin analiz edilecek")
+        
+        if not filtered_data:
+            return
+        
+        primary = interval if interval in SCAN_LIMITS else '4h'
+        pool = get_worker_pool()
+        if worker_count is None:
+            worker_count = pool.max_workers
+        
+        async def process(chunk):
+            return await pool.run(analyze_timeframes_batch, dict(chunk))
+        
+        pipeline = ScanPipeline(self._fetch_scan_timeframes, process,
+                                fetch_concurrency=int(os.getenv('SCAN_FETCH_CONCURRENCY', '8')),
+                                chunk_size=10, consumers=worker_count)
+        
+        # Parça sonuçları geldikçe tabloya eklenir (sembol -> satır, doğrusal birleştirme)
+        table = TimeframeTable(list(SCAN_LIMITS))
+        coins = {coin['symbol']: coin for coin in filtered_data}
+        found = 0
+        analyzed = 0
+        try:
+            async with aclosing(pipeline.stream(filtered_data)) as batches:
+                async for batch in batches:
+                    for results in batch.values():
+                        for timeframe, result in results.items():
+                            table.add(timeframe, result)
+                    analyzed += len(batch)
+                    
+                    scores = combined_scores(table)
+                    directional = ~np.isnan(scores) & (np.nan_to_num(table.column(primary, 'trend')) != 0)
+                    found = int(np.count_nonzero(directional))
+                    new_rows = [table.index[symbol] for symbol in batch
+                                if symbol in table.index and not np.isnan(scores[table.index[symbol]])]
+                    yield {
+                        'new': self._table_records(table, new_rows, scores, primary, coins),
+                        'top': self._table_records(table, rank(table, scores), scores, primary, coins, limit=top_k),
+                        'found': found,
+                        'scanned': analyzed + pipeline.stats['skipped'] + pipeline.stats['fetch_errors'],
+                        'total': len(filtered_data),
+                        'elapsed': time.time() - start_time,
+                    }
+        finally:
+            self.logger.info(f"🎯 {found} fırsat / {len(table)} sembol "
+                             f"({pipeline.stats['fetched']} getirildi, {pipeline.stats['fetch_errors']} getirme "
+                             f"hatası, {pipeline.stats['process_errors']} analiz hatası, "
+                             f"{time.time() - start_time:.2f}s)")
+
+    async def _fetch_scan_timeframes(self, coin: Dict):
+        """Coinin tarama zaman dilimleri için mumları; taban zaman dilimi yetersizse None"""
+        symbol = coin['symbol']
+        ccxt_symbol = symbol if '/' in symbol else f"{symbol[:-4]}/USDT"
+        candles = await get_timeframes_async(self.exchange, ccxt_symbol, SCAN_LIMITS)
+        if len(candles[next(iter(SCAN_LIMITS))]) < 30:
+            return None
+        return symbol, candles
+
     async def enrich_with_ai(self, opportunities, top_count=5):
         """
         En iyi fırsatları AI ile zenginleştir
@@ -1118,36 +1091,20 @@ class MultiTimeframeAnalyzer:
 
     def calculate_rsi(self, prices, period=14):
         """RSI hesapla"""
-        import pandas as pd
-        import numpy as np
-        
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        
-        # Sıfıra bölünme hatasını önle
-        rs = pd.Series(np.where(loss == 0, 100, gain / loss), index=loss.index)
-        return 100 - (100 / (1 + rs))
+        return pd.Series(ie.rsi(prices.to_numpy(), period), index=prices.index)
 
     def calculate_macd(self, prices, fast=12, slow=26, signal=9):
         """MACD hesapla"""
-        import pandas as pd
-        
-        fast_ema = prices.ewm(span=fast, adjust=False).mean()
-        slow_ema = prices.ewm(span=slow, adjust=False).mean()
-        macd = fast_ema - slow_ema
-        macd_signal = macd.ewm(span=signal, adjust=False).mean()
-        macd_hist = macd - macd_signal
-        
-        return macd, macd_signal, macd_hist
+        macd, macd_signal, macd_hist = ie.macd(prices.to_numpy(), fast, slow, signal)
+        return (pd.Series(macd, index=prices.index),
+                pd.Series(macd_signal, index=prices.index),
+                pd.Series(macd_hist, index=prices.index))
 
     def calculate_risk_reward(self, df, trend, risk_percent=1.0):
         """
         Stop loss, hedef ve risk/ödül oranını hesapla
         """
         try:
-            import numpy as np
-            
             current_price = df['close'].iloc[-1]
             
             # Son 20 mum içindeki en yüksek ve en düşük noktaları bul
@@ -1155,12 +1112,7 @@ class MultiTimeframeAnalyzer:
             recent_low = df['low'].iloc[-20:].min()
             
             # ATR (Average True Range) hesapla
-            high_low = df['high'] - df['low']
-            high_close = np.abs(df['high'] - df['close'].shift())
-            low_close = np.abs(df['low'] - df['close'].shift())
-            
-            tr = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-            atr = tr.rolling(window=14).mean().iloc[-1]
+            atr = ie.last(ie.atr(df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy()))
             
             # Trend'e göre hesapla
             if trend in ['BULLISH', 'STRONGLY_BULLISH']:
@@ -1200,3 +1152,30 @@ class MultiTimeframeAnalyzer:
                 return round(current_price * 1.02, 8), round(current_price * 0.96, 8), 2.0
             else:
                 return round(current_price * 0.99, 8), round(current_price * 1.02, 8), 2.0
+
+
+_worker_analyzer: Optional[MultiTimeframeAnalyzer] = None
+
+
+def warm_up():
+    """İşçi havuzu ön yükleme kancası: süreç başına tek MultiTimeframeAnalyzer"""
+    global _worker_analyzer
+    if _worker_analyzer is None:
+        _worker_analyzer = MultiTimeframeAnalyzer(logging.getLogger('MultiTimeframeAnalyzer.worker'))
+    return _worker_analyzer
+
+
+def analyze_timeframes_batch(candles: Dict[str, Dict]) -> Dict[str, Dict[str, Dict]]:
+    """
+    İşçi havuzu görevi: sembol -> {zaman dilimi: OHLCVArray} girer,
+    sembol -> {zaman dilimi: analiz sonucu} çıkar (yetersiz zaman dilimleri atlanır).
+    """
+    analyzer = warm_up()
+    results = {}
+    for symbol, frames in candles.items():
+        results[symbol] = {}
+        for timeframe, data in frames.items():
+            result = analyzer._analyze_frame(symbol, timeframe, data.to_dataframe(index=True))
+            if result is not None:
+                results[symbol][timeframe] = result
+    return results
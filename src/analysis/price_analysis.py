@@ -7,7 +7,11 @@ from anthropic import Anthropic
 import os
 from dotenv import load_dotenv
 import json
-import ccxt
+from src.data_collectors.candle_store import get_candle_store
+from src.data_collectors.resampler import get_timeframes_async
+from src.exchanges.gateway import get_gateway
+from src.analysis import indicator_engine as ie
+from src.analysis.volume_profile import price_edges, summarize_profile, volume_histogram
 
 class TrendType(Enum):
     STRONGLY_BULLISH = "STRONGLY_BULLISH"
@@ -41,7 +45,7 @@ class PriceAnalyzer:
             'STRONGLY_BEARISH': {'price': -5, 'rsi': 30},
             'BEARISH': {'price': -1, 'rsi': 45}
         }
-        self.exchange = ccxt.binance()
+        self.exchange = get_gateway()
         self.leverage_levels = {
             'LOW': 2,
             'MEDIUM': 5,
@@ -102,12 +106,7 @@ class PriceAnalyzer:
             price_change = ((end_price - start_price) / start_price) * 100
             
             # RSI hesaplama
-            delta = df['close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss
-            rsi = 100 - (100 / (1 + rs))
-            current_rsi = rsi.iloc[-1]
+            current_rsi = ie.rsi(df['close'].to_numpy())[-1]
             
             # Volatilite hesaplama
             returns = df['close'].pct_change()
@@ -152,15 +151,13 @@ class PriceAnalyzer:
             df = df.sort_values('timestamp')
             
             # Bollinger Bands
-            df['MA20'] = df['price'].rolling(window=20).mean()
-            df['SD20'] = df['price'].rolling(window=20).std()
-            df['Upper'] = df['MA20'] + (df['SD20'] * 2)
-            df['Lower'] = df['MA20'] - (df['SD20'] * 2)
+            prices = df['price'].to_numpy(dtype=np.float64)
+            upper, _, lower = ie.bollinger(prices)
             
             # Son fiyat kontrolü
-            last_price = df.iloc[-1]['price']
-            upper_band = df.iloc[-1]['Upper']
-            lower_band = df.iloc[-1]['Lower']
+            last_price = prices[-1]
+            upper_band = upper[-1]
+            lower_band = lower[-1]
             
             # Kırılım kontrolü
             if last_price > upper_band:
@@ -194,23 +191,15 @@ class PriceAnalyzer:
         """
         try:
             # RSI analizi
-            delta = df['price'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss
-            rsi = 100 - (100 / (1 + rs))
-            current_rsi = rsi.iloc[-1]
+            prices = df['price'].to_numpy(dtype=np.float64)
+            current_rsi = ie.rsi(prices)[-1]
 
             # Volatilite hesaplama
             returns = df['price'].pct_change()
             volatility = returns.std() * np.sqrt(24) * 100
 
             # MACD hesaplama
-            exp1 = df['price'].ewm(span=12, adjust=False).mean()
-            exp2 = df['price'].ewm(span=26, adjust=False).mean()
-            macd = exp1 - exp2
-            signal = macd.ewm(span=9, adjust=False).mean()
-            macd_hist = macd - signal
+            macd, signal, macd_hist = ie.macd(prices)
             
             # Son fiyat değişimi
             price_change = ((df['price'].iloc[-1] - df['price'].iloc[0]) / df['price'].iloc[0]) * 100
@@ -234,10 +223,10 @@ class PriceAnalyzer:
                 sentiment_factors.append("Düşük RSI")
 
             # MACD bazlı duyarlılık
-            if macd_hist.iloc[-1] > 0 and macd_hist.iloc[-2] <= 0:
+            if macd_hist[-1] > 0 and macd_hist[-2] <= 0:
                 sentiment_score += 2
                 sentiment_factors.append("MACD yukarı kesişim")
-            elif macd_hist.iloc[-1] < 0 and macd_hist.iloc[-2] >= 0:
+            elif macd_hist[-1] < 0 and macd_hist[-2] >= 0:
                 sentiment_score -= 2
                 sentiment_factors.append("MACD aşağı kesişim")
 
@@ -276,13 +265,13 @@ class PriceAnalyzer:
                     "score": sentiment_score,
                     "factors": sentiment_factors,
                     "details": {
-                        "rsi": round(current_rsi, 2),
+                        "rsi": round(float(current_rsi), 2),
                         "volatility": round(volatility, 2),
                         "price_change": round(price_change, 2),
                         "macd": {
-                            "value": round(macd.iloc[-1], 2),
-                            "signal": round(signal.iloc[-1], 2),
-                            "histogram": round(macd_hist.iloc[-1], 2)
+                            "value": round(float(macd[-1]), 2),
+                            "signal": round(float(signal[-1]), 2),
+                            "histogram": round(float(macd_hist[-1]), 2)
                         }
                     }
                 }
@@ -302,15 +291,15 @@ class PriceAnalyzer:
     async def get_market_analysis(self, symbol: str) -> Dict:
         """Piyasa analizi yapar"""
         try:
-            # OHLCV verilerini al - DÜZELTME: await kullanmıyoruz çünkü ccxt senkron API
-            ohlcv = self.exchange.fetch_ohlcv(symbol, '15m', limit=96)  # Son 24 saat
+            # OHLCV verilerini al
+            ohlcv = await get_candle_store().get_ohlcv_async(self.exchange, symbol, '15m', limit=96)  # Son 24 saat
             if not ohlcv or len(ohlcv) < 2:
                 raise Exception(f"{symbol} için yeterli veri yok")
 
             df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
             
-            # Ticker verilerini al - DÜZELTME: await kullanmıyoruz çünkü ccxt senkron API
-            ticker = self.exchange.fetch_ticker(symbol)
+            # Ticker verilerini al
+            ticker = await self.exchange.fetch_ticker(symbol)
             if not ticker or 'last' not in ticker:
                 raise Exception(f"{symbol} için fiyat verisi alınamadı")
 
@@ -350,24 +339,10 @@ class PriceAnalyzer:
             if df.empty or len(df) < 2:
                 raise Exception("Yetersiz veri")
 
-            # RSI
-            delta = df['close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss
-            rsi = 100 - (100 / (1 + rs))
-
-            # MACD
-            exp1 = df['close'].ewm(span=12).mean()
-            exp2 = df['close'].ewm(span=26).mean()
-            macd = exp1 - exp2
-            signal = macd.ewm(span=9).mean()
-
-            # Bollinger Bands
-            sma = df['close'].rolling(window=20).mean()
-            std = df['close'].rolling(window=20).std()
-            upper_band = sma + (std * 2)
-            lower_band = sma - (std * 2)
+            close = df['close'].to_numpy(dtype=np.float64)
+            rsi = ie.rsi(close)
+            macd, signal, macd_hist = ie.macd(close)
+            upper_band, sma, lower_band = ie.bollinger(close)
 
             # Volume Change
             recent_volume = df['volume'].iloc[-3:].mean()
@@ -375,16 +350,16 @@ class PriceAnalyzer:
             volume_change = ((recent_volume - prev_volume) / prev_volume * 100) if prev_volume > 0 else 0
 
             return {
-                'rsi': float(rsi.iloc[-1]),
+                'rsi': float(rsi[-1]),
                 'macd': {
-                    'macd': float(macd.iloc[-1]),
-                    'signal': float(signal.iloc[-1]),
-                    'hist': float((macd - signal).iloc[-1])
+                    'macd': float(macd[-1]),
+                    'signal': float(signal[-1]),
+                    'hist': float(macd_hist[-1])
                 },
                 'bb': {
-                    'upper': float(upper_band.iloc[-1]),
-                    'middle': float(sma.iloc[-1]),
-                    'lower': float(lower_band.iloc[-1])
+                    'upper': float(upper_band[-1]),
+                    'middle': float(sma[-1]),
+                    'lower': float(lower_band[-1])
                 },
                 'volume_change': float(volume_change)
             }
@@ -428,21 +403,21 @@ class PriceAnalyzer:
     async def get_price_data(self, symbol: str) -> Dict:
         try:
             # Çoklu zaman dilimi analizi
+            # Üst zaman dilimleri alt zaman dilimi serilerinden türetilir (4 yerine 2 istek)
+            candles = await get_timeframes_async(self.exchange, symbol, {tf: 100 for tf in self.timeframes})
             multi_timeframe_data = {}
             for tf in self.timeframes:
-                ohlcv = self.exchange.fetch_ohlcv(symbol, tf, limit=100)
-                df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+                df = pd.DataFrame(candles[tf].tolist(), columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
                 multi_timeframe_data[tf] = self._analyze_timeframe(df, tf)
 
             # Funding rate (sadece perpetual futures için)
             try:
-                # ccxt senkron API kullanılıyor, await kullanmıyoruz
-                funding_rate = self.exchange.fetch_funding_rate(symbol)
+                funding_rate = await self.exchange.fetch_funding_rate(symbol)
             except:
                 funding_rate = None
 
             # Orderbook analizi
-            order_book = self.exchange.fetch_order_book(symbol)
+            order_book = await self.exchange.fetch_order_book(symbol)
             orderbook_analysis = self._analyze_orderbook(order_book)
 
             # Fibonacci seviyeleri
@@ -491,12 +466,8 @@ class PriceAnalyzer:
         bollinger = self._calculate_bollinger_bands(df)
         
         # Trend göstergeleri
-        ema_data = {
-            'ema9': df['close'].ewm(span=9).mean().iloc[-1],
-            'ema20': df['close'].ewm(span=20).mean().iloc[-1],
-            'ema50': df['close'].ewm(span=50).mean().iloc[-1],
-            'ema200': df['close'].ewm(span=200).mean().iloc[-1]
-        }
+        close = df['close'].to_numpy(dtype=np.float64)
+        ema_data = {f'ema{period}': ie.last(ie.ema(close, period)) for period in (9, 20, 50, 200)}
         
         # Momentum göstergeleri
         stoch = self._calculate_stochastic(df)
@@ -560,91 +531,73 @@ class PriceAnalyzer:
         }
 
     def _analyze_volume_profile(self, df: pd.DataFrame) -> Dict:
-        """Hacim profili analizi"""
+        """Hacim profili analizi (mum aralığı/fiyat aralığı örtüşmesine göre)"""
         # Fiyat aralıklarını belirle
-        price_range = df['high'].max() - df['low'].min()
+        low_min, high_max = float(df['low'].min()), float(df['high'].max())
         num_bins = 10
-        bin_size = price_range / num_bins
+        bin_size = (high_max - low_min) / num_bins
+        edges = price_edges(low_min, high_max, num_bins)
+        
+        # Her fiyat seviyesindeki hacim, mumların o seviyeyle örtüşen kısmı kadar
+        if bin_size > 0:
+            volumes = volume_histogram(df['high'], df['low'], df['volume'], edges)
+        else:
+            volumes = np.zeros(num_bins)
+            volumes[0] = float(df['volume'].sum())
+        volume_profile = [{
+            'price_level': round(float(price_level), 2),
+            'volume': float(volume)
+        } for price_level, volume in zip(edges[:-1], volumes)]
         
-        # Her fiyat seviyesindeki hacmi hesapla
-        volume_profile = []
-        for i in range(num_bins):
-            price_level = df['low'].min() + (i * bin_size)
-            volume = df[
-                (df['close'] >= price_level) & 
-                (df['close'] < price_level + bin_size)
-            ]['volume'].sum()
-            volume_profile.append({
-                'price_level': round(price_level, 2),
-                'volume': volume
-            })
-            
-        # POC (Point of Control) - En yüksek hacimli seviye
-        poc = max(volume_profile, key=lambda x: x['volume'])
+        # POC (Point of Control) ve toplam hacmin %70'ini içeren value area
+        summary = summarize_profile(volumes)
+        value_area_levels = edges[:-1][summary['value_area']]
         
         return {
             'profile': volume_profile,
-            'poc': poc,
+            'poc': volume_profile[summary['poc']],
             'value_area': {
-                'high': poc['price_level'] + bin_size,
-                'low': poc['price_level'] - bin_size
+                'high': round(float(value_area_levels.max() + bin_size), 2),
+                'low': round(float(value_area_levels.min()), 2)
             }
         }
 
     def _calculate_stochastic(self, df: pd.DataFrame, k_period: int = 14, d_period: int = 3) -> Dict:
         """Stochastic Oscillator"""
-        low_min = df['low'].rolling(window=k_period).min()
-        high_max = df['high'].rolling(window=k_period).max()
-        
-        k = 100 * ((df['close'] - low_min) / (high_max - low_min))
-        d = k.rolling(window=d_period).mean()
+        k, d = ie.stochastic(df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy(), k_period, d_period)
         
         return {
-            'k': float(k.iloc[-1]),
-            'd': float(d.iloc[-1])
+            'k': float(k[-1]),
+            'd': float(d[-1])
         }
 
     def _calculate_bollinger_bands(self, df: pd.DataFrame, period: int = 20, std: int = 2) -> Dict:
-        """Bollinger Bands"""
-        typical_price = (df['high'] + df['low'] + df['close']) / 3
-        bb_middle = typical_price.rolling(window=period).mean()
-        bb_std = typical_price.rolling(window=period).std()
+        """Bollinger Bands (tipik fiyat üzerinden)"""
+        typical_price = (df['high'].to_numpy() + df['low'].to_numpy() + df['close'].to_numpy()) / 3
+        upper, middle, lower = ie.bollinger(typical_price, period, std)
         
         return {
-            'upper': float(bb_middle.iloc[-1] + (bb_std.iloc[-1] * std)),
-            'middle': float(bb_middle.iloc[-1]),
-            'lower': float(bb_middle.iloc[-1] - (bb_std.iloc[-1] * std))
+            'upper': ie.last(upper),
+            'middle': ie.last(middle),
+            'lower': ie.last(lower)
         }
 
     def _calculate_rsi(self, df: pd.DataFrame, periods: int = 14) -> float:
         """RSI hesapla"""
         try:
-            close_delta = df['close'].diff()
-            
-            # Pozitif ve negatif değişimleri ayır
-            gain = (close_delta.where(close_delta > 0, 0)).rolling(window=periods).mean()
-            loss = (-close_delta.where(close_delta < 0, 0)).rolling(window=periods).mean()
-            
-            rs = gain / loss
-            rsi = 100 - (100 / (1 + rs))
-            
-            return float(rsi.iloc[-1])
+            return ie.last(ie.rsi(df['close'].to_numpy(), periods), default=50.0)
         except:
             return 50  # Hata durumunda nötr değer döndür
 
     def _calculate_macd(self, df: pd.DataFrame) -> Dict:
         """MACD hesapla"""
         try:
-            exp1 = df['close'].ewm(span=12, adjust=False).mean()
-            exp2 = df['close'].ewm(span=26, adjust=False).mean()
-            macd = exp1 - exp2
-            signal = macd.ewm(span=9, adjust=False).mean()
-            macd_hist = macd - signal
+            macd, signal, macd_hist = ie.macd(df['close'].to_numpy())
             
             return {
-                'value': round(macd.iloc[-1], 2),
-                'signal': round(signal.iloc[-1], 2),
-                'histogram': round(macd_hist.iloc[-1], 2)
+                'value': round(ie.last(macd), 2),
+                'signal': round(ie.last(signal), 2),
+                'histogram': round(ie.last(macd_hist), 2)
             }
         except:
             return {'value': 0, 'signal': 0, 'histogram': 0}
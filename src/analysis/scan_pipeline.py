@@ -0,0 +1,134 @@
+"""
+Taramanın G/Ç ve CPU aşamalarını ayıran iki aşamalı boru hattı.
+
+Eskiden her işçi süreç kendi 5 iş parçacıklı havuzuyla senkron fetch_ohlcv
+çağırıyordu; eş zamanlı HTTP isteği sayısı işçi × 5 idi ve rate limit ile
+CPU işi aynı yerde karışıyordu.
+
+Burada:
+- Getirme aşaması ana event loop'ta `fetch_concurrency` görevle çalışır;
+  tüm istekler paylaşılan gateway'den (tek rate limit noktası) geçer.
+- Getirilen öğeler `chunk_size`'lık parçalar halinde sınırlı bir kuyruğa
+  konur. Kuyruk doluysa getiriciler bekler (geri basınç): CPU aşaması
+  geride kalınca yeni istek atılmaz. Bellekte en fazla
+  (consumers + queue_size + fetch_concurrency) × chunk_size öğe bulunur.
+- CPU aşaması `consumers` görevle kuyruktan parça alır ve işler (ör. işçi
+  havuzunda puanlama). `stream()` her parçanın sonucunu hazır olduğunda verir.
+"""
+import time
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class ScanPipeline:
+    """Sınırlı eşzamanlı getirme -> sınırlı kuyruk -> parça işleme"""
+
+    def __init__(self, fetch: Callable[[Any], Awaitable[Any]], process: Callable[[List[Any]], Awaitable[Any]],
+                 fetch_concurrency: int = 8, chunk_size: int = 10, consumers: int = 1,
+                 queue_size: Optional[int] = None):
+        """
+        Args:
+            fetch: Öğe başına G/Ç; None dönerse öğe atlanır
+            process: Getirilmiş öğe listesini işleyen CPU aşaması
+            fetch_concurrency: Aynı anda en fazla kaç getirme yapılacağı
+            chunk_size: CPU aşamasına gönderilen parça boyutu
+            consumers: Aynı anda işlenen en fazla parça sayısı
+            queue_size: Bekleyen en fazla parça (varsayılan: consumers × 2)
+        """
+        self.fetch = fetch
+        self.process = process
+        self.fetch_concurrency = max(1, fetch_concurrency)
+        self.chunk_size = max(1, chunk_size)
+        self.consumers = max(1, consumers)
+        self.queue_size = queue_size or self.consumers * 2
+        self.stats = {}
+
+    async def run(self, items: Iterable[Any]) -> List[Any]:
+        """
+        Öğeleri boru hattından geçir.
+
+        Returns:
+            process() sonuçları (parçaların tamamlanma sırasıyla)
+        """
+        return [result async for result in self.stream(items)]
+
+    async def stream(self, items: Iterable[Any]) -> AsyncIterator[Any]:
+        """
+        run()'ın akış sürümü: her parçanın process() sonucu hazır olur olmaz verilir.
+
+        Tüketici döngüden erken çıkıp üreteci kapatırsa (aclose) bekleyen
+        getirme ve işleme görevleri iptal edilir.
+        """
+        pending = iter(items)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        results: asyncio.Queue = asyncio.Queue()
+        chunk: List[Any] = []
+        self.stats = {'fetched': 0, 'skipped': 0, 'fetch_errors': 0, 'chunks': 0, 'process_errors': 0,
+                      'fetch_wait': 0.0, 'max_queue': 0}
+
+        async def put(batch: List[Any]):
+            started = time.perf_counter()
+            await queue.put(batch)
+            self.stats['fetch_wait'] += time.perf_counter() - started
+            self.stats['max_queue'] = max(self.stats['max_queue'], queue.qsize())
+
+        async def fetcher():
+            nonlocal chunk
+            for item in pending:
+                try:
+                    fetched = await self.fetch(item)
+                except Exception as e:
+                    self.stats['fetch_errors'] += 1
+                    logger.debug(f"Getirme hatası ({item!r}): {str(e)}")
+                    continue
+                if fetched is None:
+                    self.stats['skipped'] += 1
+                    continue
+                self.stats['fetched'] += 1
+                chunk.append(fetched)
+                if len(chunk) >= self.chunk_size:
+                    batch, chunk = chunk, []
+                    await put(batch)
+
+        async def consumer():
+            while True:
+                batch = await queue.get()
+                if batch is _DONE:
+                    return
+                self.stats['chunks'] += 1
+                try:
+                    results.put_nowait(await self.process(batch))
+                except Exception as e:
+                    self.stats['process_errors'] += 1
+                    logger.error(f"Parça işleme hatası: {str(e)}")
+
+        async def drive():
+            try:
+                await asyncio.gather(*fetcher_tasks)
+                if chunk:
+                    await put(chunk)
+                for _ in consumer_tasks:
+                    await queue.put(_DONE)
+                await asyncio.gather(*consumer_tasks)
+            finally:
+                results.put_nowait(_DONE)
+
+        consumer_tasks = [asyncio.ensure_future(consumer()) for _ in range(self.consumers)]
+        fetcher_tasks = [asyncio.ensure_future(fetcher()) for _ in range(self.fetch_concurrency)]
+        driver = asyncio.ensure_future(drive())
+        try:
+            while True:
+                result = await results.get()
+                if result is _DONE:
+                    break
+                yield result
+            await driver
+        finally:
+            for task in fetcher_tasks + consumer_tasks + [driver]:
+                task.cancel()
+            self.stats['fetch_wait'] = round(self.stats['fetch_wait'], 3)
@@ -12,9 +12,7 @@ from typing import Dict, Optional
 from anthropic import Anthropic
 from .price_analysis import PriceAnalyzer
 from .whale_tracker import WhaleTracker
-from ta.trend import EMAIndicator, MACD
-from ta.momentum import RSIIndicator
-from ta.volume import VolumeWeightedAveragePrice
+from src.analysis import indicator_engine as ie
 
 class SignalAnalyzer:
     def __init__(self):
@@ -93,27 +91,11 @@ class SignalAnalyzer:
             # İndikatörleri hesapla
             print("🔄 İndikatörler hesaplanıyor...")
             
-            # RSI hesaplama
-            delta = df['close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss
-            df['RSI'] = 100 - (100 / (1 + rs))
-            
-            # EMA hesaplama
-            df['EMA20'] = df['close'].ewm(span=20, adjust=False).mean()
-            df['EMA50'] = df['close'].ewm(span=50, adjust=False).mean()
-            
-            # MACD hesaplama
-            exp1 = df['close'].ewm(span=12, adjust=False).mean()
-            exp2 = df['close'].ewm(span=26, adjust=False).mean()
-            df['MACD'] = exp1 - exp2
-            df['MACD_Signal'] = df['MACD'].ewm(span=9, adjust=False).mean()
-            
-            # Bollinger Bands
-            df['BB_middle'] = df['close'].rolling(window=20).mean()
-            df['BB_upper'] = df['BB_middle'] + 2 * df['close'].rolling(window=20).std()
-            df['BB_lower'] = df['BB_middle'] - 2 * df['close'].rolling(window=20).std()
+            features = ie.compute_features(df)
+            for column, name in (('RSI', 'rsi'), ('EMA20', 'ema20'), ('EMA50', 'ema50'), ('MACD', 'macd'),
+                                 ('MACD_Signal', 'macd_signal'), ('BB_middle', 'bb_middle'),
+                                 ('BB_upper', 'bb_upper'), ('BB_lower', 'bb_lower')):
+                df[column] = features[name]
             
             print("✅ Teknik analiz tamamlandı")
             return df.tail(1).to_dict('records')[0]
@@ -466,26 +448,19 @@ class SignalAnalyzer:
     async def analyze(self, symbol: str, df: pd.DataFrame) -> Dict:
         """Teknik analiz yap"""
         try:
-            # RSI
-            rsi = RSIIndicator(df['close'], window=14)
-            current_rsi = float(rsi.rsi().iloc[-1])
+            features = ie.compute_features(df)
+            current_rsi = float(features['rsi'][-1])
             
             # EMA
-            ema20 = float(EMAIndicator(df['close'], window=20).ema_indicator().iloc[-1])
-            ema50 = float(EMAIndicator(df['close'], window=50).ema_indicator().iloc[-1])
+            ema20 = float(features['ema20'][-1])
+            ema50 = float(features['ema50'][-1])
             
             # MACD
-            macd = MACD(df['close'])
-            current_macd = float(macd.macd().iloc[-1])
-            current_signal = float(macd.macd_signal().iloc[-1])
+            current_macd = float(features['macd'][-1])
+            current_signal = float(features['macd_signal'][-1])
             
             # VWAP
-            vwap = float(VolumeWeightedAveragePrice(
-                high=df['high'],
-                low=df['low'],
-                close=df['close'],
-                volume=df['volume']
-            ).volume_weighted_average_price().iloc[-1])
+            vwap = float(ie.vwap(df['high'], df['low'], df['close'], df['volume'], period=14)[-1])
             
             # Hacim değişimi
             recent_vol = float(df['volume'].iloc[-3:].mean())
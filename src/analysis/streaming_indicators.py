@@ -0,0 +1,532 @@
+"""
+Artımlı (O(1)) teknik göstergeler.
+
+Takip ve scalping döngüleri her tikte RSI/MACD/EMA'yı tüm geçmişten yeniden
+hesaplıyordu. Buradaki nesneler durumlarını tutar: kapanan her mumda
+`update`, henüz kapanmamış mumun anlık fiyatı için `peek` sabit zamanda
+çalışır. `peek` durumu değiştirmez.
+
+Tanımlar indicator_engine ile aynıdır (Wilder RSI/ATR, adjust=False EMA,
+ddof=0 Bollinger); aynı mum serisiyle beslenen bir nesnenin değeri motorun
+dizisinin son elemanına eşittir.
+
+Tüm durum JSON'a yazılabilir (`to_dict` / `from_dict`), böylece bot yeniden
+başladığında göstergeler geçmişi baştan işlemeden kaldığı yerden devam eder.
+"""
+import os
+import json
+import math
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+from src.data_collectors.candle_store import MAX_FETCH_LIMIT, get_candle_store, timeframe_to_ms
+
+logger = logging.getLogger(__name__)
+
+
+class StreamingIndicator:
+    """Durumu düz özniteliklerde tutan, JSON'a yazılabilir gösterge tabanı"""
+
+    def to_dict(self) -> Dict:
+        state = {}
+        for name, value in self.__dict__.items():
+            if isinstance(value, StreamingIndicator):
+                state[name] = value.to_dict()
+            elif isinstance(value, deque):
+                state[name] = list(value)
+            else:
+                state[name] = value
+        return {'type': type(self).__name__, 'state': state}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'StreamingIndicator':
+        indicator_cls = _REGISTRY[data['type']]
+        indicator = indicator_cls.__new__(indicator_cls)
+        for name, value in data['state'].items():
+            if isinstance(value, dict) and 'type' in value:
+                value = StreamingIndicator.from_dict(value)
+            elif isinstance(value, list):
+                value = deque(value)
+            setattr(indicator, name, value)
+        return indicator
+
+
+class StreamingEMA(StreamingIndicator):
+    """Üstel hareketli ortalama (ilk değerle başlar)"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.value: Optional[float] = None
+
+    def _next(self, x: float) -> float:
+        if self.value is None:
+            return x
+        alpha = 2.0 / (self.period + 1.0)
+        return alpha * x + (1.0 - alpha) * self.value
+
+    def update(self, x: float) -> float:
+        self.value = self._next(x)
+        return self.value
+
+    def peek(self, x: float) -> float:
+        return self._next(x)
+
+
+class StreamingWilder(StreamingIndicator):
+    """Wilder ortalaması; ilk `period` değerin basit ortalamasıyla başlar"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.count = 0
+        self.total = 0.0
+        self.value: Optional[float] = None
+
+    def _next(self, x: float) -> Optional[float]:
+        if self.value is not None:
+            return (self.value * (self.period - 1) + x) / self.period
+        if self.count + 1 == self.period:
+            return (self.total + x) / self.period
+        return None
+
+    def update(self, x: float) -> Optional[float]:
+        if self.value is None:
+            self.count += 1
+            self.total += x
+            if self.count == self.period:
+                self.value = self.total / self.period
+        else:
+            self.value = (self.value * (self.period - 1) + x) / self.period
+        return self.value
+
+    def peek(self, x: float) -> Optional[float]:
+        return self._next(x)
+
+
+class StreamingSMA(StreamingIndicator):
+    """Kayan pencere ortalaması ve standart sapması (ddof=0), koşan toplamlarla"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.window = deque()
+        # Toplamlar ilk değere göre kaydırılır; büyük fiyatlarda kareler toplamı hassasiyet kaybetmesin
+        self.shift: Optional[float] = None
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def _stats(self, total: float, total_sq: float, shift: float):
+        mean = total / self.period
+        variance = max(total_sq / self.period - mean * mean, 0.0)
+        return mean + shift, math.sqrt(variance)
+
+    def update(self, x: float):
+        if self.shift is None:
+            self.shift = x
+        d = x - self.shift
+        self.window.append(d)
+        self.total += d
+        self.total_sq += d * d
+        if len(self.window) > self.period:
+            old = self.window.popleft()
+            self.total -= old
+            self.total_sq -= old * old
+        if len(self.window) < self.period:
+            return None, None
+        return self._stats(self.total, self.total_sq, self.shift)
+
+    def peek(self, x: float):
+        if len(self.window) + 1 < self.period:
+            return None, None
+        shift = x if self.shift is None else self.shift
+        d = x - shift
+        total, total_sq = self.total + d, self.total_sq + d * d
+        if len(self.window) == self.period:
+            old = self.window[0]
+            total -= old
+            total_sq -= old * old
+        return self._stats(total, total_sq, shift)
+
+
+class StreamingRSI(StreamingIndicator):
+    """Wilder RSI"""
+
+    def __init__(self, period: int = 14):
+        self.prev_close: Optional[float] = None
+        self.gain = StreamingWilder(period)
+        self.loss = StreamingWilder(period)
+        self.value: Optional[float] = None
+
+    @staticmethod
+    def _rsi(avg_gain: Optional[float], avg_loss: Optional[float]) -> Optional[float]:
+        if avg_gain is None:
+            return None
+        if avg_loss == 0:
+            # Hiç kayıp yoksa RSI 100, hiç hareket yoksa 50
+            return 50.0 if avg_gain == 0 else 100.0
+        return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+    def update(self, close: float) -> Optional[float]:
+        if self.prev_close is not None:
+            delta = close - self.prev_close
+            self.value = self._rsi(self.gain.update(max(delta, 0.0)), self.loss.update(max(-delta, 0.0)))
+        self.prev_close = close
+        return self.value
+
+    def peek(self, close: float) -> Optional[float]:
+        if self.prev_close is None:
+            return None
+        delta = close - self.prev_close
+        return self._rsi(self.gain.peek(max(delta, 0.0)), self.loss.peek(max(-delta, 0.0)))
+
+
+class StreamingMACD(StreamingIndicator):
+    """MACD: (çizgi, sinyal, histogram)"""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = StreamingEMA(fast)
+        self.slow = StreamingEMA(slow)
+        self.signal = StreamingEMA(signal)
+
+    def update(self, close: float):
+        line = self.fast.update(close) - self.slow.update(close)
+        signal = self.signal.update(line)
+        return line, signal, line - signal
+
+    def peek(self, close: float):
+        line = self.fast.peek(close) - self.slow.peek(close)
+        signal = self.signal.peek(line)
+        return line, signal, line - signal
+
+
+class StreamingATR(StreamingIndicator):
+    """Wilder ATR"""
+
+    def __init__(self, period: int = 14):
+        self.prev_close: Optional[float] = None
+        self.average = StreamingWilder(period)
+
+    def _true_range(self, high: float, low: float, close: float) -> float:
+        prev_close = close if self.prev_close is None else self.prev_close
+        return max(high - low, abs(high - prev_close), abs(low - prev_close))
+
+    def update(self, high: float, low: float, close: float) -> Optional[float]:
+        value = self.average.update(self._true_range(high, low, close))
+        self.prev_close = close
+        return value
+
+    def peek(self, high: float, low: float, close: float) -> Optional[float]:
+        return self.average.peek(self._true_range(high, low, close))
+
+    @property
+    def value(self) -> Optional[float]:
+        return self.average.value
+
+
+class StreamingBollinger(StreamingIndicator):
+    """Bollinger bantları: (üst, orta, alt)"""
+
+    def __init__(self, period: int = 20, num_std: float = 2.0):
+        self.num_std = num_std
+        self.sma = StreamingSMA(period)
+
+    def _bands(self, mean, std):
+        if mean is None:
+            return None, None, None
+        return mean + self.num_std * std, mean, mean - self.num_std * std
+
+    def update(self, close: float):
+        return self._bands(*self.sma.update(close))
+
+    def peek(self, close: float):
+        return self._bands(*self.sma.peek(close))
+
+
+class StreamingOBV(StreamingIndicator):
+    """On Balance Volume (ilk değer ilk mumun hacmi)"""
+
+    def __init__(self):
+        self.prev_close: Optional[float] = None
+        self.value: Optional[float] = None
+
+    def _next(self, close: float, volume: float) -> float:
+        if self.prev_close is None:
+            return volume
+        if close > self.prev_close:
+            return self.value + volume
+        if close < self.prev_close:
+            return self.value - volume
+        return self.value
+
+    def update(self, close: float, volume: float) -> float:
+        self.value = self._next(close, volume)
+        self.prev_close = close
+        return self.value
+
+    def peek(self, close: float, volume: float) -> float:
+        return self._next(close, volume)
+
+
+class StreamingVWAP(StreamingIndicator):
+    """Kümülatif hacim ağırlıklı ortalama fiyat"""
+
+    def __init__(self):
+        self.cumulative_tp_vol = 0.0
+        self.cumulative_vol = 0.0
+
+    def _next(self, high: float, low: float, close: float, volume: float):
+        typical_price = (high + low + close) / 3
+        tp_vol = self.cumulative_tp_vol + typical_price * volume
+        vol = self.cumulative_vol + volume
+        return tp_vol, vol, (tp_vol / vol if vol > 0 else typical_price)
+
+    def update(self, high: float, low: float, close: float, volume: float) -> float:
+        self.cumulative_tp_vol, self.cumulative_vol, value = self._next(high, low, close, volume)
+        return value
+
+    def peek(self, high: float, low: float, close: float, volume: float) -> float:
+        return self._next(high, low, close, volume)[2]
+
+
+_REGISTRY = {cls.__name__: cls for cls in (
+    StreamingEMA, StreamingWilder, StreamingSMA, StreamingRSI, StreamingMACD,
+    StreamingATR, StreamingBollinger, StreamingOBV, StreamingVWAP,
+)}
+
+
+class IndicatorState:
+    """
+    Bir (sembol, zaman dilimi) için tüm akan göstergeler.
+
+    Kapanmış mumlar `update_candle` ile işlenir; `sync` bir ccxt mum
+    listesinden yalnızca henüz işlenmemiş kapanmış mumları alır (son mum
+    açık kabul edilir). `snapshot(price)` açık mumun anlık fiyatıyla geçici
+    değerleri döndürür.
+    """
+
+    def __init__(self, symbol: str = '', timeframe: str = '1h'):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.reset()
+
+    def reset(self):
+        """Tüm göstergeleri sıfırla (kapatılamayan bir veri boşluğundan sonra)"""
+        self.last_ts: Optional[float] = None
+        self.last_close: Optional[float] = None
+        self.last_volume: Optional[float] = None
+        self.indicators: Dict[str, StreamingIndicator] = self._default_indicators()
+        self.values: Dict[str, Optional[float]] = {}
+
+    @staticmethod
+    def _default_indicators() -> Dict[str, StreamingIndicator]:
+        return {
+            'rsi': StreamingRSI(14),
+            'ema20': StreamingEMA(20),
+            'ema50': StreamingEMA(50),
+            'macd': StreamingMACD(12, 26, 9),
+            'atr': StreamingATR(14),
+            'bollinger': StreamingBollinger(20, 2.0),
+            'volume_sma': StreamingSMA(20),
+            'obv': StreamingOBV(),
+            'vwap': StreamingVWAP(),
+        }
+
+    def update_candle(self, candle) -> Dict[str, Optional[float]]:
+        """Kapanmış bir mumu işle; daha önce işlenmiş timestamp'ler yok sayılır"""
+        timestamp, _, high, low, close, volume = (float(v) for v in candle[:6])
+        if self.last_ts is not None and timestamp <= self.last_ts:
+            return self.values
+
+        ind = self.indicators
+        macd, signal, hist = ind['macd'].update(close)
+        bb_upper, bb_middle, bb_lower = ind['bollinger'].update(close)
+        self.values = {
+            'rsi': ind['rsi'].update(close),
+            'ema20': ind['ema20'].update(close),
+            'ema50': ind['ema50'].update(close),
+            'macd': macd,
+            'macd_signal': signal,
+            'macd_hist': hist,
+            'atr': ind['atr'].update(high, low, close),
+            'bb_upper': bb_upper,
+            'bb_middle': bb_middle,
+            'bb_lower': bb_lower,
+            'volume_sma': ind['volume_sma'].update(volume)[0],
+            'obv': ind['obv'].update(close, volume),
+            'vwap': ind['vwap'].update(high, low, close, volume),
+        }
+        self.last_ts, self.last_close, self.last_volume = timestamp, close, volume
+        return self.values
+
+    @property
+    def next_close_ms(self) -> Optional[float]:
+        """Açık mumun kapanacağı zaman (ms)"""
+        if self.last_ts is None:
+            return None
+        return self.last_ts + 2 * timeframe_to_ms(self.timeframe)
+
+    def needs_backfill(self, candles: List[list]) -> bool:
+        """Verilen mumlar son işlenen mumla arasında boşluk bırakıyor mu"""
+        if self.last_ts is None:
+            return True
+        if not candles:
+            return False
+        return float(candles[0][0]) > self.last_ts + timeframe_to_ms(self.timeframe)
+
+    def sync(self, candles: List[list], include_last: bool = False) -> int:
+        """
+        Mum listesindeki yeni kapanmış mumları işle.
+
+        Args:
+            candles: Zaman sıralı ccxt mum listesi
+            include_last: Son mum da kapanmış kabul edilsin mi
+
+        Returns:
+            İşlenen mum sayısı
+        """
+        closed = candles if include_last else candles[:-1]
+        processed = 0
+        for candle in closed:
+            if self.last_ts is None or float(candle[0]) > self.last_ts:
+                self.update_candle(candle)
+                processed += 1
+        return processed
+
+    def snapshot(self, price: Optional[float] = None) -> Dict[str, Optional[float]]:
+        """
+        Güncel gösterge değerleri.
+
+        `price` verilirse kapanış fiyatına bağlı göstergeler (RSI, EMA, MACD,
+        Bollinger) açık mumun bu fiyatla kapanacağı varsayılarak durum
+        değiştirilmeden hesaplanır.
+        """
+        values = dict(self.values)
+        if price is None or self.last_ts is None:
+            values['price'] = self.last_close if price is None else price
+            return values
+
+        ind = self.indicators
+        macd, signal, hist = ind['macd'].peek(price)
+        bb_upper, bb_middle, bb_lower = ind['bollinger'].peek(price)
+        values.update({
+            'rsi': ind['rsi'].peek(price),
+            'ema20': ind['ema20'].peek(price),
+            'ema50': ind['ema50'].peek(price),
+            'macd': macd,
+            'macd_signal': signal,
+            'macd_hist': hist,
+            'bb_upper': bb_upper,
+            'bb_middle': bb_middle,
+            'bb_lower': bb_lower,
+            'price': price,
+        })
+        return values
+
+    def to_dict(self) -> Dict:
+        return {
+            'symbol': self.symbol,
+            'timeframe': self.timeframe,
+            'last_ts': self.last_ts,
+            'last_close': self.last_close,
+            'last_volume': self.last_volume,
+            'values': self.values,
+            'indicators': {name: indicator.to_dict() for name, indicator in self.indicators.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'IndicatorState':
+        state = cls(data['symbol'], data['timeframe'])
+        state.last_ts = data['last_ts']
+        state.last_close = data['last_close']
+        state.last_volume = data.get('last_volume')
+        state.values = data['values']
+        state.indicators.update({name: StreamingIndicator.from_dict(indicator)
+                                 for name, indicator in data['indicators'].items()})
+        return state
+
+
+class IndicatorStateStore:
+    """IndicatorState nesnelerini (sembol, zaman dilimi) başına JSON dosyasında saklar"""
+
+    def __init__(self, state_dir: str = 'cache/indicator_state'):
+        self.state_dir = state_dir
+        self._states: Dict[tuple, IndicatorState] = {}
+        self._lock = threading.Lock()
+        os.makedirs(self.state_dir, exist_ok=True)
+
+    def _path(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.state_dir, f"{symbol.replace('/', '_')}_{timeframe}.json")
+
+    def get(self, symbol: str, timeframe: str) -> IndicatorState:
+        """Bellekteki, yoksa diskteki durumu döndür; hiçbiri yoksa boş durum"""
+        key = (symbol, timeframe)
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                state = self._read(symbol, timeframe) or IndicatorState(symbol, timeframe)
+                self._states[key] = state
+            return state
+
+    def _read(self, symbol: str, timeframe: str) -> Optional[IndicatorState]:
+        path = self._path(symbol, timeframe)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path) as f:
+                return IndicatorState.from_dict(json.load(f))
+        except Exception as e:
+            logger.warning(f"{symbol} {timeframe} gösterge durumu okunamadı, sıfırdan başlanıyor: {str(e)}")
+            return None
+
+    def save(self, state: IndicatorState):
+        """Durumu atomik olarak diske yaz"""
+        path = self._path(state.symbol, state.timeframe)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(state.to_dict(), f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"{state.symbol} {state.timeframe} gösterge durumu yazılamadı: {str(e)}")
+
+
+async def sync_state_async(state: IndicatorState, exchange, candle_store=None, warmup: int = 200) -> int:
+    """
+    Durumu mum deposundaki yeni kapanmış mumlarla güncelle.
+
+    Yalnızca son işlenen mumdan bu yana geçen mumlar istenir; yeniden
+    başlatma sonrası bu aradaki mumların sayısıdır. Boşluk tek istekle
+    kapatılamıyorsa durum sıfırlanıp `warmup` mumla yeniden ısıtılır.
+
+    Returns:
+        İşlenen mum sayısı
+    """
+    candle_store = candle_store or get_candle_store()
+    if state.last_ts is None:
+        limit = warmup
+    else:
+        missed = int((time.time() * 1000 - state.last_ts) // timeframe_to_ms(state.timeframe))
+        limit = max(2, missed + 1)
+        if limit > MAX_FETCH_LIMIT:
+            limit = warmup
+    candles = await candle_store.get_ohlcv_async(exchange, state.symbol, state.timeframe, limit=limit)
+    if not candles:
+        return 0
+    if state.last_ts is not None and state.needs_backfill(candles):
+        logger.info(f"{state.symbol} {state.timeframe} gösterge durumunda kapatılamayan boşluk, yeniden ısıtılıyor")
+        state.reset()
+    return state.sync(candles)
+
+
+_state_store: Optional[IndicatorStateStore] = None
+_state_store_lock = threading.Lock()
+
+
+def get_indicator_state_store() -> IndicatorStateStore:
+    """Süreç genelinde paylaşılan IndicatorStateStore örneğini döndür"""
+    global _state_store
+    if _state_store is None:
+        with _state_store_lock:
+            if _state_store is None:
+                _state_store = IndicatorStateStore(os.getenv('INDICATOR_STATE_DIR', 'cache/indicator_state'))
+    return _state_store
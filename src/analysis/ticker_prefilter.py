@@ -0,0 +1,153 @@
+"""
+Taramanın ucuz ilk aşaması: tek toplu 24s ticker yükünden aday seçimi.
+
+Fiyat/hacim filtresinden geçen her çift için mumlar çekiliyor ve tüm
+gösterge seti hesaplanıyordu; istek sayısı evren büyüklüğüyle artıyordu.
+TickerPrefilter evreni zaten elde olan /ticker/24hr verisinden vektörel
+olarak puanlar ve yalnızca ilk `top_k` aday derin analize (mum çekme +
+göstergeler) gider.
+
+Ön puan bileşenleri (evren içinde z-skoru, ağırlıklar ayarlanabilir):
+- change: 24s değişimin büyüklüğü (|priceChangePercent|)
+- range: fiyatın 24s aralığının ucuna yakınlığı (dip/tepe kırılımı veya dönüşü)
+- volume: log(quoteVolume) z-skoru (likidite ve ilgi)
+- spread: alış-satış makası (baz puan), ceza olarak
+
+`prefilter_recall` tam taramanın en iyi fırsatlarının ne kadarının aday
+listesinde olduğunu ölçer; ağırlıklar ve top_k bununla ayarlanır.
+"""
+import os
+import numpy as np
+from typing import Dict, Iterable, List, Optional
+
+DEFAULT_WEIGHTS = {'change': 1.0, 'range': 0.5, 'volume': 1.0, 'spread': 0.5}
+
+
+def _column(tickers: List[Dict], field: str) -> np.ndarray:
+    """Ticker alanını float dizisine çevir (eksik/bozuk değerler NaN)"""
+    values = np.full(len(tickers), np.nan)
+    for i, ticker in enumerate(tickers):
+        try:
+            values[i] = float(ticker[field])
+        except (KeyError, TypeError, ValueError):
+            pass
+    return values
+
+
+def _zscore(values: np.ndarray) -> np.ndarray:
+    """NaN'ları yok sayan z-skoru; NaN ve sabit sütunlar 0 olur"""
+    finite = np.isfinite(values)
+    if finite.sum() < 2:
+        return np.zeros_like(values)
+    std = values[finite].std()
+    if std == 0:
+        return np.zeros_like(values)
+    return np.where(finite, (values - values[finite].mean()) / std, 0.0)
+
+
+def ticker_features(tickers: List[Dict]) -> Dict[str, np.ndarray]:
+    """
+    Binance 24s ticker listesinden ön filtre öznitelikleri.
+
+    Returns:
+        {'change': %, 'range_position': 0 (dip) - 1 (tepe), 'log_volume',
+         'spread_bps': makas (baz puan)}; hesaplanamayan değerler NaN
+    """
+    last = _column(tickers, 'lastPrice')
+    high = _column(tickers, 'highPrice')
+    low = _column(tickers, 'lowPrice')
+    bid = _column(tickers, 'bidPrice')
+    ask = _column(tickers, 'askPrice')
+    volume = _column(tickers, 'quoteVolume')
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        span = high - low
+        range_position = np.where(span > 0, (last - low) / span, np.nan)
+        mid = (bid + ask) / 2
+        spread_bps = np.where((mid > 0) & (ask >= bid), (ask - bid) / mid * 1e4, np.nan)
+        log_volume = np.where(volume > 0, np.log(volume), np.nan)
+
+    return {
+        'change': _column(tickers, 'priceChangePercent'),
+        'range_position': np.clip(range_position, 0.0, 1.0),
+        'log_volume': log_volume,
+        'spread_bps': spread_bps,
+    }
+
+
+def prefilter_scores(features: Dict[str, np.ndarray], weights: Optional[Dict[str, float]] = None) -> np.ndarray:
+    """Özniteliklerden ön puan (yüksek = derin analize daha değer)"""
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    range_extremity = np.abs(features['range_position'] - 0.5) * 2
+    return (weights['change'] * _zscore(np.abs(features['change']))
+            + weights['range'] * _zscore(range_extremity)
+            + weights['volume'] * _zscore(features['log_volume'])
+            - weights['spread'] * _zscore(features['spread_bps']))
+
+
+def prefilter_recall(candidates: Iterable[str], opportunities: List[Dict], top_n: int = 10) -> float:
+    """
+    Tam taramanın puana göre ilk top_n fırsatından aday listesinde olanların oranı.
+
+    Args:
+        candidates: Ön filtrenin seçtiği semboller
+        opportunities: Ön filtresiz tam taramanın fırsatları
+    """
+    best = sorted(opportunities, key=lambda x: x['opportunity_score'], reverse=True)[:top_n]
+    if not best:
+        return 1.0
+    candidates = set(candidates)
+    return sum(opp['symbol'] in candidates for opp in best) / len(best)
+
+
+class TickerPrefilter:
+    """Ticker yükünden puanlayıp derin analiz için ilk top_k adayı seçen ön filtre"""
+
+    def __init__(self, top_k: int = 60, weights: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            top_k: Derin analize gidecek aday sayısı (0: ön filtre kapalı)
+            weights: DEFAULT_WEIGHTS üzerine yazılacak ağırlıklar
+        """
+        self.top_k = top_k
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.stats = {'scans': 0, 'universe': 0, 'selected': 0, 'recall_checks': 0, 'last_recall': None}
+
+    @property
+    def enabled(self) -> bool:
+        return self.top_k > 0
+
+    def select(self, tickers: List[Dict]) -> List[Dict]:
+        """Ön puana göre ilk top_k ticker (evren küçükse hepsi, sıra korunmaz)"""
+        self.stats['scans'] += 1
+        self.stats['universe'] += len(tickers)
+        if not self.enabled or len(tickers) <= self.top_k:
+            self.stats['selected'] += len(tickers)
+            return list(tickers)
+
+        scores = prefilter_scores(ticker_features(tickers), self.weights)
+        chosen = np.argsort(-scores, kind='stable')[:self.top_k]
+        self.stats['selected'] += len(chosen)
+        return [tickers[i] for i in chosen]
+
+    def record_recall(self, recall: float):
+        self.stats['recall_checks'] += 1
+        self.stats['last_recall'] = recall
+
+    @property
+    def reduction(self) -> float:
+        """Derin analize giden sembollerde sağlanan azalma katsayısı (evren / aday)"""
+        return self.stats['universe'] / self.stats['selected'] if self.stats['selected'] else 1.0
+
+
+def prefilter_from_env() -> TickerPrefilter:
+    """
+    SCAN_PREFILTER_TOP_K (varsayılan 60, 0 kapatır) ve
+    SCAN_PREFILTER_WEIGHTS ('change=1,range=0.5,...') ile yapılandırılmış ön filtre
+    """
+    weights = {}
+    for item in os.getenv('SCAN_PREFILTER_WEIGHTS', '').split(','):
+        if '=' in item:
+            key, value = item.split('=', 1)
+            weights[key.strip()] = float(value)
+    return TickerPrefilter(top_k=int(os.getenv('SCAN_PREFILTER_TOP_K', '60')), weights=weights)
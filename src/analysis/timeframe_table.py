@@ -0,0 +1,146 @@
+"""
+Çoklu zaman dilimi sonuçları için sembol anahtarlı sütunlu tablo.
+
+MultiTimeframeAnalyzer zaman dilimi sonuçlarını ikişer ikişer birleştiriyordu:
+önceki her sonuç için yeni listede `next(...)` ile sembol aranıyor (evren
+büyüklüğünde karesel) ve her aşamada tüm sonuç sözlükleri kopyalanıyordu.
+
+TimeframeTable her sembole bir satır numarası verir (sözlük indeksi); her
+zaman dilimi için sayısal alanlar satır numarasıyla numpy sütunlarına
+yerleştirilir. Birleştirme sonuç sayısında doğrusaldır ve `combined_scores`
+fırsat puanını tüm semboller için tek seferde, zaman dilimi başına bir
+vektörel adımla hesaplar. Sözlükler yalnızca gösterilecek satırlar için kurulur.
+
+Puanlama eski ardışık birleştirmeyle aynıdır (zaman dilimleri büyükten küçüğe):
+- Yeni zaman dilimi önceki zaman diliminin yönünü teyit ederse puan artar,
+  ters yöndeyse azalır (STRONGLY +25, normal +15, NEUTRAL +5, ters -10/-20).
+- Yeni zaman diliminin risk/ödül oranı >= 3 ise +10, >= 2 ise +5.
+- Puan her aşamada 0-100 arasına sınırlanır.
+- Bir zaman dilimi eksikse o aşamanın trendi UNKNOWN sayılır; henüz puan
+  yoksa önceki trendin gücüne göre 60/40/20 başlangıç puanı verilir.
+- İlk (en büyük) zaman diliminde sonucu olmayan semboller puanlanmaz.
+"""
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Sequence
+
+TREND_CODES = {'STRONGLY_BEARISH': -2, 'BEARISH': -1, 'NEUTRAL': 0, 'BULLISH': 1, 'STRONGLY_BULLISH': 2}
+TREND_NAMES = {code: name for name, code in TREND_CODES.items()}
+
+# Önceki yöne göre hizalanmış yeni trend kodu (-2..2) -> puan
+ALIGNMENT_POINTS = np.array([-20, -10, 5, 15, 25])
+
+NUMERIC_FIELDS = ('trend_strength', 'current_price', 'volume', 'stop_price', 'target_price', 'risk_reward')
+
+
+class TimeframeTable:
+    """Sembol -> satır indeksli, zaman dilimi başına sayısal sütunlar tutan sonuç tablosu"""
+
+    def __init__(self, timeframes: Sequence[str]):
+        """
+        Args:
+            timeframes: Büyükten küçüğe zaman dilimleri (ör. ('1w', '4h', '1h', '15m'));
+                ilki birleştirmenin tabanıdır
+        """
+        self.timeframes = tuple(timeframes)
+        self.symbols: List[str] = []
+        self.index: Dict[str, int] = {}
+        # Zaman dilimi -> (satır numaraları, alan -> değerler); sütunlar column() ile kurulur
+        self._rows: Dict[str, List[int]] = {timeframe: [] for timeframe in self.timeframes}
+        self._values: Dict[str, Dict[str, list]] = {
+            timeframe: {field: [] for field in ('trend',) + NUMERIC_FIELDS} for timeframe in self.timeframes}
+        # Sayısal olmayan alanlar (indicators, trend_descriptions) satır numarasıyla
+        self._extras: Dict[str, Dict[int, Dict]] = {timeframe: {} for timeframe in self.timeframes}
+        self._columns: Dict[tuple, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def row(self, symbol: str) -> int:
+        """Sembolün satır numarası (yoksa yeni satır açılır)"""
+        position = self.index.get(symbol)
+        if position is None:
+            position = self.index[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        return position
+
+    def add(self, timeframe: str, result: Dict):
+        """Tek zaman dilimi analiz sonucunu (symbol, trend, trend_strength, ... alanlarıyla) ekle"""
+        position = self.row(result['symbol'])
+        self._rows[timeframe].append(position)
+        values = self._values[timeframe]
+        values['trend'].append(TREND_CODES.get(result.get('trend'), 0))
+        for field in NUMERIC_FIELDS:
+            values[field].append(float(result.get(field) or 0))
+        self._extras[timeframe][position] = {'indicators': result.get('indicators', {}),
+                                             'trend_descriptions': result.get('trend_descriptions', [])}
+        self._columns.clear()
+
+    def extend(self, timeframe: str, results: Iterable[Dict]):
+        """Bir zaman diliminin tüm sonuçlarını ekle (sonuç sayısında doğrusal)"""
+        for result in results:
+            self.add(timeframe, result)
+
+    def column(self, timeframe: str, field: str) -> np.ndarray:
+        """Alanın tüm semboller için sütunu; sembolün o zaman diliminde sonucu yoksa NaN"""
+        key = (timeframe, field)
+        if key not in self._columns:
+            values = np.full(len(self.symbols), np.nan)
+            values[self._rows[timeframe]] = self._values[timeframe][field]
+            self._columns[key] = values
+        return self._columns[key]
+
+    def present(self, timeframe: str) -> np.ndarray:
+        """Zaman diliminde sonucu olan satırların maskesi"""
+        return ~np.isnan(self.column(timeframe, 'trend'))
+
+    def trend(self, timeframe: str, position: int) -> str:
+        code = self.column(timeframe, 'trend')[position]
+        return 'UNKNOWN' if np.isnan(code) else TREND_NAMES[int(code)]
+
+    def extras(self, timeframe: str, position: int) -> Dict:
+        """Satırın zaman dilimindeki göstergeleri ve trend açıklamaları (yoksa boş)"""
+        return self._extras[timeframe].get(position, {'indicators': {}, 'trend_descriptions': []})
+
+
+def combined_scores(table: TimeframeTable) -> np.ndarray:
+    """
+    Tüm semboller için çoklu zaman dilimi fırsat puanı (0-100).
+
+    Returns:
+        Satır başına puan; taban zaman diliminde sonucu olmayan satırlar NaN
+    """
+    count = len(table)
+    base = table.timeframes[0]
+    previous = table.column(base, 'trend')
+    score = np.zeros(count)
+    scored = np.zeros(count, dtype=bool)
+
+    for timeframe in table.timeframes[1:]:
+        trend = table.column(timeframe, 'trend')
+        present = ~np.isnan(trend)
+        direction = np.sign(np.nan_to_num(previous))
+
+        # Eksik zaman dilimi: puan yoksa önceki trendin gücüne göre başlangıç puanı
+        strength = np.abs(np.nan_to_num(previous))
+        fallback = np.select([strength == 2, strength == 1], [60, 40], 20)
+        first_missing = ~present & ~scored
+        score = np.where(first_missing, fallback, score)
+
+        aligned = (np.nan_to_num(trend) * direction).astype(int)
+        points = np.where(direction != 0, ALIGNMENT_POINTS[aligned + 2], 0)
+        risk_reward = np.nan_to_num(table.column(timeframe, 'risk_reward'))
+        bonus = np.select([risk_reward >= 3, risk_reward >= 2], [10, 5], 0)
+        score = np.where(present, np.clip(score + points + bonus, 0, 100), score)
+
+        scored |= present | first_missing
+        previous = trend
+
+    return np.where(table.present(base), score, np.nan)
+
+
+def rank(table: TimeframeTable, scores: Optional[np.ndarray] = None, limit: Optional[int] = None) -> np.ndarray:
+    """Puanı olan satırlar, puana göre azalan (eşitlikte ekleme sırası korunur)"""
+    scores = combined_scores(table) if scores is None else scores
+    rows = np.flatnonzero(~np.isnan(scores))
+    rows = rows[np.argsort(-scores[rows], kind='stable')]
+    return rows if limit is None else rows[:limit]
@@ -1,10 +1,13 @@
-import ccxt
 from typing import Dict, Optional
 from datetime import datetime
 import asyncio
 import numpy as np
 from dataclasses import dataclass
 import pandas as pd
+from src.exchanges.gateway import get_gateway
+from src.exchanges.price_feed import get_price_feed
+from src.data_collectors.kline_stream import get_kline_stream
+from src.analysis.streaming_indicators import IndicatorState
 
 @dataclass
 class TradePosition:
@@ -19,7 +22,7 @@ class TradePosition:
 
 class TradeMonitor:
     def __init__(self):
-        self.exchange = ccxt.binance()
+        self.exchange = get_gateway()
         self.active_positions: Dict[str, TradePosition] = {}
         self.alert_thresholds = {
             'profit_alert': 1.5,    
@@ -152,23 +155,29 @@ class TradeMonitor:
 
             await self._send_alert(chat_id, bot, start_message)
             
-            # 15 dakika boyunca takip et
+            # 15 dakika boyunca takip et - fiyatlar ortak toplu fiyat servisinden
+            subscription = get_price_feed().subscribe(symbol)
             monitoring_start = datetime.now()
-            while (datetime.now() - monitoring_start).seconds < 900 and position.monitoring:
-                try:
-                    ticker = self.exchange.fetch_ticker(symbol)
-                    current_price = ticker['last']
-                    pnl = self._calculate_pnl(position, current_price)
-                    
-                    await self._check_position_status(
-                        position, current_price, pnl, chat_id, bot
-                    )
-                    
-                    await asyncio.sleep(10)
-                    
-                except Exception as e:
-                    print(f"Monitoring hatası: {str(e)}")
-                    await asyncio.sleep(5)
+            try:
+                while (datetime.now() - monitoring_start).seconds < 900 and position.monitoring:
+                    try:
+                        ticker = await subscription.next(timeout=30)
+                        if ticker is None or subscription.price is None:
+                            continue
+                        current_price = subscription.price
+                        pnl = self._calculate_pnl(position, current_price)
+                        
+                        await self._check_position_status(
+                            position, current_price, pnl, chat_id, bot
+                        )
+                        
+                        await asyncio.sleep(10)
+                        
+                    except Exception as e:
+                        print(f"Monitoring hatası: {str(e)}")
+                        await asyncio.sleep(5)
+            finally:
+                subscription.close()
             
             # Takip süresi bitti
             if position.monitoring:
@@ -234,6 +243,7 @@ class TradeMonitor:
                                    chat_id: int,
                                    bot) -> None:
         """15 dakikalık scalping takibi başlat"""
+        stream_subscription = None
         try:
             position = TradePosition(
                 symbol=symbol,
@@ -265,14 +275,24 @@ class TradeMonitor:
             monitoring_start = datetime.now()
             last_candle_time = None
             
+            # Akış açıksa 1m mumlar WebSocket tamponundan okunur (abonelik takip bitince bırakılır)
+            stream = get_kline_stream()
+            if stream is not None:
+                stream_subscription = stream.subscribe(symbol, timeframes=(self.timeframes['scalping'],))
+            
+            # 1m göstergeler bir kez ısıtılır, sonra her yeni mumda sabit zamanda güncellenir
+            indicators = IndicatorState(symbol, self.timeframes['scalping'])
+            
             while (datetime.now() - monitoring_start).seconds < 900 and position.monitoring:
                 try:
                     # 1 dakikalık mum verilerini al
-                    candles = self.exchange.fetch_ohlcv(
-                        symbol, 
-                        timeframe=self.timeframes['scalping'],
-                        limit=3
-                    )
+                    candles = stream.get_ohlcv(symbol, self.timeframes['scalping'], limit=3) if stream else None
+                    if candles is None:
+                        candles = await self.exchange.fetch_ohlcv(
+                            symbol, 
+                            timeframe=self.timeframes['scalping'],
+                            limit=3
+                        )
                     
                     current_candle_time = candles[-1][0]
                     current_price = candles[-1][4]  # Kapanış fiyatı
@@ -281,8 +301,20 @@ class TradeMonitor:
                     if current_candle_time != last_candle_time:
                         last_candle_time = current_candle_time
                         
+                        # İlk turda veya kaçırılan mum varsa geçmişi bir kez al
+                        if indicators.needs_backfill(candles):
+                            history = await self.exchange.fetch_ohlcv(
+                                symbol,
+                                timeframe=self.timeframes['scalping'],
+                                limit=100
+                            )
+                            indicators.sync(history)
+                        indicators.sync(candles)
+                        
                         # Scalping analizi
-                        analysis = self._analyze_scalping_candles(candles, position_type)
+                        analysis = self._analyze_scalping_candles(
+                            candles, position_type, indicators.snapshot(current_price)
+                        )
                         
                         # PNL hesapla
                         pnl = self._calculate_pnl(position, current_price)
@@ -310,9 +342,12 @@ class TradeMonitor:
         except Exception as e:
             print(f"Scalping başlatma hatası: {str(e)}")
             await self._send_alert(chat_id, bot, f"❌ Scalping takibi başlatılamadı: {str(e)}", True)
+        finally:
+            if stream_subscription is not None:
+                stream_subscription.close()
 
-    def _analyze_scalping_candles(self, candles: list, position_type: str) -> Dict:
-        """Scalping mum analizi"""
+    def _analyze_scalping_candles(self, candles: list, position_type: str, indicators: Optional[Dict] = None) -> Dict:
+        """Scalping mum analizi (indicators: IndicatorState.snapshot çıktısı)"""
         try:
             df = pd.DataFrame(candles, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
             
@@ -347,9 +382,24 @@ class TradeMonitor:
                 elif volume_change < -50:
                     signals.append("⚠️ Hacim düşüşü")
             
+            rsi = (indicators or {}).get('rsi')
+            ema20 = (indicators or {}).get('ema20')
+            price = df['close'].iloc[-1]
+            if rsi is not None:
+                if position_type == 'LONG' and rsi >= 70:
+                    signals.append(f"⚠️ RSI aşırı alım bölgesinde ({rsi:.1f})")
+                elif position_type != 'LONG' and rsi <= 30:
+                    signals.append(f"⚠️ RSI aşırı satım bölgesinde ({rsi:.1f})")
+            if ema20 is not None:
+                if position_type == 'LONG' and price < ema20:
+                    signals.append("⚠️ Fiyat EMA20 altına indi")
+                elif position_type != 'LONG' and price > ema20:
+                    signals.append("⚠️ Fiyat EMA20 üstüne çıktı")
+            
             return {
                 'momentum': momentum,
                 'volume_change': volume_change,
+                'rsi': rsi,
                 'signals': signals
             }
             
@@ -0,0 +1,214 @@
+"""
+Yola bağımlı trend göstergeleri için dizi çekirdekleri.
+
+Supertrend, Parabolic SAR, ADX ve Ichimoku market_analyzer içinde her
+sembolün her mumu için Python döngüsüyle hesaplanıyordu. Buradaki
+fonksiyonlar indicator_engine gibi son eksen boyunca çalışır ve
+(sembol, N) matrislerini kabul eder. Sonuçlar eski döngülerle birebir
+aynıdır (tests/test_trend_kernels.py).
+
+- Supertrend: yön yalnızca fiyatın bantları kırdığı mumlarda değişir; bu
+  olaylar ileri doldurma (maximum.accumulate) ile yayılır, döngü gerekmez.
+- Ichimoku: kayan pencere max/min.
+- ADX: özyinelemeli yumuşatmalar lfilter üzerinden.
+- Parabolic SAR: gerçekten yola bağımlıdır. Numba kuruluysa döngü JIT ile
+  derlenir; değilse tek seri için skaler döngü, matris için semboller
+  üzerinde vektörleştirilmiş zaman döngüsü kullanılır. USE_NUMBA=0 ile JIT
+  kapatılabilir.
+"""
+import os
+import numpy as np
+from typing import Tuple
+from src.analysis import indicator_engine as ie
+
+try:
+    from numba import njit
+except ImportError:  # numba opsiyonel
+    njit = None
+
+
+def _as_2d(values) -> np.ndarray:
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    return values.reshape(-1, values.shape[-1])
+
+
+def supertrend(high, low, close, period: int = 10, multiplier: float = 3.0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Supertrend: (değer, yön). Yön 1 iken değer alt bant, -1 iken üst banttır.
+
+    Eski döngünün yön kuralı korunur: kapanış üst bandı aşarsa yön -1,
+    alt bandın altına inerse 1 olur, aksi halde önceki yön sürer. Önceki
+    bantlar tanımsızsa (ATR ısınması) yön değişmez. multiplier >= 0 varsayılır.
+    """
+    high, low, close = ie._as_float(high), ie._as_float(low), ie._as_float(close)
+    hl2 = (high + low) / 2
+    atr = ie.atr(high, low, close, period)
+    upper = hl2 + multiplier * atr
+    lower = hl2 - multiplier * atr
+
+    n = close.shape[-1]
+    direction = np.ones_like(close)
+    values = np.where(direction == 1, lower, upper)
+    if n == 0:
+        return values, direction
+    values[..., 0] = close[..., 0]
+    if n == 1:
+        return values, direction
+
+    # Önceki mumun supertrend değeri bantların arasındaysa kırılma koşulları geçerlidir;
+    # ilk mumda bu değer kapanış fiyatıdır, sonrakilerde bantlardan biridir
+    prev_upper, prev_lower = upper[..., :-1], lower[..., :-1]
+    can_turn_down = np.isfinite(prev_upper) & np.isfinite(prev_lower)
+    can_turn_up = can_turn_down.copy()
+    can_turn_down[..., 0] = close[..., 0] <= upper[..., 0]
+    can_turn_up[..., 0] = close[..., 0] >= lower[..., 0]
+
+    turn_down = can_turn_down & (close[..., 1:] > upper[..., 1:])
+    turn_up = can_turn_up & (close[..., 1:] < lower[..., 1:])
+
+    events = np.zeros_like(close)
+    events[..., 0] = 1
+    events[..., 1:] = np.where(turn_down, -1.0, np.where(turn_up, 1.0, 0.0))
+
+    # Son olayın indeksini ileri doldur
+    index = np.where(events != 0, np.arange(n), 0)
+    np.maximum.accumulate(index, axis=-1, out=index)
+    direction = np.take_along_axis(events, index, axis=-1)
+
+    values = np.where(direction == 1, lower, upper)
+    values[..., 0] = close[..., 0]
+    return values, direction
+
+
+def ichimoku(high, low) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Ichimoku: (tenkan-sen, kijun-sen, senkou span A, senkou span B), kaydırmasız"""
+    tenkan_sen = (ie.rolling_max(high, 9) + ie.rolling_min(low, 9)) / 2
+    kijun_sen = (ie.rolling_max(high, 26) + ie.rolling_min(low, 26)) / 2
+    senkou_span_a = (tenkan_sen + kijun_sen) / 2
+    senkou_span_b = (ie.rolling_max(high, 52) + ie.rolling_min(low, 52)) / 2
+    return tenkan_sen, kijun_sen, senkou_span_a, senkou_span_b
+
+
+def adx(high, low, close, period: int = 14) -> np.ndarray:
+    """
+    market_analyzer'ın ADX tanımı (ısınma değerleri 0).
+
+    indicator_engine.adx'ten farkı: +DI/-DI yumuşatılmamış DM'nin ATR'ye
+    oranıdır ve ATR ilk TR ile başlar. Bu ölçeğe göre ayarlanmış eşikler
+    değişmesin diye tanım korunur.
+    """
+    high, low, close = ie._as_float(high), ie._as_float(low), ie._as_float(close)
+    out = np.zeros_like(close)
+    if close.shape[-1] < max(2, period):
+        return out
+
+    tr = np.maximum(np.maximum(np.abs(high[..., 1:] - low[..., 1:]),
+                               np.abs(high[..., 1:] - close[..., :-1])),
+                    np.abs(low[..., 1:] - close[..., :-1]))
+    tr = np.concatenate([tr[..., :1], tr], axis=-1)
+    atr = ie._recursive_filter(tr, 1.0 / period, tr[..., 0])
+
+    up_move = np.zeros_like(high)
+    down_move = np.zeros_like(low)
+    up_move[..., 1:] = high[..., 1:] - high[..., :-1]
+    down_move[..., 1:] = low[..., :-1] - low[..., 1:]
+    plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
+    minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        plus_di = 100 * (plus_dm / atr)
+        minus_di = 100 * (minus_dm / atr)
+        dx = 100 * np.abs(plus_di - minus_di) / (plus_di + minus_di + 1e-10)
+
+    seed = dx[..., :period].mean(axis=-1)
+    out[..., period - 1] = seed
+    out[..., period:] = ie._recursive_filter(dx[..., period:], 1.0 / period, seed)
+    return out
+
+
+def _psar_loop(high, low, acceleration, maximum):
+    """Parabolic SAR tek seri döngüsü (numba varsa JIT ile derlenir)"""
+    n = high.shape[0]
+    sar = np.zeros(n)
+    if n == 0:
+        return sar
+    sar[0] = low[0]
+    trend = 1
+    ep = high[0]
+    af = acceleration
+    for i in range(1, n):
+        prev_sar = sar[i - 1]
+        if trend == 1:
+            curr_sar = prev_sar + af * (ep - prev_sar)
+            curr_sar = min(curr_sar, low[i - 1], low[i - 2] if i > 1 else low[i - 1])
+            if curr_sar > low[i]:
+                trend = -1
+                curr_sar = ep
+                ep = low[i]
+                af = acceleration
+            elif high[i] > ep:
+                ep = high[i]
+                af = min(af + acceleration, maximum)
+        else:
+            curr_sar = prev_sar - af * (prev_sar - ep)
+            curr_sar = max(curr_sar, high[i - 1], high[i - 2] if i > 1 else high[i - 1])
+            if curr_sar < high[i]:
+                trend = 1
+                curr_sar = ep
+                ep = high[i]
+                af = acceleration
+            elif low[i] < ep:
+                ep = low[i]
+                af = min(af + acceleration, maximum)
+        sar[i] = curr_sar
+    return sar
+
+
+_psar_jit = njit(cache=True)(_psar_loop) if njit is not None else None
+
+
+def jit_enabled() -> bool:
+    """Numba kurulu ve USE_NUMBA=0 ile kapatılmamışsa True"""
+    return _psar_jit is not None and os.getenv('USE_NUMBA', '1') != '0'
+
+
+def _psar_batch(high: np.ndarray, low: np.ndarray, acceleration: float, maximum: float) -> np.ndarray:
+    """(sembol, N) için zaman döngüsü; her adım tüm sembollerde vektörel çalışır"""
+    sar = np.zeros_like(high)
+    n = high.shape[-1]
+    if n == 0:
+        return sar
+    sar[:, 0] = low[:, 0]
+    up = np.ones(high.shape[0], dtype=bool)
+    ep = high[:, 0].copy()
+    af = np.full(high.shape[0], acceleration)
+    for i in range(1, n):
+        prev_sar = sar[:, i - 1]
+        j = i - 2 if i > 1 else i - 1
+        sar_up = np.minimum(np.minimum(prev_sar + af * (ep - prev_sar), low[:, i - 1]), low[:, j])
+        sar_down = np.maximum(np.maximum(prev_sar - af * (prev_sar - ep), high[:, i - 1]), high[:, j])
+
+        candidate = np.where(up, sar_up, sar_down)
+        reverse = np.where(up, candidate > low[:, i], candidate < high[:, i])
+        extend = ~reverse & np.where(up, high[:, i] > ep, low[:, i] < ep)
+
+        sar[:, i] = np.where(reverse, ep, candidate)
+        new_ep = np.where(up, np.where(reverse, low[:, i], high[:, i]), np.where(reverse, high[:, i], low[:, i]))
+        ep = np.where(reverse | extend, new_ep, ep)
+        af = np.where(reverse, acceleration, np.where(extend, np.minimum(af + acceleration, maximum), af))
+        up = up ^ reverse
+    return sar
+
+
+def parabolic_sar(high, low, acceleration: float = 0.02, maximum: float = 0.2) -> np.ndarray:
+    """Parabolic SAR (tek seri veya (sembol, N) matris)"""
+    high, low = ie._as_float(high), ie._as_float(low)
+    if jit_enabled():
+        flat_high, flat_low = _as_2d(high), _as_2d(low)
+        out = np.empty_like(flat_high)
+        for row in range(flat_high.shape[0]):
+            out[row] = _psar_jit(flat_high[row], flat_low[row], acceleration, maximum)
+        return out.reshape(high.shape)
+    if high.ndim == 1:
+        return _psar_loop(high, low, acceleration, maximum)
+    return _psar_batch(_as_2d(high), _as_2d(low), acceleration, maximum).reshape(high.shape)
@@ -1,6 +1,7 @@
 import numpy as np
 import pandas as pd
 from typing import Dict, List, Tuple, Optional
+from src.analysis import indicator_engine as ie
 
 
 class VolatilityBasedStopCalculator:
@@ -28,20 +29,8 @@ class VolatilityBasedStopCalculator:
         Returns:
             pd.Series: ATR değerleri
         """
-        high = df['high']
-        low = df['low']
-        close = df['close'].shift(1)
-        
-        # True Range hesapla
-        tr1 = high - low
-        tr2 = abs(high - close)
-        tr3 = abs(low - close)
-        
-        true_range = pd.DataFrame({'tr1': tr1, 'tr2': tr2, 'tr3': tr3}).max(axis=1)
-        
-        # ATR hesapla
-        atr = true_range.rolling(window=periods).mean()
-        return atr
+        atr = ie.atr(df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy(), periods)
+        return pd.Series(atr, index=df.index)
     
     def calculate_volatility_stops(self, df: pd.DataFrame, risk_level: str = 'medium') -> Dict:
         """
@@ -79,18 +68,11 @@ class VolatilityBasedStopCalculator:
         volatility_pct = (current_atr / current_price) * 100
         
         # RSI Hesapla (volatiliteyi ayarlamak için)
-        delta = df['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=self.rsi_periods).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=self.rsi_periods).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        current_rsi = rsi.iloc[-1]
+        close = df['close'].to_numpy()
+        current_rsi = ie.rsi(close, self.rsi_periods)[-1]
         
         # Trend yönünü belirle
-        ema9 = df['close'].ewm(span=9, adjust=False).mean()
-        ema21 = df['close'].ewm(span=21, adjust=False).mean()
-        
-        if ema9.iloc[-1] > ema21.iloc[-1]:
+        if ie.ema(close, 9)[-1] > ie.ema(close, 21)[-1]:
             trend = 'LONG'
         else:
             trend = 'SHORT'
@@ -1,8 +1,230 @@
 import numpy as np
 import pandas as pd
+from collections import deque
 from typing import Dict, List, Tuple, Optional
 import matplotlib.pyplot as plt
 from io import BytesIO
+from src.analysis import indicator_engine as ie
+
+
+def price_edges(low_min: float, high_max: float, num_bins: int) -> np.ndarray:
+    """[low_min, high_max] aralığını num_bins eşit aralığa bölen num_bins + 1 sınır"""
+    bin_size = (high_max - low_min) / num_bins
+    edges = low_min + np.arange(num_bins + 1) * bin_size
+    edges[-1] = high_max  # Son sınır yuvarlama yüzünden tepedeki mumu dışarıda bırakmasın
+    return edges
+
+
+def overlap_matrix(high, low, edges: np.ndarray) -> np.ndarray:
+    """
+    (mum, aralık) örtüşme oranları: her mumun fiyat aralığının hangi kısmı
+    hangi fiyat aralığına düşüyor. Sınırlar mumları kapsıyorsa her satırın
+    toplamı 1'dir; hacim bu oranlarla paylaştırılınca toplam hacim korunur.
+    Gövdesiz (high == low) mumun tamamı fiyatının düştüğü aralığa yazılır.
+    """
+    high, low = ie._as_float(high), ie._as_float(low)
+    lower_edges, upper_edges = edges[:-1], edges[1:]
+    overlap = np.minimum(high[:, None], upper_edges) - np.maximum(low[:, None], lower_edges)
+    np.clip(overlap, 0, None, out=overlap)
+
+    total_range = high - low
+    flat = total_range <= 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = overlap / total_range[:, None]
+    if flat.any():
+        index = np.clip(np.searchsorted(edges, high[flat], side='right') - 1, 0, len(edges) - 2)
+        ratios[flat] = 0.0
+        ratios[np.flatnonzero(flat), index] = 1.0
+    return ratios
+
+
+def volume_histogram(high, low, volume, edges: np.ndarray) -> np.ndarray:
+    """Her fiyat aralığına düşen hacim (overlap_matrix ağırlıklı toplam)"""
+    return ie._as_float(volume) @ overlap_matrix(high, low, edges)
+
+
+def summarize_profile(volumes: np.ndarray, value_area_pct: float = 0.7,
+                      liquidity_pct: float = 0.2) -> Dict[str, np.ndarray]:
+    """
+    Hacim dağılımından POC, value area ve likidite aralıklarının indeksleri.
+
+    Aralıklar hacme göre azalan (eşitlikte fiyat sırasıyla) dizilir: ilki
+    POC'tur, toplam hacmin value_area_pct'sine ulaşana kadarki aralıklar
+    value area'yı, baştaki ve sondaki liquidity_pct'lik dilimler yüksek ve
+    düşük likidite bölgelerini oluşturur.
+    """
+    order = np.argsort(-volumes, kind='stable')
+    cumulative = np.cumsum(volumes[order])
+    value_area_count = min(len(order), int(np.searchsorted(cumulative, cumulative[-1] * value_area_pct)) + 1)
+    liquidity_count = max(1, int(len(order) * liquidity_pct))
+    return {
+        'poc': order[0],
+        'value_area': order[:value_area_count],
+        'high_liquidity': order[:liquidity_count],
+        'low_liquidity': order[-liquidity_count:],
+    }
+
+
+def order_blocks(open_, high, low, close, volume, window: int = 10, top: int = 3) -> Dict[str, List[Dict]]:
+    """
+    Sipariş blokları: ortalamanın 1.2 katından büyük gövdeli mumdan 3 mum
+    sonra momentum ters yöndeyse mumun gövdesi blok olur. Güce göre en
+    güçlü `top` blok döner.
+    """
+    open_, high, low, close, volume = (ie._as_float(col) for col in (open_, high, low, close, volume))
+    n = len(close)
+    body_size = np.abs(close - open_)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        body_size_pct = body_size / ie.sma(high - low, window)
+        strength = body_size_pct * volume / ie.sma(volume, window)
+
+    # i+3'teki 3 mumluk momentum = close[i+3] - close[i]; eski döngü aralığı 3 <= i < n-3
+    momentum_ahead = np.full(n, np.nan)
+    momentum_ahead[:-3] = close[3:] - close[:-3]
+    in_range = (np.arange(n) >= 3) & (np.arange(n) < n - 3)
+    large = in_range & (body_size_pct > 1.2)
+    bullish = close > open_
+
+    block_low, block_high = np.minimum(open_, close), np.maximum(open_, close)
+
+    def collect(mask: np.ndarray) -> List[Dict]:
+        blocks = [{
+            'index': int(i),
+            'low': round(float(block_low[i]), 8),
+            'high': round(float(block_high[i]), 8),
+            'strength': round(float(strength[i]), 2)
+        } for i in np.flatnonzero(mask)]
+        blocks.sort(key=lambda x: x['strength'], reverse=True)
+        return blocks[:top]
+
+    return {
+        'bullish_blocks': collect(large & ~bullish & (momentum_ahead > 0)),
+        'bearish_blocks': collect(large & bullish & (momentum_ahead < 0)),
+    }
+
+
+class RollingVolumeProfile:
+    """
+    Son `window` mumun hacim profili; mum eklenip en eskisi çıkarılırken
+    yalnızca o mumun dokunduğu aralıklar güncellenir.
+
+    Aralıklar sabit bir ızgaradır (k * bin_size); pencere fiyatla birlikte
+    kayarken ızgara genişler, tüm profil yeniden hesaplanmaz.
+    """
+
+    def __init__(self, bin_size: float, window: int = 100):
+        if bin_size <= 0:
+            raise ValueError("bin_size pozitif olmalı")
+        self.bin_size = bin_size
+        self.window = window
+        self._origin = 0  # _volumes[0]'ın ızgara indeksi
+        self._volumes = np.zeros(0)
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._candles = deque()  # (başlangıç indeksi, hacim payları)
+
+    def __len__(self) -> int:
+        return len(self._candles)
+
+    def _ensure(self, first: int, last: int):
+        """Izgarayı [first, last] indekslerini kapsayacak şekilde genişlet"""
+        if not len(self._volumes):
+            self._origin = first
+            self._volumes = np.zeros(last - first + 1)
+            self._counts = np.zeros(last - first + 1, dtype=np.int64)
+            return
+        before = max(0, self._origin - first)
+        after = max(0, last - (self._origin + len(self._volumes) - 1))
+        if before or after:
+            self._volumes = np.pad(self._volumes, (before, after))
+            self._counts = np.pad(self._counts, (before, after))
+            self._origin -= before
+
+    def add(self, candle) -> None:
+        """ccxt formatında mum ([ts, open, high, low, close, volume]) ekle"""
+        high, low, volume = float(candle[2]), float(candle[3]), float(candle[5])
+        first = int(np.floor(low / self.bin_size))
+        last = max(first, int(np.floor(high / self.bin_size)))
+        edges = np.arange(first, last + 2) * self.bin_size
+        share = volume * overlap_matrix(np.array([high]), np.array([low]), edges)[0]
+
+        self._ensure(first, last)
+        offset = first - self._origin
+        self._volumes[offset:offset + len(share)] += share
+        self._counts[offset:offset + len(share)] += 1
+        self._candles.append((first, share))
+
+        if len(self._candles) > self.window:
+            old_first, old_share = self._candles.popleft()
+            offset = old_first - self._origin
+            self._volumes[offset:offset + len(old_share)] -= old_share
+            self._counts[offset:offset + len(old_share)] -= 1
+
+    def profile(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Penceredeki mumların dokunduğu aralıklar: (aralık alt sınırları, hacimler)"""
+        touched = np.flatnonzero(self._counts)
+        if not touched.size:
+            return np.zeros(0), np.zeros(0)
+        start, stop = touched[0], touched[-1] + 1
+        levels = (self._origin + np.arange(start, stop)) * self.bin_size
+        # Çıkarma sonrası kalan kayan nokta artıkları
+        return levels, np.clip(self._volumes[start:stop], 0, None)
+
+    def snapshot(self) -> Dict:
+        """analyze_volume_profile ile aynı biçimde POC / value area / likidite"""
+        levels, volumes = self.profile()
+        return _profile_result(levels, volumes, self.bin_size)
+
+
+def _empty_profile() -> Dict:
+    return {
+        'poc': None,
+        'value_area_high': None,
+        'value_area_low': None,
+        'volume_profile': [],
+        'high_liquidity': [],
+        'low_liquidity': []
+    }
+
+
+def _profile_result(levels: np.ndarray, volumes: np.ndarray, bin_size: float) -> Dict:
+    """Aralık seviyeleri ve hacimlerinden analyze_volume_profile sözlüğü"""
+    if not len(levels) or volumes.sum() <= 0:
+        return _empty_profile()
+
+    summary = summarize_profile(volumes)
+    value_area_levels = levels[summary['value_area']]
+
+    def entries(index) -> List[Dict]:
+        return [{'price_level': round(float(levels[i]), 8), 'volume': float(volumes[i])} for i in index]
+
+    return {
+        'poc': round(float(levels[summary['poc']]), 8),
+        'value_area_high': round(float(value_area_levels.max() + bin_size), 8),
+        'value_area_low': round(float(value_area_levels.min()), 8),
+        'volume_profile': entries(range(len(levels))),
+        'high_liquidity': entries(summary['high_liquidity']),
+        'low_liquidity': entries(summary['low_liquidity'])
+    }
+
+
+def volume_profile(high, low, volume, num_bins: int = 20) -> Dict:
+    """
+    Mumların [en düşük, en yüksek] aralığındaki hacim profili.
+
+    Her mumun hacmi, fiyat aralığının her fiyat aralığıyla örtüşme oranında
+    paylaştırılır. Sonuç POC, value area, fiyata göre sıralı profil ve
+    likidite bölgelerini içerir.
+    """
+    high, low = ie._as_float(high), ie._as_float(low)
+    if not len(high):
+        return _empty_profile()
+    low_min, high_max = float(low.min()), float(high.max())
+    if high_max - low_min <= 0:
+        return _empty_profile()
+
+    edges = price_edges(low_min, high_max, num_bins)
+    volumes = volume_histogram(high, low, volume, edges)
+    return _profile_result(edges[:-1], volumes, (high_max - low_min) / num_bins)
 
 
 class VolumeProfileAnalyzer:
@@ -12,108 +234,38 @@ class VolumeProfileAnalyzer:
         self.num_bins = 20  # Fiyat aralıkları sayısı
         self.poc_window = 5  # POC etrafındaki pencere büyüklüğü
     
-    def analyze_volume_profile(self, df: pd.DataFrame) -> Dict:
+    def analyze(self, df: pd.DataFrame) -> Dict:
         """
-        Hacim profili analizi yapar
+        Hacim profili, likidite bölgeleri ve sipariş bloklarını tek geçişte hesaplar
         
         Args:
             df: OHLCV verilerini içeren DataFrame
             
         Returns:
-            Dict: Hacim profili analiz sonuçları
+            Dict: analyze_volume_profile alanları + high/low_liquidity + bullish/bearish_blocks
         """
         if len(df) < 10:
-            return {
-                'poc': None,
-                'value_area_high': None,
-                'value_area_low': None,
-                'volume_profile': []
-            }
-            
-        # Fiyat aralığı
-        price_range = df['high'].max() - df['low'].min()
-        if price_range == 0:
-            return {
-                'poc': None,
-                'value_area_high': None,
-                'value_area_low': None,
-                'volume_profile': []
-            }
-            
-        bin_size = price_range / self.num_bins
-        
-        # Fiyat aralıkları oluştur
-        price_levels = []
-        for i in range(self.num_bins):
-            price_level = df['low'].min() + (i * bin_size)
-            price_levels.append(price_level)
-        
-        # Her fiyat aralığı için hacim topla
-        volume_profile = []
-        for i in range(self.num_bins):
-            price_level = price_levels[i]
-            next_level = price_level + bin_size
-            
-            # Bu fiyat aralığındaki mumları bul
-            mask = (df['low'] <= next_level) & (df['high'] >= price_level)
-            
-            # Bu aralıktaki toplam hacim
-            if mask.any():
-                # Her mumun bu aralıkta geçirdiği yüzdeyi hesapla (yaklaşık)
-                volume_in_range = df.loc[mask, 'volume'].sum()
-                
-                # Ağırlıklı hacim (mumun bu aralıkta geçirdiği zamana göre)
-                rows = df.loc[mask]
-                for _, row in rows.iterrows():
-                    overlap = min(row['high'], next_level) - max(row['low'], price_level)
-                    total_range = row['high'] - row['low']
-                    if total_range > 0:
-                        ratio = overlap / total_range
-                    else:
-                        ratio = 1.0
-                    
-                    volume_in_range = volume_in_range * ratio
-            else:
-                volume_in_range = 0
-            
-            volume_profile.append({
-                'price_level': round(price_level, 8),
-                'volume': float(volume_in_range)
-            })
-        
-        # Hacim profilini hacme göre sırala ve en yüksek hacimli aralığı bul (POC)
-        volume_profile.sort(key=lambda x: x['volume'], reverse=True)
-        poc = volume_profile[0]['price_level'] if volume_profile else None
+            return {**_empty_profile(), 'bullish_blocks': [], 'bearish_blocks': []}
         
-        # Value Area hesapla (toplam hacmin %70'ini içeren alan)
-        total_volume = sum(item['volume'] for item in volume_profile)
-        value_area_volume = 0
-        value_area = []
+        data = ie.to_columns(df)
+        result = volume_profile(data[2], data[3], data[5], self.num_bins)
+        result.update(order_blocks(data[1], data[2], data[3], data[4], data[5]))
+        return result
+    
+    def analyze_volume_profile(self, df: pd.DataFrame) -> Dict:
+        """
+        Hacim profili analizi yapar
         
-        for item in volume_profile:
-            value_area.append(item['price_level'])
-            value_area_volume += item['volume']
+        Args:
+            df: OHLCV verilerini içeren DataFrame
             
-            if value_area_volume >= total_volume * 0.7:
-                break
-        
-        # Value Area High ve Low
-        if value_area:
-            value_area_high = max(value_area) + bin_size
-            value_area_low = min(value_area)
-        else:
-            value_area_high = None
-            value_area_low = None
-        
-        # Sonucu hacme göre değil, fiyat seviyesine göre sırala
-        volume_profile.sort(key=lambda x: x['price_level'])
+        Returns:
+            Dict: Hacim profili analiz sonuçları
+        """
+        if len(df) < 10:
+            return _empty_profile()
         
-        return {
-            'poc': round(poc, 8) if poc is not None else None,
-            'value_area_high': round(value_area_high, 8) if value_area_high is not None else None,
-            'value_area_low': round(value_area_low, 8) if value_area_low is not None else None,
-            'volume_profile': volume_profile
-        }
+        return volume_profile(df['high'], df['low'], df['volume'], self.num_bins)
     
     def find_liquidity_zones(self, df: pd.DataFrame) -> Dict:
         """
@@ -125,34 +277,10 @@ class VolumeProfileAnalyzer:
         Returns:
             Dict: Likidite bölgeleri
         """
-        volume_profile = self.analyze_volume_profile(df)
-        
-        if not volume_profile['volume_profile']:
-            return {
-                'high_liquidity': [],
-                'low_liquidity': []
-            }
-        
-        # Hacim profilini hacme göre sırala
-        profile = sorted(volume_profile['volume_profile'], key=lambda x: x['volume'], reverse=True)
-        
-        # Yüksek likidite bölgeleri (en yüksek hacimli %20)
-        high_liquidity_count = max(1, int(len(profile) * 0.2))
-        high_liquidity = profile[:high_liquidity_count]
-        
-        # Düşük likidite bölgeleri (en düşük hacimli %20)
-        low_liquidity_count = max(1, int(len(profile) * 0.2))
-        low_liquidity = profile[-low_liquidity_count:]
-        
+        profile = self.analyze_volume_profile(df)
         return {
-            'high_liquidity': [{
-                'price_level': item['price_level'],
-                'volume': item['volume']
-            } for item in high_liquidity],
-            'low_liquidity': [{
-                'price_level': item['price_level'],
-                'volume': item['volume']
-            } for item in low_liquidity]
+            'high_liquidity': profile['high_liquidity'],
+            'low_liquidity': profile['low_liquidity']
         }
     
     def identify_order_blocks(self, df: pd.DataFrame) -> Dict:
@@ -168,65 +296,7 @@ class VolumeProfileAnalyzer:
         if len(df) < 10:
             return {'bullish_blocks': [], 'bearish_blocks': []}
         
-        # Copy dataframe to avoid modifying original
-        df = df.copy()
-        
-        # Calculate candle body size and direction
-        df['body_size'] = abs(df['close'] - df['open'])
-        df['body_size_pct'] = df['body_size'] / ((df['high'] - df['low']).rolling(window=10).mean())
-        df['is_bullish'] = df['close'] > df['open']
-        
-        # Calculate momentum
-        df['momentum'] = df['close'].diff(3)
-        
-        bullish_blocks = []
-        bearish_blocks = []
-        
-        # Look for bullish order blocks (support)
-        for i in range(3, len(df)-3):
-            # Look for strong bearish candle followed by momentum shift upward
-            if (not df['is_bullish'].iloc[i] and 
-                df['body_size_pct'].iloc[i] > 1.2 and  # Large bearish candle
-                df['momentum'].iloc[i+3] > 0):  # Upward momentum after
-                
-                # Price area of interest is the bearish candle body
-                block_low = min(df['open'].iloc[i], df['close'].iloc[i])
-                block_high = max(df['open'].iloc[i], df['close'].iloc[i])
-                
-                bullish_blocks.append({
-                    'index': i,
-                    'low': round(block_low, 8),
-                    'high': round(block_high, 8),
-                    'strength': round(df['body_size_pct'].iloc[i] * df['volume'].iloc[i] / df['volume'].rolling(window=10).mean().iloc[i], 2)
-                })
-        
-        # Look for bearish order blocks (resistance)
-        for i in range(3, len(df)-3):
-            # Look for strong bullish candle followed by momentum shift downward
-            if (df['is_bullish'].iloc[i] and 
-                df['body_size_pct'].iloc[i] > 1.2 and  # Large bullish candle
-                df['momentum'].iloc[i+3] < 0):  # Downward momentum after
-                
-                # Price area of interest is the bullish candle body
-                block_low = min(df['open'].iloc[i], df['close'].iloc[i])
-                block_high = max(df['open'].iloc[i], df['close'].iloc[i])
-                
-                bearish_blocks.append({
-                    'index': i,
-                    'low': round(block_low, 8),
-                    'high': round(block_high, 8),
-                    'strength': round(df['body_size_pct'].iloc[i] * df['volume'].iloc[i] / df['volume'].rolling(window=10).mean().iloc[i], 2)
-                })
-        
-        # Sort blocks by strength
-        bullish_blocks.sort(key=lambda x: x['strength'], reverse=True)
-        bearish_blocks.sort(key=lambda x: x['strength'], reverse=True)
-        
-        # Take top 3 strongest blocks
-        return {
-            'bullish_blocks': bullish_blocks[:3],
-            'bearish_blocks': bearish_blocks[:3]
-        }
+        return order_blocks(df['open'], df['high'], df['low'], df['close'], df['volume'])
     
     def generate_volume_profile_image(self, df: pd.DataFrame) -> Optional[BytesIO]:
         """
@@ -312,19 +382,16 @@ class VolumeProfileAnalyzer:
 
 # Kullanım örneği
 def analyze_volume_distribution(df):
-    analyzer = VolumeProfileAnalyzer()
-    volume_profile = analyzer.analyze_volume_profile(df)
-    liquidity_zones = analyzer.find_liquidity_zones(df)
-    order_blocks = analyzer.identify_order_blocks(df)
+    analysis = VolumeProfileAnalyzer().analyze(df)
     
     result = {
-        'poc': volume_profile['poc'],  # Point of Control
-        'value_area_high': volume_profile['value_area_high'],
-        'value_area_low': volume_profile['value_area_low'],
-        'high_liquidity': liquidity_zones['high_liquidity'],
-        'low_liquidity': liquidity_zones['low_liquidity'],
-        'bullish_blocks': order_blocks['bullish_blocks'],
-        'bearish_blocks': order_blocks['bearish_blocks']
+        'poc': analysis['poc'],  # Point of Control
+        'value_area_high': analysis['value_area_high'],
+        'value_area_low': analysis['value_area_low'],
+        'high_liquidity': analysis['high_liquidity'],
+        'low_liquidity': analysis['low_liquidity'],
+        'bullish_blocks': analysis['bullish_blocks'],
+        'bearish_blocks': analysis['bearish_blocks']
     }
     
-    return result 
\ No newline at end of file
+    return result
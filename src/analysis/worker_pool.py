@@ -0,0 +1,240 @@
+"""
+Uzun ömürlü, önceden ısıtılmış işçi süreç havuzu.
+
+Tarama her çağrıda yeni bir ProcessPoolExecutor açıyordu: her işçi süreci
+ccxt/pandas/numpy'yi yeniden import ediyor, bağlı `self._analyze_batch`
+metodu (tüm MarketAnalyzer) her görevde pickle ediliyordu. Süreç başlatma
+ve import süresi her taramanın gecikmesine ekleniyordu.
+
+Bu havuz bot ile birlikte bir kez başlar. Her işçi başlarken `preload`
+modüllerini import eder, modül bir `warm_up()` fonksiyonu tanımlıyorsa onu
+çağırır ve gösterge çekirdeklerini küçük bir dizi üzerinde bir kez çalıştırır
+(numba kuruluysa JIT derlemesi de bu sırada yapılır).
+
+Görevler saf veridir: modül düzeyinde bir fonksiyon ve argümanları (ör.
+OHLCVArray sözlüğü veya paylaşımlı bellekteki bloğun konumu) gönderilir,
+düz kayıtlar döner (pack_records ile kompakt biçimde). Her görevin
+işçide geçirdiği süre işçi pid'i ile birlikte döner; `utilization()` işçi
+başına görev sayısını, meşgul süreyi ve kullanım oranını verir.
+"""
+import os
+import time
+import asyncio
+import logging
+import importlib
+import threading
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# İşçiler başlarken import edilen modüller (tarama görevleri bu modüllerde tanımlı)
+DEFAULT_PRELOAD = (
+    'src.analysis.indicator_engine',
+    'src.analysis.trend_kernels',
+    'src.bot.modules.analysis.market',
+    'src.bot.modules.analysis.dual_timeframe_analyzer',
+    'src.analysis.multi_timeframe_analyzer',
+)
+
+
+def _warm_worker(preload: Sequence[str]):
+    """İşçi süreç başlatıcısı: modülleri yükle ve gösterge kodunu ısıt"""
+    from src.analysis import indicator_engine as ie
+    from src.analysis import trend_kernels
+
+    for name in preload:
+        try:
+            module = importlib.import_module(name)
+            warm_up = getattr(module, 'warm_up', None)
+            if callable(warm_up):
+                warm_up()
+        except Exception as e:
+            logger.warning(f"İşçi ön yükleme hatası ({name}): {str(e)}")
+
+    # İlk çağrıdaki tembel kurulumları (lfilter, numba JIT) görev dışına al
+    close = 100 + np.cumsum(np.random.default_rng(0).normal(0, 1, (2, 64)), axis=-1)
+    block = np.stack([np.zeros_like(close), close, close + 1, close - 1, close, np.ones_like(close)])
+    ie._features_from_columns(block)
+    trend_kernels.parabolic_sar(block[2], block[3])
+
+
+def _execute(fn: Callable, args: Tuple, kwargs: Dict):
+    """Görevi işçide çalıştır; (pid, meşgul süre, sonuç) döndür"""
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return os.getpid(), time.perf_counter() - started, result
+
+
+def pack_records(records: List[Dict]) -> Dict:
+    """
+    Sözlük listesini kompakt biçime çevir: her alan dizilimi bir kez, her kayıt
+    için yalnızca (dizilim no, değerler). numpy skalerleri Python sayısına çevrilir.
+    """
+    layouts: List[Tuple[str, ...]] = []
+    index: Dict[Tuple[str, ...], int] = {}
+    rows = []
+    for record in records:
+        keys = tuple(record)
+        if keys not in index:
+            index[keys] = len(layouts)
+            layouts.append(keys)
+        rows.append((index[keys], tuple(value.item() if isinstance(value, np.generic) else value
+                                        for value in record.values())))
+    return {'layouts': layouts, 'rows': rows}
+
+
+def unpack_records(packed: Dict) -> List[Dict]:
+    """pack_records çıktısını sözlük listesine geri çevir"""
+    layouts = packed['layouts']
+    return [dict(zip(layouts[layout], values)) for layout, values in packed['rows']]
+
+
+def default_worker_count() -> int:
+    """CPU sayısı - 1, en fazla 6 (taramanın önceki varsayılanı)"""
+    return min(6, max(1, multiprocessing.cpu_count() - 1))
+
+
+class WorkerPool:
+    """Bot ömrü boyunca açık kalan işçi süreç havuzu"""
+
+    def __init__(self, max_workers: Optional[int] = None, preload: Sequence[str] = DEFAULT_PRELOAD):
+        """
+        Args:
+            max_workers: İşçi süreç sayısı (varsayılan: default_worker_count())
+            preload: İşçiler başlarken import edilecek modüller
+        """
+        self.max_workers = max_workers or default_worker_count()
+        self.preload = tuple(preload)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._started_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._workers: Dict[int, Dict[str, float]] = {}
+        self.stats = {'tasks': 0, 'failed': 0, 'restarts': 0}
+
+    @property
+    def running(self) -> bool:
+        return self._executor is not None
+
+    def start(self) -> 'WorkerPool':
+        """
+        Havuzu başlat (zaten açıksa bir şey yapmaz).
+
+        Her işçiye bir boş görev gönderilerek tüm süreçler hemen oluşturulur;
+        ısınma arka planda sürer, çağıran beklemez.
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                     initializer=_warm_worker, initargs=(self.preload,))
+                self._started_at = time.monotonic()
+                for _ in range(self.max_workers):
+                    self._executor.submit(os.getpid)
+                logger.info(f"İşçi havuzu başlatıldı ({self.max_workers} süreç)")
+            return self
+
+    def _restart(self, executor: ProcessPoolExecutor):
+        """Çöken havuzu kapat; sonraki görev yeni havuzu başlatır"""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+            self.stats['restarts'] += 1
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _record(self, pid: int, busy: float):
+        with self._lock:
+            worker = self._workers.setdefault(pid, {'tasks': 0, 'busy': 0.0})
+            worker['tasks'] += 1
+            worker['busy'] += busy
+            self.stats['tasks'] += 1
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """
+        Modül düzeyindeki `fn(*args, **kwargs)`'u bir işçide çalıştır ve sonucunu döndür.
+
+        fn ve argümanlar pickle edilebilir olmalıdır; bağlı metotlar yerine
+        saf veri alan fonksiyonlar kullanılmalıdır.
+        """
+        executor = self.start()._executor
+        loop = asyncio.get_running_loop()
+        try:
+            pid, busy, result = await loop.run_in_executor(executor, partial(_execute, fn, args, kwargs))
+        except BrokenProcessPool:
+            self.stats['failed'] += 1
+            logger.error("İşçi havuzu çöktü, yeniden başlatılacak")
+            self._restart(executor)
+            raise
+        except Exception:
+            self.stats['failed'] += 1
+            raise
+        self._record(pid, busy)
+        return result
+
+    def snapshot(self) -> Dict:
+        """utilization(since=...) için anlık sayaç kopyası"""
+        with self._lock:
+            return {'at': time.monotonic(),
+                    'workers': {pid: dict(worker) for pid, worker in self._workers.items()}}
+
+    def utilization(self, since: Optional[Dict] = None) -> Dict[int, Dict]:
+        """
+        İşçi başına kullanım.
+
+        Args:
+            since: snapshot() çıktısı; verilirse yalnızca o andan bu yana
+                geçen aralık hesaplanır, verilmezse havuzun başlangıcından beri
+
+        Returns:
+            pid -> {'tasks', 'busy_seconds', 'utilization'} (utilization: meşgul süre / aralık);
+            hiç görev almamış işçiler listede yer almaz
+        """
+        current = self.snapshot()
+        if since is None:
+            started_at = self._started_at if self._started_at is not None else current['at']
+            since = {'at': started_at, 'workers': {}}
+        window = max(current['at'] - since['at'], 1e-9)
+
+        usage = {}
+        for pid, worker in current['workers'].items():
+            previous = since['workers'].get(pid, {'tasks': 0, 'busy': 0.0})
+            tasks = worker['tasks'] - previous['tasks']
+            busy = worker['busy'] - previous['busy']
+            usage[pid] = {
+                'tasks': tasks,
+                'busy_seconds': round(busy, 3),
+                'utilization': round(min(1.0, busy / window), 3),
+            }
+        return usage
+
+    def shutdown(self, wait: bool = True):
+        """Havuzu kapat; bekleyen görevler iptal edilir"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+            logger.info("İşçi havuzu kapatıldı")
+
+
+_pool: Optional[WorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_worker_pool() -> WorkerPool:
+    """Süreç genelinde paylaşılan WorkerPool örneğini döndür (SCAN_WORKERS ile boyutlanır)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = WorkerPool(max_workers=int(os.getenv('SCAN_WORKERS', '0')) or None)
+    return _pool
+
+
+async def stop_worker_pool():
+    """Paylaşılan işçi havuzunu kapat"""
+    if _pool is not None:
+        await asyncio.get_running_loop().run_in_executor(None, _pool.shutdown)
@@ -1,8 +1,6 @@
 import numpy as np
 import pandas as pd
 from typing import Dict, List, Optional, Tuple
-import asyncio
-import ccxt.async_support as ccxt
 import logging
 from datetime import datetime
 from functools import partial
@@ -18,9 +16,16 @@ src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../'))
 if src_path not in sys.path:
     sys.path.append(src_path)
 
+from src.analysis import indicator_engine as ie
 from src.analysis.candlestick_patterns import CandlestickPatternRecognizer, analyze_chart
 from src.analysis.volatility_stops import VolatilityBasedStopCalculator, calculate_volatility_based_stops
 from src.analysis.volume_profile import VolumeProfileAnalyzer, analyze_volume_distribution
+from src.data_collectors.ohlcv_array import OHLCVArray
+from src.data_collectors.ohlcv_arena import OHLCVArena, read_block
+from src.data_collectors.resampler import get_timeframes_async
+from src.exchanges.gateway import get_gateway
+from src.analysis.worker_pool import get_worker_pool
+from src.analysis.scan_pipeline import ScanPipeline
 
 class DualTimeframeAnalyzer:
     """
@@ -115,12 +120,11 @@ class DualTimeframeAnalyzer:
     
     def _calculate_risk_management_for_worker(self, df: pd.DataFrame, position: str, current_price: float) -> Dict:
         """Pozisyona uygun stop-loss ve take-profit seviyelerini hesapla (worker için)"""
-        # ATR hesapla (volatiliteye göre stop-loss belirlemek için)
-        tr1 = df['high'] - df['low']
-        tr2 = abs(df['high'] - df['close'].shift())
-        tr3 = abs(df['low'] - df['close'].shift())
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        atr = tr.rolling(window=14).mean().iloc[-1]
+        # ATR (volatiliteye göre stop-loss belirlemek için); hazırlanmış DataFrame'de sütun olarak gelir
+        if 'atr' in df.columns:
+            atr = df['atr'].iloc[-1]
+        else:
+            atr = ie.last(ie.atr(df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy()))
         
         # Scalping için daha sıkı stop-loss ve take-profit
         if "LONG" in position:
@@ -155,154 +159,59 @@ class DualTimeframeAnalyzer:
         }
 
     # scan_market fonksiyonunu analyze_market_parallel yöntemine yönlendiren uyumluluk fonksiyonu
-    async def scan_market(self, symbols: List[str]) -> List[Dict]:
-        """Belirtilen sembolleri tarayarak kısa vadeli fırsatları bul"""
+    async def scan_market(self, symbols: Optional[List[str]] = None) -> List[Dict]:
+        """Belirtilen sembolleri (verilmezse filtrelenmiş tüm USDT evrenini) tarayarak kısa vadeli fırsatları bul"""
         self.logger.info("scan_market çağrıldı, analyze_market_parallel'e yönlendiriliyor")
         return await self.analyze_market_parallel(symbols)
 
-    async def analyze_market_parallel(self, symbols: List[str], worker_count=None) -> List[Dict]:
-        """Multi-işlemci ile sembolleri paralel olarak analiz eder"""
+    async def get_scan_universe(self) -> List[str]:
+        """Tek toplu ticker isteğinden hacim ve fiyat filtresini geçen USDT çiftleri (hacme göre azalan)"""
+        tickers = await get_gateway().fetch_tickers()
+        universe = []
+        for symbol, ticker in tickers.items():
+            if not symbol.endswith('/USDT'):
+                continue
+            base = symbol.split('/')[0]
+            if any(base.endswith(suffix) for suffix in ('UP', 'DOWN', 'BULL', 'BEAR')):
+                continue
+            volume = float(ticker.get('quoteVolume') or 0)
+            if volume >= self.min_volume and float(ticker.get('last') or 0) >= self.min_price:
+                universe.append((volume, symbol))
+        universe.sort(reverse=True)
+        return [symbol for _, symbol in universe]
+
+    async def analyze_market_parallel(self, symbols: Optional[List[str]] = None, worker_count=None) -> List[Dict]:
+        """
+        Sembolleri sınırlı eşzamanlılıkla getirip işçi havuzunda analiz eder.
+        
+        Her sembolün 1h ve 15m mumları aynı anda çekilir (gateway'in ortak rate
+        limiter'ı üzerinden), analiz kalıcı işçi havuzunda parçalar halinde yapılır.
+        symbols verilmezse filtrelenmiş tüm evren taranır.
+        """
         try:
             import time
             start_time = time.time()
             
-            # Daha az sembol üzerinde çalış
-            if len(symbols) > 20:
-                self.logger.info(f"Sembol sayısı çok fazla, ilk 20 sembol ile çalışılacak (toplam: {len(symbols)})")
-                symbols = symbols[:20]
+            if symbols is None:
+                symbols = await self.get_scan_universe()
+            single = len(symbols) == 1
             
             self.logger.info(f"==== 📊 TARAMA BAŞLATILIYOR ({len(symbols)} coin) ====")
             
-            # Seri işleme (paralelleştirme yapmadan)
-            opportunities = []
-            
-            # Exchange örneğini yalnızca bir kez oluştur
-            exchange = ccxt.binance({
-                'enableRateLimit': True,
-                'options': {'defaultType': 'spot'}
-            })
+            # Paylaşılan gateway - bağlantılar ve marketler tekrar kullanılır
+            await get_gateway().load_markets()
             
+            pool = get_worker_pool()
+            if worker_count is None:
+                worker_count = pool.max_workers
+            arena = self._open_scan_arena()
+            pipeline = self._build_scan_pipeline(pool, worker_count, single, arena)
             try:
-                await exchange.load_markets()
-                
-                for symbol in symbols:
-                    try:
-                        # 1h verilerini al
-                        ohlcv_1h = await exchange.fetch_ohlcv(symbol, '1h', limit=100)
-                        await asyncio.sleep(0.3)  # Rate limit için bekle
-                        
-                        # 15m verilerini al
-                        ohlcv_15m = await exchange.fetch_ohlcv(symbol, '15m', limit=100)
-                        await asyncio.sleep(0.3)  # Rate limit için bekle
-                        
-                        if not ohlcv_1h or not ohlcv_15m or len(ohlcv_1h) < 50 or len(ohlcv_15m) < 50:
-                            continue
-                            
-                        # Analiz işlemleri...
-                        df_1h = self._prepare_dataframe_for_worker(ohlcv_1h)
-                        df_15m = self._prepare_dataframe_for_worker(ohlcv_15m)
-                        
-                        trend_analysis = self._analyze_trend_for_worker(df_1h)
-                        signal_analysis = self._analyze_signal_for_worker(df_15m)
-                        combined_analysis = self._combine_analysis_for_worker(trend_analysis, signal_analysis)
-                        
-                        # Hacim kontrolü - Hacim kontrolünü devre dışı bırakıyoruz veya düşürüyoruz
-                        # (belirli bir coin aranırken hacim filtresini atlayabiliriz)
-                        current_volume = float(df_15m['volume'].iloc[-1])
-                        avg_volume = float(df_15m['volume'].rolling(20).mean().iloc[-1])
-                        
-                        # Eğer özel olarak aranıyorsa hacim kontrolünü atla
-                        if len(symbols) == 1:
-                            # Belirli bir coin aranıyor, hacim kontrolünü atla
-                            pass
-                        elif current_volume < self.min_volume:
-                            continue
-                        
-                        # Mum formasyonu analizi ekle
-                        candlestick_1h = analyze_chart(df_1h, '1h')
-                        candlestick_15m = analyze_chart(df_15m, '15m')
-                        
-                        # Risk yönetimi hesaplamaları
-                        risk_management = self._calculate_risk_management_for_worker(
-                            df_15m, 
-                            combined_analysis['position'], 
-                            float(df_15m['close'].iloc[-1])
-                        )
-                        self.logger.debug(f"Risk yönetimi sonuçları: {risk_management}")
-                        
-                        # Volatilite ve hacim analizlerini ekle
-                        volatility_stops = calculate_volatility_based_stops(df_15m, 'medium')
-                        volume_analysis = analyze_volume_distribution(df_15m)
-                        
-                        # Sonuç oluştur...
-                        result = {
-                            'symbol': symbol,
-                            'current_price': float(df_15m['close'].iloc[-1]),
-                            'position': combined_analysis['position'],
-                            'confidence': combined_analysis['confidence'],
-                            'opportunity_score': combined_analysis['score'],
-                            '1h_trend': trend_analysis['trend'],
-                            '15m_signal': signal_analysis['signal'],
-                            'stop_loss': risk_management['stop_loss'],
-                            'take_profit': risk_management['take_profit'],
-                            'risk_reward': risk_management.get('risk_reward', risk_management.get('risk_reward_ratio', 0)),
-                            'risk_reward_ratio': risk_management.get('risk_reward_ratio', risk_management.get('risk_reward', 0)),
-                            'volume': current_volume,
-                            'volume_ratio': current_volume / avg_volume if avg_volume > 0 else 0,
-                            'reasons': combined_analysis['reasons'],
-                            'timestamp': datetime.now().isoformat(),
-                            'timeframe': 'dual_15m_1h',
-                            # Yeni mum formasyonu analiz sonuçlarını ekle
-                            'candlestick_1h': candlestick_1h,
-                            'candlestick_15m': candlestick_15m,
-                            # Yeni volatilite analizi sonuçlarını ekle
-                            'v_stop_loss': volatility_stops['stop_loss'],
-                            'v_take_profit1': volatility_stops['take_profit1'],
-                            'v_take_profit2': volatility_stops['take_profit2'],
-                            'v_trailing_stop': volatility_stops['trailing_stop'],
-                            'v_risk_reward': volatility_stops.get('risk_reward', volatility_stops.get('risk_reward_ratio', 0)),
-                            'v_risk_reward_ratio': volatility_stops.get('risk_reward_ratio', volatility_stops.get('risk_reward', 0)),
-                            'volatility_pct': volatility_stops['volatility_pct'],
-                            # Hacim profili analizini ekle
-                            'poc': volume_analysis['poc'],
-                            'value_area_high': volume_analysis['value_area_high'],
-                            'value_area_low': volume_analysis['value_area_low'],
-                            'high_liquidity': volume_analysis['high_liquidity'],
-                            'low_liquidity': volume_analysis['low_liquidity'],
-                            'bullish_blocks': volume_analysis['bullish_blocks'],
-                            'bearish_blocks': volume_analysis['bearish_blocks']
-                        }
-                        
-                        # Eğer mum formasyonu güçlü bir sinyal veriyorsa puana ek yap
-                        if candlestick_15m['pattern_confidence'] > 50:
-                            if candlestick_15m['pattern_signal'] == 'BULLISH' and 'LONG' in result['position']:
-                                result['opportunity_score'] += 10
-                                result['reasons'].append(f"✅ 15m: Güçlü alım mum formasyonu tespit edildi")
-                            elif candlestick_15m['pattern_signal'] == 'BEARISH' and 'SHORT' in result['position']:
-                                result['opportunity_score'] += 10
-                                result['reasons'].append(f"✅ 15m: Güçlü satım mum formasyonu tespit edildi")
-                        
-                        # Belirli bir coin aranıyorsa veya minimum puan eşiğini geçiyorsa ekle
-                        min_score_threshold = 50 if len(symbols) > 1 else 0  # Tek coin aranıyorsa puanı dikkate alma
-                        
-                        if len(symbols) == 1 or result['opportunity_score'] > min_score_threshold:
-                            opportunities.append(result)
-                            self.logger.info(f"{symbol} için fırsat bulundu! Puan: {result['opportunity_score']:.1f}/100")
-                        
-                    except Exception as e:
-                        self.logger.error(f"{symbol} analiz hatası: {str(e)}")
-                        self.logger.error(f"Hata detayları: {repr(e)}")  # Hatanın daha detaylı temsilini ekle
-                        import traceback
-                        self.logger.error(f"Hata stack trace: {traceback.format_exc()}")  # Stack trace ekle
-                        continue
-            
+                batches = await pipeline.run(symbols)
             finally:
-                # ÖNEMLİ: Exchange'i her durumda kapat
-                try:
-                    await exchange.close()
-                    self.logger.debug("Exchange düzgün şekilde kapatıldı")
-                except Exception as e:
-                    self.logger.error(f"Exchange kapatma hatası: {str(e)}")
+                if arena is not None:
+                    arena.close()
+            opportunities = [opportunity for batch in batches for opportunity in batch]
             
             # Sonuçları sırala
             opportunities.sort(key=lambda x: x.get('opportunity_score', 0), reverse=True)
@@ -311,7 +220,9 @@ class DualTimeframeAnalyzer:
             elapsed_time = end_time - start_time
             
             self.logger.info(f"🎯 Bulunan Fırsat Sayısı: {len(opportunities)}/{len(symbols)}")
-            self.logger.info(f"⏱️ Toplam Süre: {elapsed_time:.2f} saniye")
+            self.logger.info(f"⏱️ Toplam Süre: {elapsed_time:.2f} saniye "
+                             f"({pipeline.stats['fetched']} sembol getirildi, {pipeline.stats['fetch_errors']} getirme "
+                             f"hatası, {pipeline.stats['process_errors']} analiz hatası, {worker_count} işçi)")
             
             return opportunities
             
@@ -319,66 +230,194 @@ class DualTimeframeAnalyzer:
             self.logger.error(f"Piyasa analiz hatası: {str(e)}")
             return []
 
-    def _prepare_dataframe_for_worker(self, ohlcv: List) -> pd.DataFrame:
-        """OHLCV verilerini DataFrame'e dönüştür (worker için)"""
-        df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        
-        # RSI hesapla
-        close_diff = df['close'].diff()
-        gain = close_diff.where(close_diff > 0, 0).rolling(window=9).mean()
-        loss = -close_diff.where(close_diff < 0, 0).rolling(window=9).mean()
-        rs = gain / loss.replace(0, 1e-9)  # Sıfıra bölme hatasını önle
-        df['rsi'] = 100 - (100 / (1 + rs))
-        
-        # EMA hesapla - daha fazla EMA periyodu eklendi
-        df['ema9'] = df['close'].ewm(span=9, adjust=False).mean()  # Eklendi: EMA 9
-        df['ema20'] = df['close'].ewm(span=20, adjust=False).mean()
-        df['ema21'] = df['close'].ewm(span=21, adjust=False).mean()  # Eklendi: EMA 21
-        df['ema50'] = df['close'].ewm(span=50, adjust=False).mean()
-        df['ema200'] = df['close'].ewm(span=200, adjust=False).mean()  # Eklendi: EMA 200
-        
-        # SMA hesapla
-        df['sma9'] = df['close'].rolling(window=9).mean()  # Eklendi: SMA 9
-        df['sma20'] = df['close'].rolling(window=20).mean()
-        df['sma50'] = df['close'].rolling(window=50).mean()  # Eklendi: SMA 50
-        
-        # MACD hesapla
-        df['ema12'] = df['close'].ewm(span=12, adjust=False).mean()
-        df['ema26'] = df['close'].ewm(span=26, adjust=False).mean()
-        df['macd'] = df['ema12'] - df['ema26']
-        df['signal'] = df['macd'].ewm(span=9, adjust=False).mean()
-        df['macd_hist'] = df['macd'] - df['signal']
-        
-        # Bollinger Bands hesapla
-        df['bb_middle'] = df['close'].rolling(window=20).mean()
-        df['bb_std'] = df['close'].rolling(window=20).std()
-        df['bb_upper'] = df['bb_middle'] + (df['bb_std'] * 2)
-        df['bb_lower'] = df['bb_middle'] - (df['bb_std'] * 2)
-        
-        # BB Pozisyonu (0-100%)
-        df['bb_width'] = df['bb_upper'] - df['bb_lower']
-        df['bb_position'] = (df['close'] - df['bb_lower']) / df['bb_width'] * 100
-        df['bb_position'] = df['bb_position'].clip(0, 100)  # 0-100 arası sınırla
-        
-        # Bollinger Band Squeeze ölçümü (eklendi)
-        df['bb_squeeze'] = df['bb_width'] / df['bb_middle'] * 100
-        
-        # Hacim analizleri (eklendi)
-        df['volume_ma'] = df['volume'].rolling(window=20).mean()
-        df['volume_ratio'] = df['volume'] / df['volume_ma']
-        
-        # Stochastic RSI (eklendi)
-        period = 14
-        df['rsi_min'] = df['rsi'].rolling(window=period).min()
-        df['rsi_max'] = df['rsi'].rolling(window=period).max()
-        df['stoch_rsi'] = 100 * (df['rsi'] - df['rsi_min']) / ((df['rsi_max'] - df['rsi_min']) + 1e-9)
-        df['stoch_rsi_k'] = df['stoch_rsi'].rolling(window=3).mean()
-        df['stoch_rsi_d'] = df['stoch_rsi_k'].rolling(window=3).mean()
-        
-        # Fiyat kanallarını belirle (eklendi)
-        df['high_20'] = df['high'].rolling(window=20).max()
-        df['low_20'] = df['low'].rolling(window=20).min()
+    async def _fetch_dual_ohlcv(self, symbol: str):
+        """Sembolün 15m mumlarını al, 1h mumlarını onlardan türet; biri yetersizse None"""
+        candles = await get_timeframes_async(get_gateway(), symbol, {'15m': 100, '1h': 100})
+        ohlcv_1h, ohlcv_15m = candles['1h'], candles['15m']
+        if not ohlcv_1h or not ohlcv_15m or len(ohlcv_1h) < 50 or len(ohlcv_15m) < 50:
+            return None
+        return symbol, ohlcv_1h, ohlcv_15m
+
+    def _build_scan_pipeline(self, pool, worker_count: int, single: bool,
+                             arena: Optional[OHLCVArena] = None) -> ScanPipeline:
+        """
+        Tarama boru hattı: sembol -> (sembol, 1h mumlar, 15m mumlar) -> işçide analiz
+        
+        Args:
+            arena: Verilirse mumlar işçilere pickle yerine paylaşımlı bellek üzerinden aktarılır
+        """
+        async def process(chunk):
+            ohlcv_1h = {symbol: candles for symbol, candles, _ in chunk}
+            ohlcv_15m = {symbol: candles for symbol, _, candles in chunk}
+            if arena is None:
+                return await pool.run(analyze_dual_batch, ohlcv_1h, ohlcv_15m, single)
+            return await pool.run(analyze_dual_block, arena.write(ohlcv_1h), arena.write(ohlcv_15m), single)
+
+        return ScanPipeline(self._fetch_dual_ohlcv, process,
+                            fetch_concurrency=int(os.getenv('SCAN_FETCH_CONCURRENCY', '8')),
+                            chunk_size=10, consumers=worker_count)
+
+    def _open_scan_arena(self) -> Optional[OHLCVArena]:
+        """Tarama için paylaşımlı bellek arenası (SCAN_SHARED_MEMORY=0 ise veya açılamazsa None)"""
+        if os.getenv('SCAN_SHARED_MEMORY', '1') == '0':
+            return None
+        try:
+            return OHLCVArena()
+        except OSError as e:
+            self.logger.warning(f"Paylaşımlı bellek arenası açılamadı, pickle kullanılacak: {str(e)}")
+            return None
+
+    def _analyze_symbol(self, symbol: str, ohlcv_1h, ohlcv_15m, single: bool = False) -> Optional[Dict]:
+        """
+        Tek sembolün 1h trend + 15m sinyal analizi (saf hesaplama, işçi süreçte çalışır).
+        
+        Args:
+            single: Belirli bir coin aranıyorsa True (hacim ve puan eşikleri atlanır)
+            
+        Returns:
+            Fırsat sözlüğü; veri yetersizse veya eşikleri geçemezse None
+        """
+        if not ohlcv_1h or not ohlcv_15m or len(ohlcv_1h) < 50 or len(ohlcv_15m) < 50:
+            return None
+            
+        # Analiz işlemleri...
+        df_1h = self._prepare_dataframe_for_worker(ohlcv_1h)
+        df_15m = self._prepare_dataframe_for_worker(ohlcv_15m)
+        
+        trend_analysis = self._analyze_trend_for_worker(df_1h)
+        signal_analysis = self._analyze_signal_for_worker(df_15m)
+        combined_analysis = self._combine_analysis_for_worker(trend_analysis, signal_analysis)
+        
+        # Hacim kontrolü - Hacim kontrolünü devre dışı bırakıyoruz veya düşürüyoruz
+        # (belirli bir coin aranırken hacim filtresini atlayabiliriz)
+        current_volume = float(df_15m['volume'].iloc[-1])
+        avg_volume = float(df_15m['volume_ma'].iloc[-1])
+        
+        # Eğer özel olarak aranıyorsa hacim kontrolünü atla
+        if single:
+            # Belirli bir coin aranıyor, hacim kontrolünü atla
+            pass
+        elif current_volume < self.min_volume:
+            return None
+        
+        # Mum formasyonu analizi ekle
+        candlestick_1h = analyze_chart(df_1h, '1h')
+        candlestick_15m = analyze_chart(df_15m, '15m')
+        
+        # Risk yönetimi hesaplamaları
+        risk_management = self._calculate_risk_management_for_worker(
+            df_15m, 
+            combined_analysis['position'], 
+            float(df_15m['close'].iloc[-1])
+        )
+        self.logger.debug(f"Risk yönetimi sonuçları: {risk_management}")
+        
+        # Volatilite ve hacim analizlerini ekle
+        volatility_stops = calculate_volatility_based_stops(df_15m, 'medium')
+        volume_analysis = analyze_volume_distribution(df_15m)
+        
+        # Sonuç oluştur...
+        result = {
+            'symbol': symbol,
+            'current_price': float(df_15m['close'].iloc[-1]),
+            'position': combined_analysis['position'],
+            'confidence': combined_analysis['confidence'],
+            'opportunity_score': combined_analysis['score'],
+            '1h_trend': trend_analysis['trend'],
+            '15m_signal': signal_analysis['signal'],
+            'stop_loss': risk_management['stop_loss'],
+            'take_profit': risk_management['take_profit'],
+            'risk_reward': risk_management.get('risk_reward', risk_management.get('risk_reward_ratio', 0)),
+            'risk_reward_ratio': risk_management.get('risk_reward_ratio', risk_management.get('risk_reward', 0)),
+            'volume': current_volume,
+            'volume_ratio': current_volume / avg_volume if avg_volume > 0 else 0,
+            'reasons': combined_analysis['reasons'],
+            'timestamp': datetime.now().isoformat(),
+            'timeframe': 'dual_15m_1h',
+            # Yeni mum formasyonu analiz sonuçlarını ekle
+            'candlestick_1h': candlestick_1h,
+            'candlestick_15m': candlestick_15m,
+            # Yeni volatilite analizi sonuçlarını ekle
+            'v_stop_loss': volatility_stops['stop_loss'],
+            'v_take_profit1': volatility_stops['take_profit1'],
+            'v_take_profit2': volatility_stops['take_profit2'],
+            'v_trailing_stop': volatility_stops['trailing_stop'],
+            'v_risk_reward': volatility_stops.get('risk_reward', volatility_stops.get('risk_reward_ratio', 0)),
+            'v_risk_reward_ratio': volatility_stops.get('risk_reward_ratio', volatility_stops.get('risk_reward', 0)),
+            'volatility_pct': volatility_stops['volatility_pct'],
+            # Hacim profili analizini ekle
+            'poc': volume_analysis['poc'],
+            'value_area_high': volume_analysis['value_area_high'],
+            'value_area_low': volume_analysis['value_area_low'],
+            'high_liquidity': volume_analysis['high_liquidity'],
+            'low_liquidity': volume_analysis['low_liquidity'],
+            'bullish_blocks': volume_analysis['bullish_blocks'],
+            'bearish_blocks': volume_analysis['bearish_blocks']
+        }
+        
+        # Eğer mum formasyonu güçlü bir sinyal veriyorsa puana ek yap
+        if candlestick_15m['pattern_confidence'] > 50:
+            if candlestick_15m['pattern_signal'] == 'BULLISH' and 'LONG' in result['position']:
+                result['opportunity_score'] += 10
+                result['reasons'].append(f"✅ 15m: Güçlü alım mum formasyonu tespit edildi")
+            elif candlestick_15m['pattern_signal'] == 'BEARISH' and 'SHORT' in result['position']:
+                result['opportunity_score'] += 10
+                result['reasons'].append(f"✅ 15m: Güçlü satım mum formasyonu tespit edildi")
+        
+        # Belirli bir coin aranıyorsa veya minimum puan eşiğini geçiyorsa ekle
+        min_score_threshold = 50 if not single else 0  # Tek coin aranıyorsa puanı dikkate alma
+        
+        if single or result['opportunity_score'] > min_score_threshold:
+            self.logger.info(f"{symbol} için fırsat bulundu! Puan: {result['opportunity_score']:.1f}/100")
+            return result
+        return None
+
+    def _prepare_dataframe_for_worker(self, ohlcv) -> pd.DataFrame:
+        """
+        OHLCV verilerini (OHLCVArray veya ccxt listesi) göstergeli DataFrame'e dönüştür (worker için)
+        
+        Göstergeler sütun dizileri üzerinden indicator_engine ile tek geçişte
+        hesaplanır (/scan ile aynı tanımlar: Wilder RSI/ATR, popülasyon std'li
+        Bollinger). DataFrame yalnızca satır bazlı sinyal kuralları ile mum
+        formasyonu, volatilite ve hacim profili analizleri için kurulur.
+        """
+        if isinstance(ohlcv, OHLCVArray):
+            df = ohlcv.to_dataframe()
+        else:
+            df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        data = ie.to_columns(ohlcv)
+        high, low, close, volume = data[2], data[3], data[4], data[5]
+        features = ie.compute_features(data)
+        
+        # RSI - daha hızlı tepki için kısa periyot
+        df['rsi'] = ie.rsi(close, self.rsi_period_15m)
+        
+        # EMA, MACD, Bollinger Bands ve ATR
+        for name in ('ema9', 'ema20', 'ema21', 'ema50', 'ema200', 'macd', 'macd_hist',
+                     'bb_upper', 'bb_middle', 'bb_lower', 'atr'):
+            df[name] = features[name]
+        df['signal'] = features['macd_signal']
+        
+        # BB Pozisyonu (0-100%) ve Bollinger Band Squeeze ölçümü
+        bb_width = features['bb_upper'] - features['bb_lower']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            df['bb_width'] = bb_width
+            df['bb_position'] = np.clip((close - features['bb_lower']) / bb_width * 100, 0, 100)
+            df['bb_squeeze'] = bb_width / features['bb_middle'] * 100
+            
+            # Hacim analizleri
+            df['volume_ma'] = features['volume_sma']
+            df['volume_ratio'] = volume / features['volume_sma']
+        
+        # Stochastic RSI
+        df['stoch_rsi'] = features['stoch_rsi']
+        df['stoch_rsi_k'] = features['stoch_k']
+        df['stoch_rsi_d'] = features['stoch_d']
+        
+        # Fiyat kanalları
+        df['high_20'] = ie.rolling_max(high, 20)
+        df['low_20'] = ie.rolling_min(low, 20)
         df['channel_mid'] = (df['high_20'] + df['low_20']) / 2
         
         return df
@@ -753,10 +792,8 @@ class DualTimeframeAnalyzer:
     async def initialize(self):
         """Başlangıç ayarlarını yap"""
         try:
-            # Sadece test amaçlı geçici bir exchange kullanıp hemen kapatıyoruz
-            exchange = ccxt.binance()
-            await exchange.load_markets()
-            await exchange.close()  # Önemli: exchange'i hemen kapat
+            # Paylaşılan gateway marketleri bir kez yükler
+            await get_gateway().load_markets()
             
             self.logger.info("Dual Timeframe Analyzer başlatıldı")
             return True
@@ -769,27 +806,18 @@ class DualTimeframeAnalyzer:
         Verilen sembol için 15m ve 1h zaman dilimlerini birlikte analiz eder.
         1h grafiğinden trend yönünü, 15m grafiğinden giriş noktalarını belirler.
         """
-        exchange = None
         try:
-            # Yeni bir exchange nesnesi oluştur
-            exchange = ccxt.binance({
-                'enableRateLimit': True,
-                'options': {'defaultType': 'spot'}
-            })
+            exchange = get_gateway()
             
             await exchange.load_markets()
             
-            # 1h verilerini al
-            ohlcv_1h = await exchange.fetch_ohlcv(symbol, '1h', limit=100)
+            # 15m verilerini al; 1h mumları 15m serisinden türetilir (tek istek)
+            candles = await get_timeframes_async(exchange, symbol, {'15m': 100, '1h': 100})
+            ohlcv_1h, ohlcv_15m = candles['1h'], candles['15m']
             if not ohlcv_1h or len(ohlcv_1h) < 50:
                 self.logger.debug(f"{symbol} için yeterli 1h verisi bulunamadı")
                 return None
             
-            # İstekler arasında biraz bekle (rate limiting için)
-            await asyncio.sleep(0.5)
-            
-            # 15m verilerini al
-            ohlcv_15m = await exchange.fetch_ohlcv(symbol, '15m', limit=100)
             if not ohlcv_15m or len(ohlcv_15m) < 50:
                 self.logger.debug(f"{symbol} için yeterli 15m verisi bulunamadı")
                 return None
@@ -814,7 +842,7 @@ class DualTimeframeAnalyzer:
             # Hacim kontrolü - Burada hacim kontrolünü kaldırıyoruz, özel olarak coin seçildiğinde
             # hacim filtresi uygulamıyoruz
             current_volume = float(df_15m['volume'].iloc[-1])
-            avg_volume = float(df_15m['volume'].rolling(20).mean().iloc[-1])
+            avg_volume = float(df_15m['volume_ma'].iloc[-1])
             
             # Risk yönetimi hesaplamaları
             risk_management = self._calculate_risk_management_for_worker(
@@ -901,13 +929,6 @@ class DualTimeframeAnalyzer:
         except Exception as e:
             self.logger.error(f"Dual timeframe analiz hatası ({symbol}): {e}")
             return None
-        finally:
-            # Exchange'i kapat
-            if exchange:
-                try:
-                    await exchange.close()
-                except Exception as e:
-                    self.logger.debug(f"Exchange kapatılırken hata: {e}")
 
     async def generate_enhanced_scalp_chart(self, symbol: str, analysis_result: Dict) -> Optional[BytesIO]:
         """
@@ -921,220 +942,190 @@ class DualTimeframeAnalyzer:
             BytesIO: PNG formatında grafik içeren buffer
         """
         try:
-            # Exchange örneğini oluştur
-            exchange = ccxt.binance({
-                'enableRateLimit': True,
-                'options': {'defaultType': 'spot'}
-            })
+            exchange = get_gateway()
             
-            try:
-                await exchange.load_markets()
-                
-                # OHLCV verilerini al - 15m için
-                ohlcv = await exchange.fetch_ohlcv(symbol, '15m', limit=120)
-                if not ohlcv or len(ohlcv) < 50:
-                    self.logger.warning(f"Yetersiz kline verisi: {symbol}")
-                    return None
-                    
-                # Pandas DataFrame'e dönüştür
-                df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-                df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-                df.set_index('timestamp', inplace=True)
-                
-                # Teknik göstergeleri hesapla
-                df['ema9'] = df['close'].ewm(span=9, adjust=False).mean()
-                df['ema20'] = df['close'].ewm(span=20, adjust=False).mean()
-                df['ema50'] = df['close'].ewm(span=50, adjust=False).mean()
-                
-                # RSI
-                delta = df['close'].diff()
-                gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-                loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-                rs = gain / loss.replace(0, 1e-9)  # Sıfıra bölme hatasını önle
-                df['rsi'] = 100 - (100 / (1 + rs))
-                
-                # MACD
-                ema12 = df['close'].ewm(span=12, adjust=False).mean()
-                ema26 = df['close'].ewm(span=26, adjust=False).mean()
-                df['macd'] = ema12 - ema26
-                df['signal'] = df['macd'].ewm(span=9, adjust=False).mean()
-                df['hist'] = df['macd'] - df['signal']
-                
-                # Bollinger Bands
-                df['bb_middle'] = df['close'].rolling(window=20).mean()
-                df['bb_std'] = df['close'].rolling(window=20).std()
-                df['bb_upper'] = df['bb_middle'] + (df['bb_std'] * 2)
-                df['bb_lower'] = df['bb_middle'] - (df['bb_std'] * 2)
-                
-                # Volume Weighted Average Price (VWAP) - oturumun başlangıcından itibaren
-                df['vwap'] = (df['close'] * df['volume']).cumsum() / df['volume'].cumsum()
-                
-                # Fiyat öngörüsü için basit lineer regresyon
-                # Son 30 mumu kullanarak gelecek 10 mum için tahmin oluştur
-                x = np.arange(30)
-                y = df['close'].values[-30:]
-                
-                # Lineer regresyon hesapla - polynomial curve fitting kullanarak (2. derece)
-                z = np.polyfit(x, y, 2)
-                p = np.poly1d(z)
-                
-                # Gelecek 10 mum için tahmin
-                forecast_x = np.arange(30, 40)
-                forecast_y = p(forecast_x)
-                
-                # Son 80 mumu göster
-                df = df.iloc[-80:]
-                
-                # Grafik ayarları
-                mc = mpf.make_marketcolors(up='green', down='red', edge='black', wick='black', volume='in')
-                s = mpf.make_mpf_style(marketcolors=mc, gridstyle='--', y_on_right=True)
-                
-                # Gelecek fiyat tahmini için renkli bölge - sadece DataFrame'de olması gereken verileri kullan
-                last_idx = df.index[-1]
-                future_idx = [last_idx + pd.Timedelta(minutes=15*i) for i in range(1, 11)]
-                
-                # Ek göstergeler
-                apds = [
-                    mpf.make_addplot(df['ema9'], color='blue', width=0.7, label='EMA9'),
-                    mpf.make_addplot(df['ema20'], color='orange', width=1, label='EMA20'),
-                    mpf.make_addplot(df['ema50'], color='purple', width=1.2, label='EMA50'),
-                    mpf.make_addplot(df['bb_upper'], color='gray', width=0.7, linestyle='--'),
-                    mpf.make_addplot(df['bb_middle'], color='gray', width=0.7),
-                    mpf.make_addplot(df['bb_lower'], color='gray', width=0.7, linestyle='--'),
-                    mpf.make_addplot(df['vwap'], color='teal', width=1, label='VWAP'),
-                    mpf.make_addplot(df['rsi'], panel=1, color='red', width=1),
-                    mpf.make_addplot(df['macd'], panel=2, color='blue', width=1),
-                    mpf.make_addplot(df['signal'], panel=2, color='orange', width=1),
-                    mpf.make_addplot(df['hist'], panel=2, type='bar', color='gray'),
-                ]
-                
-                # Grafik başlığı
-                title = f'{symbol} - 15m Scalp Sinyali: {analysis_result.get("position", "NEUTRAL")}'
-                
-                # Figür boyutu arttırıldı
-                fig, axes = mpf.plot(df, type='candle', style=s, addplot=apds, volume=True, 
-                                    panel_ratios=(6, 2, 2), figsize=(14, 10), title=title, 
-                                    returnfig=True)
-                
-                # RSI paneline 30 ve 70 çizgileri ekle
-                axes[2].axhline(y=30, color='green', linestyle='--', alpha=0.5)
-                axes[2].axhline(y=70, color='red', linestyle='--', alpha=0.5)
-                
-                # MACD paneline 0 çizgisi ekle
-                axes[3].axhline(y=0, color='black', linestyle='-', alpha=0.5)
-                
-                # Ana grafiğe stop-loss ve take-profit seviyelerini ekle
-                if 'stop_loss' in analysis_result and 'take_profit' in analysis_result:
-                    # Stop-loss çizgisi
-                    stop_price = analysis_result['stop_loss']
-                    axes[0].axhline(y=stop_price, color='red', linestyle='--', linewidth=2, alpha=0.7)
-                    axes[0].text(0.01, stop_price, f'Stop: {stop_price:.4f}', transform=axes[0].get_yaxis_transform(), 
-                                color='red', fontweight='bold', va='center')
-                    
-                    # Take-profit çizgisi
-                    target_price = analysis_result['take_profit']
-                    axes[0].axhline(y=target_price, color='green', linestyle='--', linewidth=2, alpha=0.7)
-                    axes[0].text(0.01, target_price, f'Target: {target_price:.4f}', transform=axes[0].get_yaxis_transform(), 
-                                color='green', fontweight='bold', va='center')
-                
-                # Gelecek tahminini çiz
-                last_close = df['close'].iloc[-1]
-                next_15m = last_idx + pd.Timedelta(minutes=15)
-                
-                # Fiyat öngörüsü çizgisi (kesikli)
-                forecast_dates = pd.date_range(start=next_15m, periods=10, freq='15min')
-                axes[0].plot(forecast_dates, forecast_y, 'b--', linewidth=1.5, alpha=0.7)
-                
-                # Öngörü eğilimini gösteren ok
-                if forecast_y[-1] > last_close:
-                    arrow_color = 'green'
-                    arrow_text = '↗ Yükseliş Eğilimi'
-                else:
-                    arrow_color = 'red'
-                    arrow_text = '↘ Düşüş Eğilimi'
-                
-                axes[0].annotate(arrow_text, 
-                               xy=(forecast_dates[5], forecast_y[5]), 
-                               xytext=(forecast_dates[5], forecast_y[5] * 1.02),
-                               arrowprops=dict(facecolor=arrow_color, shrink=0.05),
-                               color=arrow_color,
-                               fontweight='bold')
-                
-                # Destek ve Direnç Seviyeleri
-                if 'support_levels' in analysis_result and 'resistance_levels' in analysis_result:
-                    # Destek çizgileri (en fazla 2 tane)
-                    for i, level in enumerate(analysis_result.get('support_levels', [])[:2]):
-                        if level < last_close:  # Sadece mevcut fiyatın altındaki destekleri göster
-                            axes[0].axhline(y=level, color='green', linestyle='-.', linewidth=1, alpha=0.6)
-                            axes[0].text(0.99, level, f'S{i+1}: {level:.4f}', transform=axes[0].get_yaxis_transform(), 
-                                        color='green', ha='right', va='center')
-                    
-                    # Direnç çizgileri (en fazla 2 tane)
-                    for i, level in enumerate(analysis_result.get('resistance_levels', [])[:2]):
-                        if level > last_close:  # Sadece mevcut fiyatın üstündeki dirençleri göster
-                            axes[0].axhline(y=level, color='red', linestyle='-.', linewidth=1, alpha=0.6)
-                            axes[0].text(0.99, level, f'R{i+1}: {level:.4f}', transform=axes[0].get_yaxis_transform(), 
-                                        color='red', ha='right', va='center')
-                
-                # Hacim Profili POC seviyesi
-                if 'poc' in analysis_result and analysis_result['poc'] is not None:
-                    poc_level = analysis_result['poc']
-                    axes[0].axhline(y=poc_level, color='blue', linestyle='-.', linewidth=1.5, alpha=0.6)
-                    axes[0].text(0.5, poc_level, f'POC: {poc_level:.4f}', transform=axes[0].get_yaxis_transform(), 
-                                color='blue', ha='center', va='center', fontweight='bold')
-                
-                # Mum Formasyonlarını İşaretle
-                if 'candlestick_15m' in analysis_result and 'patterns' in analysis_result['candlestick_15m']:
-                    patterns = analysis_result['candlestick_15m']['patterns']
-                    if patterns:
-                        for pattern in patterns[:2]:  # En önemli 2 formasyonu göster
-                            pattern_name = pattern.get('name', '')
-                            idx = pattern.get('index', -1)
-                            if idx >= 0 and idx < len(df):
-                                pattern_idx = df.index[idx]
-                                price = df['high'].iloc[idx] * 1.01  # Biraz üstte göster
-                                axes[0].annotate(pattern_name, 
-                                              xy=(pattern_idx, price),
-                                              xytext=(pattern_idx, price * 1.03),
-                                              arrowprops=dict(facecolor='black', shrink=0.05, width=1, headwidth=8),
-                                              fontweight='bold',
-                                              ha='center')
-                
-                # Sinyal Metni
-                position = analysis_result.get('position', 'NEUTRAL')
-                confidence = analysis_result.get('confidence', 0)
-                signal_color = 'green' if 'LONG' in position else 'red' if 'SHORT' in position else 'gray'
-                
-                signal_text = f"{position} - Güven: %{confidence:.0f}"
-                plt.figtext(0.5, 0.01, signal_text, ha='center', color=signal_color, 
-                           fontsize=12, fontweight='bold', 
-                           bbox=dict(facecolor='white', alpha=0.8, boxstyle='round,pad=0.5'))
-                
-                # Risk/Ödül bilgisi
-                risk_reward = analysis_result.get('risk_reward_ratio', analysis_result.get('risk_reward', 0))
-                if risk_reward:
-                    rr_text = f"Risk/Ödül: {risk_reward:.2f}"
-                    plt.figtext(0.5, 0.04, rr_text, ha='center', fontsize=10)
-                
-                # Lejant ekle
-                axes[0].legend(loc='upper left')
+            await exchange.load_markets()
+            
+            # OHLCV verilerini al - 15m için
+            ohlcv = await exchange.fetch_ohlcv(symbol, '15m', limit=120)
+            if not ohlcv or len(ohlcv) < 50:
+                self.logger.warning(f"Yetersiz kline verisi: {symbol}")
+                return None
                 
-                # Grafiği kaydet
-                buf = BytesIO()
-                plt.tight_layout()
-                plt.savefig(buf, format='png', dpi=100)
-                buf.seek(0)
-                plt.close(fig)
+            # Pandas DataFrame'e dönüştür
+            df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+            df.set_index('timestamp', inplace=True)
+            
+            # Teknik göstergeleri hesapla (indicator_engine)
+            _, _, high, low, close, volume = ie.to_columns(ohlcv)
+            for period in (9, 20, 50):
+                df[f'ema{period}'] = ie.ema(close, period)
+            df['rsi'] = ie.rsi(close)
+            df['macd'], df['signal'], df['hist'] = ie.macd(close)
+            df['bb_upper'], df['bb_middle'], df['bb_lower'] = ie.bollinger(close)
+            
+            # Volume Weighted Average Price (VWAP) - oturumun başlangıcından itibaren
+            df['vwap'] = ie.vwap(high, low, close, volume)
+            
+            # Fiyat öngörüsü için basit lineer regresyon
+            # Son 30 mumu kullanarak gelecek 10 mum için tahmin oluştur
+            x = np.arange(30)
+            y = df['close'].values[-30:]
+            
+            # Lineer regresyon hesapla - polynomial curve fitting kullanarak (2. derece)
+            z = np.polyfit(x, y, 2)
+            p = np.poly1d(z)
+            
+            # Gelecek 10 mum için tahmin
+            forecast_x = np.arange(30, 40)
+            forecast_y = p(forecast_x)
+            
+            # Son 80 mumu göster
+            df = df.iloc[-80:]
+            
+            # Grafik ayarları
+            mc = mpf.make_marketcolors(up='green', down='red', edge='black', wick='black', volume='in')
+            s = mpf.make_mpf_style(marketcolors=mc, gridstyle='--', y_on_right=True)
+            
+            # Gelecek fiyat tahmini için renkli bölge - sadece DataFrame'de olması gereken verileri kullan
+            last_idx = df.index[-1]
+            future_idx = [last_idx + pd.Timedelta(minutes=15*i) for i in range(1, 11)]
+            
+            # Ek göstergeler
+            apds = [
+                mpf.make_addplot(df['ema9'], color='blue', width=0.7, label='EMA9'),
+                mpf.make_addplot(df['ema20'], color='orange', width=1, label='EMA20'),
+                mpf.make_addplot(df['ema50'], color='purple', width=1.2, label='EMA50'),
+                mpf.make_addplot(df['bb_upper'], color='gray', width=0.7, linestyle='--'),
+                mpf.make_addplot(df['bb_middle'], color='gray', width=0.7),
+                mpf.make_addplot(df['bb_lower'], color='gray', width=0.7, linestyle='--'),
+                mpf.make_addplot(df['vwap'], color='teal', width=1, label='VWAP'),
+                mpf.make_addplot(df['rsi'], panel=1, color='red', width=1),
+                mpf.make_addplot(df['macd'], panel=2, color='blue', width=1),
+                mpf.make_addplot(df['signal'], panel=2, color='orange', width=1),
+                mpf.make_addplot(df['hist'], panel=2, type='bar', color='gray'),
+            ]
+            
+            # Grafik başlığı
+            title = f'{symbol} - 15m Scalp Sinyali: {analysis_result.get("position", "NEUTRAL")}'
+            
+            # Figür boyutu arttırıldı
+            fig, axes = mpf.plot(df, type='candle', style=s, addplot=apds, volume=True, 
+                                panel_ratios=(6, 2, 2), figsize=(14, 10), title=title, 
+                                returnfig=True)
+            
+            # RSI paneline 30 ve 70 çizgileri ekle
+            axes[2].axhline(y=30, color='green', linestyle='--', alpha=0.5)
+            axes[2].axhline(y=70, color='red', linestyle='--', alpha=0.5)
+            
+            # MACD paneline 0 çizgisi ekle
+            axes[3].axhline(y=0, color='black', linestyle='-', alpha=0.5)
+            
+            # Ana grafiğe stop-loss ve take-profit seviyelerini ekle
+            if 'stop_loss' in analysis_result and 'take_profit' in analysis_result:
+                # Stop-loss çizgisi
+                stop_price = analysis_result['stop_loss']
+                axes[0].axhline(y=stop_price, color='red', linestyle='--', linewidth=2, alpha=0.7)
+                axes[0].text(0.01, stop_price, f'Stop: {stop_price:.4f}', transform=axes[0].get_yaxis_transform(), 
+                            color='red', fontweight='bold', va='center')
                 
-                return buf
+                # Take-profit çizgisi
+                target_price = analysis_result['take_profit']
+                axes[0].axhline(y=target_price, color='green', linestyle='--', linewidth=2, alpha=0.7)
+                axes[0].text(0.01, target_price, f'Target: {target_price:.4f}', transform=axes[0].get_yaxis_transform(), 
+                            color='green', fontweight='bold', va='center')
+            
+            # Gelecek tahminini çiz
+            last_close = df['close'].iloc[-1]
+            next_15m = last_idx + pd.Timedelta(minutes=15)
+            
+            # Fiyat öngörüsü çizgisi (kesikli)
+            forecast_dates = pd.date_range(start=next_15m, periods=10, freq='15min')
+            axes[0].plot(forecast_dates, forecast_y, 'b--', linewidth=1.5, alpha=0.7)
+            
+            # Öngörü eğilimini gösteren ok
+            if forecast_y[-1] > last_close:
+                arrow_color = 'green'
+                arrow_text = '↗ Yükseliş Eğilimi'
+            else:
+                arrow_color = 'red'
+                arrow_text = '↘ Düşüş Eğilimi'
+            
+            axes[0].annotate(arrow_text, 
+                           xy=(forecast_dates[5], forecast_y[5]), 
+                           xytext=(forecast_dates[5], forecast_y[5] * 1.02),
+                           arrowprops=dict(facecolor=arrow_color, shrink=0.05),
+                           color=arrow_color,
+                           fontweight='bold')
+            
+            # Destek ve Direnç Seviyeleri
+            if 'support_levels' in analysis_result and 'resistance_levels' in analysis_result:
+                # Destek çizgileri (en fazla 2 tane)
+                for i, level in enumerate(analysis_result.get('support_levels', [])[:2]):
+                    if level < last_close:  # Sadece mevcut fiyatın altındaki destekleri göster
+                        axes[0].axhline(y=level, color='green', linestyle='-.', linewidth=1, alpha=0.6)
+                        axes[0].text(0.99, level, f'S{i+1}: {level:.4f}', transform=axes[0].get_yaxis_transform(), 
+                                    color='green', ha='right', va='center')
                 
-            finally:
-                # Exchange'i kapat
-                if exchange:
-                    try:
-                        await exchange.close()
-                    except Exception as e:
-                        self.logger.debug(f"Exchange kapatılırken hata: {e}")
+                # Direnç çizgileri (en fazla 2 tane)
+                for i, level in enumerate(analysis_result.get('resistance_levels', [])[:2]):
+                    if level > last_close:  # Sadece mevcut fiyatın üstündeki dirençleri göster
+                        axes[0].axhline(y=level, color='red', linestyle='-.', linewidth=1, alpha=0.6)
+                        axes[0].text(0.99, level, f'R{i+1}: {level:.4f}', transform=axes[0].get_yaxis_transform(), 
+                                    color='red', ha='right', va='center')
+            
+            # Hacim Profili POC seviyesi
+            if 'poc' in analysis_result and analysis_result['poc'] is not None:
+                poc_level = analysis_result['poc']
+                axes[0].axhline(y=poc_level, color='blue', linestyle='-.', linewidth=1.5, alpha=0.6)
+                axes[0].text(0.5, poc_level, f'POC: {poc_level:.4f}', transform=axes[0].get_yaxis_transform(), 
+                            color='blue', ha='center', va='center', fontweight='bold')
+            
+            # Mum Formasyonlarını İşaretle
+            if 'candlestick_15m' in analysis_result and 'patterns' in analysis_result['candlestick_15m']:
+                patterns = analysis_result['candlestick_15m']['patterns']
+                if patterns:
+                    for pattern in patterns[:2]:  # En önemli 2 formasyonu göster
+                        pattern_name = pattern.get('name', '')
+                        idx = pattern.get('index', -1)
+                        if idx >= 0 and idx < len(df):
+                            pattern_idx = df.index[idx]
+                            price = df['high'].iloc[idx] * 1.01  # Biraz üstte göster
+                            axes[0].annotate(pattern_name, 
+                                          xy=(pattern_idx, price),
+                                          xytext=(pattern_idx, price * 1.03),
+                                          arrowprops=dict(facecolor='black', shrink=0.05, width=1, headwidth=8),
+                                          fontweight='bold',
+                                          ha='center')
+            
+            # Sinyal Metni
+            position = analysis_result.get('position', 'NEUTRAL')
+            confidence = analysis_result.get('confidence', 0)
+            signal_color = 'green' if 'LONG' in position else 'red' if 'SHORT' in position else 'gray'
+            
+            signal_text = f"{position} - Güven: %{confidence:.0f}"
+            plt.figtext(0.5, 0.01, signal_text, ha='center', color=signal_color, 
+                       fontsize=12, fontweight='bold', 
+                       bbox=dict(facecolor='white', alpha=0.8, boxstyle='round,pad=0.5'))
+            
+            # Risk/Ödül bilgisi
+            risk_reward = analysis_result.get('risk_reward_ratio', analysis_result.get('risk_reward', 0))
+            if risk_reward:
+                rr_text = f"Risk/Ödül: {risk_reward:.2f}"
+                plt.figtext(0.5, 0.04, rr_text, ha='center', fontsize=10)
+            
+            # Lejant ekle
+            axes[0].legend(loc='upper left')
+            
+            # Grafiği kaydet
+            buf = BytesIO()
+            plt.tight_layout()
+            plt.savefig(buf, format='png', dpi=100)
+            buf.seek(0)
+            plt.close(fig)
+            
+            return buf
             
         except Exception as e:
             self.logger.error(f"Gelişmiş grafik oluşturma hatası ({symbol}): {e}")
@@ -1173,4 +1164,40 @@ class DualTimeframeAnalyzer:
         except Exception as e:
             self.logger.error(f"Grafik gönderme hatası: {str(e)}")
             import traceback
-            self.logger.error(traceback.format_exc())
\ No newline at end of file
+            self.logger.error(traceback.format_exc())
+
+
+# İşçi süreçlerdeki analizör; havuz başlatılırken warm_up() ile oluşturulur
+_worker_analyzer: Optional[DualTimeframeAnalyzer] = None
+
+
+def warm_up():
+    """İşçi havuzu ön yükleme kancası: süreç başına tek DualTimeframeAnalyzer"""
+    global _worker_analyzer
+    if _worker_analyzer is None:
+        _worker_analyzer = DualTimeframeAnalyzer(logging.getLogger('DualTimeframeAnalyzer.worker'))
+    return _worker_analyzer
+
+
+def analyze_dual_batch(ohlcv_1h: Dict, ohlcv_15m: Dict, single: bool = False) -> List[Dict]:
+    """
+    İşçi havuzu görevi: sembol -> 1h / 15m mumları girer, eşiği geçen fırsatlar çıkar.
+    
+    Bir sembolün hatası parçadaki diğer sembolleri etkilemez.
+    """
+    analyzer = warm_up()
+    opportunities = []
+    for symbol, candles_1h in ohlcv_1h.items():
+        try:
+            result = analyzer._analyze_symbol(symbol, candles_1h, ohlcv_15m[symbol], single)
+        except Exception as e:
+            analyzer.logger.error(f"{symbol} analiz hatası: {str(e)}")
+            continue
+        if result is not None:
+            opportunities.append(result)
+    return opportunities
+
+
+def analyze_dual_block(block_1h, block_15m, single: bool = False) -> List[Dict]:
+    """analyze_dual_batch'in paylaşımlı bellek sürümü: mumlar arenadaki bloklardan kopyasız okunur"""
+    return analyze_dual_batch(read_block(block_1h), read_block(block_15m), single)
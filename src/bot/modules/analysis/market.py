@@ -1,22 +1,26 @@
 from ..data.binance_client import BinanceClient
 from .indicators import Indicators
 import numpy as np
-import ccxt.async_support as ccxt
 import pandas as pd
-from typing import Dict, Optional, Tuple, List
+from typing import AsyncIterator, Dict, Optional, Tuple, List
+from contextlib import aclosing
 from datetime import datetime
-import asyncio
-import concurrent.futures
+import os
+import time
+import heapq
 import multiprocessing
-from functools import partial
 from .advanced_analysis import AdvancedAnalyzer, SignalStrength
+from src.data_collectors.candle_store import get_candle_store
+from src.data_collectors.ohlcv_arena import OHLCVArena, read_block
+from src.analysis import indicator_engine as ie
+from src.analysis.feature_cache import get_feature_cache
+from src.exchanges.gateway import get_gateway
+from src.analysis.worker_pool import get_worker_pool, pack_records, unpack_records
+from src.analysis.scan_pipeline import ScanPipeline
+from src.analysis.ticker_prefilter import prefilter_from_env, prefilter_recall
 import matplotlib.pyplot as plt
 import mplfinance as mpf
 from io import BytesIO
-import ta
-from ta.trend import EMAIndicator
-from ta.momentum import RSIIndicator
-from ta.volatility import BollingerBands
 import logging
 
 class MarketAnalyzer:
@@ -24,12 +28,12 @@ class MarketAnalyzer:
         self.logger = logger or logging.getLogger('MarketAnalyzer')
         self.client = BinanceClient()
         self.indicators = Indicators()
-        self.exchange = ccxt.binance()
         self.min_volume = 50000  # Minimum 50k USDT hacim (daha küçük coinleri de tarayabilmek için)
         self.min_price = 0.00001
         self.timeframe = '1h'  # 1 saatlik mum
         self.limit = 200  # Son 200 mum
         self.advanced_analyzer = AdvancedAnalyzer()
+        self.prefilter = prefilter_from_env()  # Yalnızca ilk K aday için mum çekilir
         
         # Debug için sayaçlar
         self.analysis_stats = {
@@ -37,6 +41,8 @@ class MarketAnalyzer:
             'valid_pairs': 0,
             'price_filtered': 0,
             'volume_filtered': 0,
+            'prefilter_dropped': 0,
+            'data_skipped': 0,
             'analysis_failed': 0,
             'analysis_success': 0
         }
@@ -71,6 +77,11 @@ class MarketAnalyzer:
             'STRONG_SELL': {'min_score': 0, 'emoji': '⛔'}
         }
 
+    @property
+    def exchange(self):
+        """Paylaşılan, bloklamayan exchange gateway'i (process havuzuna pickle edilmez)"""
+        return get_gateway()
+
     async def initialize(self):
         """
         Asenkron başlatma işlemleri için metod
@@ -96,6 +107,8 @@ class MarketAnalyzer:
         """Tüm market analizi"""
         try:
             opportunities = []
+            ohlcv_by_symbol = {}
+            market_data = {}
             
             # Sayaçları sıfırla
             self.analysis_stats = {key: 0 for key in self.analysis_stats}
@@ -161,80 +174,16 @@ class MarketAnalyzer:
                         self.logger.debug(f"📊 {symbol} düşük hacim nedeniyle atlandı: {current_volume:.2f} USDT < {self.min_volume} USDT")
                         continue
 
-                    # OHLCV verilerini al
+                    # OHLCV verilerini al; göstergeler döngüden sonra tüm evren için tek seferde hesaplanır
                     try:
-                        ohlcv = await self.exchange.fetch_ohlcv(symbol, interval, limit=100)
+                        ohlcv = await get_candle_store().get_array_async(self.exchange, symbol, interval, limit=100)
                         if not ohlcv or len(ohlcv) < 100:
                             self.analysis_stats['analysis_failed'] += 1
                             self.logger.debug(f"📈 {symbol} yetersiz OHLCV verisi")
                             continue
                             
-                        self.logger.debug(f"✅ {symbol} analiz ediliyor...")
-                        
-                        # Verileri numpy dizilerine dönüştür
-                        closes = np.array([float(candle[4]) for candle in ohlcv])
-                        volumes = np.array([float(candle[5]) for candle in ohlcv])
-                        
-                        # Teknik indikatörleri hesapla
-                        rsi = self._calculate_rsi(closes)
-                        macd, signal, hist = self._calculate_macd(closes)
-                        bb_upper, bb_middle, bb_lower = self._calculate_bollinger_bands(closes)
-                        ema20 = self._calculate_ema(closes, 20)
-                        ema50 = self._calculate_ema(closes, 50)
-                        
-                        # Hacim analizi
-                        avg_volume = np.mean(volumes[-20:])
-                        volume_surge = current_volume > (avg_volume * 1.2)  # Hacim artış eşiğini düşürdük
-                        
-                        # Trend analizi
-                        trend = "YUKARI" if ema20[-1] > ema50[-1] else "AŞAĞI"
-                        
-                        # Fırsat puanı hesapla
-                        opportunity_score = self._calculate_opportunity_score(
-                            rsi[-1],
-                            hist[-1],
-                            volume_surge,
-                            trend,
-                            current_volume,
-                            avg_volume
-                        )
-                        
-                        # Fırsat eşiğini düşürdük
-                        if opportunity_score >= 40:  # 50'den 40'a düşürdük
-                            position_rec = self._analyze_position_recommendation(
-                                rsi[-1], hist[-1], ema20[-1], ema50[-1],
-                                bb_upper, bb_lower, current_price, opportunity_score, volume_surge
-                            )
-                            
-                            # Sinyal belirle
-                            signal = self._determine_signal(opportunity_score, rsi[-1], trend)
-                            
-                            opportunity = {
-                                'symbol': symbol,
-                                'price': current_price,
-                                'volume': current_volume,
-                                'rsi': float(rsi[-1]),
-                                'macd': float(hist[-1]),
-                                'trend': trend,
-                                'volume_surge': volume_surge,
-                                'opportunity_score': float(opportunity_score),
-                                'signal': signal,
-                                'position_recommendation': position_rec['position'],
-                                'position_confidence': position_rec['confidence'],
-                                'recommended_leverage': position_rec['leverage'],
-                                'risk_level': position_rec['risk_level'],
-                                'analysis_reasons': position_rec['reasons'],
-                                'score': position_rec['score'],
-                                'ema20': float(ema20[-1]),
-                                'ema50': float(ema50[-1]),
-                                'bb_upper': float(bb_upper),
-                                'bb_middle': float(bb_middle),
-                                'bb_lower': float(bb_lower)
-                            }
-                            
-                            opportunities.append(opportunity)
-                            self.analysis_stats['analysis_success'] += 1
-                            self.logger.debug(f"💎 {symbol} fırsat bulundu! Skor: {opportunity_score:.1f}")
+                        ohlcv_by_symbol[symbol] = ohlcv
+                        market_data[symbol] = (current_price, current_volume)
                         
                     except Exception as e:
                         self.analysis_stats['analysis_failed'] += 1
@@ -246,6 +195,46 @@ class MarketAnalyzer:
                     self.logger.debug(f"❌ {symbol} işleme hatası: {str(e)}")
                     continue
             
+            # Fırsat eşiğini geçen satırlar için öneri oluştur
+            table = self._build_scan_table(ohlcv_by_symbol, market_data, min_length=100,
+                                           volume_window=20, timeframe=interval)
+            candidates = table.select(table['opportunity_score'] >= 40) if len(table) else table
+            for row in candidates.rows():
+                symbol = row['symbol']
+                try:
+                    position_rec = self._analyze_position_recommendation(
+                        row['rsi'], row['macd_hist'], row['ema20'], row['ema50'],
+                        row['bb_upper'], row['bb_lower'], row['price'], row['opportunity_score'], row['volume_surge']
+                    )
+                    
+                    opportunities.append({
+                        'symbol': symbol,
+                        'price': row['price'],
+                        'volume': row['volume'],
+                        'rsi': row['rsi'],
+                        'macd': row['macd_hist'],
+                        'trend': row['trend'],
+                        'volume_surge': row['volume_surge'],
+                        'opportunity_score': row['opportunity_score'],
+                        'signal': self._determine_signal(row['opportunity_score'], row['rsi'], row['trend']),
+                        'position_recommendation': position_rec['position'],
+                        'position_confidence': position_rec['confidence'],
+                        'recommended_leverage': position_rec['leverage'],
+                        'risk_level': position_rec['risk_level'],
+                        'analysis_reasons': position_rec['reasons'],
+                        'score': position_rec['score'],
+                        'ema20': row['ema20'],
+                        'ema50': row['ema50'],
+                        'bb_upper': row['bb_upper'],
+                        'bb_middle': row['bb_middle'],
+                        'bb_lower': row['bb_lower']
+                    })
+                    self.analysis_stats['analysis_success'] += 1
+                    self.logger.debug(f"💎 {symbol} fırsat bulundu! Skor: {row['opportunity_score']:.1f}")
+                except Exception as e:
+                    self.analysis_stats['analysis_failed'] += 1
+                    self.logger.debug(f"❌ {symbol} analiz hatası: {str(e)}")
+            
             # Analiz istatistiklerini logla
             self.logger.info("\n📊 TARAMA İSTATİSTİKLERİ:")
             self.logger.info(f"📌 Toplam Coin: {self.analysis_stats['total_coins']}")
@@ -254,6 +243,9 @@ class MarketAnalyzer:
             self.logger.info(f"📊 Hacim Filtresi: {self.analysis_stats['volume_filtered']}")
             self.logger.info(f"✨ Başarılı Analiz: {self.analysis_stats['analysis_success']}")
             self.logger.info(f"❌ Başarısız Analiz: {self.analysis_stats['analysis_failed']}")
+            cache_stats = get_feature_cache().stats
+            self.logger.info(f"🧮 Gösterge Önbelleği: {cache_stats['hits']} hit / {cache_stats['misses']} miss "
+                             f"(%{get_feature_cache().hit_rate * 100:.0f})")
             
             # Fırsatları puana göre sırala
             opportunities.sort(key=lambda x: x['opportunity_score'], reverse=True)
@@ -268,93 +260,86 @@ class MarketAnalyzer:
         except Exception as e:
             self.logger.error(f"Market analysis error: {str(e)}")
             return []
-        finally:
-            try:
-                await self.exchange.close()
-            except:
-                pass
 
     def _calculate_rsi(self, prices: np.ndarray, period: int = 14) -> np.ndarray:
         """RSI hesapla"""
-        deltas = np.diff(prices)
-        seed = deltas[:period+1]
-        up = seed[seed >= 0].sum()/period
-        down = -seed[seed < 0].sum()/period
-        rs = up/down if down != 0 else 0
-        rsi = np.zeros_like(prices)
-        rsi[:period] = 100. - 100./(1.+rs)
-
-        for i in range(period, len(prices)):
-            delta = deltas[i-1]
-            if delta > 0:
-                upval = delta
-                downval = 0.
-            else:
-                upval = 0.
-                downval = -delta
-
-            up = (up*(period-1) + upval)/period
-            down = (down*(period-1) + downval)/period
-            rs = up/down if down != 0 else 0
-            rsi[i] = 100. - 100./(1.+rs)
-
-        return rsi
+        return ie.rsi(prices, period)
 
     def _calculate_macd(self, prices: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """MACD hesapla"""
-        exp1 = pd.Series(prices).ewm(span=12, adjust=False).mean()
-        exp2 = pd.Series(prices).ewm(span=26, adjust=False).mean()
-        macd = exp1 - exp2
-        signal = macd.ewm(span=9, adjust=False).mean()
-        hist = macd - signal
-        return macd.values, signal.values, hist.values
+        return ie.macd(prices)
 
     def _calculate_bollinger_bands(self, prices: np.ndarray, period: int = 20) -> Tuple[float, float, float]:
         """Bollinger Bands hesapla"""
-        sma = np.mean(prices[-period:])
-        std = np.std(prices[-period:])
-        upper = sma + (std * 2)
-        lower = sma - (std * 2)
-        return upper, sma, lower
+        upper, middle, lower = ie.bollinger(prices, period)
+        return ie.last(upper), ie.last(middle), ie.last(lower)
 
     def _calculate_ema(self, prices: np.ndarray, period: int) -> np.ndarray:
         """EMA hesapla"""
-        return pd.Series(prices).ewm(span=period, adjust=False).mean().values
+        return ie.ema(prices, period)
 
-    def _calculate_opportunity_score(self, rsi: float, macd: float, 
-                                   volume_surge: bool, trend: str,
-                                   current_volume: float, avg_volume: float) -> float:
-        """Fırsat puanı hesapla (0-100)"""
-        score = 0
+    def _calculate_opportunity_score(self, rsi, macd, volume_surge, trend,
+                                   current_volume, avg_volume):
+        """
+        Fırsat puanı hesapla (0-100).
+        
+        Skaler değerlerle tek sembol için float, IndicatorTable sütunlarıyla
+        tüm evren için dizi döndürür.
+        """
+        rsi = np.asarray(rsi, dtype=np.float64)
+        macd = np.asarray(macd, dtype=np.float64)
+        current_volume = np.asarray(current_volume, dtype=np.float64)
+        avg_volume = np.asarray(avg_volume, dtype=np.float64)
+        
+        # RSI bazlı puan (0-30): aşırı satım 30, aşırı alım 10
+        score = np.where(rsi < 30, 30.0, np.where(rsi > 70, 10.0, 20.0))
         
-        # RSI bazlı puan (0-30)
-        if rsi < 30:  # Aşırı satım
-            score += 30
-        elif rsi > 70:  # Aşırı alım
-            score += 10
-        else:
-            score += 20
-            
         # MACD bazlı puan (0-20)
-        if macd > 0:
-            score += 20
-        elif macd < 0:
-            score += 5
+        score = score + np.where(macd > 0, 20.0, np.where(macd < 0, 5.0, 0.0))
         
         # Hacim bazlı puan (0-30)
-        if volume_surge:
-            score += 30
-        else:
-            volume_ratio = current_volume / avg_volume if avg_volume > 0 else 1
-            score += min(30, volume_ratio * 15)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volume_ratio = np.where(avg_volume > 0, current_volume / avg_volume, 1.0)
+        score = score + np.where(volume_surge, 30.0, np.minimum(30.0, volume_ratio * 15))
             
-        # Trend bazlı puan (0-20)
-        if trend == "YUKARI":
-            score += 20
-        else:
-            score += 10  # Düşüş trendinde de puan ver
+        # Trend bazlı puan (0-20), düşüş trendinde de puan ver
+        score = score + np.where(np.asarray(trend) == "YUKARI", 20.0, 10.0)
             
-        return min(100, score)
+        score = np.minimum(100.0, score)
+        return float(score) if score.ndim == 0 else score
+
+    def _build_scan_table(self, ohlcv_by_symbol: Dict[str, list], market_data: Dict[str, Tuple[float, float]],
+                          min_length: int = 30, volume_window: int = 10,
+                          timeframe: Optional[str] = None) -> ie.IndicatorTable:
+        """
+        Tüm semboller için göstergeleri ve fırsat puanını sütun bazlı hesapla.
+        
+        Args:
+            ohlcv_by_symbol: Sembol -> OHLCV listesi
+            market_data: Sembol -> (anlık fiyat, 24s hacim)
+            timeframe: Verilirse göstergeler kapanmış mumlardan, gösterge
+                önbelleği üzerinden alınır (yalnızca yeni mum kapanınca yeniden hesaplanır)
+            
+        Returns:
+            Puan sütunu eklenmiş IndicatorTable
+        """
+        if timeframe:
+            table = get_feature_cache().indicator_table(timeframe, ohlcv_by_symbol, min_length=min_length,
+                                                        volume_window=volume_window)
+        else:
+            table = ie.build_indicator_table(ohlcv_by_symbol, min_length=min_length, volume_window=volume_window)
+        if not len(table):
+            return table
+        
+        table['price'] = np.array([market_data[symbol][0] for symbol in table.symbols], dtype=np.float64)
+        table['volume'] = np.array([market_data[symbol][1] for symbol in table.symbols], dtype=np.float64)
+        table['volume_surge'] = table['volume'] > table['avg_volume'] * 1.2
+        table['trend'] = np.where(table['ema20'] > table['ema50'], "YUKARI", "AŞAĞI")
+        table['opportunity_score'] = self._calculate_opportunity_score(
+            table['rsi'], table['macd_hist'], table['volume_surge'],
+            table['trend'], table['volume'], table['avg_volume']
+        )
+        return table
 
     def _format_position_signal(self, position_type: str) -> str:
         """Pozisyon sinyalini formatla"""
@@ -403,19 +388,16 @@ class MarketAnalyzer:
             self.logger.debug(f"Analyzing {symbol}...")
             
             # OHLCV verilerini al - timeframe yerine interval kullan
-            ohlcv = await self.exchange.fetch_ohlcv(symbol, interval='1h', limit=100)
+            ohlcv = await get_candle_store().get_ohlcv_async(self.exchange, symbol, '1h', limit=100)
             if not ohlcv or len(ohlcv) < 100:
                 self.logger.error(f"Insufficient OHLCV data for {symbol}")
                 return None
                 
-            # Verileri numpy dizilerine dönüştür
-            closes = np.array([float(candle[4]) for candle in ohlcv])
-            volumes = np.array([float(candle[5]) for candle in ohlcv])
-            
-            # Teknik indikatörleri hesapla
-            rsi = self._calculate_rsi(closes)
-            macd, signal, hist = self._calculate_macd(closes)
-            bb_upper, bb_middle, bb_lower = self._calculate_bollinger_bands(closes)
+            # Tüm göstergeler tek geçişte; yeni mum kapanana kadar önbellekten
+            features = get_feature_cache().get_features(symbol, '1h', ohlcv)
+            closes, volumes = ie.to_columns(ohlcv)[4:6]
+            rsi, hist = features['rsi'], features['macd_hist']
+            bb_upper, bb_middle, bb_lower = (ie.last(features[k]) for k in ('bb_upper', 'bb_middle', 'bb_lower'))
             
             # Hacim analizi
             avg_volume = np.mean(volumes[-20:])
@@ -423,8 +405,7 @@ class MarketAnalyzer:
             volume_surge = current_volume > (avg_volume * 1.5)
             
             # Trend analizi
-            ema20 = self._calculate_ema(closes, 20)
-            ema50 = self._calculate_ema(closes, 50)
+            ema20, ema50 = features['ema20'], features['ema50']
             trend = "YUKARI" if ema20[-1] > ema50[-1] else "AŞAĞI"
             
             # Fırsat puanı hesapla
@@ -481,26 +462,10 @@ class MarketAnalyzer:
         except Exception as e:
             self.logger.error(f"Single coin analysis error ({symbol}): {str(e)}")
             return None
-        finally:
-            try:
-                await self.exchange.close()
-            except:
-                pass
 
     def _calculate_atr(self, prices: np.ndarray, period: int = 14) -> float:
-        """ATR (Average True Range) hesapla"""
-        high = prices
-        low = prices
-        close = prices
-        
-        tr1 = np.abs(high[1:] - low[1:])
-        tr2 = np.abs(high[1:] - close[:-1])
-        tr3 = np.abs(low[1:] - close[:-1])
-        
-        tr = np.maximum(np.maximum(tr1, tr2), tr3)
-        atr = np.mean(tr[-period:])
-        
-        return float(atr)
+        """ATR (Average True Range) hesapla - yalnızca kapanış fiyatlarıyla"""
+        return ie.last(ie.atr(prices, prices, prices, period))
 
     def _analyze_position_recommendation(self, 
                                   rsi: float, 
@@ -709,19 +674,18 @@ class MarketAnalyzer:
         """Trend gücü analizi"""
         try:
             # EMA hesapla
-            ema20 = df['close'].ewm(span=20, adjust=False).mean()
-            ema50 = df['close'].ewm(span=50, adjust=False).mean()
-            ema200 = df['close'].ewm(span=200, adjust=False).mean()
+            close = df['close'].to_numpy()
+            ema20, ema50, ema200 = (ie.last(ie.ema(close, period)) for period in (20, 50, 200))
             
             # Trend yönü ve gücü
             trend_score = 0.0
             
             # Kısa vadeli trend
-            if ema20.iloc[-1] > ema50.iloc[-1]:
+            if ema20 > ema50:
                 trend_score += 0.4
             
             # Orta vadeli trend
-            if ema50.iloc[-1] > ema200.iloc[-1]:
+            if ema50 > ema200:
                 trend_score += 0.3
             
             # Momentum
@@ -791,18 +755,8 @@ class MarketAnalyzer:
     def calculate_atr(self, df: pd.DataFrame, period: int = 14) -> float:
         """ATR (Average True Range) hesaplama"""
         try:
-            high = df['high']
-            low = df['low']
-            close = df['close']
-            
-            tr1 = high - low
-            tr2 = abs(high - close.shift())
-            tr3 = abs(low - close.shift())
-            
-            tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-            atr = tr.rolling(window=period).mean()
-            
-            return float(atr.iloc[-1])
+            atr = ie.atr(df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy(), period)
+            return ie.last(atr)
         except Exception as e:
             self.logger.error(f"ATR hesaplama hatası: {e}")
             return 0.0
@@ -923,8 +877,8 @@ class MarketAnalyzer:
             current_price = float(df['close'].iloc[-1])
             
             # EMA hesapla
-            ema20 = df['close'].ewm(span=20, adjust=False).mean()
-            ema50 = df['close'].ewm(span=50, adjust=False).mean()
+            ema20 = ie.last(ie.ema(df['close'].to_numpy(), 20))
+            ema50 = ie.last(ie.ema(df['close'].to_numpy(), 50))
             
             # RSI
             rsi = self.calculate_rsi(df)
@@ -940,9 +894,9 @@ class MarketAnalyzer:
             short_signals = 0
             
             # EMA bazlı sinyal
-            if current_price > ema20.iloc[-1] and ema20.iloc[-1] > ema50.iloc[-1]:
+            if current_price > ema20 and ema20 > ema50:
                 long_signals += 1
-            elif current_price < ema20.iloc[-1] and ema20.iloc[-1] < ema50.iloc[-1]:
+            elif current_price < ema20 and ema20 < ema50:
                 short_signals += 1
             
             # RSI bazlı sinyal
@@ -1021,328 +975,337 @@ class MarketAnalyzer:
             }
 
     async def analyze_market_parallel(self, ticker_data: list, interval: str = '4h', worker_count=None) -> list:
-        """Çoklu işlemci kullanarak piyasa analizi yapan yeni fonksiyon"""
+        """Çoklu işlemci kullanarak piyasa analizi yapan yeni fonksiyon (en iyi 10 fırsat)"""
         try:
-            # Başlangıç zamanını kaydet (performans ölçümü için)
-            import time
-            start_time = time.time()
-            
-            # Sayaçları sıfırla
-            self.analysis_stats = {key: 0 for key in self.analysis_stats}
-            self.analysis_stats['total_coins'] = len(ticker_data)
-            
-            # İşçi sayısını belirleme (eğer belirtilmemişse)
-            if worker_count is None:
-                # Sistem CPU sayısına göre işçi sayısını belirle (CPU sayısı - 1)
-                worker_count = max(1, multiprocessing.cpu_count() - 1)
-                # İşlemci sayısını 6 ile sınırla (daha fazla işlemci genellikle daha yavaş olabilir)
-                worker_count = min(worker_count, 6)
-            
-            # DEBUG: İşlemci bilgilerini logla
-            self.logger.info(f"🔍 Toplam {len(ticker_data)} coin {worker_count} işlemci ile taranıyor...")
-            self.logger.info(f"🖥️  Sistem toplam CPU sayısı: {multiprocessing.cpu_count()}")
-            
-            # Tüm USDT çiftlerini al (filtreleme olmadan)
-            # Blacklist tanımla - FIAT paralar ve istenmeyenler
-            blacklist = [
-                "EURUSDT", "GBPUSDT", "TRYUSDT", "USDTBRL", "USDTRUB", "AUDUSDT", "CADUSDT",
-                "JPYUSDT", "CNHUSDT", "CHFUSDT", "AUDUSDT", "NZDSUSDT", "RUBUSDT", "BUSDUSDT",
-                "TUSDUSDT", "USDCUSDT", "DAIUSDT", "FDUSDUSDT", "PYUSDUSDT", "BRLBIDR", "BRLRUB",
-                "USDTBKRW", "EURUSDC", "IDRTUSDT", "UAHUSDT", "VAIUSDT", "NGNUSDT", "BIDRUSDT", "BVNDUSDT", "BKRWUSDT"
-            ]
-            
-            # Kaldıraçlı ve hatalı tokenlar için pattern'ler
-            blacklist_patterns = [
-                "UP", "DOWN", "BULL", "BEAR"
-            ]
-            
-            # Tüm USDT çiftlerini al, ancak blacklist'tekileri ve blacklist pattern'leri hariç tut
-            usdt_pairs = []
-            filtered_out_count = 0
-            
-            for ticker in ticker_data:
-                symbol = ticker['symbol']
-                if symbol.endswith('USDT'):
-                    # Blacklist kontrolü
-                    if symbol in blacklist:
-                        filtered_out_count += 1
-                        continue
-                        
-                    # Blacklist pattern kontrolü
-                    if any(pattern in symbol for pattern in blacklist_patterns):
-                        filtered_out_count += 1
-                        continue
-                        
-                    usdt_pairs.append(ticker)
-            
-            self.logger.info(f"📊 Toplam {len(usdt_pairs)} geçerli USDT çifti bulundu (blacklist'ten {filtered_out_count} coin filtrelendi)")
-            
-            self.analysis_stats['valid_pairs'] = len(usdt_pairs)
-            
-            # Ön filtreleme (fiyat ve hacim) - Multi-threaded yaparak hızlandırma
-            filtered_pairs = []
-            
-            def filter_pair(ticker):
-                try:
-                    current_price = float(ticker['lastPrice'])
-                    current_volume = float(ticker['quoteVolume'])
-                    
-                    if current_price < self.min_price:
-                        return None
-                    if current_volume < self.min_volume:
-                        return None
-                    return ticker
-                except:
-                    return None
-            
-            # Thread havuzu ile filtreleme - ana threadleri bloklamadan
-            # Önceki ve sonraki işlemlerle paralellik için
-            import threading
-            filter_results = []
-            
-            def filter_batch(batch):
-                results = []
-                for ticker in batch:
-                    result = filter_pair(ticker)
-                    if result:
-                        results.append(result)
-                filter_results.extend(results)
-            
-            # Çok büyük veri kümeleri için thread'lere böl
-            batch_size = len(usdt_pairs) // 4  # 4 thread kullan
-            batches = [usdt_pairs[i:i+batch_size] for i in range(0, len(usdt_pairs), batch_size)]
-            
-            threads = []
-            for batch in batches:
-                thread = threading.Thread(target=filter_batch, args=(batch,))
-                threads.append(thread)
-                thread.start()
-                
-            # Tüm threadlerin tamamlanmasını bekle
-            for thread in threads:
-                thread.join()
-                
-            filtered_pairs = filter_results
-            
-            # Filtreleme istatistiklerini hesapla
-            self.analysis_stats['price_filtered'] = 0
-            self.analysis_stats['volume_filtered'] = 0
-            for ticker in usdt_pairs:
-                try:
-                    if ticker not in filtered_pairs:
-                        current_price = float(ticker['lastPrice'])
-                        current_volume = float(ticker['quoteVolume'])
-                        
-                        if current_price < self.min_price:
-                            self.analysis_stats['price_filtered'] += 1
-                        elif current_volume < self.min_volume:
-                            self.analysis_stats['volume_filtered'] += 1
-                except Exception as e:
-                    continue
-            
-            # İşlemci başına batch hesaplama - load dengesini daha iyi sağlamak için
-            # Not: Büyük batche düşük işlemci sayısı daha iyi olabilir
-            if len(filtered_pairs) < worker_count * 5:
-                # Çok az coin varsa worker sayısını azalt
-                worker_count = max(1, len(filtered_pairs) // 3)
-                self.logger.info(f"⚠️  Çok az coin var. İşlemci sayısı {worker_count}'e düşürüldü.")
-            
-            # İşlemci başına düşen coin sayısını optimize etmek için batch size'i ayarla
-            batch_size = max(1, min(10, len(filtered_pairs) // worker_count))
-            batches = []
-            
-            # Daha akıllı load balancing - hacime göre sırala ve dağıt
-            # Böylece her işlemciye hem yüksek hem düşük hacimli coinler düşer
-            filtered_pairs.sort(key=lambda x: float(x['quoteVolume']), reverse=True)
-            
-            # Hacim sıralı listeyi işlemcilere dağıt
-            for i in range(worker_count):
-                batch = filtered_pairs[i::worker_count]  # Her işlemciye bir coin atla
-                if batch:  # Boş batch oluşturma
-                    batches.append(batch)
-            
-            if not filtered_pairs:
-                self.logger.warning("Filtreleme sonrası coin kalmadı!")
-                return []
-                
-            self.logger.info(f"📌 Filtreleme sonrası {len(filtered_pairs)} coin analiz edilecek")
-            self.logger.info(f"🛠️  {len(batches)} batch oluşturuldu (işlemci başına ~{len(filtered_pairs)/max(1, len(batches)):.1f} coin)")
-            
-            # Analiz işlemini paralel olarak çalıştır
-            loop = asyncio.get_event_loop()
-            
-            opportunities = []
-            with concurrent.futures.ProcessPoolExecutor(max_workers=worker_count) as executor:
-                # Her batch için _analyze_batch fonksiyonunu çağır
-                analyze_batch_partial = partial(self._analyze_batch, interval=interval)
-                
-                # Senkronize edilerek yapılan RPC çağrısını ölç
-                batch_start_time = time.time()
-                batch_results = await loop.run_in_executor(
-                    None,
-                    lambda: list(executor.map(analyze_batch_partial, batches))
-                )
-                batch_end_time = time.time()
-                batch_elapsed = batch_end_time - batch_start_time
-                
-                # İşlemci başına süreyi hesapla
-                self.logger.info(f"⏱️  Paralel işlemler {batch_elapsed:.2f} saniyede tamamlandı (işlemci başına ~{batch_elapsed/max(1, len(batches)):.2f}s)")
-                
-                # DEBUG: işlemci başına analiz edilecek coin sayısını logla
-                for i, batch in enumerate(batches):
-                    self.logger.debug(f"Worker {i+1}: {len(batch)} coin analiz edilecek")
-                
-                # Sonuçları birleştir
-                for i, batch_result in enumerate(batch_results):
-                    # DEBUG: Her işlemcinin sonuçlarını logla
-                    self.logger.debug(f"Worker {i+1} Sonucu: {len(batch_result['opportunities'])} fırsat bulundu, " + 
-                                 f"Başarılı: {batch_result['stats']['success']}, " + 
-                                 f"Başarısız: {batch_result['stats']['failed']}")
-                    
-                    opportunities.extend(batch_result['opportunities'])
-                    
-                    # İstatistikleri güncelle
-                    self.analysis_stats['analysis_success'] += batch_result['stats']['success']
-                    self.analysis_stats['analysis_failed'] += batch_result['stats']['failed']
-                
-            # Süre hesaplama
-            end_time = time.time()
-            elapsed_time = end_time - start_time
-            
-            # Analiz istatistiklerini logla
-            self.logger.info("\n📊 TARAMA İSTATİSTİKLERİ:")
-            self.logger.info(f"📌 Toplam Coin: {self.analysis_stats['total_coins']}")
-            self.logger.info(f"✅ Geçerli USDT Çiftleri: {self.analysis_stats['valid_pairs']}")
-            self.logger.info(f"💰 Fiyat Filtresi: {self.analysis_stats['price_filtered']}")
-            self.logger.info(f"📊 Hacim Filtresi: {self.analysis_stats['volume_filtered']}")
-            self.logger.info(f"✨ Başarılı Analiz: {self.analysis_stats['analysis_success']}")
-            self.logger.info(f"❌ Başarısız Analiz: {self.analysis_stats['analysis_failed']}")
-            self.logger.info(f"⏱️ Toplam Süre: {elapsed_time:.2f} saniye ({worker_count} işlemci ile)")
-            
-            # Fırsatları puana göre sırala
-            opportunities.sort(key=lambda x: x['opportunity_score'], reverse=True)
-            
-            if opportunities:
-                self.logger.info(f"🎯 Bulunan Fırsat Sayısı: {len(opportunities)}")
-            else:
-                self.logger.info("❌ Fırsat bulunamadı")
-            
-            return opportunities[:10]  # En iyi 10 fırsatı döndür
+            top = []
+            async with aclosing(self.analyze_market_stream(ticker_data, interval, worker_count, top_k=10)) as updates:
+                async for update in updates:
+                    top = update['top']
+            return top
             
         except Exception as e:
             self.logger.error(f"Parallel market analysis error: {str(e)}")
             return []
-        finally:
-            try:
-                await self.exchange.close()
-            except:
-                pass
 
-    def _analyze_batch(self, batch: list, interval: str = '4h'):
-        """Bir batch içindeki coinleri seri olarak analiz et - Process havuzunda çalışır"""
-        import ccxt  # Yeni process için gereken importlar
-        import pandas as pd
-        import numpy as np
-        import concurrent.futures
-        import time
+    async def analyze_market_stream(self, ticker_data: list, interval: str = '4h', worker_count=None,
+                                    top_k: int = 10, prefilter: bool = True) -> AsyncIterator[Dict]:
+        """
+        analyze_market_parallel'in akış sürümü: her parça puanlandığı anda ilerleme verir.
+        
+        prefilter açıksa (ve SCAN_PREFILTER_TOP_K > 0 ise) filtreden geçen evren önce
+        ticker verisiyle puanlanır; mumlar yalnızca ilk K aday için çekilir.
+
+        Tüketici döngüden erken çıkıp üreteci kapatırsa (aclose) bekleyen
+        getirme ve puanlama işleri iptal edilir.
         
+        Yields:
+            {'new': bu parçada bulunan fırsatlar, 'top': puana göre ilk top_k fırsat,
+             'found': toplam fırsat, 'scanned': işlenen coin, 'total': filtre sonrası coin,
+             'elapsed': geçen süre (s)}
+        """
+        # Başlangıç zamanını kaydet (performans ölçümü için)
         start_time = time.time()
-        opportunities = []
-        stats = {'success': 0, 'failed': 0}
         
-        # API çağrı sayısını azaltmak için bir exchange nesnesi oluştur
-        exchange = ccxt.binance({
-            'enableRateLimit': True,
-            'options': {'defaultType': 'spot'}
-        })
+        # Sayaçları sıfırla
+        self.analysis_stats = {key: 0 for key in self.analysis_stats}
+        self.analysis_stats['total_coins'] = len(ticker_data)
         
-        # Eş zamanlı işlem
-        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as thread_executor:
-            # API çağrılarını eş zamanlı yap
-            future_to_symbol = {}
-            
-            for ticker in batch:
-                symbol = ticker['symbol']
-                future = thread_executor.submit(
-                    self._analyze_single_coin_data, 
-                    exchange, 
-                    symbol, 
-                    interval, 
-                    float(ticker['lastPrice']),
-                    float(ticker['quoteVolume'])
-                )
-                future_to_symbol[future] = symbol
-                
-            # Tüm sonuçları topla
-            for future in concurrent.futures.as_completed(future_to_symbol):
-                symbol = future_to_symbol[future]
-                try:
-                    result = future.result()
-                    if result:
-                        opportunities.append(result)
-                        stats['success'] += 1
-                    else:
-                        stats['failed'] += 1
-                except Exception as e:
-                    stats['failed'] += 1
+        # İşçi sayısını belirleme (eğer belirtilmemişse)
+        if worker_count is None:
+            # Kalıcı işçi havuzunun boyutu (varsayılan CPU sayısı - 1, en fazla 6; SCAN_WORKERS ile değişir)
+            worker_count = get_worker_pool().max_workers
         
-        end_time = time.time()
-        elapsed = end_time - start_time
+        # DEBUG: İşlemci bilgilerini logla
+        self.logger.info(f"🔍 Toplam {len(ticker_data)} coin {worker_count} işlemci ile taranıyor...")
+        self.logger.info(f"🖥️  Sistem toplam CPU sayısı: {multiprocessing.cpu_count()}")
         
-        # Peformanns debug bilgisi
-        print(f"Batch of {len(batch)} coins processed in {elapsed:.2f}s - Success: {stats['success']}, Failed: {stats['failed']}")
+        filtered_pairs = self._filter_scan_universe(ticker_data)
+        if not filtered_pairs:
+            self.logger.warning("Filtreleme sonrası coin kalmadı!")
+            return
         
-        return {'opportunities': opportunities, 'stats': stats}
-    
-    def _analyze_single_coin_data(self, exchange, symbol, interval, current_price, current_volume):
-        """Tek bir coin için analiz işlemi yap - Thread içinde çalışır"""
+        if prefilter and self.prefilter.enabled:
+            universe = len(filtered_pairs)
+            filtered_pairs = self.prefilter.select(filtered_pairs)
+            self.analysis_stats['prefilter_dropped'] = universe - len(filtered_pairs)
+            self.logger.info(f"🎯 Ön filtre: {universe} coin içinden {len(filtered_pairs)} aday derin analize alındı")
+        
+        # Yüksek hacimli coinler önce çekilir ve puanlanır
+        filtered_pairs.sort(key=lambda x: float(x['quoteVolume']), reverse=True)
+        self.logger.info(f"📌 Filtreleme sonrası {len(filtered_pairs)} coin analiz edilecek")
+        
+        # G/Ç aşaması ana döngüde (sınırlı eşzamanlılık, tek rate limit noktası: gateway),
+        # CPU aşaması kalıcı işçi havuzunda; aradaki sınırlı kuyruk geri basınç sağlar
+        pool = get_worker_pool()
+        scan_usage = pool.snapshot()
+        arena = self._open_scan_arena()
+        pipeline = self._build_scan_pipeline(pool, interval, worker_count, arena)
+        
+        opportunities = []
+        scored = 0
         try:
-            # OHLCV verileri al
+            async with aclosing(pipeline.stream(filtered_pairs)) as batches:
+                async for batch_result in batches:
+                    opportunities.extend(batch_result['opportunities'])
+                    scored += batch_result['stats']['scored'] + batch_result['stats']['failed']
+                    self.analysis_stats['analysis_success'] += batch_result['stats']['scored']
+                    yield {
+                        'new': batch_result['opportunities'],
+                        'top': heapq.nlargest(top_k, opportunities, key=lambda x: x['opportunity_score']),
+                        'found': len(opportunities),
+                        'scanned': scored + pipeline.stats['skipped'] + pipeline.stats['fetch_errors'],
+                        'total': len(filtered_pairs),
+                        'elapsed': time.time() - start_time,
+                    }
+        finally:
+            if arena is not None:
+                arena.close()
+            # Başarısız: getirme hatası + getirilip puanlanamayan (puanlama veya parça hatası);
+            # yetersiz mumlu semboller ayrıca sayılır
+            self.analysis_stats['data_skipped'] = pipeline.stats['skipped']
+            self.analysis_stats['analysis_failed'] = (pipeline.stats['fetch_errors'] + pipeline.stats['fetched']
+                                                      - self.analysis_stats['analysis_success'])
+            self._log_scan_summary(pipeline, pool, scan_usage, arena, start_time, worker_count, len(opportunities))
+
+    async def measure_prefilter_recall(self, ticker_data: list, interval: str = '4h', top_n: int = 10) -> Dict:
+        """
+        Ön filtrenin isabetini ölç: ön filtresiz tam tarama yapar ve tam taramanın
+        ilk top_n fırsatından kaçının aday listesinde olduğunu hesaplar (maliyetli, ara sıra çalıştırın).
+        
+        Returns:
+            {'recall', 'top_n', 'candidates', 'universe', 'missed': aday dışında kalan semboller}
+        """
+        universe = self._filter_scan_universe(ticker_data)
+        candidates = {ticker['symbol'] for ticker in self.prefilter.select(universe)}
+        
+        found = []
+        async with aclosing(self.analyze_market_stream(ticker_data, interval, top_k=top_n, prefilter=False)) as updates:
+            async for update in updates:
+                found.extend(update['new'])
+        
+        recall = prefilter_recall(candidates, found, top_n)
+        self.prefilter.record_recall(recall)
+        best = heapq.nlargest(top_n, found, key=lambda x: x['opportunity_score'])
+        missed = [opp['symbol'] for opp in best if opp['symbol'] not in candidates]
+        self.logger.info(f"🎯 Ön filtre isabeti ({interval}): ilk {top_n} fırsatın %{recall * 100:.0f}'i "
+                         f"{len(candidates)}/{len(universe)} aday içinde" + (f", kaçan: {', '.join(missed)}" if missed else ""))
+        return {'recall': recall, 'top_n': top_n, 'candidates': len(candidates), 'universe': len(universe),
+                'missed': missed}
+
+    def _log_scan_summary(self, pipeline, pool, scan_usage, arena, start_time, worker_count, found):
+        """Taramanın boru hattı, işçi kullanımı ve filtre istatistiklerini logla"""
+        elapsed_time = time.time() - start_time
+        self.logger.info(f"⏱️  Getirme + puanlama {elapsed_time:.2f} saniyede tamamlandı "
+                         f"({pipeline.stats['fetched']} mum seti, {pipeline.stats['chunks']} parça, "
+                         f"kuyrukta en fazla {pipeline.stats['max_queue']} parça, "
+                         f"geri basınç beklemesi {pipeline.stats['fetch_wait']:.2f}s)")
+        if arena is not None:
+            self.logger.info(f"🧠 Paylaşımlı bellekle {arena.stats['candles']} mum "
+                             f"({arena.stats['bytes'] / 1024:.0f} KB) işçilere aktarıldı")
+        for pid, usage in pool.utilization(since=scan_usage).items():
+            self.logger.info(f"🧵 İşçi {pid}: {usage['tasks']} görev, {usage['busy_seconds']:.2f}s meşgul "
+                             f"(kullanım %{usage['utilization'] * 100:.0f})")
+        
+        # Analiz istatistiklerini logla
+        self.logger.info("\n📊 TARAMA İSTATİSTİKLERİ:")
+        self.logger.info(f"📌 Toplam Coin: {self.analysis_stats['total_coins']}")
+        self.logger.info(f"✅ Geçerli USDT Çiftleri: {self.analysis_stats['valid_pairs']}")
+        self.logger.info(f"💰 Fiyat Filtresi: {self.analysis_stats['price_filtered']}")
+        self.logger.info(f"📊 Hacim Filtresi: {self.analysis_stats['volume_filtered']}")
+        self.logger.info(f"🎯 Ön Filtre Eleme: {self.analysis_stats['prefilter_dropped']}")
+        self.logger.info(f"⏭️ Yetersiz Veri: {self.analysis_stats['data_skipped']}")
+        self.logger.info(f"✨ Başarılı Analiz: {self.analysis_stats['analysis_success']}")
+        self.logger.info(f"❌ Başarısız Analiz: {self.analysis_stats['analysis_failed']}")
+        self.logger.info(f"⏱️ Toplam Süre: {elapsed_time:.2f} saniye ({worker_count} işlemci ile)")
+        
+        if found:
+            self.logger.info(f"🎯 Bulunan Fırsat Sayısı: {found}")
+        else:
+            self.logger.info("❌ Fırsat bulunamadı")
+
+    def _filter_scan_universe(self, ticker_data: list) -> list:
+        """Blacklist, fiyat ve hacim filtrelerinden geçen USDT çiftleri (sayaçlar analysis_stats'a yazılır)"""
+        # Tüm USDT çiftlerini al (filtreleme olmadan)
+        # Blacklist tanımla - FIAT paralar ve istenmeyenler
+        blacklist = [
+            "EURUSDT", "GBPUSDT", "TRYUSDT", "USDTBRL", "USDTRUB", "AUDUSDT", "CADUSDT",
+            "JPYUSDT", "CNHUSDT", "CHFUSDT", "AUDUSDT", "NZDSUSDT", "RUBUSDT", "BUSDUSDT",
+            "TUSDUSDT", "USDCUSDT", "DAIUSDT", "FDUSDUSDT", "PYUSDUSDT", "BRLBIDR", "BRLRUB",
+            "USDTBKRW", "EURUSDC", "IDRTUSDT", "UAHUSDT", "VAIUSDT", "NGNUSDT", "BIDRUSDT", "BVNDUSDT", "BKRWUSDT"
+        ]
+        
+        # Kaldıraçlı ve hatalı tokenlar için pattern'ler
+        blacklist_patterns = [
+            "UP", "DOWN", "BULL", "BEAR"
+        ]
+        
+        # Tüm USDT çiftlerini al, ancak blacklist'tekileri ve blacklist pattern'leri hariç tut
+        usdt_pairs = []
+        filtered_out_count = 0
+        
+        for ticker in ticker_data:
+            symbol = ticker['symbol']
+            if symbol.endswith('USDT'):
+                # Blacklist kontrolü
+                if symbol in blacklist:
+                    filtered_out_count += 1
+                    continue
+                    
+                # Blacklist pattern kontrolü
+                if any(pattern in symbol for pattern in blacklist_patterns):
+                    filtered_out_count += 1
+                    continue
+                    
+                usdt_pairs.append(ticker)
+        
+        self.logger.info(f"📊 Toplam {len(usdt_pairs)} geçerli USDT çifti bulundu (blacklist'ten {filtered_out_count} coin filtrelendi)")
+        
+        self.analysis_stats['valid_pairs'] = len(usdt_pairs)
+        
+        # Ön filtreleme (fiyat ve hacim) - Multi-threaded yaparak hızlandırma
+        filtered_pairs = []
+        
+        def filter_pair(ticker):
             try:
-                ohlcv = exchange.fetch_ohlcv(symbol, interval, limit=50)
-                if not ohlcv or len(ohlcv) < 30:
-                    return None
+                current_price = float(ticker['lastPrice'])
+                current_volume = float(ticker['quoteVolume'])
                 
-                # DataFrame oluştur (gelişmiş stop/loss hesaplaması için)
-                df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-                
-            except Exception as e:
+                if current_price < self.min_price:
+                    return None
+                if current_volume < self.min_volume:
+                    return None
+                return ticker
+            except:
                 return None
+        
+        # Thread havuzu ile filtreleme - ana threadleri bloklamadan
+        # Önceki ve sonraki işlemlerle paralellik için
+        import threading
+        filter_results = []
+        
+        def filter_batch(batch):
+            results = []
+            for ticker in batch:
+                result = filter_pair(ticker)
+                if result:
+                    results.append(result)
+            filter_results.extend(results)
+        
+        # Çok büyük veri kümeleri için thread'lere böl
+        batch_size = max(1, len(usdt_pairs) // 4)  # 4 thread kullan
+        batches = [usdt_pairs[i:i+batch_size] for i in range(0, len(usdt_pairs), batch_size)]
+        
+        threads = []
+        for batch in batches:
+            thread = threading.Thread(target=filter_batch, args=(batch,))
+            threads.append(thread)
+            thread.start()
             
-            # Temel hesaplamalar
-            closes = np.array([float(candle[4]) for candle in ohlcv])
-            volumes = np.array([float(candle[5]) for candle in ohlcv])
-            
-            # Teknik indikatörler
-            indicators = self._calculate_technical_indicators(closes, volumes)
-            
-            # Hacim analizi
-            volume_analysis = self._analyze_volume(current_volume, volumes)
+        # Tüm threadlerin tamamlanmasını bekle
+        for thread in threads:
+            thread.join()
             
-            # Fırsat puanı hesapla
-            opportunity_score = self._calculate_opportunity_score(
-                indicators['rsi'][-1],
-                indicators['macd_hist'][-1],
-                volume_analysis['volume_surge'],
-                indicators['trend'],
-                current_volume,
-                volume_analysis['avg_volume']
-            )
-            
-            if opportunity_score < 40:
+        filtered_pairs = filter_results
+        
+        # Filtreleme istatistiklerini hesapla
+        self.analysis_stats['price_filtered'] = 0
+        self.analysis_stats['volume_filtered'] = 0
+        for ticker in usdt_pairs:
+            try:
+                if ticker not in filtered_pairs:
+                    current_price = float(ticker['lastPrice'])
+                    current_volume = float(ticker['quoteVolume'])
+                    
+                    if current_price < self.min_price:
+                        self.analysis_stats['price_filtered'] += 1
+                    elif current_volume < self.min_volume:
+                        self.analysis_stats['volume_filtered'] += 1
+            except Exception as e:
+                continue
+        
+        return filtered_pairs
+
+    def _build_scan_pipeline(self, pool, interval: str, worker_count: int,
+                             arena: Optional[OHLCVArena] = None) -> ScanPipeline:
+        """
+        Tarama boru hattı: ticker -> (sembol, mumlar, piyasa verisi) -> işçide puanlama
+        
+        Args:
+            arena: Verilirse mumlar işçilere pickle yerine paylaşımlı bellek üzerinden aktarılır
+        """
+        async def fetch(ticker):
+            ohlcv = await self._fetch_coin_ohlcv(ticker['symbol'], interval)
+            if ohlcv is None:
                 return None
+            return ticker['symbol'], ohlcv, (float(ticker['lastPrice']), float(ticker['quoteVolume']))
+
+        async def process(chunk):
+            ohlcv_by_symbol = {symbol: ohlcv for symbol, ohlcv, _ in chunk}
+            market_data = {symbol: data for symbol, _, data in chunk}
+            if arena is None:
+                return await pool.run(score_ohlcv_batch, interval, ohlcv_by_symbol, market_data)
+            # Mumlar paylaşımlı belleğe yazılır, işçiye yalnızca bloğun konumu gider
+            packed = await pool.run(score_ohlcv_block, interval, arena.write(ohlcv_by_symbol), market_data)
+            return {'opportunities': unpack_records(packed['opportunities']), 'stats': packed['stats']}
+
+        return ScanPipeline(fetch, process,
+                            fetch_concurrency=int(os.getenv('SCAN_FETCH_CONCURRENCY', '8')),
+                            chunk_size=10, consumers=worker_count)
+    
+    def _open_scan_arena(self) -> Optional[OHLCVArena]:
+        """Tarama için paylaşımlı bellek arenası (SCAN_SHARED_MEMORY=0 ise veya açılamazsa None)"""
+        if os.getenv('SCAN_SHARED_MEMORY', '1') == '0':
+            return None
+        try:
+            return OHLCVArena()
+        except OSError as e:
+            self.logger.warning(f"Paylaşımlı bellek arenası açılamadı, pickle kullanılacak: {str(e)}")
+            return None
+    
+    async def _fetch_coin_ohlcv(self, symbol, interval):
+        """Tek bir coin için OHLCV verisi al; veri yetersizse None (hatalar boru hattında sayılır)"""
+        ohlcv = await get_candle_store().get_array_async(self.exchange, symbol, interval, limit=50)
+        if not ohlcv or len(ohlcv) < 30:
+            return None
+        return ohlcv
+
+    def _score_batch(self, ohlcv_by_symbol: Dict, market_data: Dict[str, Tuple[float, float]],
+                     interval: str) -> Dict:
+        """Mumlardan fırsat kayıtları üret - işçi süreçte çalışır (bkz. score_ohlcv_batch)"""
+        opportunities = []
+        scored = 0
+        try:
+            # Göstergeler ve puanlar tüm batch için tek seferde (sembol × mum matrisleri)
+            table = self._build_scan_table(ohlcv_by_symbol, market_data, min_length=30,
+                                           volume_window=10, timeframe=interval)
+            scored = len(table)
+            candidates = table.select(table['opportunity_score'] >= 40) if len(table) else table
+            for row in candidates.rows():
+                result = self._build_opportunity_result(row, ohlcv_by_symbol[row['symbol']])
+                if result:
+                    opportunities.append(result)
+        except Exception as e:
+            self.logger.error(f"Batch analysis error: {str(e)}")
+        
+        return {'opportunities': opportunities,
+                'stats': {'scored': scored, 'failed': len(market_data) - scored}}
+    
+    def _build_opportunity_result(self, row: Dict, ohlcv) -> Optional[Dict]:
+        """Puan eşiğini geçen tablo satırı için fırsat sonucunu oluştur"""
+        try:
+            current_price = row['price']
             
             # Pozisyon önerisi
             position_rec = self._analyze_position_recommendation(
-                indicators['rsi'][-1], 
-                indicators['macd_hist'][-1],
-                indicators['ema20'][-1],
-                indicators['ema50'][-1],
-                indicators['bb_upper'],
-                indicators['bb_lower'],
+                row['rsi'], 
+                row['macd_hist'],
+                row['ema20'],
+                row['ema50'],
+                row['bb_upper'],
+                row['bb_lower'],
                 current_price,
-                opportunity_score,
-                volume_analysis['volume_surge']
+                row['opportunity_score'],
+                row['volume_surge']
             )
             
             # Gelişmiş stop/loss ve take profit hesapla
@@ -1350,30 +1313,32 @@ class MarketAnalyzer:
             actual_position_type = "LONG" if "LONG" in position_rec['position'] else "SHORT" if "SHORT" in position_rec['position'] else "NEUTRAL"
             
             if actual_position_type in ["LONG", "SHORT"]:
+                # DataFrame yalnızca gelişmiş stop/loss hesaplaması gerektiğinde oluşturulur
+                df = pd.DataFrame(ie.to_columns(ohlcv).T, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
                 risk_management = self.calculate_advanced_stoploss(df, current_price, actual_position_type)
             
             # Sonuç oluştur
             result = {
-                'symbol': symbol,
+                'symbol': row['symbol'],
                 'price': current_price,
-                'volume': current_volume,
-                'rsi': float(indicators['rsi'][-1]),
-                'macd': float(indicators['macd_hist'][-1]),
-                'trend': indicators['trend'],
-                'volume_surge': volume_analysis['volume_surge'],
-                'opportunity_score': float(opportunity_score),
-                'signal': self._determine_signal(opportunity_score, indicators['rsi'][-1], indicators['trend']),
+                'volume': row['volume'],
+                'rsi': row['rsi'],
+                'macd': row['macd_hist'],
+                'trend': row['trend'],
+                'volume_surge': row['volume_surge'],
+                'opportunity_score': row['opportunity_score'],
+                'signal': self._determine_signal(row['opportunity_score'], row['rsi'], row['trend']),
                 'position_recommendation': position_rec['position'],
                 'position_confidence': position_rec['confidence'],
                 'recommended_leverage': position_rec['leverage'],
                 'risk_level': position_rec['risk_level'],
                 'analysis_reasons': position_rec['reasons'],
                 'score': position_rec['score'],
-                'ema20': float(indicators['ema20'][-1]),
-                'ema50': float(indicators['ema50'][-1]),
-                'bb_upper': float(indicators['bb_upper']),
-                'bb_middle': float(indicators['bb_middle']),
-                'bb_lower': float(indicators['bb_lower'])
+                'ema20': row['ema20'],
+                'ema50': row['ema50'],
+                'bb_upper': row['bb_upper'],
+                'bb_middle': row['bb_middle'],
+                'bb_lower': row['bb_lower']
             }
             
             # Risk yönetimi bilgilerini ekle
@@ -1392,195 +1357,6 @@ class MarketAnalyzer:
         except Exception as e:
             return None
 
-    def _calculate_technical_indicators(self, closes: np.ndarray, volumes: np.ndarray) -> Dict:
-        """Tüm teknik indikatörleri tek bir fonksiyonda hesapla"""
-        try:
-            # RSI
-            rsi = self._calculate_rsi_quick(closes)
-            
-            # MACD
-            macd, signal, hist = self._calculate_macd_quick(closes)
-            
-            # Bollinger Bands
-            bb_upper, bb_middle, bb_lower = self._calculate_bollinger_bands_quick(closes)
-            
-            # EMA
-            ema20 = self._calculate_ema_quick(closes, 20)
-            ema50 = self._calculate_ema_quick(closes, 50)
-            
-            # Trend
-            trend = "YUKARI" if ema20[-1] > ema50[-1] else "AŞAĞI"
-            
-            return {
-                'rsi': rsi,
-                'macd': macd,
-                'macd_signal': signal,
-                'macd_hist': hist,
-                'bb_upper': bb_upper,
-                'bb_middle': bb_middle,
-                'bb_lower': bb_lower,
-                'ema20': ema20,
-                'ema50': ema50,
-                'trend': trend
-            }
-        except Exception as e:
-            self.logger.error(f"Teknik indikatör hesaplama hatası: {e}")
-            return None
-
-    def _analyze_volume(self, current_volume: float, volumes: np.ndarray) -> Dict:
-        """Hacim analizini tek bir fonksiyonda yap"""
-        try:
-            avg_volume = np.mean(volumes[-10:])
-            volume_surge = current_volume > (avg_volume * 1.2)
-            
-            return {
-                'avg_volume': avg_volume,
-                'volume_surge': volume_surge,
-                'volume_ratio': current_volume / avg_volume if avg_volume > 0 else 1
-            }
-        except Exception as e:
-            self.logger.error(f"Hacim analizi hatası: {e}")
-            return {
-                'avg_volume': 0,
-                'volume_surge': False,
-                'volume_ratio': 1
-            }
-
-    def _calculate_rsi_quick(self, prices, period=14):
-        # Orijinal metot ile aynı ama optimize edildi
-        # Son verileri kullanarak hızlı hesaplama
-        deltas = np.diff(prices[-period-10:])  # Son periyot+10 veri al
-        seed = deltas[:period+1]
-        up = seed[seed >= 0].sum()/period
-        down = -seed[seed < 0].sum()/period
-        rs = up/down if down != 0 else 0
-        rsi = np.zeros(len(prices[-period-10:]))
-        rsi[:period] = 100. - 100./(1.+rs)
-
-        for i in range(period, len(prices[-period-10:])):
-            delta = deltas[i-1]
-            if delta > 0:
-                upval = delta
-                downval = 0.
-            else:
-                upval = 0.
-                downval = -delta
-
-            up = (up*(period-1) + upval)/period
-            down = (down*(period-1) + downval)/period
-            rs = up/down if down != 0 else 0
-            rsi[i] = 100. - 100./(1.+rs)
-
-        return rsi[-5:]
-
-    def _calculate_macd_quick(self, prices):
-        # Karsılaştırma için son verileri al
-        prices_subset = prices[-40:]  # Son 40 veri yeterli
-        exp1 = pd.Series(prices_subset).ewm(span=12, adjust=False).mean()
-        exp2 = pd.Series(prices_subset).ewm(span=26, adjust=False).mean()
-        macd = exp1 - exp2
-        signal = macd.ewm(span=9, adjust=False).mean()
-        hist = macd - signal
-        return macd.values, signal.values, hist.values
-
-    def _calculate_bollinger_bands_quick(self, prices, period=20):
-        # Son verileri kullanarak BB hesapla
-        prices_subset = prices[-period-5:]  # Son period+5 veri
-        sma = np.mean(prices_subset[-period:])
-        std = np.std(prices_subset[-period:])
-        upper = sma + (std * 2)
-        lower = sma - (std * 2)
-        return upper, sma, lower
-
-    def _calculate_ema_quick(self, prices, period):
-        # Son verileri kullanarak EMA hesapla
-        prices_subset = prices[-period-15:]  # Son period+15 veri
-        return pd.Series(prices_subset).ewm(span=period, adjust=False).mean().values
-
-    def _calculate_opportunity_score_quick(self, rsi, macd, volume_surge, trend,
-                                   current_volume, avg_volume):
-        # Basitleştirilmiş fırsat puanı hesaplama
-        score = 0
-        
-        # RSI bazlı puan (0-30)
-        if rsi < 30:  # Aşırı satım
-            score += 30
-        elif rsi > 70:  # Aşırı alım
-            score += 10
-        else:
-            score += 20
-            
-        # MACD bazlı puan (0-20)
-        if macd > 0:
-            score += 20
-        elif macd < 0:
-            score += 5
-        
-        # Hacim bazlı puan (0-30)
-        if volume_surge:
-            score += 30
-        else:
-            score += 20 if current_volume > avg_volume else 10
-            
-        # Trend bazlı puan (0-20)
-        if trend == "YUKARI":
-            score += 20
-        else:
-            score += 10
-            
-        return min(100, score)
-
-    def _analyze_position_recommendation_quick(self, 
-                                       rsi, 
-                                       macd, 
-                                       ema20,
-                                       ema50,
-                                       bb_upper,
-                                       bb_lower,
-                                       current_price,
-                                       opportunity_score,
-                                       volume_surge):
-        # Basitleştirilmiş pozisyon önerisi
-        is_bullish = (ema20 > ema50) or (rsi < 40) or (macd > 0)
-        is_bearish = (ema20 < ema50) or (rsi > 60) or (macd < 0)
-        
-        if rsi < 30 and current_price < (bb_lower * 1.05):
-            position_type = "STRONG_LONG"
-            confidence = 3
-            reasons = ["RSI aşırı satım bölgesinde", "Fiyat BB alt bandının altında"]
-        elif rsi > 70 and current_price > (bb_upper * 0.95):
-            position_type = "STRONG_SHORT"
-            confidence = 3
-            reasons = ["RSI aşırı alım bölgesinde", "Fiyat BB üst bandının üstünde"]
-        elif is_bullish and not is_bearish:
-            position_type = "LONG"
-            confidence = 2
-            reasons = ["Eğilim yükseliyor"]
-        elif is_bearish and not is_bullish:
-            position_type = "SHORT"
-            confidence = 2
-            reasons = ["Eğilim düşüyor"]
-        else:
-            position_type = "NEUTRAL"
-            confidence = 1
-            reasons = ["Net bir eğilim yok"]
-            
-        # Kaldıraç önerisi
-        leverage = 2  # Varsayılan düşük kaldıraç
-        if opportunity_score > 80:
-            leverage = 10
-        elif opportunity_score > 60:
-            leverage = 5
-            
-        return {
-            'position': position_type,
-            'confidence': confidence,
-            'leverage': leverage,
-            'reasons': reasons,
-            'risk_level': "YÜKSEK" if leverage > 5 else "ORTA",
-            'score': opportunity_score
-        }
-
     def _generate_signal(self, rsi: float, macd: float, price: float, bb_upper: float, bb_lower: float) -> str:
         """Sinyal üret"""
         try:
@@ -1658,45 +1434,21 @@ class MarketAnalyzer:
         """
         try:
             # OHLCV verilerini al
-            ohlcv = await self.exchange.fetch_ohlcv(symbol, timeframe, limit=100)
+            candles = await get_candle_store().get_array_async(self.exchange, symbol, timeframe, limit=100)
             
-            if not ohlcv or len(ohlcv) < 20:
+            if not candles or len(candles) < 20:
                 self.logger.error(f"{symbol} için yeterli veri bulunamadı")
                 return None
                 
-            # DataFrame oluştur
-            df = pd.DataFrame(
-                ohlcv,
-                columns=['timestamp', 'open', 'high', 'low', 'close', 'volume']
-            )
-            
-            # Timestamp'i datetime'a çevir
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            df.set_index('timestamp', inplace=True)
+            # DataFrame yalnızca grafik için oluşturulur (timestamp index)
+            df = candles.to_dataframe(index=True)
             
-            # Teknik indikatörleri hesapla
-            ema20 = EMAIndicator(close=df['close'], window=20)
-            ema50 = EMAIndicator(close=df['close'], window=50)
-            ema200 = EMAIndicator(close=df['close'], window=200)
-            df['EMA20'] = ema20.ema_indicator()
-            df['EMA50'] = ema50.ema_indicator()
-            df['EMA200'] = ema200.ema_indicator()
-            
-            # RSI
-            rsi = RSIIndicator(close=df['close'])
-            df['RSI'] = rsi.rsi()
-            
-            # Bollinger Bands
-            bb = BollingerBands(close=df['close'])
-            df['BB_UPPER'] = bb.bollinger_hband()
-            df['BB_MIDDLE'] = bb.bollinger_mavg()
-            df['BB_LOWER'] = bb.bollinger_lband()
-            
-            # MACD
-            exp1 = df['close'].ewm(span=12, adjust=False).mean()
-            exp2 = df['close'].ewm(span=26, adjust=False).mean()
-            df['MACD'] = exp1 - exp2
-            df['MACD_SIGNAL'] = df['MACD'].ewm(span=9, adjust=False).mean()
+            # Teknik indikatörleri hesapla (tek geçişte, diğer analizlerle aynı tanımlar)
+            features = ie.compute_features(candles)
+            for column, name in (('EMA20', 'ema20'), ('EMA50', 'ema50'), ('EMA200', 'ema200'), ('RSI', 'rsi'),
+                                 ('BB_UPPER', 'bb_upper'), ('BB_MIDDLE', 'bb_middle'), ('BB_LOWER', 'bb_lower'),
+                                 ('MACD', 'macd'), ('MACD_SIGNAL', 'macd_signal')):
+                df[column] = features[name]
             
             # Grafik ayarları
             mc = mpf.make_marketcolors(
@@ -1779,29 +1531,32 @@ class MarketAnalyzer:
             return None
 
     def calculate_rsi(self, prices, period=14):
-        """RSI hesapla"""
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        return 100 - (100 / (1 + rs))
+        """
+        RSI hesapla.
+        
+        DataFrame verilirse son değeri (float), Series verilirse Series,
+        dizi verilirse dizi döndürür.
+        """
+        if isinstance(prices, pd.DataFrame):
+            return ie.last(ie.rsi(prices['close'].to_numpy(), period), default=50.0)
+        return self._like(prices, ie.rsi(np.asarray(prices, dtype=np.float64), period))
         
     def calculate_macd(self, prices, fast=12, slow=26, signal=9):
-        """MACD hesapla"""
-        exp1 = prices.ewm(span=fast, adjust=False).mean()
-        exp2 = prices.ewm(span=slow, adjust=False).mean()
-        macd = exp1 - exp2
-        signal_line = macd.ewm(span=signal, adjust=False).mean()
-        histogram = macd - signal_line
-        return macd, signal_line, histogram
+        """MACD hesapla (girdi Series ise Series döndürür)"""
+        line, signal_line, histogram = ie.macd(np.asarray(prices, dtype=np.float64), fast, slow, signal)
+        return self._like(prices, line), self._like(prices, signal_line), self._like(prices, histogram)
         
     def calculate_bollinger_bands(self, prices, period=20, std=2):
-        """Bollinger Bands hesapla"""
-        middle = prices.rolling(window=period).mean()
-        std_dev = prices.rolling(window=period).std()
-        upper = middle + (std_dev * std)
-        lower = middle - (std_dev * std)
-        return upper, middle, lower
+        """Bollinger Bands hesapla (girdi Series ise Series döndürür)"""
+        upper, middle, lower = ie.bollinger(np.asarray(prices, dtype=np.float64), period, std)
+        return self._like(prices, upper), self._like(prices, middle), self._like(prices, lower)
+
+    @staticmethod
+    def _like(source, values: np.ndarray):
+        """Girdi pandas Series ise sonucu aynı index ile Series olarak döndür"""
+        if isinstance(source, pd.Series):
+            return pd.Series(values, index=source.index)
+        return values
 
     async def analyze_opportunity(self, symbol: str, timeframe: str = "4h") -> dict:
         """
@@ -1882,4 +1637,40 @@ class MarketAnalyzer:
             
         except Exception as e:
             self.logger.error(f"Fırsat analizi hatası ({symbol}): {str(e)}")
-            return None
\ No newline at end of file
+            return None
+
+
+# İşçi süreçlerdeki analizör; havuz başlatılırken warm_up() ile oluşturulur
+_worker_analyzer: Optional[MarketAnalyzer] = None
+
+
+def warm_up():
+    """İşçi havuzu ön yükleme kancası: süreç başına tek MarketAnalyzer"""
+    global _worker_analyzer
+    if _worker_analyzer is None:
+        _worker_analyzer = MarketAnalyzer(logging.getLogger('MarketAnalyzer.worker'))
+    return _worker_analyzer
+
+
+def score_ohlcv_batch(interval: str, ohlcv_by_symbol: Dict, market_data: Dict[str, Tuple[float, float]]) -> Dict:
+    """
+    İşçi havuzu görevi: saf veri girer, fırsat kayıtları çıkar.
+    
+    Args:
+        interval: Mum aralığı
+        ohlcv_by_symbol: Sembol -> OHLCVArray / mum listesi
+        market_data: Sembol -> (anlık fiyat, 24s hacim)
+        
+    Returns:
+        {'opportunities': [...], 'stats': {'scored': puanlanan sembol, 'failed': puanlanamayan sembol}}
+    """
+    return warm_up()._score_batch(ohlcv_by_symbol, market_data, interval)
+
+
+def score_ohlcv_block(interval: str, block, market_data: Dict[str, Tuple[float, float]]) -> Dict:
+    """
+    score_ohlcv_batch'in paylaşımlı bellek sürümü: mumlar arenadaki bloktan
+    kopyasız okunur, fırsatlar pack_records biçiminde döner.
+    """
+    result = score_ohlcv_batch(interval, read_block(block), market_data)
+    return {'opportunities': pack_records(result['opportunities']), 'stats': result['stats']}
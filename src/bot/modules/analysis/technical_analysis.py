@@ -1,9 +1,6 @@
 import numpy as np
-import pandas as pd
-from ta.trend import EMAIndicator, MACD
-from ta.momentum import RSIIndicator
-from ta.volatility import BollingerBands
 import aiohttp
+from src.analysis import indicator_engine as ie
 
 class TechnicalAnalysis:
     def __init__(self, logger=None):
@@ -12,29 +9,7 @@ class TechnicalAnalysis:
     def calculate_rsi(self, prices: np.ndarray, period: int = 14) -> float:
         """RSI hesapla"""
         try:
-            deltas = np.diff(prices)
-            seed = deltas[:period+1]
-            up = seed[seed >= 0].sum()/period
-            down = -seed[seed < 0].sum()/period
-            rs = up/down if down != 0 else 0
-            rsi = np.zeros_like(prices)
-            rsi[:period] = 100. - 100./(1.+rs)
-
-            for i in range(period, len(prices)):
-                delta = deltas[i-1]
-                if delta > 0:
-                    upval = delta
-                    downval = 0.
-                else:
-                    upval = 0.
-                    downval = -delta
-
-                up = (up*(period-1) + upval)/period
-                down = (down*(period-1) + downval)/period
-                rs = up/down if down != 0 else 0
-                rsi[i] = 100. - 100./(1.+rs)
-
-            return rsi[-1]
+            return ie.last(ie.rsi(prices, period), default=50.0)
         except Exception as e:
             if self.logger:
                 self.logger.error(f"RSI hesaplama hatası: {e}")
@@ -43,18 +18,9 @@ class TechnicalAnalysis:
     def calculate_macd(self, prices: np.ndarray) -> tuple:
         """MACD hesapla"""
         try:
-            # Numpy array'i pandas Series'e çevir
-            prices_pd = pd.Series(prices)
-            
-            # MACD hesapla
-            exp1 = prices_pd.ewm(span=12, adjust=False).mean()
-            exp2 = prices_pd.ewm(span=26, adjust=False).mean()
-            macd = exp1 - exp2
-            signal = macd.ewm(span=9, adjust=False).mean()
-            hist = macd - signal
-            
+            macd, signal, hist = ie.macd(prices)
             # Son değerleri al
-            return float(macd.iloc[-1]), float(signal.iloc[-1]), float(hist.iloc[-1])
+            return ie.last(macd), ie.last(signal), ie.last(hist)
         except Exception as e:
             if self.logger:
                 self.logger.error(f"MACD hesaplama hatası: {e}")
@@ -63,11 +29,8 @@ class TechnicalAnalysis:
     def calculate_bollinger_bands(self, prices: np.ndarray, period: int = 20) -> tuple:
         """Bollinger Bands hesapla"""
         try:
-            sma = np.mean(prices[-period:])
-            std = np.std(prices[-period:])
-            upper = sma + (std * 2)
-            lower = sma - (std * 2)
-            return upper, sma, lower
+            upper, sma, lower = ie.bollinger(prices, period)
+            return ie.last(upper), ie.last(sma), ie.last(lower)
         except Exception as e:
             if self.logger:
                 self.logger.error(f"Bollinger Bands hesaplama hatası: {e}")
@@ -78,12 +41,7 @@ class TechnicalAnalysis:
     def calculate_ema(self, prices: np.ndarray, period: int) -> np.ndarray:
         """EMA hesapla"""
         try:
-            # Numpy array'i pandas Series'e çevir
-            prices_pd = pd.Series(prices)
-            
-            # EMA hesapla ve numpy array'e geri çevir
-            ema = prices_pd.ewm(span=period, adjust=False).mean()
-            return ema.to_numpy()
+            return ie.ema(prices, period)
         except Exception as e:
             if self.logger:
                 self.logger.error(f"EMA hesaplama hatası: {e}")
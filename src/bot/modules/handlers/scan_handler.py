@@ -1,11 +1,25 @@
-from telegram import Update
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 from ..data.binance_client import BinanceClient
 from ..analysis.market import MarketAnalyzer
 from ..utils.formatter import MessageFormatter
+from ..utils.live_message import LiveMessage, ScanCancellation
+import os
 import time
 import asyncio
+from contextlib import aclosing
+from typing import Dict, Optional, Tuple
 from src.analysis.ai_analyzer import AIAnalyzer
+from src.analysis.ai_client import gather_cancellable
+from src.analysis.background_scanner import background_scan_enabled, format_freshness, get_background_scanner
+
+# Arka planda sürekli taranan zaman dilimleri (mum kapanışında yenilenir)
+BACKGROUND_SCAN_INTERVALS = tuple(
+    interval.strip() for interval in os.getenv('BACKGROUND_SCAN_INTERVALS', '15m,1h,4h').split(',') if interval.strip()
+)
+
+# Ön filtre isabeti her N taramada bir ön filtresiz tam taramayla ölçülür (0 kapatır)
+PREFILTER_RECALL_EVERY = int(os.getenv('PREFILTER_RECALL_EVERY', '24'))
 
 class ScanHandler:
     def __init__(self, logger, track_handler):
@@ -15,6 +29,72 @@ class ScanHandler:
         self.formatter = MessageFormatter()
         self.track_handler = track_handler
         self.ai_analyzer = AIAnalyzer(logger)  # AI Analizci ekledik
+        self.cancellation = ScanCancellation()  # Sohbet başına çalışan taramalar
+        self.scanner = get_background_scanner()
+        self._scan_analyzers: Dict[str, MarketAnalyzer] = {}  # Zaman dilimi başına (istatistikler karışmasın)
+        self._scan_counts: Dict[str, int] = {}
+        self._recall_checks: Dict[str, asyncio.Task] = {}  # Zaman dilimi başına süren isabet ölçümü
+        for interval in BACKGROUND_SCAN_INTERVALS:
+            self.scan_job(interval)
+
+    def scan_job(self, interval: str) -> str:
+        """Zaman diliminin arka plan tarama işinin adı (kayıtlı değilse kaydeder)"""
+        name = f"scan:{interval}"
+        if name not in self.scanner.jobs:
+            self.scanner.register(name, lambda report: self._scan_universe(interval, report), interval,
+                                  background=interval in BACKGROUND_SCAN_INTERVALS and background_scan_enabled(name))
+        return name
+
+    async def _scan_universe(self, interval: str, report) -> list:
+        """Tüm evreni tara; puanlanan tüm fırsatları (yalnızca ilk 10'u değil) puana göre döndür"""
+        ticker_data = await self.client.get_ticker()
+        if not ticker_data:
+            raise RuntimeError("Market verileri alınamadı")
+        analyzer = self._scan_analyzers.setdefault(interval, MarketAnalyzer(self.logger))
+        found = []
+        async with aclosing(analyzer.analyze_market_stream(ticker_data, interval, top_k=10)) as stream:
+            async for scan_update in stream:
+                found.extend(scan_update['new'])
+                report(scan_update)
+        self._schedule_recall_check(analyzer, ticker_data, interval)
+        return self._filter_safe_opportunities(found)
+
+    def _schedule_recall_check(self, analyzer: MarketAnalyzer, ticker_data: list, interval: str):
+        """
+        Her PREFILTER_RECALL_EVERY taramada bir ön filtre isabetini arka planda ölç.
+
+        Ölçüm ön filtresiz tam tarama yaptığı için taramanın sonucunu bekletmez;
+        sonuç analizörün prefilter.stats['last_recall'] alanına yazılır.
+        """
+        if PREFILTER_RECALL_EVERY <= 0 or not analyzer.prefilter.enabled:
+            return
+        count = self._scan_counts[interval] = self._scan_counts.get(interval, 0) + 1
+        running = self._recall_checks.get(interval)
+        if count % PREFILTER_RECALL_EVERY or (running is not None and not running.done()):
+            return
+
+        async def check():
+            try:
+                await analyzer.measure_prefilter_recall(ticker_data, interval)
+            except Exception as e:
+                self.logger.error(f"{interval} ön filtre isabet ölçümü başarısız: {e}")
+
+        self._recall_checks[interval] = asyncio.ensure_future(check())
+
+    def prefilter_note(self, interval: str) -> str:
+        """Zaman diliminin son ön filtre isabeti (ölçülmediyse boş)"""
+        analyzer = self._scan_analyzers.get(interval)
+        recall = analyzer.prefilter.stats['last_recall'] if analyzer is not None else None
+        return "" if recall is None else f"🎯 Ön Filtre İsabeti: %{recall * 100:.0f}\n"
+
+    async def get_scan_snapshot(self, interval: str = "4h") -> Dict:
+        """Sunulabilir son taramayı döndür; yoksa (diğer isteklerle paylaşılan) taramayı bekle"""
+        return await self.scanner.get(self.scan_job(interval))
+
+    def scan_freshness(self, interval: str = "4h") -> str:
+        """Zaman diliminin son taramasının tazelik notu (tarama yoksa boş)"""
+        snapshot = self.scanner.snapshot(self.scan_job(interval))
+        return format_freshness(snapshot) if snapshot else ""
 
     async def handle(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         try:
@@ -24,29 +104,25 @@ class ScanHandler:
                 await self._send_usage_message(update)
                 return
 
-            progress_message = await update.message.reply_text(
+            progress = LiveMessage(await update.message.reply_text(
                 f"🔍 {interval} taraması başlatıldı...\n"
-                f"⏳ Veriler alınıyor..."
-            )
+                f"⏳ Veriler alınıyor...",
+                reply_markup=self.cancel_keyboard()
+            ))
             
             start_time = time.time()
             
-            # Market verilerini al
-            ticker_data = await self.client.get_ticker()
-            if not ticker_data:
-                await progress_message.edit_text("❌ Market verileri alınamadı!")
+            # Fırsatlar puanlandıkça mesaj yerinde güncellenir; kullanıcı durdurabilir
+            ticker_count, opportunities, cancelled = await self.run_live_scan(progress, chat_id, interval)
+            if ticker_count is None:
                 return
-                
-            await progress_message.edit_text(
-                f"📊 Market verileri alındı!\n"
-                f"⏳ Coinler analiz ediliyor..."
-            )
             
-            # Fırsatları analiz et - Güvenli analiz ekle
-            opportunities = await self._analyze_market_safely(ticker_data, interval)
+            # Güvenli sonuçları filtrele
+            opportunities = self._filter_safe_opportunities(opportunities)
             
             if not opportunities:
-                await progress_message.edit_text("❌ Fırsat bulunamadı!")
+                await progress.update("⏹ Tarama durduruldu, fırsat bulunamadı." if cancelled else "❌ Fırsat bulunamadı!",
+                                      force=True)
                 return
             
             scan_duration = time.time() - start_time
@@ -55,10 +131,11 @@ class ScanHandler:
             self.track_handler.update_opportunities(chat_id, opportunities)
             
             # İlk mesajı güncelle
-            await progress_message.edit_text(
-                f"✅ Tarama tamamlandı!\n"
+            await progress.update(
+                f"{'⏹ Tarama durduruldu (kısmi sonuç)' if cancelled else '✅ Tarama tamamlandı'}!\n"
                 f"📊 {len(opportunities)} fırsat bulundu.\n"
-                f"⏳ Sonuçlar hazırlanıyor..."
+                f"⏳ Sonuçlar hazırlanıyor...",
+                force=True
             )
             
             # Fırsatları listele
@@ -70,10 +147,12 @@ class ScanHandler:
             # Özet ve kullanım mesajı
             summary = (
                 f"📈 TARAMA ÖZET ({interval})\n\n"
-                f"🔍 Taranan Coin: {len(ticker_data)}\n"
+                f"🔍 Taranan Coin: {ticker_count}\n"
                 f"✨ Bulunan Fırsat: {len(opportunities)}\n"
                 f"⭐ En Yüksek Skor: {opportunities[0]['opportunity_score']:.1f}\n"
-                f"⏱ Tarama Süresi: {scan_duration:.1f}s\n\n"
+                f"⏱ Yanıt Süresi: {scan_duration:.1f}s\n"
+                f"{self.prefilter_note(interval)}"
+                f"{self.scan_freshness(interval)}\n\n"
                 f"🎯 Coin takip etmek için:\n"
                 f"/track <numara> komutunu kullanın\n"
                 f"Örnek: /track 1"
@@ -92,32 +171,7 @@ class ScanHandler:
             
             # Eski zorunlu BTC ve ETH ekleme kodunu kaldırdım
             
-            # Güvenli sonuçları filtrele
-            safe_opportunities = []
-            for opp in opportunities:
-                try:
-                    # Temel verileri kontrol et
-                    required_fields = ['symbol', 'price', 'opportunity_score', 'signal']
-                    if not all(field in opp for field in required_fields):
-                        self.logger.warning(f"Eksik alan: {opp.get('symbol', 'Bilinmeyen')}")
-                        continue
-                    
-                    # Support ve resistance değerlerini düzelt
-                    self._ensure_support_resistance(opp)
-                    
-                    # Güvenli fırsatları ekle
-                    safe_opportunities.append(opp)
-                except Exception as e:
-                    self.logger.error(f"Fırsat hazırlama hatası ({opp.get('symbol', 'Bilinmeyen')}): {e}")
-                    continue
-            
-            # Skorlarına göre fırsatları sırala
-            if safe_opportunities:
-                safe_opportunities.sort(key=lambda x: x['opportunity_score'], reverse=True)
-                
-                # Eski dummy veri ekleme kodunu kaldırdım
-            
-            return safe_opportunities
+            return self._filter_safe_opportunities(opportunities)
             
         except Exception as e:
             self.logger.error(f"Güvenli analiz hatası: {e}")
@@ -128,6 +182,104 @@ class ScanHandler:
                 self.logger.error(f"Basit analiz de başarısız: {e2}")
                 return []
 
+    def _filter_safe_opportunities(self, opportunities: list) -> list:
+        """Zorunlu alanları eksik fırsatları at, support/resistance'ı tamamla, puana göre sırala"""
+        # Güvenli sonuçları filtrele
+        safe_opportunities = []
+        for opp in opportunities:
+            try:
+                # Temel verileri kontrol et
+                required_fields = ['symbol', 'price', 'opportunity_score', 'signal']
+                if not all(field in opp for field in required_fields):
+                    self.logger.warning(f"Eksik alan: {opp.get('symbol', 'Bilinmeyen')}")
+                    continue
+                
+                # Support ve resistance değerlerini düzelt
+                self._ensure_support_resistance(opp)
+                
+                # Güvenli fırsatları ekle
+                safe_opportunities.append(opp)
+            except Exception as e:
+                self.logger.error(f"Fırsat hazırlama hatası ({opp.get('symbol', 'Bilinmeyen')}): {e}")
+                continue
+        
+        # Skorlarına göre fırsatları sırala
+        safe_opportunities.sort(key=lambda x: x['opportunity_score'], reverse=True)
+        return safe_opportunities
+
+    def cancel_keyboard(self) -> InlineKeyboardMarkup:
+        """Çalışan taramayı durdurma butonu"""
+        return InlineKeyboardMarkup([[InlineKeyboardButton("⏹ Durdur", callback_data="scancancel")]])
+
+    def format_scan_progress(self, scan_update: dict, interval: str, top_n: int = 5) -> str:
+        """Akan tarama güncellemesinden ilerleme mesajı"""
+        total = max(1, scan_update['total'])
+        message = (
+            f"🔍 {interval} taraması sürüyor... %{100 * scan_update['scanned'] / total:.0f}\n"
+            f"📊 {scan_update['scanned']}/{scan_update['total']} coin • "
+            f"✨ {scan_update['found']} fırsat • ⏱ {scan_update['elapsed']:.0f}s\n"
+        )
+        if scan_update['top']:
+            message += "\n🏆 Şu ana kadar en iyiler:\n"
+            for i, opp in enumerate(scan_update['top'][:top_n], 1):
+                position = opp.get('position_recommendation', opp.get('signal', ''))
+                message += f"{i}. {opp['symbol']} — {opp['opportunity_score']:.1f} {position}\n"
+        return message
+
+    async def run_live_scan(self, progress: LiveMessage, chat_id: int, interval: str, worker_count=None,
+                            top_k: int = 10) -> Tuple[Optional[int], list, bool]:
+        """
+        Arka plan taramasının anlık görüntüsünü döndür; görüntü yoksa taramayı
+        bekle ve ilerlemeyi `progress` mesajında göster.
+        
+        Tarama tüm kullanıcılar arasında paylaşılır; kullanıcı durdurursa yalnızca
+        beklemeyi bırakır (tarama diğerleri için sürer) ve o ana kadarki en iyiler döner.
+        worker_count artık kullanılmaz; tarama paylaşılan işçi havuzunda çalışır.
+        
+        Returns:
+            (taranan coin sayısı, puana göre ilk top_k fırsatın kopyası, durduruldu mu);
+            tarama başarısız olursa coin sayısı None olur
+        """
+        name = self.scan_job(interval)
+        snapshot = self.scanner.peek(name)
+        if snapshot is None:
+            stop = self.cancellation.begin(chat_id)
+            try:
+                snapshot = await self._wait_for_scan(progress, name, interval, stop)
+            except Exception as e:
+                self.logger.error(f"{interval} taraması başarısız: {e}")
+                await progress.update("❌ Market verileri alınamadı!", force=True)
+                return None, [], False
+            finally:
+                self.cancellation.finish(chat_id, stop)
+            if snapshot is None:
+                partial = self.scanner.progress(name) or {}
+                return partial.get('total', 0), [dict(opp) for opp in partial.get('top', [])[:top_k]], True
+        
+        # Görüntü paylaşılıyor; sonraki adımlar (AI, takip) fırsatları değiştirebilir
+        return snapshot['scanned'], [dict(opp) for opp in snapshot['opportunities'][:top_k]], False
+
+    async def _wait_for_scan(self, progress: LiveMessage, name: str, interval: str,
+                             stop: asyncio.Event) -> Optional[Dict]:
+        """Paylaşılan taramayı bekle; durdurulursa None"""
+        scan = asyncio.ensure_future(self.scanner.get(name))
+        stop_wait = asyncio.ensure_future(stop.wait())
+        try:
+            while not scan.done():
+                await asyncio.wait({scan, stop_wait}, timeout=progress.min_interval,
+                                   return_when=asyncio.FIRST_COMPLETED)
+                if stop.is_set() and not scan.done():
+                    return None
+                scan_update = self.scanner.progress(name)
+                if scan_update and not scan.done():
+                    await progress.update(self.format_scan_progress(scan_update, interval),
+                                          reply_markup=self.cancel_keyboard())
+            return scan.result()
+        finally:
+            stop_wait.cancel()
+            if not scan.done():
+                scan.cancel()  # Yalnızca beklemeyi bırakır; tarama SingleFlight içinde sürer
+
     def _ensure_support_resistance(self, opportunity):
         """Support ve resistance değerlerini kontrol et ve eksik ise ekle"""
         try:
@@ -336,8 +488,13 @@ class ScanHandler:
         else:
             return "⚪ NÖTR"
             
-    async def enrich_with_ai(self, opportunities):
-        """İşlem fırsatlarını AI ile zenginleştir"""
+    async def enrich_with_ai(self, opportunities, stop: Optional[asyncio.Event] = None):
+        """
+        İşlem fırsatlarını AI ile zenginleştir
+        
+        Analizler aynı anda yapılır (eşzamanlılık AI istemcisinde sınırlı); stop set
+        edilirse bitmemiş analizler iptal edilir ve o fırsatlar AI'sız kalır.
+        """
         try:
             self.logger.info("Fırsatlar AI analizi ile zenginleştiriliyor")
             enriched_opportunities = []
@@ -352,12 +509,14 @@ class ScanHandler:
                 symbol = opp.get('symbol')
                 ai_tasks.append(self.ai_analyzer.analyze_opportunity(symbol, opp))
 
-            # Tüm AI analizlerini bekle
-            ai_results = await asyncio.gather(*ai_tasks, return_exceptions=True)
+            # Tüm AI analizlerini bekle (kullanıcı durdurursa bekleyenler iptal edilir)
+            ai_results = await gather_cancellable(ai_tasks, stop)
 
             # Sonuçları birleştir
             for i, ai_result in enumerate(ai_results):
-                if isinstance(ai_result, Exception):
+                if isinstance(ai_result, asyncio.CancelledError):
+                    enriched_opportunities.append(top_opportunities[i])
+                elif isinstance(ai_result, Exception):
                     self.logger.error(f"AI Analiz hatası: {ai_result}")
                     # Hata varsa orijinal veriyi kullan
                     enriched_opportunities.append(top_opportunities[i])
@@ -403,6 +562,7 @@ class ScanHandler:
         arg = args[0].lower()
         return {
             "scan15": "15m",
+            "scan1": "1h",
             "scan4": "4h"
         }.get(arg)
 
@@ -413,6 +573,7 @@ class ScanHandler:
             "Kullanım:\n"
             "/scan - 4 saatlik tarama\n"
             "/scan scan15 - 15 dakikalık tarama\n"
+            "/scan scan1 - 1 saatlik tarama\n"
             "/scan scan4 - 4 saatlik tarama"
         )
 
@@ -428,71 +589,23 @@ class ScanHandler:
             await update.message.reply_text(message)
 
     async def scan_market(self, interval="4h", worker_count=None):
-        """Belirtilen aralıkta piyasayı çoklu işlemci ile tarar ve fırsatları döndürür"""
+        """Arka plan taramasının ilk 10 fırsatını AI ile zenginleştirip döndürür (görüntü yoksa taramayı bekler)"""
         try:
-            # Başlangıç zamanını kaydet (performans ölçümü için)
-            import time
             start_time = time.time()
-            
-            self.logger.info("\n\n==== 📊 ÇOKLU İŞLEMCİ TARAMA BAŞLATILIYOR ====")
-            
-            # Market verilerini al
-            ticker_data = await self.client.get_ticker()
-            if not ticker_data:
-                self.logger.warning("Market verileri alınamadı!")
-                return []
-            
-            # DEBUG: Alınan coin sayısını göster    
-            self.logger.info(f"🔍 Toplam {len(ticker_data)} coin verisi alındı")
-                
-            # Çalışan CPU sayısını belirle (belirtilmemişse)
-            if worker_count is None:
-                # Kullanılabilir işlemci sayısının 1 eksiğini kullan (sistemin responsif kalması için)
-                import multiprocessing
-                worker_count = max(1, multiprocessing.cpu_count() - 1)
-                self.logger.info(f"🔄 Tarama {worker_count} işlemci ile yapılıyor...")
-            
-            # DEBUG: Eski tek işlemci ile geçen süre bilgisini ekle
-            self.logger.info(f"⏰ Tahmini eski süre: ~{len(ticker_data) * 0.2:.1f} saniye olacaktı (tek işlemci ile)")
-                
-            # Fırsatları çoklu işlemci ile analiz et
-            self.logger.info(f"🚀 Çoklu işlemci analizi başlatılıyor...")
-            opportunities = await self.analyzer.analyze_market_parallel(ticker_data, interval, worker_count)
-            
-            # İşlem süresi hesaplama
-            analysis_end_time = time.time()
-            analysis_time = analysis_end_time - start_time
-            
+            snapshot = await self.get_scan_snapshot(interval)
+            opportunities = [dict(opp) for opp in snapshot['opportunities'][:10]]
             if not opportunities:
                 self.logger.warning("Fırsat bulunamadı!")
-                self.logger.info(f"\n==== 📊 ÇOKLU İŞLEMCİ TARAMA TAMAMLANDI [Süre: {analysis_time:.2f}s] ====\n")
                 return []
             
-            self.logger.info(f"Teknik analiz {analysis_time:.2f} saniyede tamamlandı, {len(opportunities)} fırsat bulundu")
+            self.logger.info(f"{interval} taraması sunuldu: {len(opportunities)} fırsat "
+                             f"({format_freshness(snapshot)}, {time.time() - start_time:.2f}s)")
             
             # AI ile zenginleştirme
             ai_start_time = time.time()
-            
-            self.logger.info("AI ile zenginleştirme başlatılıyor...")
             enriched_opportunities = await self.enrich_with_ai(opportunities)
-            
-            ai_end_time = time.time()
-            ai_time = ai_end_time - ai_start_time
-            total_time = ai_end_time - start_time
-            
-            # DEBUG: Performans özeti
-            estimated_old_time = len(ticker_data) * 0.2  # Tahmini eski süre
-            speedup = estimated_old_time / total_time
-            
-            self.logger.info(f"\n📊 PERFORMANS ÖZETİ:")
-            self.logger.info(f"⏱️ Teknik analiz süresi: {analysis_time:.2f} saniye")
-            self.logger.info(f"🤖 AI analiz süresi: {ai_time:.2f} saniye")
-            self.logger.info(f"⏰️ Toplam süre: {total_time:.2f} saniye")
-            self.logger.info(f"🚀 Hızlanma oranı: {speedup:.2f}x ({worker_count} işlemci ile)")
-            self.logger.info(f"💡 İşlemci başına: {analysis_time/worker_count:.2f} saniye")
-            self.logger.info(f"\n==== 📊 ÇOKLU İŞLEMCİ TARAMA TAMAMLANDI ====\n")
-                
+            self.logger.info(f"🤖 AI analiz süresi: {time.time() - ai_start_time:.2f} saniye")
             return enriched_opportunities
         except Exception as e:
             self.logger.error(f"Scan market hatası: {str(e)}")
-            return [] 
\ No newline at end of file
+            return []
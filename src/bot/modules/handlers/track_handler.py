@@ -1,6 +1,8 @@
 from telegram import Update
 from telegram.ext import ContextTypes
 from ..analysis.market import MarketAnalyzer
+from src.exchanges.price_feed import get_price_feed
+from src.analysis.streaming_indicators import get_indicator_state_store, sync_state_async
 from datetime import datetime, timedelta
 import asyncio
 import time
@@ -26,6 +28,9 @@ class TrackHandler:
             '15m': {'profit_target': 3, 'loss_limit': -2},  # 15dk için %3 kar, %2 zarar
             '4h': {'profit_target': 8, 'loss_limit': -5}    # 4s için %8 kar, %5 zarar
         }
+        # Fiyat her 30 sn'de toplu fiyat servisinden gelir; göstergeler artımlı güncellenir,
+        # yeni mumlar ve mum bazlı girdiler (hacim, pozisyon önerisi) yalnızca mum kapandığında işlenir
+        self.indicator_timeframe = '1h'
 
     async def handle(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Track komutunu işle"""
@@ -76,6 +81,9 @@ class TrackHandler:
 
     async def _track_price(self, update: Update, chat_id: int, symbol: str, entry_price: float, timeframe: str = '4h'):
         """Fiyat takip döngüsü"""
+        subscription = get_price_feed().subscribe(symbol)
+        state_store = get_indicator_state_store()
+        indicators = state_store.get(symbol, self.indicator_timeframe)
         try:
             # Pozisyon geçmişini başlat
             if chat_id not in self.position_history:
@@ -86,11 +94,21 @@ class TrackHandler:
                     'max_loss': 0
                 }
 
+            base_analysis = None
             while True:
-                current_analysis = await self.analyzer.analyze_single_coin(symbol)
+                # Mum kapandıysa yalnızca yeni mumları göstergelere işle; tam analiz
+                # (hacim, hacim patlaması, pozisyon önerisi) da kapanan mumla tazelenir
+                if base_analysis is None or indicators.next_close_ms is None \
+                        or time.time() * 1000 >= indicators.next_close_ms:
+                    if await sync_state_async(indicators, self.analyzer.exchange):
+                        state_store.save(indicators)
+                    base_analysis = await self.analyzer.analyze_single_coin(symbol) or base_analysis
                 
-                if current_analysis:
-                    current_price = current_analysis['price']
+                await subscription.latest(timeout=30)
+                
+                if base_analysis:
+                    current_price = subscription.price or base_analysis['price']
+                    current_analysis = self._live_analysis(base_analysis, indicators, current_price)
                     price_change = ((current_price - entry_price) / entry_price) * 100
                     
                     # Maksimum kar/zarar güncelle
@@ -159,6 +177,29 @@ class TrackHandler:
             self.logger.info(f"Price tracking cancelled for {symbol}")
         except Exception as e:
             self.logger.error(f"Price tracking error for {symbol}: {e}")
+        finally:
+            subscription.close()
+
+    def _live_analysis(self, analysis: Dict, indicators, price: float) -> Dict:
+        """Son tam analizi akan göstergelerin anlık değerleriyle güncelle (O(1))"""
+        live = indicators.snapshot(price)
+        if live.get('rsi') is None or live.get('ema50') is None:
+            return analysis
+        
+        trend = "YUKARI" if live['ema20'] > live['ema50'] else "AŞAĞI"
+        score = self.analyzer._calculate_opportunity_score(
+            live['rsi'], live['macd_hist'], analysis['volume_surge'], trend,
+            analysis['volume'], live.get('volume_sma') or 0
+        )
+        return {
+            **analysis,
+            'price': price,
+            'rsi': live['rsi'],
+            'macd': live['macd_hist'],
+            'trend': trend,
+            'opportunity_score': score,
+            'signal': self.analyzer._determine_signal(score, live['rsi'], trend)
+        }
 
     def _analyze_position_status(self, 
                                price_change: float,
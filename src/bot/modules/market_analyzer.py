@@ -8,7 +8,12 @@ from scipy.signal import argrelextrema
 import random
 import logging
 import aiohttp
-import ccxt.async_support as ccxt
+from src.exchanges.gateway import get_gateway
+from src.data_collectors.kline_stream import get_kline_stream
+from src.analysis import indicator_engine as ie
+from src.analysis.feature_cache import get_feature_cache
+from src.data_collectors.candle_store import get_candle_store
+from src.analysis import trend_kernels as tk
 import json
 import os
 import uuid
@@ -197,11 +202,16 @@ class MarketAnalyzer:
             }
 
     async def _create_exchange(self):
-        """Her analizde yeni bir exchange nesnesi oluştur"""
+        """
+        Paylaşılan gateway'i döndür (marketler bir kez yüklenir).
+        
+        Ham ccxt nesnesi yerine gateway döndürülür; böylece aynı anda gelen
+        özdeş fetch_ticker/fetch_ohlcv istekleri tek istekte birleşir.
+        """
         try:
-            exchange = ccxt.binance({'enableRateLimit': True})
-            await exchange.load_markets()
-            return exchange
+            gateway = get_gateway()
+            await gateway.get_exchange()
+            return gateway
         except Exception as e:
             self.logger.error(f"Exchange oluşturma hatası: {e}")
             raise
@@ -290,7 +300,6 @@ class MarketAnalyzer:
 
     async def scan_market(self, interval: str = "4h") -> List[Dict]:
         """Piyasayı tara ve fırsatları bul - belirli bir zaman diliminde"""
-        exchange = None
         try:
             exchange = await self._create_exchange()
             
@@ -301,7 +310,6 @@ class MarketAnalyzer:
             
             # İnterval 15m ise scalping metodunu kullan
             if interval == "15m":
-                await exchange.close()
                 return await self.scan_for_scalping()
             
             # Piyasa analizini yap
@@ -315,12 +323,6 @@ class MarketAnalyzer:
         except Exception as e:
             self.logger.error(f"Piyasa tarama hatası: {e}")
             return []
-        finally:
-            try:
-                if exchange:
-                    await exchange.close()
-            except Exception as e:
-                self.logger.error(f"Exchange kapatma hatası: {e}")
 
     async def _get_all_tickers(self, exchange) -> List[Dict]:
         """Tüm sembollerin ticker verilerini al"""
@@ -815,57 +817,9 @@ class MarketAnalyzer:
             self.logger.error(f"Sinyal belirleme hatası: {e}")
             return "⚪ NÖTR"
             
-    def _calculate_stochastic_rsi(self, prices: np.ndarray, period: int = 14, k_period: int = 3, d_period: int = 3) -> np.ndarray:
-        """Stochastic RSI hesapla"""
-        # Önce RSI hesapla
-        rsi_values = self._calculate_rsi(prices, period)
-        
-        # Stochastic RSI hesapla
-        stoch_rsi = np.zeros_like(rsi_values)
-        
-        for i in range(period, len(rsi_values)):
-            rsi_window = rsi_values[i-period+1:i+1]
-            
-            if len(rsi_window) < period:
-                stoch_rsi[i] = 50  # Yeterli veri yoksa orta değer
-                continue
-                
-            rsi_min = np.min(rsi_window)
-            rsi_max = np.max(rsi_window)
-            
-            if rsi_max == rsi_min:
-                stoch_rsi[i] = 50  # Aynı değerler varsa orta değer
-            else:
-                stoch_rsi[i] = 100 * (rsi_values[i] - rsi_min) / (rsi_max - rsi_min)
-        
-        # %K değeri (ham stochastic RSI)
-        k_values = stoch_rsi
-        
-        # %D değeri (SMA(3) of %K)
-        d_values = np.zeros_like(k_values)
-        for i in range(k_period, len(k_values)):
-            d_values[i] = np.mean(k_values[i-k_period+1:i+1])
-        
-        return d_values  # %D değerini döndür
-    
     def _calculate_vwap(self, highs: np.ndarray, lows: np.ndarray, closes: np.ndarray, volumes: np.ndarray) -> np.ndarray:
         """Volume Weighted Average Price hesapla"""
-        typical_price = (highs + lows + closes) / 3
-        vwap = np.zeros_like(closes)
-        
-        cumulative_tp_vol = 0
-        cumulative_vol = 0
-        
-        for i in range(len(closes)):
-            cumulative_tp_vol += typical_price[i] * volumes[i]
-            cumulative_vol += volumes[i]
-            
-            if cumulative_vol > 0:
-                vwap[i] = cumulative_tp_vol / cumulative_vol
-            else:
-                vwap[i] = typical_price[i]
-        
-        return vwap
+        return ie.vwap(highs, lows, closes, volumes)
     
     def _is_hammer(self, open_price: float, high: float, low: float, close: float) -> bool:
         """Çekiç formasyonu kontrolü"""
@@ -999,21 +953,7 @@ class MarketAnalyzer:
     
     def _calculate_obv(self, closes: np.ndarray, volumes: np.ndarray) -> np.ndarray:
         """On Balance Volume (OBV) hesapla"""
-        obv = np.zeros_like(closes)
-        
-        # İlk değer
-        obv[0] = volumes[0]
-        
-        # OBV hesapla
-        for i in range(1, len(closes)):
-            if closes[i] > closes[i-1]:
-                obv[i] = obv[i-1] + volumes[i]
-            elif closes[i] < closes[i-1]:
-                obv[i] = obv[i-1] - volumes[i]
-            else:
-                obv[i] = obv[i-1]
-        
-        return obv
+        return ie.obv(closes, volumes)
     
     def _calculate_buying_selling_pressure(self, opens: np.ndarray, closes: np.ndarray, highs: np.ndarray, lows: np.ndarray, volumes: np.ndarray) -> tuple:
         """Alım-Satım Baskısı hesapla"""
@@ -1057,90 +997,6 @@ class MarketAnalyzer:
         
         return buying_pressure, selling_pressure
     
-    def _calculate_adx(self, highs: np.ndarray, lows: np.ndarray, closes: np.ndarray, period: int = 14) -> tuple:
-        """Average Directional Index (ADX) hesapla"""
-        if len(highs) < period + 1:
-            return np.array([20]), np.array([20]), np.array([20])  # Varsayılan değerler
-            
-        # True Range hesapla
-        tr = np.zeros(len(highs))
-        tr[0] = highs[0] - lows[0]
-        
-        for i in range(1, len(highs)):
-            tr[i] = max(
-                highs[i] - lows[i],  # Günlük range
-                abs(highs[i] - closes[i-1]),  # Dünkü kapanışa göre yüksek
-                abs(lows[i] - closes[i-1])  # Dünkü kapanışa göre düşük
-            )
-        
-        # Directional Movement hesapla
-        plus_dm = np.zeros(len(highs))
-        minus_dm = np.zeros(len(highs))
-        
-        for i in range(1, len(highs)):
-            up_move = highs[i] - highs[i-1]
-            down_move = lows[i-1] - lows[i]
-            
-            if up_move > down_move and up_move > 0:
-                plus_dm[i] = up_move
-            else:
-                plus_dm[i] = 0
-                
-            if down_move > up_move and down_move > 0:
-                minus_dm[i] = down_move
-            else:
-                minus_dm[i] = 0
-        
-        # Smoothed TR, +DM, -DM
-        atr = np.zeros(len(tr))
-        plus_di = np.zeros(len(plus_dm))
-        minus_di = np.zeros(len(minus_dm))
-        
-        # İlk değerler
-        atr[period-1] = np.sum(tr[:period])
-        plus_di[period-1] = np.sum(plus_dm[:period])
-        minus_di[period-1] = np.sum(minus_dm[:period])
-        
-        # Smoothing
-        for i in range(period, len(tr)):
-            atr[i] = atr[i-1] - (atr[i-1] / period) + tr[i]
-            plus_di[i] = plus_di[i-1] - (plus_di[i-1] / period) + plus_dm[i]
-            minus_di[i] = minus_di[i-1] - (minus_di[i-1] / period) + minus_dm[i]
-        
-        # +DI ve -DI hesapla
-        plus_di_values = np.zeros(len(plus_di))
-        minus_di_values = np.zeros(len(minus_di))
-        
-        for i in range(period-1, len(atr)):
-            if atr[i] > 0:
-                plus_di_values[i] = 100 * plus_di[i] / atr[i]
-                minus_di_values[i] = 100 * minus_di[i] / atr[i]
-            else:
-                plus_di_values[i] = 0
-                minus_di_values[i] = 0
-        
-        # DX hesapla
-        dx = np.zeros(len(plus_di_values))
-        
-        for i in range(period-1, len(dx)):
-            if plus_di_values[i] + minus_di_values[i] > 0:
-                dx[i] = 100 * abs(plus_di_values[i] - minus_di_values[i]) / (plus_di_values[i] + minus_di_values[i])
-            else:
-                dx[i] = 0
-        
-        # ADX hesapla (DX'in period-period SMA'sı)
-        adx = np.zeros(len(dx))
-        
-        # İlk ADX değeri
-        if period*2-2 < len(dx):
-            adx[period*2-2] = np.mean(dx[period-1:period*2-1])
-        
-        # Smoothing
-        for i in range(period*2-1, len(dx)):
-            adx[i] = (adx[i-1] * (period-1) + dx[i]) / period
-        
-        return adx, plus_di_values, minus_di_values
-    
     def _analyze_market_structure(self, highs: np.ndarray, lows: np.ndarray) -> str:
         """Piyasa yapısını analiz et (Higher Highs, Lower Lows)"""
         if len(highs) < 10 or len(lows) < 10:
@@ -1408,59 +1264,9 @@ class MarketAnalyzer:
             }
 
     def _calculate_supertrend(self, highs: np.ndarray, lows: np.ndarray, closes: np.ndarray, period: int = 10, multiplier: float = 3.0) -> tuple:
-        """Supertrend hesapla"""
+        """Supertrend hesapla: (değer, yön) - 1: yukarı trend, -1: aşağı trend"""
         try:
-            # ATR hesapla
-            atr = self._calculate_atr(highs, lows, closes, period)
-            
-            # Supertrend hesapla
-            hl2 = (highs + lows) / 2
-            
-            # Üst ve alt bantlar
-            upper_band = hl2 + (multiplier * atr)
-            lower_band = hl2 - (multiplier * atr)
-            
-            # Supertrend değerleri
-            supertrend = np.zeros_like(closes)
-            direction = np.zeros_like(closes)  # 1: yukarı trend, -1: aşağı trend
-            
-            # İlk değer
-            supertrend[0] = closes[0]
-            direction[0] = 1  # Başlangıçta yukarı trend kabul edelim
-            
-            # Supertrend hesapla
-            for i in range(1, len(closes)):
-                # Önceki değerler
-                prev_upper = upper_band[i-1]
-                prev_lower = lower_band[i-1]
-                prev_supertrend = supertrend[i-1]
-                prev_direction = direction[i-1]
-                
-                # Mevcut değerler
-                curr_upper = upper_band[i]
-                curr_lower = lower_band[i]
-                curr_close = closes[i]
-                
-                # Yön değişimi kontrolü
-                if prev_supertrend <= prev_upper and curr_close > curr_upper:
-                    curr_direction = -1  # Aşağı trend
-                elif prev_supertrend >= prev_lower and curr_close < curr_lower:
-                    curr_direction = 1  # Yukarı trend
-                else:
-                    curr_direction = prev_direction  # Değişim yok
-                
-                # Supertrend değeri
-                if curr_direction == 1:
-                    curr_supertrend = curr_lower
-                else:
-                    curr_supertrend = curr_upper
-                
-                # Değerleri kaydet
-                supertrend[i] = curr_supertrend
-                direction[i] = curr_direction
-            
-            return supertrend, direction
-            
+            return tk.supertrend(highs, lows, closes, period, multiplier)
         except Exception as e:
             self.logger.error(f"Supertrend hesaplama hatası: {e}")
             # Boş diziler döndür
@@ -1470,26 +1276,7 @@ class MarketAnalyzer:
     def _calculate_ichimoku(self, highs: np.ndarray, lows: np.ndarray) -> tuple:
         """Ichimoku Cloud hesapla"""
         try:
-            # Tenkan-sen (Conversion Line): (9-period high + 9-period low)/2
-            period9_high = np.array(pd.Series(highs).rolling(window=9).max())
-            period9_low = np.array(pd.Series(lows).rolling(window=9).min())
-            tenkan_sen = (period9_high + period9_low) / 2
-            
-            # Kijun-sen (Base Line): (26-period high + 26-period low)/2
-            period26_high = np.array(pd.Series(highs).rolling(window=26).max())
-            period26_low = np.array(pd.Series(lows).rolling(window=26).min())
-            kijun_sen = (period26_high + period26_low) / 2
-            
-            # Senkou Span A (Leading Span A): (Conversion Line + Base Line)/2
-            senkou_span_a = (tenkan_sen + kijun_sen) / 2
-            
-            # Senkou Span B (Leading Span B): (52-period high + 52-period low)/2
-            period52_high = np.array(pd.Series(highs).rolling(window=52).max())
-            period52_low = np.array(pd.Series(lows).rolling(window=52).min())
-            senkou_span_b = (period52_high + period52_low) / 2
-            
-            return tenkan_sen, kijun_sen, senkou_span_a, senkou_span_b
-            
+            return tk.ichimoku(highs, lows)
         except Exception as e:
             self.logger.error(f"Ichimoku hesaplama hatası: {e}")
             # Boş diziler döndür
@@ -1499,55 +1286,7 @@ class MarketAnalyzer:
     def _calculate_adx(self, highs: np.ndarray, lows: np.ndarray, closes: np.ndarray, period: int = 14) -> np.ndarray:
         """Average Directional Index (ADX) hesapla"""
         try:
-            # True Range hesapla
-            tr1 = np.abs(highs[1:] - lows[1:])
-            tr2 = np.abs(highs[1:] - closes[:-1])
-            tr3 = np.abs(lows[1:] - closes[:-1])
-            tr = np.maximum(np.maximum(tr1, tr2), tr3)
-            tr = np.insert(tr, 0, tr[0])  # İlk değeri ekle
-            
-            # Average True Range (ATR) hesapla
-            atr = np.zeros_like(closes)
-            atr[0] = tr[0]
-            for i in range(1, len(tr)):
-                atr[i] = (atr[i-1] * (period - 1) + tr[i]) / period
-            
-            # +DM ve -DM hesapla
-            plus_dm = np.zeros_like(closes)
-            minus_dm = np.zeros_like(closes)
-            
-            for i in range(1, len(closes)):
-                # +DM: Bugünkü yüksek - Dünkü yüksek
-                up_move = highs[i] - highs[i-1]
-                # -DM: Dünkü düşük - Bugünkü düşük
-                down_move = lows[i-1] - lows[i]
-                
-                if up_move > down_move and up_move > 0:
-                    plus_dm[i] = up_move
-                else:
-                    plus_dm[i] = 0
-                    
-                if down_move > up_move and down_move > 0:
-                    minus_dm[i] = down_move
-                else:
-                    minus_dm[i] = 0
-            
-            # +DI ve -DI hesapla
-            plus_di = 100 * (plus_dm / atr)
-            minus_di = 100 * (minus_dm / atr)
-            
-            # DX hesapla: |+DI - -DI| / |+DI + -DI| * 100
-            dx = 100 * np.abs(plus_di - minus_di) / (plus_di + minus_di + 1e-10)  # Sıfıra bölmeyi önle
-            
-            # ADX hesapla (DX'in period-periyotlu ortalaması)
-            adx = np.zeros_like(closes)
-            adx[period-1] = np.mean(dx[:period])
-            
-            for i in range(period, len(closes)):
-                adx[i] = (adx[i-1] * (period - 1) + dx[i]) / period
-            
-            return adx
-            
+            return tk.adx(highs, lows, closes, period)
         except Exception as e:
             self.logger.error(f"ADX hesaplama hatası: {e}")
             return np.zeros_like(closes)
@@ -1593,23 +1332,7 @@ class MarketAnalyzer:
     def _calculate_macd(self, closes: np.ndarray, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9) -> tuple:
         """MACD (Moving Average Convergence Divergence) hesapla"""
         try:
-            # Hızlı EMA
-            ema_fast = self._calculate_ema(closes, fast_period)
-            
-            # Yavaş EMA
-            ema_slow = self._calculate_ema(closes, slow_period)
-            
-            # MACD Line = Hızlı EMA - Yavaş EMA
-            macd_line = ema_fast - ema_slow
-            
-            # Signal Line = MACD Line'ın EMA'sı
-            signal_line = np.array(pd.Series(macd_line).ewm(span=signal_period, adjust=False).mean())
-            
-            # Histogram = MACD Line - Signal Line
-            histogram = macd_line - signal_line
-            
-            return macd_line, signal_line, histogram
-            
+            return ie.macd(closes, fast_period, slow_period, signal_period)
         except Exception as e:
             self.logger.error(f"MACD hesaplama hatası: {e}")
             # Boş diziler döndür
@@ -1619,45 +1342,7 @@ class MarketAnalyzer:
     def _calculate_rsi(self, closes: np.ndarray, period: int = 14) -> np.ndarray:
         """RSI (Relative Strength Index) hesapla"""
         try:
-            # Fiyat değişimleri
-            deltas = np.diff(closes)
-            
-            # Pozitif ve negatif değişimler
-            seed = deltas[:period+1]
-            up = seed[seed >= 0].sum() / period
-            down = -seed[seed < 0].sum() / period
-            
-            if down == 0:
-                rs = float('inf')
-            else:
-                rs = up / down
-            
-            rsi = np.zeros_like(closes)
-            rsi[period] = 100. - 100. / (1. + rs)
-            
-            # RSI hesapla
-            for i in range(period + 1, len(closes)):
-                delta = deltas[i - 1]
-                
-                if delta > 0:
-                    upval = delta
-                    downval = 0.
-                else:
-                    upval = 0.
-                    downval = -delta
-                
-                up = (up * (period - 1) + upval) / period
-                down = (down * (period - 1) + downval) / period
-                
-                if down == 0:
-                    rs = float('inf')
-                else:
-                    rs = up / down
-                
-                rsi[i] = 100. - 100. / (1. + rs)
-            
-            return rsi
-            
+            return ie.rsi(closes, period)
         except Exception as e:
             self.logger.error(f"RSI hesaplama hatası: {e}")
             return np.zeros_like(closes)
@@ -1665,7 +1350,7 @@ class MarketAnalyzer:
     def _calculate_ema(self, closes: np.ndarray, period: int) -> np.ndarray:
         """EMA (Exponential Moving Average) hesapla"""
         try:
-            return np.array(pd.Series(closes).ewm(span=period, adjust=False).mean())
+            return ie.ema(closes, period)
         except Exception as e:
             self.logger.error(f"EMA hesaplama hatası: {e}")
             return np.zeros_like(closes)
@@ -1673,49 +1358,15 @@ class MarketAnalyzer:
     def _calculate_atr(self, highs: np.ndarray, lows: np.ndarray, closes: np.ndarray, period: int = 14) -> np.ndarray:
         """ATR (Average True Range) hesapla"""
         try:
-            # True Range hesapla
-            tr1 = np.abs(highs[1:] - lows[1:])
-            tr2 = np.abs(highs[1:] - closes[:-1])
-            tr3 = np.abs(lows[1:] - closes[:-1])
-            tr = np.maximum(np.maximum(tr1, tr2), tr3)
-            tr = np.insert(tr, 0, tr[0])  # İlk değeri ekle
-            
-            # ATR hesapla
-            atr = np.zeros_like(closes)
-            atr[0] = tr[0]
-            
-            for i in range(1, len(tr)):
-                atr[i] = (atr[i-1] * (period - 1) + tr[i]) / period
-            
-            return atr
-            
+            return ie.atr(highs, lows, closes, period)
         except Exception as e:
             self.logger.error(f"ATR hesaplama hatası: {e}")
             return np.zeros_like(closes)
     
     def _calculate_stochastic_rsi(self, closes: np.ndarray, period: int = 14, k_period: int = 3, d_period: int = 3) -> tuple:
-        """Stochastic RSI hesapla"""
+        """Stochastic RSI hesapla: (ham değer, %K, %D)"""
         try:
-            # RSI hesapla
-            rsi = self._calculate_rsi(closes, period)
-            
-            # Stochastic RSI hesapla
-            stoch_rsi = np.zeros_like(closes)
-            
-            for i in range(period, len(closes)):
-                rsi_window = rsi[i-period+1:i+1]
-                
-                if np.max(rsi_window) == np.min(rsi_window):
-                    stoch_rsi[i] = 50  # Eğer max=min ise, 50 değerini kullan
-                else:
-                    stoch_rsi[i] = 100 * (rsi[i] - np.min(rsi_window)) / (np.max(rsi_window) - np.min(rsi_window))
-            
-            # %K ve %D hesapla
-            k = np.array(pd.Series(stoch_rsi).rolling(window=k_period).mean())
-            d = np.array(pd.Series(k).rolling(window=d_period).mean())
-            
-            return stoch_rsi, k, d
-            
+            return ie.stoch_rsi(closes, period, k_period, d_period)
         except Exception as e:
             self.logger.error(f"Stochastic RSI hesaplama hatası: {e}")
             empty_array = np.zeros_like(closes)
@@ -1724,18 +1375,7 @@ class MarketAnalyzer:
     def _calculate_bollinger_bands(self, closes: np.ndarray, period: int = 20, std_dev: float = 2.0) -> tuple:
         """Bollinger Bands hesapla"""
         try:
-            # Orta bant (SMA)
-            middle_band = np.array(pd.Series(closes).rolling(window=period).mean())
-            
-            # Standart sapma
-            std = np.array(pd.Series(closes).rolling(window=period).std())
-            
-            # Üst ve alt bantlar
-            upper_band = middle_band + (std * std_dev)
-            lower_band = middle_band - (std * std_dev)
-            
-            return upper_band, middle_band, lower_band
-            
+            return ie.bollinger(closes, period, std_dev)
         except Exception as e:
             self.logger.error(f"Bollinger Bands hesaplama hatası: {e}")
             # Boş diziler döndür
@@ -1761,86 +1401,7 @@ class MarketAnalyzer:
     def _calculate_parabolic_sar(self, highs: np.ndarray, lows: np.ndarray, acceleration: float = 0.02, maximum: float = 0.2) -> np.ndarray:
         """Parabolic SAR hesapla"""
         try:
-            # Başlangıç değerleri
-            sar = np.zeros_like(highs)
-            trend = np.zeros_like(highs)  # 1: yukarı trend, -1: aşağı trend
-            extreme_point = np.zeros_like(highs)
-            acceleration_factor = np.zeros_like(highs)
-            
-            # İlk değerler
-            trend[0] = 1  # Başlangıçta yukarı trend kabul edelim
-            sar[0] = lows[0]  # Başlangıç SAR değeri
-            extreme_point[0] = highs[0]  # Başlangıç EP değeri
-            acceleration_factor[0] = acceleration  # Başlangıç AF değeri
-            
-            # Parabolic SAR hesapla
-            for i in range(1, len(highs)):
-                # Önceki değerler
-                prev_sar = sar[i-1]
-                prev_trend = trend[i-1]
-                prev_ep = extreme_point[i-1]
-                prev_af = acceleration_factor[i-1]
-                
-                # Mevcut değerler
-                curr_high = highs[i]
-                curr_low = lows[i]
-                
-                # SAR hesapla
-                if prev_trend == 1:  # Yukarı trend
-                    # SAR = Önceki SAR + Önceki AF * (Önceki EP - Önceki SAR)
-                    curr_sar = prev_sar + prev_af * (prev_ep - prev_sar)
-                    
-                    # SAR değeri düzeltme
-                    curr_sar = min(curr_sar, lows[i-1], lows[i-2] if i > 1 else lows[i-1])
-                    
-                    # Trend değişimi kontrolü
-                    if curr_sar > curr_low:
-                        curr_trend = -1  # Aşağı trend
-                        curr_sar = prev_ep  # SAR değeri EP olur
-                        curr_ep = curr_low  # EP değeri mevcut düşük olur
-                        curr_af = acceleration  # AF değeri başlangıç değerine döner
-                    else:
-                        curr_trend = 1  # Yukarı trend devam eder
-                        
-                        # EP ve AF güncelleme
-                        if curr_high > prev_ep:
-                            curr_ep = curr_high  # EP güncelle
-                            curr_af = min(prev_af + acceleration, maximum)  # AF güncelle
-                        else:
-                            curr_ep = prev_ep  # EP değişmez
-                            curr_af = prev_af  # AF değişmez
-                else:  # Aşağı trend
-                    # SAR = Önceki SAR - Önceki AF * (Önceki SAR - Önceki EP)
-                    curr_sar = prev_sar - prev_af * (prev_sar - prev_ep)
-                    
-                    # SAR değeri düzeltme
-                    curr_sar = max(curr_sar, highs[i-1], highs[i-2] if i > 1 else highs[i-1])
-                    
-                    # Trend değişimi kontrolü
-                    if curr_sar < curr_high:
-                        curr_trend = 1  # Yukarı trend
-                        curr_sar = prev_ep  # SAR değeri EP olur
-                        curr_ep = curr_high  # EP değeri mevcut yüksek olur
-                        curr_af = acceleration  # AF değeri başlangıç değerine döner
-                    else:
-                        curr_trend = -1  # Aşağı trend devam eder
-                        
-                        # EP ve AF güncelleme
-                        if curr_low < prev_ep:
-                            curr_ep = curr_low  # EP güncelle
-                            curr_af = min(prev_af + acceleration, maximum)  # AF güncelle
-                        else:
-                            curr_ep = prev_ep  # EP değişmez
-                            curr_af = prev_af  # AF değişmez
-                
-                # Değerleri kaydet
-                sar[i] = curr_sar
-                trend[i] = curr_trend
-                extreme_point[i] = curr_ep
-                acceleration_factor[i] = curr_af
-            
-            return sar
-            
+            return tk.parabolic_sar(highs, lows, acceleration, maximum)
         except Exception as e:
             self.logger.error(f"Parabolic SAR hesaplama hatası: {e}")
             return np.zeros_like(highs)
@@ -1935,27 +1496,22 @@ class MarketAnalyzer:
             # Exchange oluştur
             exchange = await self._create_exchange()
             
-            # OHLCV verileri al
-            ohlcv = await exchange.fetch_ohlcv(exchange_symbol, interval, limit=100)
-            await exchange.close()
+            # OHLCV verileri al (mum deposu yalnızca eksik mumları çeker)
+            ohlcv = await get_candle_store().get_ohlcv_async(exchange, exchange_symbol, interval, limit=100)
             
             if not ohlcv or len(ohlcv) < 30:
                 self.logger.debug(f"{symbol} için yeterli veri bulunamadı")
                 return None
             
             # Veri dönüşümü
-            opens = np.array([float(candle[1]) for candle in ohlcv])
-            highs = np.array([float(candle[2]) for candle in ohlcv])
-            lows = np.array([float(candle[3]) for candle in ohlcv])
-            closes = np.array([float(candle[4]) for candle in ohlcv])
-            volumes = np.array([float(candle[5]) for candle in ohlcv])
+            _, opens, highs, lows, closes, volumes = ie.to_columns(ohlcv)
             
-            # Teknik göstergeler
-            rsi = self.ta.calculate_rsi(closes)
-            ema20 = self.ta.calculate_ema(closes, 20)
-            ema50 = self.ta.calculate_ema(closes, 50)
-            macd, signal, hist = self.ta.calculate_macd(closes)
-            bb_upper, bb_middle, bb_lower = self.ta.calculate_bollinger_bands(closes)
+            # Teknik göstergeler: analyze_market ve /aianalysis aynı kapanmış mum için önbelleği paylaşır
+            features = get_feature_cache().get_features(exchange_symbol, interval, ohlcv)
+            rsi = features['rsi']
+            ema20, ema50 = features['ema20'], features['ema50']
+            signal, hist = features['macd_signal'], features['macd_hist']
+            bb_upper, bb_middle, bb_lower = features['bb_upper'], features['bb_middle'], features['bb_lower']
             
             # Hacim analizi
             avg_volume = np.mean(volumes[-20:])  # Son 20 mumun ortalama hacmi
@@ -2113,7 +1669,6 @@ class MarketAnalyzer:
 
     async def scan_for_scalping(self) -> List[Dict]:
         """Scalping için kısa vadeli fırsatları tara (15 dakikalık grafikler)"""
-        exchange = None
         try:
             exchange = await self._create_exchange()
             
@@ -2163,12 +1718,6 @@ class MarketAnalyzer:
         except Exception as e:
             self.logger.error(f"Scalping tarama hatası: {e}")
             return []
-        finally:
-            try:
-                if exchange:
-                    await exchange.close()
-            except Exception as e:
-                self.logger.error(f"Exchange kapatma hatası: {e}")
                 
     async def _analyze_scalping_opportunity(self, symbol: str, current_price: float, volume: float, exchange) -> Dict:
         """Scalping fırsatını analiz et (15 dakikalık grafik)"""
@@ -2178,8 +1727,13 @@ class MarketAnalyzer:
             if '/' not in symbol and 'USDT' in symbol:
                 exchange_symbol = f"{symbol[:-4]}/USDT"
             
-            # 15 dakikalık OHLCV verilerini al
-            ohlcv = await exchange.fetch_ohlcv(exchange_symbol, '15m', limit=100)
+            # 15 dakikalık OHLCV verilerini al - başka bir tüketici (ör. takip) sembolün
+            # 15m akışını zaten tutuyorsa tampondan, değilse REST. Tek seferlik tarama
+            # abone olmaz: her yeni sembol için backfill + REST ağırlığı iki katına çıkardı.
+            stream = get_kline_stream()
+            ohlcv = stream.get_ohlcv(exchange_symbol, '15m', limit=100) if stream is not None else None
+            if ohlcv is None:
+                ohlcv = await exchange.fetch_ohlcv(exchange_symbol, '15m', limit=100)
             
             if not ohlcv or len(ohlcv) < 20:
                 return None
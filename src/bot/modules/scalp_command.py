@@ -52,15 +52,8 @@ async def cmd_scalp(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
                     caption=f"📊 {symbol} 15m Grafiği"
                 )
         else:
-            # Tüm sembolleri taramak çok zaman alacağından, sadece popüler coinleri analiz et
-            popular_coins = [
-                "BTC/USDT", "ETH/USDT", "BNB/USDT", "SOL/USDT", "XRP/USDT", 
-                "ADA/USDT", "DOGE/USDT", "DOT/USDT", "AVAX/USDT", "LINK/USDT",
-                "MATIC/USDT", "ATOM/USDT", "UNI/USDT", "LTC/USDT", "NEAR/USDT"
-            ]
-            
-            # Tüm coinleri analiz et
-            opportunities = await self.dual_analyzer.scan_market(popular_coins)
+            # Hacim filtresini geçen tüm USDT evrenini analiz et (eşzamanlı getirme + işçi havuzu)
+            opportunities = await self.dual_analyzer.scan_market()
             
             if not opportunities:
                 await msg.edit_text(
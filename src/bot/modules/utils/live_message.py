@@ -0,0 +1,115 @@
+"""
+Akan tarama sonuçları için yerinde güncellenen Telegram mesajı.
+
+Tarama tüm evren bitene kadar "taranıyor..." mesajında bekliyordu. LiveMessage
+tek bir mesajı ara sonuçlarla düzenler; Telegram'ın düzenleme sınırlarına
+takılmamak için güncellemeler `min_interval` saniyede bire seyreltilir ve
+metin değişmediyse istek atılmaz. Kullanıcı "Durdur" butonuna bastığında
+`ScanCancellation` ile tarama akışı beklemeden kesilir.
+"""
+import time
+import asyncio
+import logging
+from contextlib import suppress
+from typing import AsyncIterator, Dict, Optional
+from telegram.error import BadRequest, RetryAfter
+
+logger = logging.getLogger(__name__)
+
+
+class LiveMessage:
+    """Seyreltilmiş edit_text çağrılarıyla güncellenen tek mesaj"""
+
+    def __init__(self, message, min_interval: float = 1.5):
+        """
+        Args:
+            message: Güncellenecek telegram.Message
+            min_interval: İki düzenleme arasındaki en kısa süre (saniye)
+        """
+        self.message = message
+        self.min_interval = min_interval
+        self._text: Optional[str] = None
+        self._last_edit = 0.0
+        self.stats = {'edits': 0, 'skipped': 0}
+
+    async def update(self, text: str, force: bool = False, **kwargs) -> bool:
+        """
+        Mesajı güncelle; süre dolmadıysa (force değilse) veya metin aynıysa atla.
+
+        Returns:
+            Düzenleme yapıldıysa True
+        """
+        now = time.monotonic()
+        if text == self._text or (not force and now - self._last_edit < self.min_interval):
+            self.stats['skipped'] += 1
+            return False
+        try:
+            await self.message.edit_text(text, **kwargs)
+        except RetryAfter as e:
+            # Telegram yavaşlamamızı istedi; bu güncellemeyi atla, sonrakini ertele
+            self._last_edit = now + float(getattr(e, 'retry_after', self.min_interval))
+            self.stats['skipped'] += 1
+            return False
+        except BadRequest as e:
+            if 'not modified' not in str(e).lower():
+                logger.warning(f"Mesaj güncellenemedi: {str(e)}")
+            self.stats['skipped'] += 1
+            return False
+        self._text = text
+        self._last_edit = now
+        self.stats['edits'] += 1
+        return True
+
+
+class ScanCancellation:
+    """Sohbet başına çalışan taramaların durdurma sinyalleri"""
+
+    def __init__(self):
+        self._events: Dict[int, asyncio.Event] = {}
+
+    def begin(self, chat_id: int) -> asyncio.Event:
+        """Sohbet için yeni bir durdurma sinyali (önceki taramanınki durdurulur)"""
+        previous = self._events.get(chat_id)
+        if previous is not None:
+            previous.set()
+        event = asyncio.Event()
+        self._events[chat_id] = event
+        return event
+
+    def cancel(self, chat_id: int) -> bool:
+        """Sohbetin çalışan taramasını durdur; tarama yoksa False"""
+        event = self._events.get(chat_id)
+        if event is None or event.is_set():
+            return False
+        event.set()
+        return True
+
+    def finish(self, chat_id: int, event: asyncio.Event):
+        if self._events.get(chat_id) is event:
+            del self._events[chat_id]
+
+
+async def until_cancelled(stream: AsyncIterator, stop: asyncio.Event) -> AsyncIterator:
+    """
+    stream'in öğelerini ver; stop set edilince bir sonraki öğeyi beklemeden bitir.
+
+    Her iki durumda da stream kapatılır (aclose), böylece arkadaki tarama işleri iptal olur.
+    """
+    stop_wait = asyncio.ensure_future(stop.wait())
+    try:
+        while True:
+            next_item = asyncio.ensure_future(stream.__anext__())
+            await asyncio.wait({next_item, stop_wait}, return_when=asyncio.FIRST_COMPLETED)
+            if not next_item.done():
+                next_item.cancel()
+                with suppress(asyncio.CancelledError, StopAsyncIteration):
+                    await next_item
+                return
+            try:
+                item = next_item.result()
+            except StopAsyncIteration:
+                return
+            yield item
+    finally:
+        stop_wait.cancel()
+        await stream.aclose()
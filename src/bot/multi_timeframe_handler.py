@@ -1,6 +1,7 @@
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, CommandHandler, CallbackQueryHandler, Application, CallbackContext
 from telegram.error import BadRequest
+import asyncio
 import logging
 from typing import List, Dict, Optional, Any, Tuple
 import os
@@ -8,7 +9,12 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from src.analysis.multi_timeframe_analyzer import MultiTimeframeAnalyzer
 from datetime import datetime
-import ccxt
+from src.exchanges.gateway import get_gateway
+from src.analysis.background_scanner import background_scan_enabled, format_freshness, get_background_scanner
+from src.bot.modules.utils.live_message import LiveMessage, ScanCancellation
+
+# Genel /multiscan mesajında gösterilen en fazla fırsat
+MULTISCAN_TOP = int(os.getenv('MULTISCAN_TOP', '20'))
 
 class MultiTimeframeHandler:
     """
@@ -21,9 +27,92 @@ class MultiTimeframeHandler:
         self.logger = logger or logging.getLogger('MultiTimeframeHandler')
         self.bot = bot_instance
         self.analyzer = MultiTimeframeAnalyzer(logger=self.logger)
-        self.exchange = ccxt.binance()
+        self.exchange = get_gateway()
+        # Genel /multiscan 4h mum kapanışlarında arka planda taranır, kullanıcılar görüntüyü paylaşır
+        self.scanner = get_background_scanner()
+        self.cancellation = ScanCancellation()  # Sohbet başına bekleyen taramalar
+        self.scanner.register('multiscan', self._scan_universe, '4h',
+                              background=background_scan_enabled('multiscan'))
         self.logger.info("MultiTimeframeHandler başlatıldı")
     
+    async def _scan_universe(self, report) -> List[Dict]:
+        """Tüm USDT evreninin çoklu zaman dilimi taraması (arka plan işi, parça parça ilerleme bildirir)"""
+        return await self.analyzer.scan_market(report=report)
+    
+    async def _general_scan(self, progress: LiveMessage, chat_id: int) -> Tuple[Optional[List[Dict]], str, bool]:
+        """
+        Genel taramanın sonuçları ve tazelik notu.
+        
+        Görüntü yoksa paylaşılan taramayı bekler ve ilerlemeyi `progress` mesajında
+        gösterir; kullanıcı durdurursa yalnızca beklemeyi bırakır (tarama diğerleri
+        için sürer) ve o ana kadarki en iyiler döner.
+        
+        Returns:
+            (puana göre ilk MULTISCAN_TOP fırsat, tazelik notu, durduruldu mu);
+            tarama başarısız olursa fırsatlar None olur
+        """
+        snapshot = self.scanner.peek('multiscan')
+        if snapshot is None:
+            stop = self.cancellation.begin(chat_id)
+            try:
+                snapshot = await self._wait_for_scan(progress, stop)
+            except Exception as e:
+                self.logger.error(f"Multiscan taraması başarısız: {str(e)}")
+                return None, "", False
+            finally:
+                self.cancellation.finish(chat_id, stop)
+            if snapshot is None:
+                partial = self.scanner.progress('multiscan') or {}
+                return partial.get('top', [])[:MULTISCAN_TOP], "⏹ Tarama durduruldu (kısmi sonuç)", True
+        # Tüm evren puanlanır; mesaja puana göre ilk MULTISCAN_TOP fırsat sığar
+        return snapshot['opportunities'][:MULTISCAN_TOP], format_freshness(snapshot), False
+    
+    async def _wait_for_scan(self, progress: LiveMessage, stop: asyncio.Event) -> Optional[Dict]:
+        """Paylaşılan taramayı bekle; durdurulursa None"""
+        scan = asyncio.ensure_future(self.scanner.get('multiscan'))
+        stop_wait = asyncio.ensure_future(stop.wait())
+        try:
+            while not scan.done():
+                await asyncio.wait({scan, stop_wait}, timeout=progress.min_interval,
+                                   return_when=asyncio.FIRST_COMPLETED)
+                if stop.is_set() and not scan.done():
+                    return None
+                scan_update = self.scanner.progress('multiscan')
+                if scan_update and not scan.done():
+                    await progress.update(self._format_progress(scan_update), reply_markup=self.cancel_keyboard())
+            return scan.result()
+        finally:
+            stop_wait.cancel()
+            if not scan.done():
+                scan.cancel()  # Yalnızca beklemeyi bırakır; tarama SingleFlight içinde sürer
+    
+    async def _show_general_scan(self, progress: LiveMessage, chat_id: int):
+        """Genel taramayı canlı ilerlemeyle bekle ve sonuçları aynı mesaja yaz"""
+        results, note, _ = await self._general_scan(progress, chat_id)
+        if results is None:
+            await progress.update("❌ Market verisi alınamadı. Lütfen daha sonra tekrar deneyin.", force=True)
+            return
+        await self._show_results(lambda text, **kwargs: progress.update(text, force=True, **kwargs),
+                                 results, None, note)
+    
+    def cancel_keyboard(self) -> InlineKeyboardMarkup:
+        """Beklenen taramayı durdurma butonu"""
+        return InlineKeyboardMarkup([[InlineKeyboardButton("⏹ Durdur", callback_data="multicancel")]])
+    
+    def _format_progress(self, scan_update: Dict, top_n: int = 5) -> str:
+        """Akan tarama güncellemesinden ilerleme mesajı"""
+        total = max(1, scan_update['total'])
+        message = (
+            f"⏳ Market taranıyor... %{100 * scan_update['scanned'] / total:.0f}\n"
+            f"📊 {scan_update['scanned']}/{scan_update['total']} coin • "
+            f"✨ {scan_update['found']} fırsat • ⏱ {scan_update['elapsed']:.0f}s\n"
+        )
+        if scan_update['top']:
+            message += "\n🏆 Şu ana kadar en iyiler:\n"
+            for i, opp in enumerate(scan_update['top'][:top_n], 1):
+                message += f"{i}. {opp['symbol']} — {opp['opportunity_score']:.1f} {opp.get('signal', '')}\n"
+        return message
+    
     async def initialize(self):
         """
         Handler'ı başlat
@@ -53,11 +142,14 @@ class MultiTimeframeHandler:
                     symbol += 'USDT'
                 wait_message = await message.reply_text(f"⏳ {symbol} için analiz yapılıyor...")
             else:
-                wait_message = await message.reply_text("⏳ Market taranıyor...")
+                # Tarama sürerken mesaj yerinde güncellenir; kullanıcı beklemeyi durdurabilir
+                progress = LiveMessage(await message.reply_text("⏳ Market taranıyor...",
+                                                                reply_markup=self.cancel_keyboard()))
+                await self._show_general_scan(progress, message.chat_id)
+                return
 
             try:
-                # ccxt.binance() senkron API kullanıyor, await kullanmıyoruz
-                tickers = self.exchange.fetch_tickers()
+                tickers = await self.exchange.fetch_tickers()
                 
                 # Sadece USDT çiftlerini filtrele
                 ticker_data = []
@@ -79,37 +171,13 @@ class MultiTimeframeHandler:
                 await wait_message.edit_text("❌ Market verisi alınamadı. Lütfen daha sonra tekrar deneyin.")
                 return
 
-            # Market analizi yap
-            if symbol:
-                # Tek sembol analizi
-                symbol_data = next((t for t in ticker_data if t['symbol'] == symbol), None)
-                if not symbol_data:
-                    await wait_message.edit_text(f"❌ {symbol} için veri bulunamadı.")
-                    return
-                results = await self.analyzer.scan_market([symbol_data])
-            else:
-                # Genel tarama
-                results = await self.analyzer.scan_market(ticker_data)
-
-            if not results:
-                await wait_message.edit_text("❌ Analiz sonucu bulunamadı.")
+            # Tek sembol analizi
+            symbol_data = next((t for t in ticker_data if t['symbol'] == symbol), None)
+            if not symbol_data:
+                await wait_message.edit_text(f"❌ {symbol} için veri bulunamadı.")
                 return
-
-            # Sonuçları formatla
-            formatted_message = self._format_multi_results(results)
-            
-            # Yenileme butonu ekle
-            refresh_button = InlineKeyboardButton(
-                "🔄 Yenile",
-                callback_data=f"refresh_multi{'_'+symbol if symbol else ''}"
-            )
-            
-            # Mesajı gönder
-            await wait_message.edit_text(
-                formatted_message,
-                reply_markup=InlineKeyboardMarkup([[refresh_button]]),
-                parse_mode='HTML'
-            )
+            results = await self.analyzer.scan_market([symbol_data])
+            await self._show_results(wait_message.edit_text, results, f"refresh_multi_{symbol}")
 
         except Exception as e:
             self.logger.error(f"Multiscan hatası: {str(e)}")
@@ -124,9 +192,15 @@ class MultiTimeframeHandler:
             callback_data = query.data
             symbol = callback_data.split('_')[2] if len(callback_data.split('_')) > 2 else None
             
+            if not symbol:
+                progress = LiveMessage(query.message)
+                await progress.update("⏳ Market taranıyor...", force=True, reply_markup=self.cancel_keyboard())
+                await self._show_general_scan(progress, query.message.chat_id)
+                return
+            
             try:
                 # Ticker verilerini al
-                tickers = self.exchange.fetch_tickers()
+                tickers = await self.exchange.fetch_tickers()
                 
                 # Sadece USDT çiftlerini filtrele
                 ticker_data = []
@@ -149,39 +223,39 @@ class MultiTimeframeHandler:
                 return
 
             # Market analizi yap
-            if symbol:
-                symbol_data = next((t for t in ticker_data if t['symbol'] == symbol), None)
-                if not symbol_data:
-                    await query.edit_message_text(f"❌ {symbol} için veri bulunamadı.")
-                    return
-                results = await self.analyzer.scan_market([symbol_data])
-            else:
-                results = await self.analyzer.scan_market(ticker_data)
-            
-            if not results:
-                await query.edit_message_text("❌ Analiz sonucu bulunamadı.")
+            symbol_data = next((t for t in ticker_data if t['symbol'] == symbol), None)
+            if not symbol_data:
+                await query.edit_message_text(f"❌ {symbol} için veri bulunamadı.")
                 return
-
-            # Sonuçları formatla
-            formatted_message = self._format_multi_results(results)
-            
-            # Yenileme butonu
-            refresh_button = InlineKeyboardButton(
-                "🔄 Yenile",
-                callback_data=query.data
-            )
-            
-            # Mesajı güncelle
-            await query.edit_message_text(
-                formatted_message,
-                reply_markup=InlineKeyboardMarkup([[refresh_button]]),
-                parse_mode='HTML'
-            )
+            results = await self.analyzer.scan_market([symbol_data])
+            await self._show_results(query.edit_message_text, results, query.data)
 
         except Exception as e:
             self.logger.error(f"Refresh hatası: {str(e)}")
             await query.edit_message_text("❌ Yenileme sırasında bir hata oluştu.")
     
+    async def _show_results(self, edit, results: List[Dict], callback_data: Optional[str],
+                            freshness: str = ""):
+        """Sonuçları yenileme butonuyla mesaja yaz (edit: edit_text veya edit_message_text)"""
+        if not results:
+            await edit("❌ Analiz sonucu bulunamadı.")
+            return
+        
+        # Sonuçları formatla
+        formatted_message = self._format_multi_results(results)
+        if freshness:
+            formatted_message += f"\n{freshness}"
+        
+        # Yenileme butonu
+        refresh_button = InlineKeyboardButton("🔄 Yenile", callback_data=callback_data or "refresh_multi")
+        
+        # Mesajı güncelle
+        await edit(
+            formatted_message,
+            reply_markup=InlineKeyboardMarkup([[refresh_button]]),
+            parse_mode='HTML'
+        )
+    
     def _format_multi_results(self, results: List[Dict]) -> str:
         """Çoklu zaman dilimi analiz sonuçlarını formatla"""
         try:
@@ -13,7 +13,6 @@ import pandas as pd
 import aiohttp
 from bs4 import BeautifulSoup
 import re
-import ccxt
 from dotenv import load_dotenv
 import os
 from pathlib import Path
@@ -40,6 +39,13 @@ from logging.handlers import RotatingFileHandler
 # Multi timeframe handler'ı başlangıçta import etme, lazım olduğunda et
 # from src.bot.multi_timeframe_handler import MultiTimeframeHandler
 from src.analysis.ai_analyzer import AIAnalyzer
+from src.exchanges.gateway import get_gateway, close_gateway
+from src.exchanges.price_feed import get_price_feed, stop_price_feed
+from src.data_collectors.kline_stream import stop_kline_stream
+from src.analysis.worker_pool import get_worker_pool, stop_worker_pool
+from src.analysis.background_scanner import get_background_scanner, stop_background_scanner
+from src.analysis.ai_client import stop_ai_client
+from .modules.utils.live_message import LiveMessage
 
 # .env dosyasının yolunu bul
 env_path = Path(__file__).parent.parent.parent / '.env'
@@ -327,13 +333,8 @@ class TelegramBot:
         # Initialize technical analysis module
         self.analyzer = MarketAnalyzer(self.logger)
         
-        # Initialize exchange connection
-        self.exchange = ccxt.binance({
-            'enableRateLimit': True,
-            'options': {
-                'defaultType': 'spot'
-            }
-        })
+        # Paylaşılan, bloklamayan exchange gateway'i
+        self.exchange = get_gateway()
         
         # Initialize tracking variables
         self.tracked_coins = {}  # {chat_id: {symbol: {'entry_price': float, 'last_update': datetime}}}
@@ -399,6 +400,12 @@ class TelegramBot:
         # Bot başlatılıyor
         await self.application.initialize()
         
+        # Tarama işçi havuzunu şimdiden başlat; süreçler arka planda modülleri yükleyip ısınır
+        get_worker_pool().start()
+        
+        # 15m/1h/4h taramaları mum kapanışlarında arka planda yenilenir; komutlar anlık görüntüden yanıtlanır
+        get_background_scanner().start()
+        
         # MultiTimeframeHandler'ı initialize et (eğer daha önce oluşurulmadıysa)
         try:
             if hasattr(self, 'multi_handler') and self.multi_handler is not None and not hasattr(self.multi_handler, '_initialized'):
@@ -451,6 +458,14 @@ class TelegramBot:
             await self.application.updater.stop()
             await self.application.stop()
             await self.application.shutdown()
+            
+            # Fiyat dağıtım servisini ve exchange bağlantı havuzunu kapat
+            await stop_background_scanner()
+            await stop_price_feed()
+            await stop_kline_stream()
+            await close_gateway()
+            await stop_worker_pool()
+            await stop_ai_client()
             self.logger.info("Bot durduruldu!")
         except Exception as e:
             self.logger.error(f"Bot durdurma hatası: {e}")
@@ -790,28 +805,48 @@ class TelegramBot:
             if context.args and len(context.args) > 0:
                 scan_type = context.args[0].lower()
             
-            # Kullanıcıya bilgi ver
-            await update.message.reply_text(
+            # Kullanıcıya bilgi ver; bu mesaj tarama boyunca ara sonuçlarla güncellenir
+            progress = LiveMessage(await update.message.reply_text(
                 f"🔍 Piyasa taranıyor...\n"
-                f"⏳ Lütfen bekleyin, bu işlem birkaç dakika sürebilir..."
-            )
+                f"⏳ İlk sonuçlar birkaç saniye içinde burada görünecek...",
+                reply_markup=self.scan_handler.cancel_keyboard()
+            ))
             
             # Tüm tarama türleri için handler'ı kullan
             self.logger.info(f"4 saatlik tarama başlatıldı - {chat_id} (tip: {scan_type})")
             
-            # ScanHandler kullanarak tarama yap
+            # ScanHandler kullanarak akan tarama yap
             try:
-                # Zaten mevcut ScanHandler'ı kullan
-                opportunities = await self.scan_handler.scan_market("4h")
+                ticker_count, opportunities, cancelled = await self.scan_handler.run_live_scan(progress, chat_id, "4h")
+                if ticker_count is None:
+                    return
                 
                 if not opportunities or len(opportunities) == 0:
                     self.logger.warning("Tarama sonucu bulunamadı")
-                    await update.message.reply_text(
+                    await progress.update(
                         "❌ Şu anda uygun işlem fırsatı bulunamadı!\n"
                         "Lütfen daha sonra tekrar deneyin.\n\n"
-                        "💡 İPUCU: Piyasa koşulları sürekli değişir. Piyasada faaliyetin artmasını bekleyebilirsiniz."
+                        "💡 İPUCU: Piyasa koşulları sürekli değişir. Piyasada faaliyetin artmasını bekleyebilirsiniz.",
+                        force=True
                     )
                     return
+                
+                await progress.update(
+                    f"{'⏹ Tarama durduruldu (kısmi sonuç)' if cancelled else '✅ Tarama tamamlandı'}: "
+                    f"{len(opportunities)} fırsat\n{self.scan_handler.scan_freshness('4h')}\n"
+                    f"⏳ Sonuçlar hazırlanıyor...",
+                    reply_markup=None if cancelled else self.scan_handler.cancel_keyboard(),
+                    force=True
+                )
+                
+                # Durdurulan taramada AI zenginleştirmesi beklenmez; AI sırasında durdurulursa
+                # bekleyen analizler iptal edilir
+                if not cancelled:
+                    stop = self.scan_handler.cancellation.begin(chat_id)
+                    try:
+                        opportunities = await self.scan_handler.enrich_with_ai(opportunities, stop)
+                    finally:
+                        self.scan_handler.cancellation.finish(chat_id, stop)
                     
             except Exception as e:
                 self.logger.error(f"Tarama hatası: {e}")
@@ -821,14 +856,6 @@ class TelegramBot:
                 )
                 return
             
-            if not opportunities or len(opportunities) == 0:
-                await update.message.reply_text(
-                    "❌ Şu anda uygun işlem fırsatı bulunamadı!\n"
-                    "Lütfen daha sonra tekrar deneyin.\n\n"
-                    "💡 İPUCU: Piyasa koşulları sürekli değişir. Piyasada faaliyetin artmasını bekleyebilirsiniz."
-                )
-                return
-            
             # Sonuçları kaydet
             self.last_scan_results[chat_id] = opportunities
             
@@ -858,8 +885,17 @@ class TelegramBot:
             # Önemli: İşlem başladığını günlüğe yaz
             self.logger.info(f"Callback işleniyor: {callback_data} - {chat_id}")
             
+            # Çalışan taramayı durdur
+            if callback_data == "scancancel":
+                if not self.scan_handler.cancellation.cancel(chat_id):
+                    await query.edit_message_reply_markup(reply_markup=None)
+            
+            elif callback_data == "multicancel":
+                if not self.multi_handler or not self.multi_handler.cancellation.cancel(chat_id):
+                    await query.edit_message_reply_markup(reply_markup=None)
+            
             # Track butonları
-            if callback_data.startswith("track_"):
+            elif callback_data.startswith("track_"):
                 index = int(callback_data.split("_")[1])
                 await self.track_button_callback(update, context, index)
             
@@ -1100,7 +1136,7 @@ class TelegramBot:
             
             # ScanHandler'ı kullan (MarketAnalyzer yerine)
             try:
-                # Her durumda scan_handler.scan_market'i çağır
+                # Arka plan taramasının görüntüsü tazeyse anında döner, değilse paylaşılan taramayı bekler
                 opportunities = await self.scan_handler.scan_market("4h")
                 
                 if not opportunities or len(opportunities) == 0:
@@ -1466,6 +1502,8 @@ class TelegramBot:
 
     async def smart_tracking_task(self, chat_id: int, symbol: str):
         """Akıllı takip görevi - 30 saniyede bir bildirim gönderir"""
+        # Fiyatlar tüm takipler için tek toplu sorguyla gelir
+        subscription = get_price_feed().subscribe(symbol)
         try:
             # Takip başlangıç mesajı
             start_message = (
@@ -1495,22 +1533,12 @@ class TelegramBot:
                 
                 # Coin verilerini güncelle
                 try:
-                    # Exchange bağlantısı - CCXT sınıfının senkron versiyonunu kullan
-                    exchange = ccxt.binance({
-                        'enableRateLimit': True,
-                        'options': {
-                            'defaultType': 'spot'
-                        }
-                    })
-                    
-                    # !! Önemli: CCXT'nin senkron versiyonunda await kullanılmaz !!
-                    # Bu bir senkron fonksiyon olduğu için await olmadan çağrılmalı
-                    ticker = exchange.fetch_ticker(symbol)
+                    ticker = await subscription.latest(timeout=30)
                     
-                    if not ticker:
+                    if not ticker or subscription.price is None:
                         continue
                     
-                    current_price = float(ticker['last'])
+                    current_price = subscription.price
                 except Exception as e:
                     self.logger.error(f"Ticker verisi alınamadı ({symbol}): {e}")
                     continue
@@ -1645,6 +1673,8 @@ class TelegramBot:
                 
         except Exception as e:
             self.logger.error(f"Akıllı takip görevi hatası ({symbol}): {e}")
+        finally:
+            subscription.close()
 
     @telegram_retry()
     async def premium_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -1827,14 +1857,8 @@ class TelegramBot:
                     await msg.edit_text(f"❌ {symbol} için analiz yapılırken hata oluştu: {str(e)}")
                     return
             else:
-                # Popüler coinleri analiz et
-                popular_coins = [
-                    "BTCUSDT", "ETHUSDT", "BNBUSDT", "SOLUSDT", "XRPUSDT", 
-                    "ADAUSDT", "DOGEUSDT", "DOTUSDT", "AVAXUSDT", "LINKUSDT"
-                ]
-                
-                # Tarama işlemini başlat
-                opportunities = await dual_analyzer.scan_market(popular_coins)
+                # Hacim filtresini geçen tüm USDT evrenini analiz et (eşzamanlı getirme + işçi havuzu)
+                opportunities = await dual_analyzer.scan_market()
                 
                 if not opportunities:
                     await msg.edit_text(
@@ -1906,15 +1930,7 @@ class TelegramBot:
         try:
             # Ticker verisi al
             try:
-                # DÜZELTME: Senkron CCXT API'sini kullan, await kullanma
-                exchange = ccxt.binance({
-                    'enableRateLimit': True,
-                    'options': {
-                        'defaultType': 'spot'
-                    }
-                })
-                # Senkron API çağrısı - await KULLANMA
-                ticker_data = exchange.fetch_ticker(symbol)
+                ticker_data = await self.exchange.fetch_ticker(symbol)
                 current_price = float(ticker_data['last'])
                 volume = float(ticker_data['quoteVolume'])
             except Exception as ticker_error:
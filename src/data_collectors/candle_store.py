@@ -0,0 +1,326 @@
+"""
+Artımlı OHLCV mum deposu.
+
+Tüm analizörler aynı (sembol, zaman dilimi) mumlarını her taramada baştan
+çekiyordu. Bu depo mumları iki katmanda tutar:
+
+- Sıcak katman: süreç içi sözlük, (sembol, zaman dilimi) -> (6, N) float64 dizi
+- Disk katmanı: her anahtar için tek bir .npy dosyası, memory-map ile okunur
+
+Dizi sütun bazlıdır: satırlar sırasıyla timestamp, open, high, low, close,
+volume. Milisaniye timestamp'leri float64 içinde kayıpsız saklanır.
+
+Borsadan yalnızca son kayıtlı mumdan sonraki mumlar istenir, aradaki
+boşluklar tespit edilip ayrı isteklerle onarılır. Anahtar son `min_refresh`
+saniye içinde tazelendiyse (ör. aynı taramada ikinci kez istenirse) borsaya
+hiç gidilmez; bu çağrılar stats['hits'] ile sayılır.
+"""
+import os
+import time
+import logging
+import threading
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from src.data_collectors.ohlcv_array import OHLCVArray
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+# Binance tek istekte en fazla 1000 mum döndürür
+MAX_FETCH_LIMIT = 1000
+
+_TIMEFRAME_UNITS_MS = {
+    'm': 60 * 1000,
+    'h': 60 * 60 * 1000,
+    'd': 24 * 60 * 60 * 1000,
+    'w': 7 * 24 * 60 * 60 * 1000,
+    'M': 30 * 24 * 60 * 60 * 1000,
+}
+
+
+def timeframe_to_ms(timeframe: str) -> int:
+    """'15m', '4h', '1d' gibi zaman dilimini milisaniyeye çevirir"""
+    try:
+        amount = int(timeframe[:-1])
+        return amount * _TIMEFRAME_UNITS_MS[timeframe[-1]]
+    except (ValueError, KeyError, IndexError):
+        raise ValueError(f"Geçersiz zaman dilimi: {timeframe}")
+
+
+class CandleStore:
+    """(sembol, zaman dilimi) anahtarlı, sıcak + disk katmanlı mum deposu"""
+
+    def __init__(self, cache_dir: str = 'cache/candles', max_candles: int = 1000, min_refresh: float = 0.0):
+        """
+        Args:
+            cache_dir: Disk katmanının .npy dosyalarını yazacağı dizin
+            max_candles: Anahtar başına saklanacak en fazla mum sayısı
+            min_refresh: Bu kadar saniye içinde tazelenmiş anahtar için borsaya gidilmez
+                (0 ise her çağrıda son mum tazelenir)
+        """
+        self.cache_dir = cache_dir
+        self.max_candles = max_candles
+        self.min_refresh = min_refresh
+        self._hot: Dict[Tuple[str, str], np.ndarray] = {}
+        self._known_gaps: Dict[Tuple[str, str], set] = {}
+        self._refreshed: Dict[Tuple[str, str], int] = {}  # Anahtarın son tazelendiği an (ms)
+        self._lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'full_fetches': 0,
+            'incremental_fetches': 0,
+            'gap_repairs': 0,
+            'candles_fetched': 0,
+        }
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # Okuma / yazma
+    # ------------------------------------------------------------------
+
+    def _path(self, key: Tuple[str, str]) -> str:
+        symbol, timeframe = key
+        return os.path.join(self.cache_dir, f"{symbol.replace('/', '_')}_{timeframe}.npy")
+
+    def _load(self, key: Tuple[str, str]) -> Optional[np.ndarray]:
+        """Önce sıcak katmana, yoksa diske bak"""
+        with self._lock:
+            data = self._hot.get(key)
+        if data is not None:
+            return data
+
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            mapped = np.load(path, mmap_mode='r')
+            if mapped.ndim != 2 or mapped.shape[0] != len(OHLCV_COLUMNS):
+                return None
+            data = np.array(mapped)
+        except Exception as e:
+            logger.warning(f"Mum dosyası okunamadı ({path}): {str(e)}")
+            return None
+
+        with self._lock:
+            self._hot[key] = data
+        return data
+
+    def _persist(self, key: Tuple[str, str], data: np.ndarray):
+        """Diziyi atomik olarak diske yaz (diğer süreçler yarım dosya görmez)"""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.save(f, data)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Mum dosyası yazılamadı ({path}): {str(e)}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def _merge(self, key: Tuple[str, str], rows: List[list]) -> Optional[np.ndarray]:
+        """Yeni mumları mevcut seriyle birleştir; aynı timestamp'te yeni veri kazanır"""
+        existing = self._load(key)
+        if rows:
+            new = np.asarray(rows, dtype=np.float64)[:, :len(OHLCV_COLUMNS)].T
+            combined = new if existing is None else np.concatenate([existing, new], axis=1)
+
+            # Son görülen kaydı tut: ters dizide ilk görülen = orijinalde son görülen
+            timestamps = combined[0]
+            _, reversed_idx = np.unique(timestamps[::-1], return_index=True)
+            keep = len(timestamps) - 1 - reversed_idx
+            merged = np.ascontiguousarray(combined[:, keep][:, -self.max_candles:])
+
+            with self._lock:
+                self._hot[key] = merged
+            self._persist(key, merged)
+            return merged
+        return existing
+
+    # ------------------------------------------------------------------
+    # Boşluk tespiti ve istek planlama
+    # ------------------------------------------------------------------
+
+    def find_gaps(self, symbol: str, timeframe: str) -> List[Tuple[int, int]]:
+        """
+        Saklı seride eksik mum aralıklarını döndürür.
+
+        Returns:
+            [(ilk_eksik_ts, son_eksik_ts), ...] listesi
+        """
+        data = self._load((symbol, timeframe))
+        if data is None or data.shape[1] < 2:
+            return []
+        return self._gaps_in(data[0], timeframe_to_ms(timeframe))
+
+    @staticmethod
+    def _gaps_in(timestamps: np.ndarray, tf_ms: int) -> List[Tuple[int, int]]:
+        diffs = np.diff(timestamps)
+        gap_idx = np.nonzero(diffs > tf_ms)[0]
+        return [
+            (int(timestamps[i]) + tf_ms, int(timestamps[i + 1]) - tf_ms)
+            for i in gap_idx
+        ]
+
+    def _plan_requests(self, key: Tuple[str, str], limit: int, now_ms: int) -> List[Dict]:
+        """
+        Eksik veriyi tamamlamak için gereken istekleri planla.
+
+        Returns:
+            {'since': ts veya None, 'limit': n, 'gap': (başlangıç, bitiş) veya None} listesi.
+            since=None tam çekim anlamına gelir; seri yeterli ve taze ise boş liste.
+        """
+        tf_ms = timeframe_to_ms(key[1])
+        data = self._load(key)
+        full = [{'since': None, 'limit': limit, 'gap': None}]
+
+        if data is None or data.shape[1] < limit:
+            return full
+
+        last_ts = int(data[0, -1])
+        missing = max(0, (now_ms - last_ts) // tf_ms)
+        # Son mumdan beri istenen pencereden fazlası geçtiyse baştan çekmek daha ucuz
+        if missing >= limit or missing + 1 > MAX_FETCH_LIMIT:
+            return full
+
+        requests = []
+
+        # İstenen pencere içindeki boşlukları onar
+        window_start = now_ms - limit * tf_ms
+        known = self._known_gaps.get(key, set())
+        for gap_start, gap_end in self._gaps_in(data[0], tf_ms):
+            if gap_end < window_start or (gap_start, gap_end) in known:
+                continue
+            count = (gap_end - gap_start) // tf_ms + 1
+            requests.append({'since': gap_start, 'limit': min(count, MAX_FETCH_LIMIT),
+                             'gap': (gap_start, gap_end)})
+
+        # Boşluk yok ve seri az önce tazelendi: saklı mumlar yeterli
+        refreshed = self._refreshed.get(key)
+        if not requests and refreshed is not None and now_ms - refreshed < self.min_refresh * 1000:
+            return requests
+
+        # Son (açık olabilecek) mum dahil yalnızca yeni mumları iste
+        requests.append({'since': last_ts, 'limit': int(missing) + 1, 'gap': None})
+        return requests
+
+    def _after_fetch(self, key: Tuple[str, str], request: Dict, rows: List[list]):
+        """İstek sonrası istatistikleri ve onarılamayan boşlukları güncelle"""
+        self.stats['candles_fetched'] += len(rows) if rows else 0
+        if request['since'] is None:
+            self.stats['full_fetches'] += 1
+        elif request['gap'] is not None:
+            self.stats['gap_repairs'] += 1
+            gap_start, gap_end = request['gap']
+            if not any(gap_start <= row[0] <= gap_end for row in rows or []):
+                # Borsada da veri yok (bakım vb.) - tekrar tekrar istemeyelim
+                self._known_gaps.setdefault(key, set()).add(request['gap'])
+        else:
+            self.stats['incremental_fetches'] += 1
+
+    def _tail(self, data: Optional[np.ndarray], limit: int) -> List[list]:
+        """Son `limit` mumu ccxt ile aynı list-of-lists formatında döndür"""
+        if data is None or data.shape[1] == 0:
+            return []
+        tail = data[:, -limit:].T
+        return [[int(row[0])] + row[1:].tolist() for row in tail]
+
+    # ------------------------------------------------------------------
+    # Genel API
+    # ------------------------------------------------------------------
+
+    def _fetch(self, exchange, symbol: str, timeframe: str, limit: int) -> Optional[np.ndarray]:
+        key = (symbol, timeframe)
+        now_ms = int(time.time() * 1000)
+        requests = self._plan_requests(key, limit, now_ms)
+        if not requests:
+            self.stats['hits'] += 1
+            return self._load(key)
+        data = None
+        for request in requests:
+            rows = exchange.fetch_ohlcv(symbol, timeframe, since=request['since'], limit=request['limit'])
+            self._after_fetch(key, request, rows)
+            data = self._merge(key, rows)
+        self._refreshed[key] = now_ms
+        return data
+
+    async def _fetch_async(self, exchange, symbol: str, timeframe: str, limit: int) -> Optional[np.ndarray]:
+        key = (symbol, timeframe)
+        now_ms = int(time.time() * 1000)
+        requests = self._plan_requests(key, limit, now_ms)
+        if not requests:
+            self.stats['hits'] += 1
+            return self._load(key)
+        data = None
+        for request in requests:
+            rows = await exchange.fetch_ohlcv(symbol, timeframe, since=request['since'], limit=request['limit'])
+            self._after_fetch(key, request, rows)
+            data = self._merge(key, rows)
+        self._refreshed[key] = now_ms
+        return data
+
+    @staticmethod
+    def _tail_array(data: Optional[np.ndarray], limit: int) -> OHLCVArray:
+        """Son `limit` mumu sıkıştırılmış OHLCVArray olarak döndür"""
+        if data is None or data.shape[1] == 0:
+            return OHLCVArray()
+        return OHLCVArray.from_columns(data[:, -limit:])
+
+    def get_ohlcv(self, exchange, symbol: str, timeframe: str, limit: int = 100) -> List[list]:
+        """
+        Senkron ccxt exchange ile mumları getir; yalnızca eksik kısım borsadan çekilir.
+
+        Args:
+            exchange: Senkron ccxt exchange nesnesi
+            symbol: İşlem çifti
+            timeframe: Zaman dilimi (1m, 15m, 1h, 4h, 1d...)
+            limit: İstenen mum sayısı
+
+        Returns:
+            ccxt fetch_ohlcv ile aynı formatta mum listesi
+        """
+        return self._tail(self._fetch(exchange, symbol, timeframe, limit), limit)
+
+    async def get_ohlcv_async(self, exchange, symbol: str, timeframe: str, limit: int = 100) -> List[list]:
+        """get_ohlcv'nin ccxt.async_support exchange'leri için asenkron karşılığı"""
+        return self._tail(await self._fetch_async(exchange, symbol, timeframe, limit), limit)
+
+    def get_array(self, exchange, symbol: str, timeframe: str, limit: int = 100) -> OHLCVArray:
+        """get_ohlcv ile aynı, sonuç list-of-lists yerine OHLCVArray"""
+        return self._tail_array(self._fetch(exchange, symbol, timeframe, limit), limit)
+
+    async def get_array_async(self, exchange, symbol: str, timeframe: str, limit: int = 100) -> OHLCVArray:
+        """get_ohlcv_async ile aynı, sonuç list-of-lists yerine OHLCVArray"""
+        return self._tail_array(await self._fetch_async(exchange, symbol, timeframe, limit), limit)
+
+    def get_cached(self, symbol: str, timeframe: str, limit: Optional[int] = None) -> List[list]:
+        """Borsaya gitmeden saklı mumları döndür"""
+        data = self._load((symbol, timeframe))
+        if data is None:
+            return []
+        return self._tail(data, limit or data.shape[1])
+
+    def clear(self, symbol: Optional[str] = None, timeframe: Optional[str] = None):
+        """Sıcak katmanı temizle (disk katmanına dokunmaz)"""
+        with self._lock:
+            for key in list(self._hot):
+                if (symbol is None or key[0] == symbol) and (timeframe is None or key[1] == timeframe):
+                    del self._hot[key]
+
+
+_store: Optional[CandleStore] = None
+_store_lock = threading.Lock()
+
+
+def get_candle_store() -> CandleStore:
+    """Süreç genelinde paylaşılan CandleStore örneğini döndür (CANDLE_CACHE_DIR, CANDLE_MIN_REFRESH)"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = CandleStore(cache_dir=os.getenv('CANDLE_CACHE_DIR', 'cache/candles'),
+                                     min_refresh=float(os.getenv('CANDLE_MIN_REFRESH', '2')))
+    return _store
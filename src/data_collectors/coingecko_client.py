@@ -5,7 +5,7 @@ import logging
 import requests
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
-import time
+from src.exchanges.rate_limiter import get_rate_limiter
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +14,8 @@ class CoinGeckoClient:
         """Initialize CoinGecko API client."""
         self.base_url = "https://api.coingecko.com/api/v3"
         self.session = requests.Session()
+        self.limiter = get_rate_limiter('coingecko')
+        self.max_retries = 3
         
     def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> Dict:
         """
@@ -28,14 +30,19 @@ class CoinGeckoClient:
         """
         url = f"{self.base_url}/{endpoint}"
         try:
-            response = self.session.get(url, params=params)
-            
-            # Handle rate limits
-            if response.status_code == 429:
-                retry_after = int(response.headers.get('retry-after', 60))
-                logger.warning(f"Rate limit reached. Waiting {retry_after} seconds...")
-                time.sleep(retry_after)
-                return self._make_request(endpoint, params)
+            for attempt in range(self.max_retries + 1):
+                with self.limiter.throttle():
+                    response = self.session.get(url, params=params)
+                
+                # Handle rate limits: the shared limiter pauses every caller until retry-after
+                if response.status_code == 429 and attempt < self.max_retries:
+                    retry_after = int(response.headers.get('retry-after', 60))
+                    logger.warning(f"Rate limit reached. Waiting {retry_after} seconds...")
+                    self.limiter.on_throttled(retry_after)
+                    continue
+                
+                self.limiter.on_success()
+                break
                 
             response.raise_for_status()
             return response.json()
@@ -0,0 +1,466 @@
+"""
+Binance WebSocket kline/miniTicker akışını halka tamponlara (ring buffer) yazan
+isteğe bağlı veri toplayıcı.
+
+Scalping ve takip modülleri 1m/3m/5m mumlar için REST sorgulama gecikmesine
+bağlıydı. Bu modül Binance combined stream'e bağlanır:
+
+- <sembol>@kline_<zaman dilimi> olayları (sembol, zaman dilimi) başına sabit
+  boyutlu (6, kapasite) numpy halka tampona yazılır
+- <sembol>@miniTicker olayları son fiyat tablosunu günceller
+- Bağlantı koptuğunda üstel bekleme ile yeniden bağlanır ve aradaki mumları
+  CandleStore üzerinden REST ile tamamlar (backfill)
+
+Analizörler get_ohlcv / get_ticker ile önce tamponlara bakar; akış kapalıysa,
+tampon henüz dolmadıysa veya ticker bayatsa None döner ve REST'e düşülür.
+
+Abonelikler referans sayımlıdır: subscribe() bir StreamSubscription döndürür,
+tüketici işi bitince close() çağırır. Hiç abonesi kalmayan akışlar
+`idle_timeout` saniye sonra tamponlarıyla birlikte bırakılır (kısa aralarla
+yeniden abone olan tüketiciler backfill'i tekrarlamaz). Tek seferlik
+taramalar abone olmamalı, yalnızca zaten tutulan tamponları okumalıdır.
+
+Etkinleştirmek için: ENABLE_KLINE_STREAM=true
+"""
+import os
+import json
+import time
+import asyncio
+import logging
+import aiohttp
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from src.data_collectors.candle_store import OHLCV_COLUMNS, get_candle_store, timeframe_to_ms
+
+logger = logging.getLogger(__name__)
+
+BINANCE_WS_URL = 'wss://stream.binance.com:9443'
+
+
+def to_unified(market_id: str) -> str:
+    """'BTCUSDT' -> 'BTC/USDT'"""
+    market_id = market_id.upper()
+    if '/' not in market_id and market_id.endswith('USDT') and len(market_id) > 4:
+        return f"{market_id[:-4]}/USDT"
+    return market_id
+
+
+def to_stream_id(symbol: str) -> str:
+    """'BTC/USDT' -> 'btcusdt'"""
+    return symbol.replace('/', '').lower()
+
+
+class KlineRingBuffer:
+    """(6, kapasite) boyutlu, eski mumların üzerine yazılan sabit boyutlu tampon"""
+
+    def __init__(self, capacity: int = 500):
+        self.capacity = capacity
+        self._data = np.zeros((len(OHLCV_COLUMNS), capacity), dtype=np.float64)
+        self._start = 0
+        self._count = 0
+        self.updated_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _index(self, offset: int) -> int:
+        return (self._start + offset) % self.capacity
+
+    @property
+    def last_ts(self) -> Optional[int]:
+        if self._count == 0:
+            return None
+        return int(self._data[0, self._index(self._count - 1)])
+
+    def push(self, row) -> bool:
+        """
+        Tek bir mumu O(1) ile ekle; son mumla aynı timestamp ise güncelle.
+
+        Returns:
+            Mum yazıldıysa True, son mumdan eski ise False
+        """
+        ts = row[0]
+        last = self.last_ts
+        if last is not None and ts < last:
+            return False
+        if last is not None and ts == last:
+            idx = self._index(self._count - 1)
+        else:
+            idx = self._index(self._count)
+            if self._count < self.capacity:
+                self._count += 1
+            else:
+                self._start = (self._start + 1) % self.capacity
+        self._data[:, idx] = row[:len(OHLCV_COLUMNS)]
+        self.updated_at = time.time()
+        return True
+
+    def extend(self, rows: List[list]):
+        """
+        Backfill mumlarını mevcut tamponla birleştir.
+
+        Aynı timestamp'te tampondaki (akıştan gelen, daha taze) veri korunur.
+        """
+        if not rows:
+            return
+        new = np.asarray(rows, dtype=np.float64)[:, :len(OHLCV_COLUMNS)].T
+        combined = np.concatenate([new, self.to_array()], axis=1)
+        timestamps = combined[0]
+        _, reversed_idx = np.unique(timestamps[::-1], return_index=True)
+        keep = len(timestamps) - 1 - reversed_idx
+        merged = combined[:, keep][:, -self.capacity:]
+
+        count = merged.shape[1]
+        self._data[:, :count] = merged
+        self._start = 0
+        self._count = count
+        self.updated_at = time.time()
+
+    def to_array(self) -> np.ndarray:
+        """Zaman sırasına göre (6, N) kopya"""
+        idx = (self._start + np.arange(self._count)) % self.capacity
+        return self._data[:, idx]
+
+    def tail(self, limit: int) -> List[list]:
+        """Son `limit` mumu ccxt fetch_ohlcv formatında döndür"""
+        data = self.to_array()[:, -limit:].T
+        return [[int(row[0])] + row[1:].tolist() for row in data]
+
+
+class StreamSubscription:
+    """Tek bir tüketicinin bir sembolün akışlarına aboneliği"""
+
+    def __init__(self, ingestor: 'KlineStreamIngestor', symbol: str, streams: Tuple[str, ...]):
+        self.symbol = symbol
+        self.streams = streams
+        self._ingestor = ingestor
+        self.closed = False
+
+    def close(self):
+        """Aboneliği bırak (referans sayısını azaltır)"""
+        if not self.closed:
+            self.closed = True
+            self._ingestor._release(self)
+
+
+class KlineStreamIngestor:
+    """Binance combined stream'den halka tamponları besleyen servis"""
+
+    def __init__(self, url: str = BINANCE_WS_URL, capacity: int = 500, gateway=None,
+                 candle_store=None, reconnect_delay: float = 1.0, max_reconnect_delay: float = 60.0,
+                 idle_timeout: float = 300.0, ticker_max_age: float = 10.0):
+        """
+        Args:
+            url: WebSocket taban adresi (testlerde yerel sunucu)
+            capacity: (sembol, zaman dilimi) başına tutulacak mum sayısı
+            gateway: Backfill için fetch_ohlcv sağlayan async exchange
+            candle_store: Backfill mumlarının geçtiği CandleStore
+            reconnect_delay: İlk yeniden bağlanma beklemesi (saniye)
+            max_reconnect_delay: Üstel beklemenin üst sınırı
+            idle_timeout: Abonesi kalmayan akışın bırakılmadan önce tutulacağı süre (saniye)
+            ticker_max_age: Bu süreden (saniye) eski ticker'lar için get_ticker None döner
+        """
+        self.url = url.rstrip('/')
+        self.capacity = capacity
+        self._gateway = gateway
+        self.candle_store = candle_store or get_candle_store()
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.idle_timeout = idle_timeout
+        self.ticker_max_age = ticker_max_age
+
+        self._buffers: Dict[Tuple[str, str], KlineRingBuffer] = {}
+        self._tickers: Dict[str, Dict] = {}
+        self._ticker_times: Dict[str, float] = {}
+        self._streams: Set[str] = set()
+        self._refs: Dict[str, int] = {}
+        self._idle: Dict[str, float] = {}
+        self._next_sweep = 0.0
+        self._backfills: Dict[Tuple[str, str], asyncio.Task] = {}
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._task: Optional[asyncio.Task] = None
+        self._request_id = 0
+        self.stats = {'messages': 0, 'connects': 0, 'reconnects': 0, 'backfills': 0, 'gaps': 0,
+                      'evictions': 0}
+
+    @property
+    def gateway(self):
+        if self._gateway is None:
+            from src.exchanges.gateway import get_gateway
+            self._gateway = get_gateway()
+        return self._gateway
+
+    @property
+    def connected(self) -> bool:
+        return self._ws is not None and not self._ws.closed
+
+    # ------------------------------------------------------------------
+    # Abonelik
+    # ------------------------------------------------------------------
+
+    def subscribe(self, symbol: str, timeframes: Iterable[str] = ('1m',)) -> StreamSubscription:
+        """
+        Sembolün kline (ve miniTicker) akışlarına abone ol.
+
+        Dönen abonelik iş bitince close() ile bırakılmalıdır.
+        """
+        symbol = to_unified(symbol)
+        stream_id = to_stream_id(symbol)
+        streams = (f"{stream_id}@miniTicker", *(f"{stream_id}@kline_{timeframe}" for timeframe in timeframes))
+        new_streams = []
+
+        for stream in streams:
+            self._refs[stream] = self._refs.get(stream, 0) + 1
+            self._idle.pop(stream, None)
+            if stream not in self._streams:
+                new_streams.append(stream)
+
+        for timeframe in timeframes:
+            key = (symbol, timeframe)
+            if key not in self._buffers:
+                self._buffers[key] = KlineRingBuffer(self.capacity)
+                self._schedule_backfill(key)
+
+        if new_streams:
+            self._streams.update(new_streams)
+            if self.connected:
+                asyncio.create_task(self._send('SUBSCRIBE', new_streams))
+        self._evict_idle()
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return StreamSubscription(self, symbol, streams)
+
+    def _release(self, subscription: StreamSubscription):
+        now = time.monotonic()
+        for stream in subscription.streams:
+            refs = self._refs.get(stream, 0) - 1
+            if refs > 0:
+                self._refs[stream] = refs
+            elif stream in self._refs:
+                self._refs[stream] = 0
+                self._idle[stream] = now
+        self._evict_idle(now)
+
+    def subscriber_count(self, symbol: str) -> int:
+        """Sembolün miniTicker akışını tutan abonelik sayısı"""
+        return self._refs.get(f"{to_stream_id(to_unified(symbol))}@miniTicker", 0)
+
+    def _evict_idle(self, now: Optional[float] = None):
+        """idle_timeout'tan uzun süredir abonesi olmayan akışları ve tamponlarını bırak"""
+        now = time.monotonic() if now is None else now
+        expired = [stream for stream, since in self._idle.items() if now - since >= self.idle_timeout]
+        if not expired:
+            return
+        for stream in expired:
+            del self._idle[stream]
+            self._refs.pop(stream, None)
+            self._streams.discard(stream)
+            stream_id, _, kind = stream.partition('@')
+            symbol = to_unified(stream_id)
+            if kind.startswith('kline_'):
+                key = (symbol, kind[len('kline_'):])
+                self._buffers.pop(key, None)
+                task = self._backfills.pop(key, None)
+                if task is not None and not task.done():
+                    task.cancel()
+            else:
+                self._tickers.pop(symbol, None)
+                self._ticker_times.pop(symbol, None)
+        self.stats['evictions'] += len(expired)
+
+        if self.connected:
+            if self._streams:
+                asyncio.create_task(self._send('UNSUBSCRIBE', expired))
+            else:
+                # Akış kalmadı: bağlantıyı kapat, döngü yeniden bağlanmadan çıkar
+                asyncio.create_task(self._ws.close())
+
+    async def _send(self, method: str, streams: List[str]):
+        self._request_id += 1
+        try:
+            await self._ws.send_json({'method': method, 'params': streams, 'id': self._request_id})
+        except Exception as e:
+            # Bağlantı koptuysa yeniden bağlanırken akış listesi URL'den yeniden kurulur
+            logger.debug(f"{method} gönderilemedi: {str(e)}")
+
+    # ------------------------------------------------------------------
+    # Bağlantı döngüsü
+    # ------------------------------------------------------------------
+
+    def _stream_url(self) -> str:
+        return f"{self.url}/stream?streams={'/'.join(sorted(self._streams))}"
+
+    async def _run(self):
+        delay = self.reconnect_delay
+        async with aiohttp.ClientSession() as session:
+            while True:
+                try:
+                    async with session.ws_connect(self._stream_url(), heartbeat=30) as ws:
+                        self._ws = ws
+                        self.stats['connects'] += 1
+                        if self.stats['connects'] > 1:
+                            # Bağlantı yokken kaçan mumları tamamla
+                            self.stats['reconnects'] += 1
+                            for key in list(self._buffers):
+                                self._schedule_backfill(key)
+                        delay = self.reconnect_delay
+                        logger.info(f"Kline akışına bağlanıldı ({len(self._streams)} akış)")
+
+                        async for msg in ws:
+                            if msg.type == aiohttp.WSMsgType.TEXT:
+                                self._handle(json.loads(msg.data))
+                            elif msg.type in (aiohttp.WSMsgType.ERROR, aiohttp.WSMsgType.CLOSED):
+                                break
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning(f"Kline akışı hatası: {str(e)}")
+                finally:
+                    self._ws = None
+
+                if not self._streams:
+                    logger.info("Kline akışında abone kalmadı, bağlantı kapatıldı")
+                    return
+                logger.info(f"Kline akışı koptu, {delay:.1f} sn sonra yeniden bağlanılacak")
+                await asyncio.sleep(delay)
+                delay = min(self.max_reconnect_delay, delay * 2)
+
+    def _handle(self, message: Dict):
+        """Combined stream mesajını ilgili tampona / ticker tablosuna yaz"""
+        data = message.get('data', message)
+        event = data.get('e')
+        self.stats['messages'] += 1
+
+        now = time.monotonic()
+        if now >= self._next_sweep:
+            self._next_sweep = now + min(self.idle_timeout, 30.0)
+            self._evict_idle(now)
+
+        if event == 'kline':
+            k = data['k']
+            key = (to_unified(k['s']), k['i'])
+            buffer = self._buffers.get(key)
+            if buffer is None:
+                return
+            row = [int(k['t']), float(k['o']), float(k['h']), float(k['l']), float(k['c']), float(k['v'])]
+            last = buffer.last_ts
+            if last is not None and row[0] > last + timeframe_to_ms(k['i']):
+                self.stats['gaps'] += 1
+                self._schedule_backfill(key)
+            buffer.push(row)
+
+        elif event == '24hrMiniTicker':
+            symbol = to_unified(data['s'])
+            if f"{to_stream_id(symbol)}@miniTicker" not in self._streams:
+                return
+            close, open_ = float(data['c']), float(data['o'])
+            self._tickers[symbol] = {
+                'symbol': symbol,
+                'timestamp': data.get('E'),
+                'last': close,
+                'close': close,
+                'open': open_,
+                'high': float(data['h']),
+                'low': float(data['l']),
+                'baseVolume': float(data['v']),
+                'quoteVolume': float(data['q']),
+                'percentage': (close - open_) / open_ * 100 if open_ else 0.0,
+            }
+            self._ticker_times[symbol] = now
+
+    # ------------------------------------------------------------------
+    # Backfill
+    # ------------------------------------------------------------------
+
+    def _schedule_backfill(self, key: Tuple[str, str]):
+        task = self._backfills.get(key)
+        if task is not None and not task.done():
+            return
+        self._backfills[key] = asyncio.create_task(self._backfill(key))
+
+    async def _backfill(self, key: Tuple[str, str]):
+        symbol, timeframe = key
+        try:
+            rows = await self.candle_store.get_ohlcv_async(self.gateway, symbol, timeframe, limit=self.capacity)
+            buffer = self._buffers.get(key)
+            if buffer is None:
+                return  # Backfill sürerken akış bırakıldı
+            buffer.extend(rows)
+            self.stats['backfills'] += 1
+        except Exception as e:
+            logger.warning(f"{symbol} {timeframe} backfill hatası: {str(e)}")
+
+    # ------------------------------------------------------------------
+    # Okuma API'si
+    # ------------------------------------------------------------------
+
+    def get_ohlcv(self, symbol: str, timeframe: str, limit: int = 100) -> Optional[List[list]]:
+        """
+        Tampondaki son mumları döndür.
+
+        Akış bağlı değilse, backfill sürüyorsa veya yeterli mum yoksa None döner
+        (çağıran REST'e düşmelidir).
+        """
+        key = (to_unified(symbol), timeframe)
+        buffer = self._buffers.get(key)
+        if buffer is None or not self.connected or len(buffer) < limit:
+            return None
+        task = self._backfills.get(key)
+        if task is not None and not task.done():
+            return None
+        return buffer.tail(limit)
+
+    def get_ticker(self, symbol: str, max_age: Optional[float] = None) -> Optional[Dict]:
+        """
+        miniTicker akışından son ticker.
+
+        Akış bağlı değilse veya son ticker `max_age` saniyeden (varsayılan
+        ticker_max_age) eskiyse None döner; çağıran REST'e düşmelidir.
+        """
+        if not self.connected:
+            return None
+        symbol = to_unified(symbol)
+        ticker = self._tickers.get(symbol)
+        max_age = self.ticker_max_age if max_age is None else max_age
+        if ticker is None or time.monotonic() - self._ticker_times[symbol] > max_age:
+            return None
+        return ticker
+
+    async def stop(self):
+        """Akışı ve bekleyen backfill görevlerini durdur"""
+        tasks = [t for t in [self._task, *self._backfills.values()] if t is not None and not t.done()]
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self._backfills.clear()
+        self._ws = None
+
+
+_ingestor: Optional[KlineStreamIngestor] = None
+
+
+def get_kline_stream() -> Optional[KlineStreamIngestor]:
+    """ENABLE_KLINE_STREAM açıksa paylaşılan akış servisini, değilse None döndür"""
+    global _ingestor
+    if os.getenv('ENABLE_KLINE_STREAM', 'false').lower() not in ('1', 'true', 'yes'):
+        return None
+    if _ingestor is None:
+        _ingestor = KlineStreamIngestor(
+            url=os.getenv('BINANCE_WS_URL', BINANCE_WS_URL),
+            capacity=int(os.getenv('KLINE_STREAM_CAPACITY', 500)),
+            idle_timeout=float(os.getenv('KLINE_STREAM_IDLE_TIMEOUT', 300)),
+            ticker_max_age=float(os.getenv('KLINE_STREAM_TICKER_MAX_AGE', 10)),
+        )
+    return _ingestor
+
+
+async def stop_kline_stream():
+    """Paylaşılan akış servisini durdur"""
+    if _ingestor is not None:
+        await _ingestor.stop()
@@ -0,0 +1,93 @@
+"""
+İşçi süreçlere OHLCV blokları için paylaşımlı bellek taşıması.
+
+Tarama parçaları işçi havuzuna pickle ile gönderiliyordu; büyük (çok zaman
+dilimli) taramalarda süre serileştirmeye gidiyordu. OHLCVArena bir taramanın
+mumlarını tek bir bellek eşlemeli dosyaya (Linux'ta /dev/shm, yani RAM)
+ekler; işçiye yalnızca dosya yolu, bayt ofseti, semboller ve mum sayıları
+(ArenaBlock) gönderilir. İşçi `read_block` ile bölgeyi salt okunur eşler ve
+sembol başına kopyasız OHLCVArray görünümleri alır.
+
+Arena tarama boyunca açık kalır; parçalar dosyanın sonuna eklenir,
+`close()` dosyayı siler. multiprocessing.shared_memory yerine dosya
+kullanılmasının nedeni segment ömrünün resource_tracker'a bağlı olmaması ve
+çok sayıda küçük parçanın tek bir dosyada toplanabilmesidir.
+"""
+import os
+import tempfile
+import numpy as np
+from typing import Dict, NamedTuple, Optional, Tuple
+from src.data_collectors.ohlcv_array import OHLCVArray, OHLCV_DTYPE
+
+
+class ArenaBlock(NamedTuple):
+    """Arenadaki bir parçanın konumu (işçiye gönderilen tek veri)"""
+    path: str
+    offset: int
+    symbols: Tuple[str, ...]
+    lengths: Tuple[int, ...]
+
+    @property
+    def size(self) -> int:
+        return sum(self.lengths)
+
+
+def _default_directory() -> Optional[str]:
+    """Varsa RAM tabanlı /dev/shm, yoksa sistem geçici dizini"""
+    return '/dev/shm' if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK) else None
+
+
+class OHLCVArena:
+    """Bir taramanın OHLCV bloklarını tek bir eşlenebilir dosyaya ekleyen arena"""
+
+    def __init__(self, directory: Optional[str] = None):
+        """
+        Args:
+            directory: Arena dosyasının dizini (varsayılan: /dev/shm veya geçici dizin)
+        """
+        fd, self.path = tempfile.mkstemp(prefix='ohlcv-', suffix='.arena',
+                                         dir=directory or _default_directory())
+        self._file = os.fdopen(fd, 'wb')
+        self._offset = 0
+        self.stats = {'blocks': 0, 'candles': 0, 'bytes': 0}
+
+    def __enter__(self) -> 'OHLCVArena':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, ohlcv_by_symbol: Dict[str, OHLCVArray]) -> ArenaBlock:
+        """Sembollerin mumlarını arenaya ekle ve bloğun konumunu döndür"""
+        arrays = {symbol: candles if isinstance(candles, OHLCVArray) else OHLCVArray.from_rows(candles)
+                  for symbol, candles in ohlcv_by_symbol.items()}
+        data = np.concatenate([candles.data for candles in arrays.values()]) if arrays \
+            else np.zeros(0, dtype=OHLCV_DTYPE)
+        self._file.write(data.tobytes())
+        self._file.flush()
+
+        block = ArenaBlock(self.path, self._offset, tuple(arrays), tuple(len(candles) for candles in arrays.values()))
+        self._offset += data.nbytes
+        self.stats['blocks'] += 1
+        self.stats['candles'] += len(data)
+        self.stats['bytes'] += data.nbytes
+        return block
+
+    def close(self):
+        """Dosyayı kapat ve sil (işçilerdeki açık eşlemeler kapanana kadar geçerli kalır)"""
+        if self._file.closed:
+            return
+        self._file.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+def read_block(block: ArenaBlock) -> Dict[str, OHLCVArray]:
+    """Bloğu salt okunur eşle; sembol -> kopyasız OHLCVArray görünümü"""
+    if not block.size:
+        return {symbol: OHLCVArray() for symbol in block.symbols}
+    data = np.memmap(block.path, dtype=OHLCV_DTYPE, mode='r', offset=block.offset, shape=(block.size,))
+    bounds = np.cumsum((0,) + block.lengths)
+    return {symbol: OHLCVArray(data[bounds[i]:bounds[i + 1]]) for i, symbol in enumerate(block.symbols)}
@@ -0,0 +1,141 @@
+"""
+Sıkıştırılmış OHLCV konteyneri.
+
+ccxt'nin list-of-lists biçimi mum başına 6 Python float ve bir liste nesnesi
+(~250 bayt) tutar; her analizör bunu ayrıca datetime sütunlu bir DataFrame'e
+çeviriyordu. OHLCVArray tek bir bitişik structured dizidir: int64 timestamp
+ve float32 open/high/low/close/volume, mum başına 28 bayt.
+
+Sütunlar sıfır kopyalı görünümlerdir (`candles.close`). Gösterge hesabı için
+`as_columns()` float64 (6, N) dizi üretir; pandas DataFrame yalnızca
+`to_dataframe()` çağrıldığında (grafik vb.) oluşturulur ve saklanır.
+
+float32 fiyatlarda ~7 anlamlı basamak tutar; gösterge hesapları float64'e
+yükseltilerek yapılır.
+"""
+import numpy as np
+import pandas as pd
+from typing import List, Optional
+
+OHLCV_DTYPE = np.dtype([
+    ('timestamp', '<i8'),
+    ('open', '<f4'),
+    ('high', '<f4'),
+    ('low', '<f4'),
+    ('close', '<f4'),
+    ('volume', '<f4'),
+])
+
+_PRICE_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+
+class OHLCVArray:
+    """Zaman sıralı mumlar için structured dizi sarmalayıcısı"""
+
+    def __init__(self, data: Optional[np.ndarray] = None):
+        if data is None:
+            data = np.zeros(0, dtype=OHLCV_DTYPE)
+        if data.dtype != OHLCV_DTYPE:
+            raise ValueError(f"Beklenen dtype {OHLCV_DTYPE}, gelen {data.dtype}")
+        self.data = data
+        self._frame: Optional[pd.DataFrame] = None
+
+    # ------------------------------------------------------------------
+    # Oluşturma
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_columns(cls, columns: np.ndarray) -> 'OHLCVArray':
+        """(6, N) sütun dizisinden (CandleStore / KlineRingBuffer biçimi)"""
+        data = np.empty(columns.shape[1], dtype=OHLCV_DTYPE)
+        data['timestamp'] = columns[0]
+        for i, name in enumerate(_PRICE_FIELDS, start=1):
+            data[name] = columns[i]
+        return cls(data)
+
+    @classmethod
+    def from_rows(cls, rows: List[list]) -> 'OHLCVArray':
+        """ccxt fetch_ohlcv çıktısından"""
+        if rows is None or not len(rows):
+            return cls()
+        return cls.from_columns(np.asarray(rows, dtype=np.float64)[:, :6].T)
+
+    # ------------------------------------------------------------------
+    # Erişim
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getitem__(self, index):
+        """Dilimler OHLCVArray görünümü, tek indeks ccxt satırı ([ts, o, h, l, c, v]) döndürür"""
+        if isinstance(index, slice):
+            return OHLCVArray(self.data[index])
+        row = self.data[index]
+        return [int(row['timestamp'])] + [float(row[name]) for name in _PRICE_FIELDS]
+
+    def __iter__(self):
+        for i in range(len(self.data)):
+            yield self[i]
+
+    @property
+    def timestamp(self) -> np.ndarray:
+        return self.data['timestamp']
+
+    @property
+    def open(self) -> np.ndarray:
+        return self.data['open']
+
+    @property
+    def high(self) -> np.ndarray:
+        return self.data['high']
+
+    @property
+    def low(self) -> np.ndarray:
+        return self.data['low']
+
+    @property
+    def close(self) -> np.ndarray:
+        return self.data['close']
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self.data['volume']
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes
+
+    def tail(self, limit: int) -> 'OHLCVArray':
+        """Son `limit` mumun görünümü"""
+        return self[-limit:] if limit > 0 else OHLCVArray()
+
+    # ------------------------------------------------------------------
+    # Dönüşümler
+    # ------------------------------------------------------------------
+
+    def as_columns(self) -> np.ndarray:
+        """indicator_engine için float64 (6, N) sütun dizisi"""
+        columns = np.empty((6, len(self.data)), dtype=np.float64)
+        columns[0] = self.data['timestamp']
+        for i, name in enumerate(_PRICE_FIELDS, start=1):
+            columns[i] = self.data[name]
+        return columns
+
+    def tolist(self) -> List[list]:
+        """ccxt list-of-lists biçimi (eski API'ler için)"""
+        return list(self)
+
+    def to_dataframe(self, index: bool = False) -> pd.DataFrame:
+        """
+        Grafik ve pandas tabanlı eski analizler için DataFrame (ilk çağrıda oluşturulur).
+
+        Args:
+            index: True ise timestamp index olur (mplfinance biçimi)
+        """
+        if self._frame is None:
+            frame = pd.DataFrame({name: self.data[name].astype(np.float64) for name in _PRICE_FIELDS})
+            frame.insert(0, 'timestamp', pd.to_datetime(self.data['timestamp'], unit='ms'))
+            self._frame = frame
+        frame = self._frame.copy()
+        return frame.set_index('timestamp') if index else frame
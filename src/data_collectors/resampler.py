@@ -0,0 +1,161 @@
+"""
+Alt zaman dilimi serisinden üst zaman dilimi mumları türetme.
+
+PriceAnalyzer (15m/1h/4h/1d), DualTimeframeAnalyzer (15m/1h) ve
+MultiTimeframeAnalyzer (15m/1h/4h/1w) her zaman dilimini sembol başına ayrı
+istekle çekiyordu. Üst zaman dilimi mumları saklı alt zaman dilimi
+serisinden yerelde kurulabilir: open=ilk, high=en yüksek, low=en düşük,
+close=son, volume=toplam.
+
+- Kova sınırları borsayla hizalıdır: dakika/saat/gün zaman dilimleri Unix
+  epoch'una, haftalık mumlar Pazartesi 00:00 UTC'ye, aylık mumlar takvim
+  ayına hizalanır.
+- Serinin başındaki eksik kova (seri kovanın ortasından başlıyorsa) atılır;
+  open/high/low değerleri yanlış olurdu.
+- Son kova açık mum olabilir: borsanın fetch_ohlcv ile döndürdüğü açık mum
+  gibi o ana kadarki alt mumlardan oluşur.
+
+`plan_sources` hangi zaman dilimlerinin borsadan çekileceğini (ve ne
+derinlikte), hangilerinin bunlardan türetileceğini belirler; türetme için
+gereken alt mum sayısı depo sınırını aşıyorsa o zaman dilimi doğrudan çekilir.
+"""
+import asyncio
+import numpy as np
+from typing import Dict, Optional, Tuple
+from src.data_collectors.candle_store import CandleStore, get_candle_store, timeframe_to_ms
+from src.data_collectors.ohlcv_array import OHLCVArray
+
+DAY_MS = 24 * 60 * 60 * 1000
+# 1970-01-01 Perşembe; Binance haftalık mumları Pazartesi 00:00 UTC'de açılır
+WEEK_OFFSET_MS = 4 * DAY_MS
+
+
+def can_resample(base: str, target: str) -> bool:
+    """target mumları base mumlarından hizalı olarak kurulabilir mi"""
+    base_ms, target_ms = timeframe_to_ms(base), timeframe_to_ms(target)
+    if target_ms <= base_ms:
+        return False
+    if target[-1] in ('w', 'M'):
+        # Hafta/ay sınırları gün sınırıdır; base günü tam bölmeli
+        return DAY_MS % base_ms == 0 and (target[-1] == 'M' or target_ms % base_ms == 0) and target[:-1] == '1'
+    return target_ms % base_ms == 0
+
+
+def bucket_starts(timestamps: np.ndarray, timeframe: str) -> np.ndarray:
+    """Her timestamp'in ait olduğu (borsa hizalı) timeframe mumunun açılış zamanı"""
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    if timeframe[-1] == 'M':
+        months = timestamps.astype('datetime64[ms]').astype('datetime64[M]')
+        return months.astype('datetime64[ms]').astype(np.int64)
+    step = timeframe_to_ms(timeframe)
+    offset = WEEK_OFFSET_MS if timeframe[-1] == 'w' else 0
+    return (timestamps - offset) // step * step + offset
+
+
+def resample(columns: np.ndarray, base: str, target: str) -> np.ndarray:
+    """
+    (6, N) sütun dizisini (timestamp, open, high, low, close, volume) üst zaman dilimine çevir.
+
+    Args:
+        columns: Zamana göre sıralı base mumları
+        base: columns'un zaman dilimi
+        target: Türetilecek zaman dilimi (can_resample(base, target) olmalı)
+
+    Returns:
+        (6, M) dizi; baştaki eksik kova atılır, son kova açık (kısmi) mum olabilir
+    """
+    if not can_resample(base, target):
+        raise ValueError(f"{target} mumları {base} mumlarından türetilemez")
+    if columns.shape[1] == 0:
+        return np.zeros((6, 0))
+
+    starts = bucket_starts(columns[0], target)
+    boundaries = np.flatnonzero(np.diff(starts)) + 1
+    first = np.concatenate(([0], boundaries))
+
+    # Seri kovanın ilk alt mumundan başlamıyorsa ilk kova eksiktir
+    if int(columns[0, 0]) != starts[0]:
+        if len(first) == 1:
+            return np.zeros((6, 0))
+        first = first[1:]
+        columns, starts = columns[:, first[0]:], starts[first[0]:]
+        first = first - first[0]
+
+    last = np.concatenate((first[1:], [columns.shape[1]])) - 1
+    return np.stack([
+        starts[first].astype(np.float64),
+        columns[1, first],
+        np.maximum.reduceat(columns[2], first),
+        np.minimum.reduceat(columns[3], first),
+        columns[4, last],
+        np.add.reduceat(columns[5], first),
+    ])
+
+
+def base_depth(base: str, target: str, limit: int) -> int:
+    """target'tan `limit` tam mum türetmek için gereken base mum sayısı (baştaki eksik kova dahil)"""
+    if target[-1] == 'M':
+        return (limit + 1) * 31 * DAY_MS // timeframe_to_ms(base)
+    return (limit + 1) * (timeframe_to_ms(target) // timeframe_to_ms(base))
+
+
+def plan_sources(limits: Dict[str, int], max_depth: int) -> Tuple[Dict[str, int], Dict[str, str]]:
+    """
+    Hangi zaman dilimleri borsadan çekilecek, hangileri türetilecek.
+
+    Zaman dilimleri küçükten büyüğe gezilir; her biri, derinliği max_depth'i
+    aşmadan kendisini kapsayabilen en ince kaynaktan türetilir, yoksa kaynak
+    olarak doğrudan çekilir.
+
+    Args:
+        limits: Zaman dilimi -> istenen mum sayısı
+        max_depth: Kaynak başına çekilebilecek/saklanabilecek en fazla mum
+
+    Returns:
+        (kaynaklar: zaman dilimi -> çekilecek mum sayısı, türetilenler: zaman dilimi -> kaynak)
+    """
+    sources: Dict[str, int] = {}
+    derived: Dict[str, str] = {}
+    for timeframe in sorted(limits, key=timeframe_to_ms):
+        for source in sorted(sources, key=timeframe_to_ms):
+            if can_resample(source, timeframe):
+                depth = base_depth(source, timeframe, limits[timeframe])
+                if depth <= max_depth:
+                    sources[source] = max(sources[source], depth)
+                    derived[timeframe] = source
+                    break
+        else:
+            sources[timeframe] = limits[timeframe]
+    return sources, derived
+
+
+async def get_timeframes_async(exchange, symbol: str, limits: Dict[str, int],
+                               store: Optional[CandleStore] = None) -> Dict[str, OHLCVArray]:
+    """
+    Sembolün birden çok zaman dilimini en az istekle getir.
+
+    Kaynak zaman dilimleri mum deposu üzerinden (artımlı, aynı anda) çekilir;
+    diğerleri kaynaklardan türetilir.
+
+    Args:
+        exchange: ccxt.async_support uyumlu exchange (ör. gateway)
+        limits: Zaman dilimi -> istenen mum sayısı
+
+    Returns:
+        Zaman dilimi -> son `limit` mum (OHLCVArray)
+    """
+    store = store or get_candle_store()
+    sources, derived = plan_sources(limits, store.max_candles)
+    fetched = await asyncio.gather(*[store.get_array_async(exchange, symbol, timeframe, limit=depth)
+                                     for timeframe, depth in sources.items()])
+    candles = dict(zip(sources, fetched))
+
+    result = {}
+    for timeframe, limit in limits.items():
+        if timeframe in derived:
+            source = derived[timeframe]
+            result[timeframe] = OHLCVArray.from_columns(
+                resample(candles[source].as_columns(), source, timeframe)).tail(limit)
+        else:
+            result[timeframe] = candles[timeframe].tail(limit)
+    return result
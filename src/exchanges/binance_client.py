@@ -1,15 +1,15 @@
 import ccxt
 import logging
 from typing import Dict, List, Optional
+from src.exchanges.rate_limiter import RateLimitedExchange
 
 class BinanceClient:
     def __init__(self):
-        self.exchange = ccxt.binance({
-            'enableRateLimit': True,
+        self.exchange = RateLimitedExchange(ccxt.binance({
             'options': {
                 'defaultType': 'spot'
             }
-        })
+        }))
         self.logger = logging.getLogger('BinanceClient')
         
     def get_exchange_info(self) -> Dict:
@@ -0,0 +1,192 @@
+"""
+Paylaşılan, bloklamayan exchange gateway'i.
+
+Bot, tarayıcılar, takip görevleri ve FastAPI uygulaması her çağrıda yeni bir
+ccxt nesnesi oluşturmak (ve çoğu zaman senkron istemciyi event loop içinde
+çağırmak) yerine bu tek ccxt.async_support örneğini kullanır:
+
+- HTTP bağlantıları keep-alive havuzunda tutulur
+- Marketler yalnızca bir kez yüklenir
+- Eş zamanlı istek sayısı havuz boyutu ile sınırlanır
+- Her istek Binance ağırlık bütçesinden geçer (bkz. rate_limiter)
+- Aynı anda gelen özdeş istekler tek istekte birleştirilir (bkz. single_flight)
+"""
+import os
+import asyncio
+import logging
+import aiohttp
+import ccxt.async_support as ccxt
+from typing import Dict, List, Optional
+from src.exchanges.single_flight import SingleFlight, make_key
+from src.exchanges.rate_limiter import WeightRateLimiter, get_rate_limiter, endpoint_weight, retry_after_seconds
+
+logger = logging.getLogger(__name__)
+
+
+class ExchangeGateway:
+    """Süreç genelinde tek, uzun ömürlü ccxt.async_support exchange'i"""
+
+    def __init__(self, exchange_id: str = 'binance', config: Optional[Dict] = None,
+                 pool_size: int = 20, request_timeout: float = 15.0,
+                 limiter: Optional[WeightRateLimiter] = None, max_retries: int = 2):
+        """
+        Args:
+            exchange_id: ccxt exchange adı
+            config: ccxt exchange ayarları
+            pool_size: Aynı anda açık tutulacak en fazla HTTP bağlantısı
+            request_timeout: Tek bir istek için saniye cinsinden zaman aşımı
+            limiter: Ağırlık bütçesi (varsayılan: exchange adına göre paylaşılan limitleyici)
+            max_retries: 429/418 sonrası en fazla tekrar deneme sayısı
+        """
+        self.exchange_id = exchange_id
+        # ccxt'nin sabit istek aralığı yerine ortak ağırlık bütçesi kullanılır
+        self.config = config or {
+            'enableRateLimit': False,
+            'options': {'defaultType': 'spot'}
+        }
+        self.pool_size = pool_size
+        self.request_timeout = request_timeout
+        self.limiter = limiter or get_rate_limiter(exchange_id)
+        self.max_retries = max_retries
+        self.single_flight = SingleFlight()
+
+        self._exchange = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._init_lock: Optional[asyncio.Lock] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._markets_loaded = False
+
+    async def get_exchange(self):
+        """Exchange'i (gerekirse) oluştur, marketleri bir kez yükle ve döndür"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Farklı bir event loop'tan çağrıldık (ör. asyncio.run ile yeniden başlatma)
+            await self._reset(loop)
+
+        if self._exchange is not None and self._markets_loaded:
+            return self._exchange
+
+        async with self._init_lock:
+            if self._exchange is None:
+                connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60,
+                                                 enable_cleanup_closed=True)
+                self._session = aiohttp.ClientSession(connector=connector)
+                exchange_class = getattr(ccxt, self.exchange_id)
+                self._exchange = exchange_class({
+                    **self.config,
+                    'session': self._session,
+                    'timeout': int(self.request_timeout * 1000),
+                })
+
+            if not self._markets_loaded:
+                await self.limiter.acquire_async(endpoint_weight('load_markets'))
+                await self._exchange.load_markets()
+                self._markets_loaded = True
+                logger.info(f"{self.exchange_id} marketleri yüklendi ({len(self._exchange.markets)} market)")
+
+        return self._exchange
+
+    async def _reset(self, loop: asyncio.AbstractEventLoop):
+        """Eski loop'a bağlı kaynakları bırak ve yeni loop için hazırlan"""
+        old_exchange, old_session = self._exchange, self._session
+        self._exchange = None
+        self._session = None
+        self._markets_loaded = False
+        self._loop = loop
+        self._init_lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(self.pool_size)
+        self.single_flight.clear()
+
+        if old_exchange is not None:
+            try:
+                await old_exchange.close()
+                if old_session is not None and not old_session.closed:
+                    await old_session.close()
+            except Exception as e:
+                logger.debug(f"Eski exchange kapatılırken hata: {str(e)}")
+
+    async def _call(self, method: str, *args, weight: Optional[int] = None, **kwargs):
+        """Özdeş eş zamanlı çağrıları birleştirerek exchange metodunu çalıştır"""
+        key = make_key(method, args, kwargs)
+        return await self.single_flight.do(key, lambda: self._request(method, *args, weight=weight, **kwargs))
+
+    async def _request(self, method: str, *args, weight: Optional[int] = None, **kwargs):
+        exchange = await self.get_exchange()
+        weight = weight or endpoint_weight(method, kwargs.get('limit'))
+        for attempt in range(self.max_retries + 1):
+            async with self._semaphore, self.limiter.throttle_async(weight):
+                try:
+                    result = await getattr(exchange, method)(*args, **kwargs)
+                except (ccxt.RateLimitExceeded, ccxt.DDoSProtection):
+                    headers = getattr(exchange, 'last_response_headers', None)
+                    self.limiter.on_throttled(retry_after_seconds(headers))
+                    if attempt == self.max_retries:
+                        raise
+                    continue
+            self.limiter.update_from_headers(getattr(exchange, 'last_response_headers', None))
+            self.limiter.on_success()
+            return result
+
+    async def load_markets(self) -> Dict:
+        exchange = await self.get_exchange()
+        return exchange.markets
+
+    async def fetch_ticker(self, symbol: str) -> Dict:
+        return await self._call('fetch_ticker', symbol)
+
+    async def fetch_tickers(self, symbols: Optional[List[str]] = None) -> Dict:
+        # Tek sembol 2, tümü 80 ağırlık; sembol listesi için ikisinin küçüğü
+        weight = min(80, 2 * len(symbols)) if symbols else None
+        return await self._call('fetch_tickers', symbols, weight=weight)
+
+    async def fetch_ohlcv(self, symbol: str, timeframe: str = '1h', since: Optional[int] = None,
+                          limit: Optional[int] = None) -> List[list]:
+        return await self._call('fetch_ohlcv', symbol, timeframe, since=since, limit=limit)
+
+    async def fetch_order_book(self, symbol: str, limit: Optional[int] = None) -> Dict:
+        return await self._call('fetch_order_book', symbol, limit=limit)
+
+    async def fetch_funding_rate(self, symbol: str) -> Dict:
+        return await self._call('fetch_funding_rate', symbol)
+
+    def get_stats(self) -> Dict:
+        """İstek birleştirme ve rate limit sayaçlarını döndür"""
+        return {
+            **self.single_flight.stats,
+            'dedup_ratio': round(self.single_flight.dedup_ratio, 3),
+            'in_flight': self.single_flight.in_flight,
+            'rate_limit': dict(self.limiter.stats),
+            'concurrency': int(self.limiter.concurrency),
+        }
+
+    async def close(self):
+        """Bağlantı havuzunu kapat (uygulama kapanırken çağrılır)"""
+        if self._exchange is not None:
+            try:
+                await self._exchange.close()
+            except Exception as e:
+                logger.debug(f"Exchange kapatılırken hata: {str(e)}")
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._exchange = None
+        self._session = None
+        self._markets_loaded = False
+        self._loop = None
+
+
+_gateway: Optional[ExchangeGateway] = None
+
+
+def get_gateway() -> ExchangeGateway:
+    """Süreç genelinde paylaşılan ExchangeGateway örneğini döndür"""
+    global _gateway
+    if _gateway is None:
+        _gateway = ExchangeGateway(pool_size=int(os.getenv('EXCHANGE_POOL_SIZE', 20)))
+    return _gateway
+
+
+async def close_gateway():
+    """Paylaşılan gateway'i kapat"""
+    if _gateway is not None:
+        await _gateway.close()
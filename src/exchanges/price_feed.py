@@ -0,0 +1,204 @@
+"""
+Takip edilen tüm semboller için merkezi fiyat dağıtım servisi.
+
+Her /track komutu kendi döngüsünde tek bir sembolü ayrı ayrı sorguluyordu;
+yüzlerce (chat, sembol) çifti dakikada yüzlerce REST çağrısı demekti. Bu
+servis her tikte takip edilen sembollerin birleşimi için tek bir toplu
+fetch_tickers isteği yapar ve fiyatları abonelere dağıtır.
+
+Abonelikler referans sayımlıdır: aynı sembolü takip eden her görev ayrı bir
+abonelik alır, son abonelik kapanınca sembol sorgu listesinden çıkar, hiç
+abone kalmayınca döngü durur.
+"""
+import os
+import time
+import asyncio
+import logging
+import ccxt.async_support as ccxt
+from typing import Dict, Optional, Set
+from src.exchanges.gateway import get_gateway
+from src.data_collectors.kline_stream import StreamSubscription, get_kline_stream, to_unified as normalize_symbol
+
+logger = logging.getLogger(__name__)
+
+
+class PriceSubscription:
+    """Tek bir görevin tek bir sembol için aboneliği"""
+
+    def __init__(self, feed: 'PriceFeed', symbol: str):
+        self.symbol = symbol
+        self.ticker: Optional[Dict] = None
+        self.updated_at: Optional[float] = None
+        self._feed = feed
+        self._event = asyncio.Event()
+        self.closed = False
+
+    def _push(self, ticker: Dict):
+        self.ticker = ticker
+        self.updated_at = time.time()
+        self._event.set()
+
+    async def next(self, timeout: Optional[float] = None) -> Optional[Dict]:
+        """Bir sonraki fiyat güncellemesini bekle"""
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self._event.clear()
+        return self.ticker
+
+    async def latest(self, timeout: Optional[float] = None) -> Optional[Dict]:
+        """Son bilinen ticker'ı döndür; henüz yoksa ilk güncellemeyi bekle"""
+        if self.ticker is not None:
+            return self.ticker
+        return await self.next(timeout)
+
+    @property
+    def price(self) -> Optional[float]:
+        if self.ticker is None or self.ticker.get('last') is None:
+            return None
+        return float(self.ticker['last'])
+
+    def close(self):
+        """Aboneliği bırak (referans sayısını azaltır)"""
+        if not self.closed:
+            self.closed = True
+            self._feed._unsubscribe(self)
+
+
+class PriceFeed:
+    """Tek döngüyle toplu fiyat çekip abonelere dağıtan servis"""
+
+    def __init__(self, gateway=None, interval: float = 5.0):
+        """
+        Args:
+            gateway: fetch_tickers sağlayan exchange gateway'i
+            interval: İki toplu sorgu arası saniye
+        """
+        self.gateway = gateway or get_gateway()
+        self.interval = interval
+        self._subscribers: Dict[str, Set[PriceSubscription]] = {}
+        self._stream_subscriptions: Dict[str, StreamSubscription] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {'ticks': 0, 'requests': 0, 'errors': 0}
+
+    def subscribe(self, symbol: str) -> PriceSubscription:
+        """Sembole abone ol; gerekirse dağıtım döngüsünü başlat"""
+        symbol = normalize_symbol(symbol)
+        subscription = PriceSubscription(self, symbol)
+        self._subscribers.setdefault(symbol, set()).add(subscription)
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return subscription
+
+    def _unsubscribe(self, subscription: PriceSubscription):
+        subscribers = self._subscribers.get(subscription.symbol)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.symbol]
+            stream_subscription = self._stream_subscriptions.pop(subscription.symbol, None)
+            if stream_subscription is not None:
+                stream_subscription.close()
+
+    def subscriber_count(self, symbol: Optional[str] = None) -> int:
+        """Sembolün (veya tüm sembollerin) abone sayısı"""
+        if symbol is not None:
+            return len(self._subscribers.get(normalize_symbol(symbol), ()))
+        return sum(len(subs) for subs in self._subscribers.values())
+
+    @property
+    def symbols(self) -> Set[str]:
+        return set(self._subscribers)
+
+    async def _fetch(self, symbols) -> Dict[str, Dict]:
+        """Takip edilen sembollerin birleşimi için tek toplu istek"""
+        # WebSocket akışı açıksa miniTicker'dan gelen fiyatlar için REST'e gitme
+        stream = get_kline_stream()
+        tickers = {}
+        if stream is not None:
+            for symbol in symbols:
+                # Sembolün miniTicker akışı, sembolün abonesi kaldıkça tutulur
+                if symbol not in self._stream_subscriptions:
+                    self._stream_subscriptions[symbol] = stream.subscribe(symbol, timeframes=())
+                ticker = stream.get_ticker(symbol)
+                if ticker is not None:
+                    tickers[symbol] = ticker
+            symbols = [symbol for symbol in symbols if symbol not in tickers]
+            if not symbols:
+                return tickers
+
+        self.stats['requests'] += 1
+        try:
+            return {**tickers, **await self.gateway.fetch_tickers(sorted(symbols))}
+        except ccxt.BadSymbol:
+            # Tek bir geçersiz sembol tüm tiki bozmasın: bu tikte tek tek dene
+            results = await asyncio.gather(
+                *[self.gateway.fetch_ticker(symbol) for symbol in symbols],
+                return_exceptions=True
+            )
+            for symbol, result in zip(symbols, results):
+                if isinstance(result, Exception):
+                    logger.warning(f"{symbol} fiyatı alınamadı: {str(result)}")
+                else:
+                    tickers[symbol] = result
+            return tickers
+
+    async def _run(self):
+        """Abone kaldığı sürece her tikte fiyatları çek ve dağıt"""
+        try:
+            while self._subscribers:
+                started = time.monotonic()
+                symbols = list(self._subscribers)
+                try:
+                    tickers = await self._fetch(symbols)
+                    self.stats['ticks'] += 1
+                    for symbol in symbols:
+                        ticker = tickers.get(symbol)
+                        if ticker is None:
+                            continue
+                        for subscription in list(self._subscribers.get(symbol, ())):
+                            subscription._push(ticker)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.stats['errors'] += 1
+                    logger.error(f"Toplu fiyat sorgusu hatası: {str(e)}")
+
+                await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+        finally:
+            self._task = None
+
+    async def stop(self):
+        """Dağıtım döngüsünü durdur ve abonelikleri bırak"""
+        task = self._task
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._subscribers.clear()
+        for stream_subscription in self._stream_subscriptions.values():
+            stream_subscription.close()
+        self._stream_subscriptions.clear()
+        self._task = None
+
+
+_feed: Optional[PriceFeed] = None
+
+
+def get_price_feed() -> PriceFeed:
+    """Süreç genelinde paylaşılan PriceFeed örneğini döndür"""
+    global _feed
+    if _feed is None:
+        _feed = PriceFeed(interval=float(os.getenv('PRICE_FEED_INTERVAL', 5)))
+    return _feed
+
+
+async def stop_price_feed():
+    """Paylaşılan fiyat servisini durdur"""
+    if _feed is not None:
+        await _feed.stop()
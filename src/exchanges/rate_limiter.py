@@ -0,0 +1,420 @@
+"""
+Binance istek ağırlığına (request weight) duyarlı, süreçler arası paylaşılan
+hız sınırlayıcı.
+
+Binance dakikalık bir ağırlık bütçesi uygular ve her endpoint farklı ağırlık
+harcar (klines 2, tüm ticker'lar 80, exchangeInfo 20...). Bu modül:
+
+- Ağırlık bütçesini bir token bucket ile yönetir. Kova durumu küçük bir
+  dosyada tutulur ve fcntl kilidiyle güncellenir; böylece aynı makinedeki
+  tüm coroutine'ler, thread'ler ve process-pool worker'ları tek bütçeyi paylaşır.
+  Her süreç kovadan bir pay (lease) alır ve istekleri bellekteki bu paydan
+  düşer; dosyaya yalnızca pay bittiğinde ya da `sync_interval` dolduğunda
+  gidilir (asenkron yolda event loop dışında, executor thread'inde)
+- Yanıtlardaki X-MBX-USED-WEIGHT-1M başlığıyla yerel tahmini düzeltir
+- Eş zamanlı istek sayısını AIMD ile ayarlar: başarılı her turda +1,
+  429/418 yanıtında yarıya iner ve Retry-After süresince tüm istekler bekler.
+  Eş zamanlılık penceresi süreç başınadır; ağırlık bütçesi ve Retry-After
+  beklemesi süreçler arası paylaşılır
+"""
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+from contextlib import contextmanager, asynccontextmanager
+from typing import Dict, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: durum yalnızca süreç içinde paylaşılır
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# ccxt metodu -> Binance spot istek ağırlığı
+ENDPOINT_WEIGHTS = {
+    'fetch_ohlcv': 2,
+    'fetch_ticker': 2,
+    'fetch_tickers': 80,
+    'load_markets': 20,
+    'fetch_order_book': 5,
+    'fetch_funding_rate': 1,
+    'fetch_trades': 25,
+    'fetch_balance': 10,
+}
+
+# Varsayılan dakikalık ağırlık limitleri
+DEFAULT_WEIGHT_LIMITS = {
+    'binance': 6000,
+    'binance_futures': 2400,
+    'coingecko': 30,
+}
+
+
+def endpoint_weight(method: str, limit: Optional[int] = None) -> int:
+    """ccxt metodu (ve derinlik limiti) için istek ağırlığını döndür"""
+    if method == 'fetch_order_book' and limit:
+        if limit <= 100:
+            return 5
+        if limit <= 500:
+            return 25
+        if limit <= 1000:
+            return 50
+        return 250
+    return ENDPOINT_WEIGHTS.get(method, 1)
+
+
+class WeightRateLimiter:
+    """Dakikalık ağırlık bütçesi + AIMD eş zamanlılık kontrolü"""
+
+    def __init__(self, name: str = 'binance', weight_limit: Optional[int] = None,
+                 safety_factor: float = 0.8, state_dir: str = 'cache/ratelimit',
+                 min_concurrency: int = 1, max_concurrency: int = 32,
+                 lease_fraction: float = 0.05, sync_interval: float = 1.0):
+        """
+        Args:
+            name: Limitleyici adı (durum dosyası adı olarak da kullanılır)
+            weight_limit: Dakikalık ağırlık limiti
+            safety_factor: Limitin ne kadarının kullanılacağı (ban riskine karşı pay)
+            state_dir: Süreçler arası durum dosyasının dizini
+            min_concurrency: AIMD alt sınırı
+            max_concurrency: AIMD üst sınırı
+            lease_fraction: Paylaşılan kovadan bir seferde alınacak pay (kapasite oranı)
+            sync_interval: Pay bitmese de paylaşılan durumla eşitleme aralığı (saniye)
+        """
+        self.name = name
+        limit = weight_limit or DEFAULT_WEIGHT_LIMITS.get(name, 1200)
+        self.capacity = max(1.0, limit * safety_factor)
+        self.refill_per_sec = self.capacity / 60.0
+        self.lease_size = max(1.0, self.capacity * lease_fraction)
+        self.sync_interval = sync_interval
+
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.concurrency = float(min(max_concurrency, max(min_concurrency, 4)))
+        self._in_flight = 0
+        self._slot_cond = threading.Condition()
+
+        self._state_path = None
+        if fcntl is not None:
+            try:
+                os.makedirs(state_dir, exist_ok=True)
+                self._state_path = os.path.join(state_dir, f"{name}.json")
+            except OSError as e:
+                logger.warning(f"Rate limit durum dizini oluşturulamadı: {str(e)}")
+        self._local_state = {'tokens': self.capacity, 'updated': time.time(), 'banned_until': 0.0}
+        self._state_lock = threading.Lock()
+
+        # Süreç içi pay: sıcak yol yalnızca bunlara dokunur (_lock altında)
+        self._lock = threading.Lock()
+        self._lease = 0.0
+        self._banned_until = 0.0
+        self._next_sync = 0.0
+        self._server_used: Optional[Tuple[int, float]] = None
+        self._pending_ban = 0.0
+
+        self.stats = {'requests': 0, 'weight': 0, 'throttled': 0, 'waited_sec': 0.0, 'syncs': 0}
+
+    # ------------------------------------------------------------------
+    # Paylaşılan kova durumu
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def _locked_state(self):
+        """Kova durumunu kilitli olarak oku; bloktan çıkarken geri yaz"""
+        with self._state_lock:
+            if self._state_path is None:
+                yield self._local_state
+                return
+
+            fd = os.open(self._state_path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                raw = os.read(fd, 4096)
+                try:
+                    state = json.loads(raw) if raw else None
+                except ValueError:
+                    state = None
+                if not isinstance(state, dict):
+                    state = {'tokens': self.capacity, 'updated': time.time(), 'banned_until': 0.0}
+
+                yield state
+
+                data = json.dumps(state).encode()
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.ftruncate(fd, 0)
+                os.write(fd, data)
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+                os.close(fd)
+
+    def _refill(self, state: Dict, now: float):
+        elapsed = max(0.0, now - state.get('updated', now))
+        state['tokens'] = min(self.capacity, state.get('tokens', self.capacity) + elapsed * self.refill_per_sec)
+        state['updated'] = now
+
+    def _take_local(self, weight: float) -> Optional[float]:
+        """
+        Ağırlığı süreç içi paydan düş (dosya G/Ç'si yok).
+
+        Returns:
+            0 ise alındı, pozitifse beklenecek saniye; None ise paylaşılan
+            durumla eşitleme (_sync) gerekir
+        """
+        now = time.time()
+        with self._lock:
+            if self._pending_ban or now >= self._next_sync:
+                return None
+            if self._banned_until > now:
+                return self._banned_until - now
+            if self._lease >= weight:
+                self._lease -= weight
+                return 0.0
+            return None
+
+    def _sync(self, weight: float) -> float:
+        """
+        Paylaşılan kovayla eşitle: kullanılmayan payı iade et, bekleyen ban ve
+        sunucu ağırlığını yaz, yeni pay al ve `weight`'i ondan düş.
+
+        Dosya kilidi burada alınır; asenkron yol bunu executor'da çağırır.
+
+        Returns:
+            0 ise alındı; aksi halde tekrar denemeden önce beklenecek saniye
+        """
+        with self._lock:
+            returned, self._lease = self._lease, 0.0
+            server_used, self._server_used = self._server_used, None
+            pending_ban, self._pending_ban = self._pending_ban, 0.0
+
+        now = time.time()
+        with self._locked_state() as state:
+            self._refill(state, now)
+            state['tokens'] = min(self.capacity, state['tokens'] + returned)
+            if server_used is not None:
+                # Sunucu daha fazla harcandığını söylüyorsa (başka istemciler vb.) ona güven
+                used, seen_at = server_used
+                state['tokens'] = min(state['tokens'], self.capacity - used + (now - seen_at) * self.refill_per_sec)
+            if pending_ban:
+                state['banned_until'] = max(state.get('banned_until', 0.0), pending_ban)
+                state['tokens'] = 0.0
+
+            banned_until = state.get('banned_until', 0.0)
+            if banned_until > now:
+                wait, lease = banned_until - now, 0.0
+            elif state['tokens'] >= weight:
+                lease = min(state['tokens'], max(weight, self.lease_size))
+                state['tokens'] -= lease
+                wait, lease = 0.0, lease - weight
+            else:
+                wait, lease = (weight - state['tokens']) / self.refill_per_sec, 0.0
+
+        with self._lock:
+            self._lease += lease
+            self._banned_until = max(self._banned_until, banned_until)
+            self._next_sync = now + self.sync_interval
+        self.stats['syncs'] += 1
+        return wait
+
+    def _try_take(self, weight: int) -> float:
+        """
+        Ağırlığı bütçeden düşmeyi dene (gerekirse paylaşılan durumla eşitleyerek).
+
+        Returns:
+            0 ise alındı; aksi halde tekrar denemeden önce beklenecek saniye
+        """
+        weight = min(weight, self.capacity)
+        wait = self._take_local(weight)
+        return self._sync(weight) if wait is None else wait
+
+    # ------------------------------------------------------------------
+    # Ağırlık bütçesi
+    # ------------------------------------------------------------------
+
+    def acquire(self, weight: int = 1):
+        """Bütçede yer açılana kadar bekle (senkron kod ve worker süreçleri için)"""
+        while True:
+            wait = self._try_take(weight)
+            if wait <= 0:
+                break
+            self.stats['waited_sec'] += wait
+            time.sleep(wait)
+        self.stats['requests'] += 1
+        self.stats['weight'] += weight
+
+    async def acquire_async(self, weight: int = 1):
+        """acquire'ın event loop'u bloklamayan karşılığı (dosya eşitlemesi executor'da)"""
+        weight = min(weight, self.capacity)
+        while True:
+            wait = self._take_local(weight)
+            if wait is None:
+                wait = await asyncio.get_running_loop().run_in_executor(None, self._sync, weight)
+            if wait <= 0:
+                break
+            self.stats['waited_sec'] += wait
+            await asyncio.sleep(wait)
+        self.stats['requests'] += 1
+        self.stats['weight'] += weight
+
+    def update_from_headers(self, headers: Optional[Dict]):
+        """Sunucunun bildirdiği kullanılmış ağırlıkla yerel tahmini düzelt"""
+        if not headers:
+            return
+        used = None
+        for key, value in headers.items():
+            if key.lower() in ('x-mbx-used-weight-1m', 'x-mbx-used-weight'):
+                try:
+                    used = int(value)
+                except (TypeError, ValueError):
+                    pass
+                break
+        if used is None:
+            return
+
+        # Paylaşılan kovaya sonraki eşitlemede yansır; yerel pay hemen sınırlanır
+        with self._lock:
+            self._server_used = (used, time.time())
+            self._lease = max(0.0, min(self._lease, self.capacity - used))
+
+    # ------------------------------------------------------------------
+    # AIMD eş zamanlılık
+    # ------------------------------------------------------------------
+
+    def _try_enter(self) -> bool:
+        with self._slot_cond:
+            if self._in_flight < int(self.concurrency):
+                self._in_flight += 1
+                return True
+            return False
+
+    def _leave(self):
+        with self._slot_cond:
+            self._in_flight -= 1
+            self._slot_cond.notify()
+
+    def on_success(self):
+        """Additive increase: her tam başarılı turda limit 1 artar"""
+        with self._slot_cond:
+            self.concurrency = min(self.max_concurrency, self.concurrency + 1.0 / max(1.0, self.concurrency))
+            self._slot_cond.notify()
+
+    def on_throttled(self, retry_after: Optional[float] = None):
+        """
+        Multiplicative decrease: 429/418 sonrası eş zamanlılığı yarıya indir
+        ve bekleme süresi boyunca bütün süreçlerde istekleri durdur.
+        """
+        with self._slot_cond:
+            self.concurrency = max(self.min_concurrency, self.concurrency / 2)
+        self.stats['throttled'] += 1
+
+        pause = retry_after if retry_after and retry_after > 0 else 60.0 / max(1.0, self.concurrency)
+        # Ban yerelde hemen geçerli; diğer süreçlere sonraki eşitlemede (event loop dışında) yazılır
+        with self._lock:
+            self._banned_until = max(self._banned_until, time.time() + pause)
+            self._pending_ban = max(self._pending_ban, self._banned_until)
+            self._lease = 0.0
+        logger.warning(f"{self.name} rate limit aşıldı, {pause:.1f} sn bekleniyor "
+                       f"(eş zamanlılık: {int(self.concurrency)})")
+
+    @contextmanager
+    def throttle(self, weight: int = 1):
+        """Senkron istek için slot + ağırlık al"""
+        with self._slot_cond:
+            while self._in_flight >= int(self.concurrency):
+                self._slot_cond.wait(0.5)
+            self._in_flight += 1
+        try:
+            self.acquire(weight)
+            yield
+        finally:
+            self._leave()
+
+    @asynccontextmanager
+    async def throttle_async(self, weight: int = 1):
+        """Asenkron istek için slot + ağırlık al"""
+        while not self._try_enter():
+            await asyncio.sleep(0.05)
+        try:
+            await self.acquire_async(weight)
+            yield
+        finally:
+            self._leave()
+
+
+def retry_after_seconds(headers: Optional[Dict]) -> Optional[float]:
+    """Retry-After başlığını saniye olarak döndür"""
+    if not headers:
+        return None
+    for key, value in headers.items():
+        if key.lower() == 'retry-after':
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                return None
+    return None
+
+
+class RateLimitedExchange:
+    """
+    Senkron ccxt exchange'ini saran vekil.
+
+    Process-pool worker'ları ve senkron modüller kendi ccxt nesnelerini kullanır;
+    bu vekil her çağrıyı ortak ağırlık bütçesinden geçirir.
+    """
+
+    def __init__(self, exchange, limiter: Optional['WeightRateLimiter'] = None, max_retries: int = 2):
+        self._exchange = exchange
+        self._limiter = limiter or get_rate_limiter()
+        self._max_retries = max_retries
+        # ccxt'nin kendi sabit gecikmesini kapat, bütçeyi biz yönetiyoruz
+        try:
+            exchange.enableRateLimit = False
+        except Exception:
+            pass
+
+    def __getattr__(self, name):
+        attr = getattr(self._exchange, name)
+        if name not in ENDPOINT_WEIGHTS or not callable(attr):
+            return attr
+
+        def wrapper(*args, **kwargs):
+            import ccxt
+            weight = endpoint_weight(name, kwargs.get('limit'))
+            for attempt in range(self._max_retries + 1):
+                with self._limiter.throttle(weight):
+                    try:
+                        result = attr(*args, **kwargs)
+                    except (ccxt.RateLimitExceeded, ccxt.DDoSProtection):
+                        headers = getattr(self._exchange, 'last_response_headers', None)
+                        self._limiter.on_throttled(retry_after_seconds(headers))
+                        if attempt == self._max_retries:
+                            raise
+                        continue
+                self._limiter.update_from_headers(getattr(self._exchange, 'last_response_headers', None))
+                self._limiter.on_success()
+                return result
+
+        return wrapper
+
+
+_limiters: Dict[str, WeightRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str = 'binance') -> WeightRateLimiter:
+    """Süreç genelinde paylaşılan limitleyiciyi döndür (durum dosyası süreçler arası ortaktır)"""
+    limiter = _limiters.get(name)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(name)
+            if limiter is None:
+                env_limit = os.getenv(f"{name.upper()}_WEIGHT_LIMIT")
+                limiter = WeightRateLimiter(
+                    name=name,
+                    weight_limit=int(env_limit) if env_limit else None,
+                    state_dir=os.getenv('RATE_LIMIT_STATE_DIR', 'cache/ratelimit'),
+                )
+                _limiters[name] = limiter
+    return limiter
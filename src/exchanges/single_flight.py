@@ -0,0 +1,68 @@
+"""
+Aynı anda yapılan özdeş istekleri tek istekte birleştiren (single-flight) katman.
+
+Birden fazla kullanıcı aynı anda /scan, /analyze veya /chart çalıştırdığında
+aynı (metot, sembol, zaman dilimi...) için milisaniyeler içinde tekrar tekrar
+borsaya gidiliyordu. Burada ilk istek çalışırken gelen özdeş istekler aynı
+task'ın sonucunu bekler; borsaya yalnızca bir istek gider.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+def make_key(*parts) -> Hashable:
+    """Liste/sözlük içeren argümanlardan hashlenebilir bir anahtar üret"""
+    def freeze(value):
+        if isinstance(value, dict):
+            return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+        if isinstance(value, (list, tuple, set)):
+            return tuple(freeze(v) for v in value)
+        return value
+    return freeze(parts)
+
+
+class SingleFlight:
+    """Anahtar başına tek uçuşta (in-flight) istek tutar"""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.stats = {'calls': 0, 'executed': 0, 'coalesced': 0}
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Aynı anahtarla çalışan bir istek varsa onun sonucunu bekle, yoksa başlat.
+
+        İstek ayrı bir task olarak çalışır; bekleyenlerden birinin iptal
+        edilmesi diğerlerinin sonucunu etkilemez.
+        """
+        self.stats['calls'] += 1
+        task = self._inflight.get(key)
+        if task is not None and not task.done():
+            self.stats['coalesced'] += 1
+        else:
+            self.stats['executed'] += 1
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._forget(k, t))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Kimse beklemiyorsa "exception was never retrieved" uyarısını önle
+        if not task.cancelled():
+            task.exception()
+
+    def clear(self):
+        """Event loop değiştiğinde eski task'ları bırak"""
+        self._inflight.clear()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._inflight)
+
+    @property
+    def dedup_ratio(self) -> float:
+        """Birleştirilen çağrıların toplam çağrılara oranı"""
+        calls = self.stats['calls']
+        return self.stats['coalesced'] / calls if calls else 0.0
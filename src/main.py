@@ -9,6 +9,7 @@ from typing import Optional, List, Dict
 from src.analysis.price_analysis import PriceAnalyzer
 from src.data_collectors.coingecko import CoinGeckoAPI
 from src.analysis.ai_analyzer import AIAnalyzer
+from src.exchanges.gateway import close_gateway
 
 # Logging ayarları
 logging.basicConfig(
@@ -56,6 +57,9 @@ async def shutdown_event():
         await ai_analyzer.close()
         logger.info("AI Analyzer kaynakları temizlendi.")
         
+        # Paylaşılan exchange bağlantı havuzunu kapat
+        await close_gateway()
+        
         # Ek temizlik işlemleri
         import asyncio
         pending = asyncio.all_tasks()
@@ -0,0 +1,29 @@
+import numpy as np
+from src.data_collectors.ohlcv_array import OHLCVArray
+
+HOUR = 3600000
+
+
+def make_columns(n, seed=0, step=HOUR, start=0, price=50.0, drift=0.0, scale=1.0, spread=1.0,
+                 volume=(100.0, 1000.0)):
+    """
+    Testler için rastgele yürüyüş mumları, (6, N) float64 sütunlar.
+
+    open önceki kapanıştır; high/low gövdenin `spread` kadar dışındadır.
+    """
+    rng = np.random.default_rng(seed)
+    close = price + np.cumsum(rng.normal(drift, scale, n))
+    open_ = np.concatenate(([price], close[:-1]))[:n]
+    return np.stack([start + np.arange(n, dtype=np.float64) * step, open_,
+                     np.maximum(open_, close) + spread, np.minimum(open_, close) - spread,
+                     close, rng.uniform(*volume, n)])
+
+
+def make_candles(n, seed=0, **kwargs) -> OHLCVArray:
+    """make_columns ile aynı seri, OHLCVArray olarak"""
+    return OHLCVArray.from_columns(make_columns(n, seed, **kwargs))
+
+
+def make_rows(n, seed=0, **kwargs) -> list:
+    """make_columns ile aynı seri, ccxt fetch_ohlcv satırları olarak"""
+    return [[int(row[0]), *map(float, row[1:])] for row in make_columns(n, seed, **kwargs).T]
@@ -0,0 +1,90 @@
+import os
+import asyncio
+import numpy as np
+from src.analysis import ai_cache as ai_cache_module
+from src.analysis.ai_analyzer import AIAnalyzer
+from src.analysis.ai_cache import AICache, cache_key
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_key_follows_regime_not_noise():
+    base = {'current_price': 100.2, 'rsi': 58.2, 'macd': 0.4, 'macd_signal': 0.3, 'trend': 'BULLISH',
+            'signal': 'LONG', 'volume': 1e6}
+    key = cache_key('BTC/USDT', base)
+
+    assert cache_key('BTCUSDT', {**base, 'current_price': np.float64(100.9), 'rsi': 63.9, 'volume': 5e6}) == key
+    assert cache_key('BTCUSDT', {**base, 'current_price': 102.5}) != key
+    assert cache_key('BTCUSDT', {**base, 'rsi': 71}) != key
+    assert cache_key('BTCUSDT', {**base, 'macd_signal': 0.5}) != key
+    assert cache_key('BTCUSDT', {**base, 'trend': 'STRONGLY_BULLISH'}) != key
+    assert cache_key('BTCUSDT', base, {'news': ['listing']}) != key
+    assert cache_key('ETHUSDT', base) != key
+
+
+def test_lru_ttl_and_disk_tier(tmp_path):
+    clock = Clock()
+    cache = AICache(max_entries=2, ttl=60, cache_dir=str(tmp_path), clock=clock)
+    for name in ('a', 'b', 'c'):
+        cache.put(name, {'analysis': name}, tokens=100)
+
+    assert len(cache) == 2 and cache.stats['evictions'] == 1
+    assert sorted(os.listdir(tmp_path)) == ['a.json', 'b.json', 'c.json']  # geçici dosya kalmaz
+
+    # Bellekten atılan girdi diskten gelir; yeni süreç aynı disk katmanını görür
+    assert cache.get('a') == {'analysis': 'a'} and cache.stats['disk_hits'] == 1
+    other = AICache(cache_dir=str(tmp_path), ttl=60, clock=clock)
+    assert other.get('c') == {'analysis': 'c'}
+
+    clock.now += 61
+    assert cache.get('a') is None and other.get('b') is None
+    assert not os.path.exists(tmp_path / 'a.json') and not os.path.exists(tmp_path / 'b.json')
+    assert cache.stats['expired'] == 1 and other.stats['expired'] == 1
+
+    stats = cache.get_stats()
+    assert stats['hits'] == 1 and stats['misses'] == 1 and stats['hit_ratio'] == 0.5
+    assert stats['saved_tokens'] == 100
+
+    # Budama yalnızca önbellek dosyalarını sınırlar, eski sembol adlı dosyalar kalır
+    (tmp_path / 'BNBUSDT.json').write_text('{}')
+    for age, name in enumerate(('0' * 32, '1' * 32)):
+        cache.put(name, {'analysis': name})
+        os.utime(tmp_path / f'{name}.json', (clock.now + age, clock.now + age))
+    cache.max_disk_entries = 1
+    cache.prune_disk()
+    assert sorted(os.listdir(tmp_path)) == ['1' * 32 + '.json', 'BNBUSDT.json', 'c.json']
+
+
+class StubClient:
+    def __init__(self):
+        self.prompts = []
+
+    async def create_message(self, prompt, max_tokens=500):
+        self.prompts.append(prompt)
+        return {'text': 'Güncel Durum: güçlü al sinyali', 'usage': {'input_tokens': 300, 'output_tokens': 120}}
+
+
+def test_repeated_analysis_in_same_regime_is_served_from_cache(monkeypatch, tmp_path):
+    monkeypatch.setenv('ANTHROPIC_API_KEY', 'test-key')
+    monkeypatch.setattr(ai_cache_module, '_cache', AICache(cache_dir=str(tmp_path)))
+    analyzer = AIAnalyzer()
+    analyzer.client = StubClient()
+    technical = {'current_price': 2.0, 'rsi': 35.0, 'macd': -0.01, 'trend': 'BEARISH', 'signal': 'SHORT'}
+
+    async def run():
+        first = await analyzer.analyze_opportunity('XRPUSDT', technical)
+        second = await analyzer.analyze_opportunity('XRPUSDT', {**technical, 'current_price': 2.005, 'rsi': 38})
+        changed = await analyzer.analyze_opportunity('XRPUSDT', {**technical, 'rsi': 25})
+        return first, second, changed
+
+    first, second, changed = asyncio.run(run())
+    assert len(analyzer.client.prompts) == 2
+    assert second['cached'] and 'cached' not in first and 'cached' not in changed
+    assert second['analysis'] == first['analysis'] and second['timestamp'] == first['timestamp']
+    assert analyzer.cache.stats['saved_tokens'] == 420
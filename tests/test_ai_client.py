@@ -0,0 +1,148 @@
+import time
+import asyncio
+from aiohttp import web
+import pytest
+from src.analysis import ai_cache as ai_cache_module
+from src.analysis import ai_client as ai_client_module
+from src.analysis.ai_analyzer import AIAnalyzer
+from src.analysis.ai_cache import AICache
+from src.analysis.ai_client import AIClient, AIClientError, LatencyHistogram, gather_cancellable
+
+
+class StubMessagesServer:
+    """Yerel messages API taklidi: istem metnine göre gecikme ('...@saniye') ve hata davranışı"""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = {}
+
+    async def messages(self, request):
+        assert request.headers['x-api-key'] == 'test-key' and request.headers['anthropic-version']
+        body = await request.json()
+        prompt = body['messages'][0]['content']
+        self.calls[prompt] = self.calls.get(prompt, 0) + 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if prompt.startswith('flaky') and self.calls[prompt] <= 2:
+                return web.json_response({'type': 'error'}, status=529, headers={'retry-after': '0'})
+            if prompt.startswith('bad'):
+                return web.json_response({'type': 'error', 'error': {'message': 'invalid'}}, status=400)
+            await asyncio.sleep(float(prompt.rsplit('@', 1)[1]) if '@' in prompt else 0.05)
+        finally:
+            self.in_flight -= 1
+        return web.json_response({'model': body['model'], 'stop_reason': 'end_turn',
+                                  'content': [{'type': 'text', 'text': f'yanıt {prompt}'}],
+                                  'usage': {'input_tokens': 10, 'output_tokens': 5}})
+
+
+def run_with_server(scenario):
+    stub = StubMessagesServer()
+
+    async def main():
+        app = web.Application()
+        app.router.add_post('/v1/messages', stub.messages)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            return await scenario(f'http://127.0.0.1:{port}')
+        finally:
+            await runner.cleanup()
+
+    return stub, asyncio.run(main())
+
+
+def test_concurrency_limit_latency_and_usage():
+    async def scenario(base_url):
+        client = AIClient('test-key', base_url=base_url, concurrency=3)
+        try:
+            results = await asyncio.gather(*[client.create_message(f'coin{i}') for i in range(8)])
+        finally:
+            await client.close()
+        return client, results
+
+    stub, (client, results) = run_with_server(scenario)
+    assert [result['text'] for result in results] == [f'yanıt coin{i}' for i in range(8)]
+    assert stub.max_in_flight == 3
+    stats = client.get_stats()
+    assert stats['succeeded'] == 8 and stats['input_tokens'] == 80 and stats['output_tokens'] == 40
+    assert stats['latency']['count'] == 8 and stats['latency']['buckets']['<=0.25s'] == 8
+    assert stats['queue_wait'] > 0
+
+
+def test_retries_with_jitter_and_non_retryable_errors():
+    async def scenario(base_url):
+        client = AIClient('test-key', base_url=base_url, backoff=0.01, timeout=0.2, max_retries=2)
+        try:
+            flaky = await client.create_message('flaky')
+            with pytest.raises(AIClientError) as bad:
+                await client.create_message('bad')
+            with pytest.raises(AIClientError):
+                await client.create_message('slow@1')
+        finally:
+            await client.close()
+        return client, flaky, bad.value
+
+    stub, (client, flaky, bad) = run_with_server(scenario)
+    assert flaky['text'] == 'yanıt flaky' and stub.calls['flaky'] == 3
+    assert bad.status == 400 and stub.calls['bad'] == 1
+    assert stub.calls['slow@1'] == 3 and client.stats['timeouts'] == 3
+    assert client.stats['retries'] == 4 and client.stats['failed'] == 2
+    assert all(0 <= client.retry_delay(attempt) <= 0.01 * 2 ** attempt for attempt in range(5))
+    assert client.retry_delay(0, retry_after=2.0) == 2.0
+
+
+def test_stop_cancels_pending_requests():
+    async def scenario(base_url):
+        client = AIClient('test-key', base_url=base_url, concurrency=2)
+        stop = asyncio.Event()
+        asyncio.get_running_loop().call_later(0.3, stop.set)
+        started = time.perf_counter()
+        try:
+            results = await gather_cancellable([client.create_message('quick@0.01')] +
+                                               [client.create_message(f'slow{i}@2') for i in range(4)], stop)
+        finally:
+            await client.close()
+        return client, results, time.perf_counter() - started
+
+    stub, (client, results, elapsed) = run_with_server(scenario)
+    assert elapsed < 1.5
+    assert results[0]['text'] == 'yanıt quick@0.01'
+    assert all(isinstance(result, asyncio.CancelledError) for result in results[1:])
+    assert client.stats['cancelled'] == 4 and client.stats['succeeded'] == 1
+    assert sum(stub.calls.values()) == 3  # iki yavaş istek hiç gönderilmeden sırada iptal edildi
+
+
+def test_latency_histogram_percentiles():
+    histogram = LatencyHistogram(buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.05, 0.5, 3.0):
+        histogram.observe(seconds)
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.percentile(0.5) == 0.1 and histogram.percentile(0.75) == 1.0
+    assert histogram.percentile(0.99) == 3.0
+
+
+def test_analyzer_enriches_coins_concurrently(monkeypatch, tmp_path):
+    monkeypatch.setenv('ANTHROPIC_API_KEY', 'test-key')
+    monkeypatch.setenv('AI_CONCURRENCY', '4')
+    monkeypatch.setattr(ai_client_module, '_client', None)
+    monkeypatch.setattr(ai_cache_module, '_cache', AICache(cache_dir=str(tmp_path)))
+    opportunities = [{'symbol': f'C{i}USDT', 'current_price': 1.0 + i, 'rsi': 50, 'opportunity_score': 60 + i}
+                     for i in range(5)]
+
+    async def scenario(base_url):
+        monkeypatch.setenv('ANTHROPIC_BASE_URL', base_url)
+        analyzer = AIAnalyzer()
+        try:
+            return await analyzer.analyze_multiple_coins(opportunities)
+        finally:
+            await ai_client_module.stop_ai_client()
+
+    stub, results = run_with_server(scenario)
+    assert [result['symbol'] for result in results] == [f'C{i}USDT' for i in range(4, -1, -1)]
+    assert all(result['ai_analysis'].startswith('yanıt') for result in results)
+    assert stub.max_in_flight == 4
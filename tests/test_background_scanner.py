@@ -0,0 +1,79 @@
+import asyncio
+from src.analysis.background_scanner import BackgroundScanner, last_closed_open
+from src.data_collectors.candle_store import timeframe_to_ms
+
+
+def make_scan(calls, gate=None):
+    async def scan(report):
+        calls.append(1)
+        report({'scanned': 1, 'total': 3, 'top': []})
+        if gate is not None:
+            await gate.wait()
+        return [{'symbol': f'SCAN{len(calls)}', 'opportunity_score': 70.0}]
+    return scan
+
+
+def test_concurrent_requests_share_one_scan_and_snapshot_is_served():
+    async def run():
+        calls, gate = [], asyncio.Event()
+        scanner = BackgroundScanner()
+        scanner.register('scan:4h', make_scan(calls, gate), '4h', background=False)
+
+        waiters = [asyncio.ensure_future(scanner.get('scan:4h')) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        assert scanner.progress('scan:4h')['total'] == 3
+
+        # Bekleyenlerden birinin iptali paylaşılan taramayı durdurmaz
+        waiters[0].cancel()
+        gate.set()
+        results = await asyncio.gather(*waiters[1:])
+        served = await scanner.get('scan:4h')
+        return calls, results, served, scanner
+
+    calls, results, served, scanner = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert served is results[0] and served['scanned'] == 3
+    assert served['opportunities'][0]['symbol'] == 'SCAN1'
+    assert served['candle_time'] == last_closed_open('4h', int(served['scanned_at'] * 1000))
+    assert scanner.progress('scan:4h') is None
+    assert scanner.stats['scans'] == 1 and scanner.stats['served'] == 1
+
+
+def test_stale_snapshot_is_rescanned():
+    async def run():
+        calls = []
+        scanner = BackgroundScanner()
+        scanner.register('scan:15m', make_scan(calls), '15m', background=False)
+        first = await scanner.get('scan:15m')
+
+        # Bir mum geride: hemen sunulur, arka planda yenilenir
+        first['candle_time'] -= timeframe_to_ms('15m')
+        assert scanner.lag('scan:15m') == 1
+        assert await scanner.get('scan:15m') is first
+        await asyncio.sleep(0.01)
+        refreshed = scanner.snapshot('scan:15m')
+
+        # İki mum geride: sunulmaz, yeni tarama beklenir
+        refreshed['candle_time'] -= 2 * timeframe_to_ms('15m')
+        latest = await scanner.get('scan:15m')
+        return calls, first, refreshed, latest
+
+    calls, first, refreshed, latest = asyncio.run(run())
+    assert len(calls) == 3
+    assert refreshed is not first and latest is not refreshed
+    assert latest['opportunities'][0]['symbol'] == 'SCAN3'
+
+
+def test_background_loop_scans_on_start_and_stops():
+    async def run():
+        calls = []
+        scanner = BackgroundScanner()
+        scanner.register('scan:1h', make_scan(calls), '1h')
+        scanner.start()
+        await asyncio.sleep(0.01)
+        await scanner.stop()
+        return calls, scanner
+
+    calls, scanner = asyncio.run(run())
+    assert len(calls) == 1 and scanner.snapshot('scan:1h') is not None
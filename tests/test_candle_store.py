@@ -0,0 +1,101 @@
+import time
+import numpy as np
+import pytest
+from src.data_collectors.candle_store import CandleStore, timeframe_to_ms
+from conftest import make_rows
+
+TF = '1h'
+TF_MS = timeframe_to_ms(TF)
+
+
+class FakeExchange:
+    """Sabit bir mum serisinden fetch_ohlcv taklidi yapar"""
+
+    def __init__(self, candles):
+        self.candles = candles
+        self.calls = []
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=100):
+        self.calls.append((since, limit))
+        rows = [c for c in self.candles if since is None or c[0] >= since]
+        return rows[-limit:] if since is None else rows[:limit]
+
+
+@pytest.fixture
+def now_ts():
+    return (int(time.time() * 1000) // TF_MS) * TF_MS
+
+
+def test_second_call_fetches_only_new_candles(tmp_path, now_ts):
+    exchange = FakeExchange(make_rows(300, start=now_ts - 299 * TF_MS, step=TF_MS))
+    store = CandleStore(cache_dir=str(tmp_path))
+
+    first = store.get_ohlcv(exchange, 'BTCUSDT', TF, limit=100)
+    second = store.get_ohlcv(exchange, 'BTCUSDT', TF, limit=100)
+
+    assert first == second
+    assert len(second) == 100
+    assert exchange.calls[0] == (None, 100)
+    # İkinci çağrı yalnızca son mumu tazeler
+    assert exchange.calls[1] == (now_ts, 1)
+    assert store.stats['hits'] == 0
+
+
+def test_disk_tier_is_shared_between_instances(tmp_path, now_ts):
+    exchange = FakeExchange(make_rows(150, start=now_ts - 149 * TF_MS, step=TF_MS))
+    CandleStore(cache_dir=str(tmp_path)).get_ohlcv(exchange, 'ETHUSDT', TF, limit=100)
+
+    other = CandleStore(cache_dir=str(tmp_path))
+    assert len(other.get_cached('ETHUSDT', TF)) == 100
+    other.get_ohlcv(exchange, 'ETHUSDT', TF, limit=100)
+    assert exchange.calls[-1][0] == now_ts
+
+
+def test_gaps_are_detected_and_repaired(tmp_path, now_ts):
+    candles = make_rows(120, start=now_ts - 119 * TF_MS, step=TF_MS)
+    holey = candles[:50] + candles[55:]
+    store = CandleStore(cache_dir=str(tmp_path))
+    store.get_ohlcv(FakeExchange(holey), 'SOLUSDT', TF, limit=110)
+
+    assert store.find_gaps('SOLUSDT', TF) == [(candles[50][0], candles[54][0])]
+
+    exchange = FakeExchange(candles)
+    result = store.get_ohlcv(exchange, 'SOLUSDT', TF, limit=110)
+
+    assert (candles[50][0], 5) in exchange.calls
+    assert store.find_gaps('SOLUSDT', TF) == []
+    assert [row[0] for row in result] == [c[0] for c in candles[-110:]]
+
+
+def test_get_array_returns_compact_candles(tmp_path, now_ts):
+    exchange = FakeExchange(make_rows(150, start=now_ts - 149 * TF_MS, step=TF_MS))
+    store = CandleStore(cache_dir=str(tmp_path))
+
+    rows = store.get_ohlcv(exchange, 'BNBUSDT', TF, limit=100)
+    candles = store.get_array(exchange, 'BNBUSDT', TF, limit=100)
+
+    assert len(candles) == 100
+    assert candles.nbytes == 100 * 28
+    assert candles.timestamp.tolist() == [row[0] for row in rows]
+    # Fiyatlar float32 saklanır
+    assert candles[-1] == [rows[-1][0], *np.float32(rows[-1][1:]).tolist()]
+
+
+def test_recently_refreshed_series_is_served_without_fetching(tmp_path, now_ts):
+    exchange = FakeExchange(make_rows(150, start=now_ts - 149 * TF_MS, step=TF_MS))
+    store = CandleStore(cache_dir=str(tmp_path), min_refresh=60)
+
+    first = store.get_ohlcv(exchange, 'XRPUSDT', TF, limit=100)
+    candles = store.get_array(exchange, 'XRPUSDT', TF, limit=100)
+
+    assert len(exchange.calls) == 1 and store.stats['hits'] == 1
+    assert candles.timestamp.tolist() == [row[0] for row in first]
+
+    # Daha derin pencere saklı değil: yine borsaya gidilir
+    store.get_ohlcv(exchange, 'XRPUSDT', TF, limit=120)
+    assert len(exchange.calls) == 2 and store.stats['hits'] == 1
+
+    # Yeni örnek tazeleme zamanını bilmez; diskteki seriyi tazeler
+    other = CandleStore(cache_dir=str(tmp_path), min_refresh=60)
+    other.get_ohlcv(exchange, 'XRPUSDT', TF, limit=100)
+    assert len(exchange.calls) == 3 and other.stats['hits'] == 0
@@ -0,0 +1,278 @@
+"""
+Vektörel mum formasyonu maskelerinin eski döngülerle eşdeğerliği.
+
+ReferenceRecognizer, maskelere geçmeden önceki CandlestickPatternRecognizer
+döngülerini aynen içerir.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from typing import List
+from src.analysis import indicator_engine as ie
+from src.analysis.candlestick_patterns import (
+    PATTERN_NAMES, CandlestickPatternRecognizer, pattern_masks, screen_ohlcv, screen_patterns,
+)
+
+
+class ReferenceRecognizer:
+    def recognize_patterns(self, df):
+        if len(df) < 5:
+            return {}
+        df = df.copy()
+        df['body'] = abs(df['close'] - df['open'])
+        df['body_pct'] = df['body'] / (df['high'] - df['low']) * 100
+        df['upper_shadow'] = df.apply(lambda x: x['high'] - max(x['open'], x['close']), axis=1)
+        df['lower_shadow'] = df.apply(lambda x: min(x['open'], x['close']) - x['low'], axis=1)
+        df['is_bullish'] = df['close'] > df['open']
+        
+        patterns = {name: getattr(self, f'_find_{name}')(df) for name in PATTERN_NAMES}
+        return {k: v for k, v in patterns.items() if v}
+
+    def _find_doji(self, df: pd.DataFrame) -> List[int]:
+        """Doji formasyonlarını bulur"""
+        doji_indices = []
+        for i in range(len(df)):
+            if df['body_pct'].iloc[i] < 5:  # Gövde çok küçük
+                if df['upper_shadow'].iloc[i] > 0 and df['lower_shadow'].iloc[i] > 0:
+                    doji_indices.append(i)
+        return doji_indices
+    
+    def _find_hammer(self, df: pd.DataFrame) -> List[int]:
+        """Hammer formasyonlarını bulur"""
+        hammer_indices = []
+        for i in range(4, len(df)):
+            # Öncesinde düşüş trendi olmalı
+            if not self._is_downtrend(df, i, window=4):
+                continue
+                
+            current = df.iloc[i]
+            if (current['lower_shadow'] > 2 * current['body'] and  # Alt gölge gövdenin 2 katından uzun
+                current['upper_shadow'] < 0.3 * current['body'] and  # Üst gölge çok kısa
+                current['body_pct'] < 40):  # Gövde çok büyük değil
+                hammer_indices.append(i)
+        return hammer_indices
+    
+    def _find_inverted_hammer(self, df: pd.DataFrame) -> List[int]:
+        """Inverted Hammer formasyonlarını bulur"""
+        inv_hammer_indices = []
+        for i in range(4, len(df)):
+            # Öncesinde düşüş trendi olmalı
+            if not self._is_downtrend(df, i, window=4):
+                continue
+                
+            current = df.iloc[i]
+            if (current['upper_shadow'] > 2 * current['body'] and  # Üst gölge gövdenin 2 katından uzun
+                current['lower_shadow'] < 0.3 * current['body'] and  # Alt gölge çok kısa
+                current['body_pct'] < 40):  # Gövde çok büyük değil
+                inv_hammer_indices.append(i)
+        return inv_hammer_indices
+    
+    def _find_shooting_star(self, df: pd.DataFrame) -> List[int]:
+        """Shooting Star formasyonlarını bulur"""
+        shooting_star_indices = []
+        for i in range(4, len(df)):
+            # Öncesinde yükseliş trendi olmalı
+            if not self._is_uptrend(df, i, window=4):
+                continue
+                
+            current = df.iloc[i]
+            if (current['upper_shadow'] > 2 * current['body'] and  # Üst gölge gövdenin 2 katından uzun
+                current['lower_shadow'] < 0.3 * current['body'] and  # Alt gölge çok kısa
+                current['body_pct'] < 40):  # Gövde çok büyük değil
+                shooting_star_indices.append(i)
+        return shooting_star_indices
+    
+    def _find_hanging_man(self, df: pd.DataFrame) -> List[int]:
+        """Hanging Man formasyonlarını bulur"""
+        hanging_man_indices = []
+        for i in range(4, len(df)):
+            # Öncesinde yükseliş trendi olmalı
+            if not self._is_uptrend(df, i, window=4):
+                continue
+                
+            current = df.iloc[i]
+            if (current['lower_shadow'] > 2 * current['body'] and  # Alt gölge gövdenin 2 katından uzun
+                current['upper_shadow'] < 0.3 * current['body'] and  # Üst gölge çok kısa
+                current['body_pct'] < 40):  # Gövde çok büyük değil
+                hanging_man_indices.append(i)
+        return hanging_man_indices
+    
+    def _find_bullish_engulfing(self, df: pd.DataFrame) -> List[int]:
+        """Bullish Engulfing formasyonlarını bulur"""
+        bullish_engulfing_indices = []
+        for i in range(1, len(df)):
+            prev = df.iloc[i-1]
+            current = df.iloc[i]
+            
+            if (not prev['is_bullish'] and current['is_bullish'] and  # Önceki kırmızı, şimdiki yeşil
+                current['open'] < prev['close'] and  # Şimdiki açılış önceki kapanışın altında
+                current['close'] > prev['open']):  # Şimdiki kapanış önceki açılışın üstünde
+                bullish_engulfing_indices.append(i)
+        return bullish_engulfing_indices
+    
+    def _find_bearish_engulfing(self, df: pd.DataFrame) -> List[int]:
+        """Bearish Engulfing formasyonlarını bulur"""
+        bearish_engulfing_indices = []
+        for i in range(1, len(df)):
+            prev = df.iloc[i-1]
+            current = df.iloc[i]
+            
+            if (prev['is_bullish'] and not current['is_bullish'] and  # Önceki yeşil, şimdiki kırmızı
+                current['open'] > prev['close'] and  # Şimdiki açılış önceki kapanışın üstünde
+                current['close'] < prev['open']):  # Şimdiki kapanış önceki açılışın altında
+                bearish_engulfing_indices.append(i)
+        return bearish_engulfing_indices
+    
+    def _find_morning_star(self, df: pd.DataFrame) -> List[int]:
+        """Morning Star formasyonunu bulur"""
+        morning_star_indices = []
+        for i in range(4, len(df) - 2):
+            # En az 3 mum gerekiyor
+            if i + 2 >= len(df):
+                continue
+                
+            # Öncesinde düşüş trendi olmalı
+            if not self._is_downtrend(df, i, window=4):
+                continue
+                
+            first = df.iloc[i]
+            middle = df.iloc[i+1]
+            last = df.iloc[i+2]
+            
+            if (not first['is_bullish'] and  # İlk mum kırmızı
+                middle['body_pct'] < 10 and  # Orta mum küçük gövdeli (doji benzeri)
+                last['is_bullish'] and  # Son mum yeşil
+                last['close'] > (first['open'] + first['close']) / 2):  # Son mum ilk mumun ortasını geçiyor
+                morning_star_indices.append(i)
+        return morning_star_indices
+    
+    def _find_evening_star(self, df: pd.DataFrame) -> List[int]:
+        """Evening Star formasyonunu bulur"""
+        evening_star_indices = []
+        for i in range(4, len(df) - 2):
+            # En az 3 mum gerekiyor
+            if i + 2 >= len(df):
+                continue
+                
+            # Öncesinde yükseliş trendi olmalı
+            if not self._is_uptrend(df, i, window=4):
+                continue
+                
+            first = df.iloc[i]
+            middle = df.iloc[i+1]
+            last = df.iloc[i+2]
+            
+            if (first['is_bullish'] and  # İlk mum yeşil
+                middle['body_pct'] < 10 and  # Orta mum küçük gövdeli (doji benzeri)
+                not last['is_bullish'] and  # Son mum kırmızı
+                last['close'] < (first['open'] + first['close']) / 2):  # Son mum ilk mumun ortasının altında
+                evening_star_indices.append(i)
+        return evening_star_indices
+    
+    def _find_three_white_soldiers(self, df: pd.DataFrame) -> List[int]:
+        """Three White Soldiers formasyonunu bulur"""
+        three_white_indices = []
+        for i in range(len(df) - 3):
+            # En az 3 mum gerekiyor
+            if i + 2 >= len(df):
+                continue
+                
+            first = df.iloc[i]
+            second = df.iloc[i+1]
+            third = df.iloc[i+2]
+            
+            if (first['is_bullish'] and second['is_bullish'] and third['is_bullish'] and  # Üç mum da yeşil
+                second['close'] > first['close'] and third['close'] > second['close'] and  # Her mum bir öncekinden yüksek kapanıyor
+                second['open'] > first['open'] and third['open'] > second['open']):  # Her mum bir öncekinden yüksek açılıyor
+                three_white_indices.append(i)
+        return three_white_indices
+    
+    def _find_three_black_crows(self, df: pd.DataFrame) -> List[int]:
+        """Three Black Crows formasyonunu bulur"""
+        three_black_indices = []
+        for i in range(len(df) - 3):
+            # En az 3 mum gerekiyor
+            if i + 2 >= len(df):
+                continue
+                
+            first = df.iloc[i]
+            second = df.iloc[i+1]
+            third = df.iloc[i+2]
+            
+            if (not first['is_bullish'] and not second['is_bullish'] and not third['is_bullish'] and  # Üç mum da kırmızı
+                second['close'] < first['close'] and third['close'] < second['close'] and  # Her mum bir öncekinden düşük kapanıyor
+                second['open'] < first['open'] and third['open'] < second['open']):  # Her mum bir öncekinden düşük açılıyor
+                three_black_indices.append(i)
+        return three_black_indices
+    
+    def _is_uptrend(self, df: pd.DataFrame, idx: int, window: int = 4) -> bool:
+        """Belirli bir pozisyonda yükseliş trendi olup olmadığını kontrol eder"""
+        if idx < window:
+            return False
+            
+        # Son window kadar mumun kapanış fiyatlarını kontrol et
+        closes = df['close'].iloc[idx-window:idx].values
+        return closes[-1] > closes[0] and np.polyfit(range(len(closes)), closes, 1)[0] > 0
+    
+    def _is_downtrend(self, df: pd.DataFrame, idx: int, window: int = 4) -> bool:
+        """Belirli bir pozisyonda düşüş trendi olup olmadığını kontrol eder"""
+        if idx < window:
+            return False
+            
+        # Son window kadar mumun kapanış fiyatlarını kontrol et
+        closes = df['close'].iloc[idx-window:idx].values
+        return closes[-1] < closes[0] and np.polyfit(range(len(closes)), closes, 1)[0] < 0
+
+
+def make_candles(n=400, seed=3):
+    """Doji, çekiç ve yutan mumların sık görüldüğü rastgele seri"""
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    open_ = np.roll(close, 1) + rng.normal(0, 0.3, n) * rng.choice([0.01, 1.0, 3.0], n)
+    open_[0] = close[0]
+    top = np.maximum(open_, close)
+    bottom = np.minimum(open_, close)
+    high = top + rng.exponential(0.6, n) * rng.choice([0.0, 0.1, 1.0, 4.0], n)
+    low = bottom - rng.exponential(0.6, n) * rng.choice([0.0, 0.1, 1.0, 4.0], n)
+    return pd.DataFrame({'open': open_, 'high': high, 'low': low, 'close': close,
+                         'volume': rng.uniform(100, 1000, n)})
+
+
+@pytest.mark.parametrize('seed', [3, 11, 29])
+def test_masks_match_reference_loops(seed):
+    df = make_candles(seed=seed)
+    expected = ReferenceRecognizer().recognize_patterns(df)
+    assert CandlestickPatternRecognizer().recognize_patterns(df) == expected
+    # Veri on bir formasyonun hepsini içermeli
+    assert expected.keys() == set(PATTERN_NAMES)
+
+
+def test_recent_window_matches_reference():
+    df = make_candles(n=200, seed=5)
+    recognizer = CandlestickPatternRecognizer()
+    for end in range(5, len(df)):
+        window = df.iloc[end - 5:end]
+        assert recognizer.recognize_patterns(window) == ReferenceRecognizer().recognize_patterns(window)
+
+
+def test_screen_patterns_matches_per_symbol_masks():
+    frames = [make_candles(n=60, seed=s) for s in range(12)]
+    symbols = [f'C{s}USDT' for s in range(12)]
+    block = np.stack([ie.to_columns(frame) for frame in frames], axis=1)  # (6, sembol, N)
+
+    screened = screen_patterns(block, symbols, last_n=3)
+    for name in PATTERN_NAMES:
+        expected = [symbol for symbol, frame in zip(symbols, frames)
+                    if pattern_masks(frame['open'], frame['high'], frame['low'], frame['close'])[name][-3:].any()]
+        assert screened.get(name, []) == expected
+    assert screened
+
+    # window=5: analyze_recent_patterns'ın son 5 mum / son 3 indeks kuralı
+    recent = screen_patterns(block[1:5], symbols, last_n=3, window=5)
+    recognizer = CandlestickPatternRecognizer()
+    for symbol, frame in zip(symbols, frames):
+        names = {p['name'] for p in recognizer.analyze_recent_patterns(frame)['patterns']}
+        assert names == {name for name, hits in recent.items() if symbol in hits}
+
+    by_symbol = {symbol: ie.to_columns(frame).T.tolist() for symbol, frame in zip(symbols, frames)}
+    assert screen_ohlcv(by_symbol, last_n=3) == screened
@@ -0,0 +1,104 @@
+import asyncio
+from src.analysis.worker_pool import WorkerPool
+from src.bot.modules.analysis import dual_timeframe_analyzer as dual_module
+from src.bot.modules.analysis.dual_timeframe_analyzer import DualTimeframeAnalyzer
+from conftest import make_candles
+
+
+class StubGateway:
+    async def load_markets(self):
+        return {}
+
+
+def test_full_universe_scan_matches_in_process_analysis(monkeypatch):
+    symbols = [f'C{s}/USDT' for s in range(45)]
+    candles = {symbol: (make_candles(100, s, drift=0.05 * (s % 3 - 1), volume=(1e6, 2e6)),
+                        make_candles(100, s + 100, step=900000, drift=0.05 * (s % 3 - 1), volume=(1e6, 2e6)))
+               for s, symbol in enumerate(symbols)}
+    analyzer = DualTimeframeAnalyzer()
+    expected = [analyzer._analyze_symbol(symbol, *candles[symbol]) for symbol in symbols]
+    expected = sorted((opp for opp in expected if opp), key=lambda x: x['opportunity_score'], reverse=True)
+
+    pool = WorkerPool(max_workers=2)
+    monkeypatch.setattr(dual_module, 'get_worker_pool', lambda: pool)
+    monkeypatch.setattr(dual_module, 'get_gateway', lambda: StubGateway())
+    fetched = []
+
+    async def fetch(symbol):
+        fetched.append(symbol)
+        await asyncio.sleep(0.001)
+        return (symbol, *candles[symbol])
+
+    monkeypatch.setattr(analyzer, '_fetch_dual_ohlcv', fetch)
+    try:
+        opportunities = asyncio.run(analyzer.analyze_market_parallel(symbols))
+    finally:
+        pool.shutdown()
+
+    assert sorted(fetched) == sorted(symbols)
+    assert expected and len(opportunities) == len(expected)
+    strip = lambda opps: [{k: v for k, v in opp.items() if k != 'timestamp'} for opp in opps]
+    assert sorted(strip(opportunities), key=lambda x: x['symbol']) == sorted(strip(expected), key=lambda x: x['symbol'])
+    assert [opp['opportunity_score'] for opp in opportunities] == [opp['opportunity_score'] for opp in expected]
+
+
+def _recording_pipeline(pipelines):
+    """_build_scan_pipeline sarmalayıcısı: oluşturulan boru hattını istatistikleri için saklar"""
+    build = DualTimeframeAnalyzer._build_scan_pipeline
+
+    def wrapper(self, *args, **kwargs):
+        pipeline = build(self, *args, **kwargs)
+        pipelines.append(pipeline)
+        return pipeline
+    return wrapper
+
+
+def _run_with_stub_timeframes(monkeypatch, symbols, get_timeframes):
+    """Gerçek _fetch_dual_ohlcv ile tarama; borsa yerine get_timeframes stub'ı kullanılır"""
+    analyzer = DualTimeframeAnalyzer()
+    pool = WorkerPool(max_workers=1)
+    monkeypatch.setattr(dual_module, 'get_worker_pool', lambda: pool)
+    monkeypatch.setattr(dual_module, 'get_gateway', lambda: StubGateway())
+    monkeypatch.setattr(dual_module, 'get_timeframes_async', get_timeframes)
+    try:
+        return asyncio.run(analyzer.analyze_market_parallel(symbols, worker_count=1))
+    finally:
+        pool.shutdown()
+
+
+def test_failed_and_short_symbols_are_skipped(monkeypatch):
+    symbols = ['OK/USDT', 'FAIL/USDT', 'SHORT/USDT']
+
+    candles = {n: {'1h': make_candles(n, 1, drift=0.05, volume=(1e6, 2e6)),
+                   '15m': make_candles(n, 2, step=900000, drift=0.05, volume=(1e6, 2e6))} for n in (10, 100)}
+    expected = DualTimeframeAnalyzer()._analyze_symbol('OK/USDT', candles[100]['1h'], candles[100]['15m'])
+
+    async def get_timeframes(exchange, symbol, limits):
+        if symbol == 'FAIL/USDT':
+            raise ConnectionError('timeout')
+        return candles[10 if symbol == 'SHORT/USDT' else 100]
+
+    pipelines = []
+    monkeypatch.setattr(DualTimeframeAnalyzer, '_build_scan_pipeline', _recording_pipeline(pipelines))
+    opportunities = _run_with_stub_timeframes(monkeypatch, symbols, get_timeframes)
+
+    stats = pipelines[0].stats
+    assert (stats['fetched'], stats['fetch_errors'], stats['skipped']) == (1, 1, 1)
+    assert [opp['symbol'] for opp in opportunities] == (['OK/USDT'] if expected else [])
+
+
+def test_fetch_concurrency_is_capped(monkeypatch):
+    monkeypatch.setenv('SCAN_FETCH_CONCURRENCY', '3')
+    symbols = [f'C{s}/USDT' for s in range(20)]
+    in_flight = peak = 0
+
+    async def get_timeframes(exchange, symbol, limits):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.005)
+        in_flight -= 1
+        return {'1h': make_candles(10), '15m': make_candles(10, step=900000)}
+
+    _run_with_stub_timeframes(monkeypatch, symbols, get_timeframes)
+    assert peak == 3
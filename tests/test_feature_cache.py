@@ -0,0 +1,132 @@
+import time
+import numpy as np
+from src.analysis import indicator_engine as ie
+from src.analysis.feature_cache import FeatureCache
+from conftest import HOUR, make_rows
+
+
+def test_features_are_keyed_by_last_closed_candle():
+    cache = FeatureCache()
+    ohlcv = make_rows(80, 1, price=100.0)
+    now = 79 * HOUR + 10  # son mum açık
+
+    features = cache.get_features('BTCUSDT', '1h', ohlcv, now_ms=now)
+    assert features['rsi'].shape == (79,)
+    assert np.allclose(features['rsi'], ie.rsi(np.array(ohlcv)[:79, 4]), equal_nan=True)
+
+    # Açık mumun fiyatı değişse de aynı kapanmış mum -> hit
+    ohlcv[-1][4] *= 1.5
+    assert cache.get_features('BTCUSDT', '1h', ohlcv, now_ms=now + 60000) is features
+    assert cache.stats == {'hits': 1, 'misses': 1, 'evictions': 0}
+
+    # Mum kapandı -> yeniden hesap
+    assert cache.get_features('BTCUSDT', '1h', ohlcv, now_ms=80 * HOUR)['rsi'].shape == (80,)
+    assert cache.stats['misses'] == 2
+
+    # Farklı parametreler ayrı girdi
+    custom = cache.get_features('BTCUSDT', '1h', ohlcv, compute=lambda data: {'rsi': ie.rsi(data[4], 7)},
+                                params={'rsi': 7}, now_ms=now)
+    assert not np.allclose(custom['rsi'][-1], features['rsi'][-1])
+    assert len(cache) == 3
+
+
+def test_lru_eviction():
+    cache = FeatureCache(max_entries=2)
+    ohlcv = make_rows(80, 1, price=100.0)
+    for symbol in ('A', 'B'):
+        cache.get_features(symbol, '1h', ohlcv, now_ms=80 * HOUR)
+    cache.get_features('A', '1h', ohlcv, now_ms=80 * HOUR)  # A en son kullanılan
+    cache.get_features('C', '1h', ohlcv, now_ms=80 * HOUR)
+
+    assert cache.stats['evictions'] == 1
+    cache.get_features('A', '1h', ohlcv, now_ms=80 * HOUR)
+    assert cache.stats['hits'] == 2  # A kaldı, B atıldı
+
+
+def test_indicator_table_matches_uncached_batch_and_reuses_entries():
+    cache = FeatureCache()
+    ohlcv_by_symbol = {f'C{s}USDT': make_rows(80, s, price=100.0) for s in range(6)}
+    ohlcv_by_symbol['SHORTUSDT'] = make_rows(20, 99, price=100.0)
+    now = 79 * HOUR + 10
+
+    table = cache.indicator_table('1h', ohlcv_by_symbol, min_length=30, volume_window=10, now_ms=now)
+    closed = {symbol: ohlcv[:-1] for symbol, ohlcv in ohlcv_by_symbol.items()}
+    expected = ie.build_indicator_table(closed, min_length=29, volume_window=10)
+
+    assert table.symbols == [f'C{s}USDT' for s in range(6)]
+    for name in ('rsi', 'macd_hist', 'ema50', 'avg_volume'):
+        assert np.allclose(table[name], expected[name], equal_nan=True)
+    assert cache.stats['misses'] == 6
+
+    cache.indicator_table('1h', ohlcv_by_symbol, min_length=30, volume_window=10, now_ms=now)
+    assert cache.stats['hits'] == 6 and cache.stats['misses'] == 6
+
+
+def test_key_normalizes_symbol_and_separates_window_depths():
+    cache = FeatureCache()
+    ohlcv = make_rows(101, 1, price=100.0)
+    now = 101 * HOUR
+
+    features = cache.get_features('BTCUSDT', '1h', ohlcv, now_ms=now)
+    assert cache.get_features('BTC/USDT', '1h', ohlcv, now_ms=now) is features
+    assert cache.get_features('BTC/USDT:USDT', '1h', ohlcv, now_ms=now) is features
+
+    # Aynı son mum, daha kısa pencere: özyinelemeli göstergeler farklıdır
+    shallow = cache.get_features('BTCUSDT', '1h', ohlcv[-50:], now_ms=now)
+    assert shallow is not features
+    assert not np.isclose(shallow['ema50'][-1], features['ema50'][-1])
+    assert cache.stats == {'hits': 2, 'misses': 2, 'evictions': 0}
+
+
+def test_opportunity_analysis_reuses_features_written_by_market_scan(monkeypatch):
+    import asyncio
+    from src.bot.modules import market_analyzer as opportunity_module
+    from src.bot.modules.analysis import market as market_module
+    from src.data_collectors.ohlcv_array import OHLCVArray
+
+    candles = OHLCVArray.from_rows(make_rows(101, 3, price=100.0))
+
+    class FakeStore:
+        async def get_array_async(self, exchange, symbol, timeframe, limit=100):
+            return candles.tail(limit)
+
+        async def get_ohlcv_async(self, exchange, symbol, timeframe, limit=100):
+            return candles.tail(limit).tolist()
+
+    cache = FeatureCache()
+    for module in (market_module, opportunity_module):
+        monkeypatch.setattr(module, 'get_candle_store', lambda: FakeStore())
+        monkeypatch.setattr(module, 'get_feature_cache', lambda: cache)
+
+    scanner = market_module.MarketAnalyzer()
+    ticker = {'symbol': 'BTCUSDT', 'lastPrice': str(candles.close[-1]), 'quoteVolume': '5000000'}
+    asyncio.run(scanner.analyze_market([ticker], '1h'))
+    assert cache.stats['misses'] == 1 and len(cache) == 1
+
+    analyzer = opportunity_module.MarketAnalyzer({})
+
+    async def create_exchange():
+        return None
+
+    monkeypatch.setattr(analyzer, '_create_exchange', create_exchange)
+    asyncio.run(analyzer.analyze_opportunity('BTCUSDT', float(candles.close[-1]), 5e6, '1h'))
+    assert cache.stats['hits'] == 1 and len(cache) == 1
+
+
+def test_multiscan_frames_use_cache_on_closed_candles(monkeypatch):
+    from src.analysis import multi_timeframe_analyzer as multi_module
+    from src.data_collectors.ohlcv_array import OHLCVArray
+
+    cache = FeatureCache()
+    monkeypatch.setattr(multi_module, 'get_feature_cache', lambda: cache)
+    analyzer = multi_module.MultiTimeframeAnalyzer()
+    candles = OHLCVArray.from_rows(make_rows(80, 4, price=100.0, start=int(time.time() * 1000) - 79 * HOUR))
+
+    first = analyzer._analyze_frame('BTCUSDT', '1h', candles.to_dataframe(index=True))
+    second = analyzer._analyze_frame('BTC/USDT', '1h', candles.to_dataframe(index=True))
+    assert cache.stats['misses'] == 1 and cache.stats['hits'] == 1
+    assert first['indicators'] == second['indicators']
+    # Oluşmakta olan son mum göstergelere girmez
+    closed = OHLCVArray.from_rows(candles.tolist()[:-1]).to_dataframe(index=True)
+    expected = analyzer.calculate_indicators(closed)
+    assert {name: first['indicators'][name] for name in expected} == expected
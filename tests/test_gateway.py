@@ -0,0 +1,77 @@
+import asyncio
+from src.exchanges import gateway as gateway_module
+from src.exchanges.gateway import ExchangeGateway
+from src.exchanges.rate_limiter import WeightRateLimiter
+
+
+class FakeBinance:
+    instances = 0
+
+    def __init__(self, config):
+        FakeBinance.instances += 1
+        self.config = config
+        self.markets = {}
+        self.load_calls = 0
+        self.closed = False
+
+    async def load_markets(self):
+        self.load_calls += 1
+        self.markets = {'BTC/USDT': {}}
+        return self.markets
+
+    async def fetch_ticker(self, symbol):
+        await asyncio.sleep(0)
+        return {'symbol': symbol, 'last': 100.0}
+
+    async def close(self):
+        self.closed = True
+
+
+def test_gateway_reuses_one_exchange(monkeypatch, tmp_path):
+    monkeypatch.setattr(gateway_module.ccxt, 'binance', FakeBinance, raising=False)
+    FakeBinance.instances = 0
+
+    async def run():
+        gateway = ExchangeGateway(pool_size=2, limiter=WeightRateLimiter(state_dir=str(tmp_path)))
+        tickers = await asyncio.gather(*[gateway.fetch_ticker('BTC/USDT') for _ in range(10)])
+        exchange = await gateway.get_exchange()
+        await gateway.close()
+        return tickers, exchange
+
+    tickers, exchange = asyncio.run(run())
+
+    assert all(t['last'] == 100.0 for t in tickers)
+    assert FakeBinance.instances == 1
+    assert exchange.load_calls == 1
+    assert exchange.closed
+    assert 'session' in exchange.config
+
+
+def test_identical_concurrent_requests_are_coalesced(monkeypatch, tmp_path):
+    monkeypatch.setattr(gateway_module.ccxt, 'binance', FakeBinance, raising=False)
+    calls = []
+
+    async def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        calls.append((symbol, timeframe))
+        await asyncio.sleep(0.01)
+        return [[0, 1.0, 1.0, 1.0, 1.0, 1.0]]
+
+    monkeypatch.setattr(FakeBinance, 'fetch_ohlcv', fetch_ohlcv, raising=False)
+
+    async def run():
+        gateway = ExchangeGateway(limiter=WeightRateLimiter(state_dir=str(tmp_path)))
+        results = await asyncio.gather(
+            *[gateway.fetch_ohlcv('BTC/USDT', '1h', limit=100) for _ in range(5)],
+            gateway.fetch_ohlcv('ETH/USDT', '1h', limit=100),
+        )
+        stats = gateway.get_stats()
+        await gateway.close()
+        return results, stats
+
+    results, stats = asyncio.run(run())
+
+    assert calls.count(('BTC/USDT', '1h')) == 1
+    assert calls.count(('ETH/USDT', '1h')) == 1
+    assert all(r == results[0] for r in results)
+    assert stats['coalesced'] == 4
+    assert stats['dedup_ratio'] == round(4 / 6, 3)
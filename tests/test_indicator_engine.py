@@ -0,0 +1,143 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.analysis import indicator_engine as ie
+from conftest import make_candles, make_columns
+
+
+def test_ema_and_macd_match_pandas():
+    close = make_columns(300, 7, price=100.0)[4]
+    series = pd.Series(close)
+
+    assert np.allclose(ie.ema(close, 20), series.ewm(span=20, adjust=False).mean())
+
+    line, signal, hist = ie.macd(close)
+    expected = series.ewm(span=12, adjust=False).mean() - series.ewm(span=26, adjust=False).mean()
+    assert np.allclose(line, expected)
+    assert np.allclose(signal, expected.ewm(span=9, adjust=False).mean())
+    assert np.allclose(hist, line - signal)
+
+
+def test_bollinger_and_atr_match_reference():
+    data = make_columns(300, 7, price=100.0)
+    high, low, close = data[2], data[3], data[4]
+
+    upper, middle, lower = ie.bollinger(close, 20)
+    series = pd.Series(close)
+    assert np.allclose(middle[19:], series.rolling(20).mean()[19:])
+    assert np.allclose(upper[19:], (series.rolling(20).mean() + 2 * series.rolling(20).std(ddof=0))[19:])
+    assert np.isnan(lower[:19]).all()
+
+    # Wilder ATR: ilk değer TR'nin basit ortalaması, sonrası 1/period yumuşatma
+    tr = ie.true_range(high, low, close)
+    expected = [tr[:14].mean()]
+    for value in tr[14:]:
+        expected.append((expected[-1] * 13 + value) / 14)
+    assert np.allclose(ie.atr(high, low, close)[13:], expected)
+
+
+def test_rsi_bounds_and_edge_cases():
+    close = make_columns(300, 7, price=100.0)[4]
+    values = ie.rsi(close)
+    assert np.isnan(values[:14]).all()
+    assert ((values[14:] >= 0) & (values[14:] <= 100)).all()
+
+    assert ie.last(ie.rsi(np.arange(30.0))) == 100.0
+    assert ie.last(ie.rsi(np.full(30, 5.0))) == 50.0
+    assert ie.last(ie.rsi(np.arange(5.0)), default=50.0) == 50.0
+
+
+def test_rsi_matches_ta_library_after_warmup():
+    ta = pytest.importorskip('ta')
+    close = make_columns(500, 7, price=100.0)[4]
+    expected = ta.momentum.RSIIndicator(pd.Series(close), window=14).rsi().to_numpy()
+    # Başlangıç tohumu farklı; Wilder yumuşatması birkaç yüz mumda yakınsar
+    assert np.allclose(ie.rsi(close)[-50:], expected[-50:], atol=1e-6)
+
+
+def test_2d_batch_matches_per_symbol():
+    batch = np.stack([make_columns(300, s, price=100.0) for s in range(4)])  # (sembol, 6, N)
+    high, low, close = batch[:, 2], batch[:, 3], batch[:, 4]
+
+    batch_results = [ie.rsi(close), ie.macd(close)[2], ie.bollinger(close)[0],
+                     ie.atr(high, low, close), ie.adx(high, low, close)[0], ie.stoch_rsi(close)[1]]
+    for i in range(len(batch)):
+        single = [ie.rsi(close[i]), ie.macd(close[i])[2], ie.bollinger(close[i])[0],
+                  ie.atr(high[i], low[i], close[i]), ie.adx(high[i], low[i], close[i])[0], ie.stoch_rsi(close[i])[1]]
+        for batch_values, values in zip(batch_results, single):
+            assert np.allclose(batch_values[i], values, equal_nan=True)
+
+
+def test_compute_features_accepts_ccxt_rows_and_dataframe():
+    data = make_columns(120, 7, price=100.0)
+    rows = data.T.tolist()
+    frame = pd.DataFrame(rows, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+
+    from_rows = ie.compute_features(rows)
+    from_frame = ie.compute_features(frame)
+    assert from_rows.keys() == from_frame.keys()
+    for key in from_rows:
+        assert from_rows[key].shape == (120,)
+        assert np.allclose(from_rows[key], from_frame[key], equal_nan=True)
+
+
+def test_indicator_table_matches_per_symbol_last_values():
+    ohlcv_by_symbol = {f'C{s}USDT': make_columns(50, s, price=100.0).T.tolist() for s in range(5)}
+    ohlcv_by_symbol['NEWUSDT'] = make_columns(35, 99, price=100.0).T.tolist()  # kısa seri ayrı grupta
+    ohlcv_by_symbol['TINYUSDT'] = make_columns(10, 98, price=100.0).T.tolist()  # min_length altında
+
+    table = ie.build_indicator_table(ohlcv_by_symbol, min_length=30, volume_window=10)
+
+    assert sorted(table.symbols) == sorted(set(ohlcv_by_symbol) - {'TINYUSDT'})
+    for i, symbol in enumerate(table.symbols):
+        features = ie.compute_features(ohlcv_by_symbol[symbol])
+        for key in ('rsi', 'macd_hist', 'ema20', 'ema50', 'bb_upper', 'atr'):
+            assert np.isclose(table[key][i], features[key][-1], equal_nan=True)
+        assert np.isclose(table['avg_volume'][i], np.mean(ie.to_columns(ohlcv_by_symbol[symbol])[5][-10:]))
+
+    top = table.sort('rsi').select(np.arange(2))
+    assert len(top) == 2 and top['rsi'][0] >= top['rsi'][1]
+    assert top.row(0)['symbol'] == top.symbols[0]
+
+
+def test_stochastic_and_rolling_vwap_match_pandas():
+    data = make_columns(300, 7, price=100.0)
+    high, low, close, volume = (pd.Series(data[i]) for i in (2, 3, 4, 5))
+
+    k, d = ie.stochastic(data[2], data[3], data[4])
+    expected_k = 100 * (close - low.rolling(14).min()) / (high.rolling(14).max() - low.rolling(14).min())
+    assert np.allclose(k, expected_k, equal_nan=True)
+    assert np.allclose(d, expected_k.rolling(3).mean(), equal_nan=True)
+
+    typical = (high + low + close) / 3
+    expected_vwap = (typical * volume).rolling(14).sum() / volume.rolling(14).sum()
+    assert np.allclose(ie.vwap(data[2], data[3], data[4], data[5], period=14), expected_vwap, equal_nan=True)
+
+
+def test_multi_timeframe_indicators_use_engine_definitions():
+    from src.analysis.multi_timeframe_analyzer import MultiTimeframeAnalyzer
+    data = make_columns(300, 7, price=100.0)
+    df = pd.DataFrame(data[1:].T, columns=['open', 'high', 'low', 'close', 'volume'])
+
+    indicators = MultiTimeframeAnalyzer().calculate_indicators(df)
+    features = ie.compute_features(data)
+    for key in ('rsi', 'macd', 'macd_signal', 'macd_hist'):
+        assert np.isclose(indicators[key], features[key][-1])
+    assert np.isclose(indicators['emas']['ema50'], features['ema50'][-1])
+
+
+def test_dual_timeframe_frame_uses_engine_definitions():
+    from src.bot.modules.analysis.dual_timeframe_analyzer import DualTimeframeAnalyzer
+    analyzer = DualTimeframeAnalyzer()
+    candles = make_candles(120, 8, price=100.0)
+    data = candles.as_columns()
+
+    df = analyzer._prepare_dataframe_for_worker(candles)
+    features = ie.compute_features(data)
+    assert np.allclose(df['rsi'], ie.rsi(data[4], analyzer.rsi_period_15m), equal_nan=True)
+    for key in ('ema50', 'macd_hist', 'bb_upper', 'atr'):
+        assert np.allclose(df[key], features[key], equal_nan=True)
+    assert np.allclose(df['stoch_rsi_k'], features['stoch_k'], equal_nan=True)
+
+    risk = analyzer._calculate_risk_management_for_worker(df, 'LONG', float(data[4, -1]))
+    assert np.isclose(risk['atr'], ie.atr(data[2], data[3], data[4])[-1])
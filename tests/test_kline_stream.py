@@ -0,0 +1,200 @@
+import json
+import asyncio
+from aiohttp import web
+from src.data_collectors.candle_store import CandleStore
+from src.data_collectors.kline_stream import KlineRingBuffer, KlineStreamIngestor
+
+MINUTE = 60 * 1000
+T0 = 1700000040000
+
+
+def kline_frame(ts, close, volume=1.0):
+    return {
+        'stream': 'btcusdt@kline_1m',
+        'data': {
+            'e': 'kline', 'E': ts + 5000, 's': 'BTCUSDT',
+            'k': {
+                't': ts, 'T': ts + MINUTE - 1, 's': 'BTCUSDT', 'i': '1m',
+                'o': '100.0', 'c': str(close), 'h': '120.0', 'l': '90.0',
+                'v': str(volume), 'n': 10, 'x': False, 'q': '0', 'V': '0', 'Q': '0', 'B': '0',
+            },
+        },
+    }
+
+
+TICKER_FRAME = {
+    'stream': 'btcusdt@miniTicker',
+    'data': {'e': '24hrMiniTicker', 'E': T0 + 6000, 's': 'BTCUSDT',
+             'c': '105.5', 'o': '100.0', 'h': '110.0', 'l': '95.0', 'v': '1000', 'q': '105000'},
+}
+
+# Kaydedilmiş iki bağlantı: ilki T0+1m'den sonra kopuyor, ikincisi T0+2m mumunu kaçırıyor
+RECORDED_SESSIONS = [
+    [kline_frame(T0, 101.0), kline_frame(T0, 102.0), kline_frame(T0 + MINUTE, 103.0), TICKER_FRAME],
+    [kline_frame(T0 + 3 * MINUTE, 104.0), kline_frame(T0 + 4 * MINUTE, 999.0)],
+]
+
+
+class FakeGateway:
+    """Backfill için REST geçmişi"""
+
+    def __init__(self):
+        self.calls = []
+        self.candles = [[T0 + i * MINUTE, 1.0, 2.0, 0.5, 1.5, 3.0] for i in range(-15, 5)]
+
+    async def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        self.calls.append((symbol, timeframe, since, limit))
+        rows = [c for c in self.candles if since is None or c[0] >= since]
+        return rows[-limit:] if since is None else rows[:limit]
+
+
+def test_ring_buffer_wraps_and_updates_last_candle():
+    buffer = KlineRingBuffer(capacity=3)
+    for i in range(5):
+        buffer.push([i * MINUTE, 1.0, 1.0, 1.0, float(i), 1.0])
+    buffer.push([4 * MINUTE, 1.0, 1.0, 1.0, 42.0, 1.0])
+
+    assert len(buffer) == 3
+    assert [row[0] for row in buffer.tail(3)] == [2 * MINUTE, 3 * MINUTE, 4 * MINUTE]
+    assert buffer.tail(1)[0][4] == 42.0
+    assert not buffer.push([0, 1.0, 1.0, 1.0, 1.0, 1.0])
+
+    buffer.extend([[1 * MINUTE, 0, 0, 0, 7.0, 0], [3 * MINUTE, 0, 0, 0, 8.0, 0]])
+    # Aynı timestamp'te tampondaki veri korunur
+    assert [row[4] for row in buffer.tail(3)] == [2.0, 3.0, 42.0]
+
+
+async def _serve_recorded_frames(connections):
+    async def handler(request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        session = len(connections)
+        connections.append(request.query.get('streams'))
+        for frame in RECORDED_SESSIONS[min(session, len(RECORDED_SESSIONS) - 1)]:
+            await ws.send_str(json.dumps(frame))
+        if session == 0:
+            await ws.close()
+        else:
+            async for _ in ws:
+                pass
+        return ws
+
+    app = web.Application()
+    app.router.add_get('/stream', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+async def _wait_for(condition, timeout=3.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError('koşul zaman aşımına uğradı')
+        await asyncio.sleep(0.01)
+
+
+def test_replayed_stream_reconnects_and_backfills_gap(tmp_path):
+    gateway = FakeGateway()
+
+    async def run():
+        connections = []
+        runner, url = await _serve_recorded_frames(connections)
+        ingestor = KlineStreamIngestor(url=url, capacity=10, gateway=gateway,
+                                       candle_store=CandleStore(cache_dir=str(tmp_path)),
+                                       reconnect_delay=0.01)
+        try:
+            ingestor.subscribe('BTCUSDT', timeframes=('1m',))
+
+            def settled():
+                candles = ingestor.get_ohlcv('BTC/USDT', '1m', limit=10)
+                return candles is not None and candles[-1][0] == T0 + 4 * MINUTE
+
+            await _wait_for(settled)
+            return connections, ingestor.get_ohlcv('BTC/USDT', '1m', limit=10), \
+                ingestor.get_ticker('BTCUSDT'), dict(ingestor.stats)
+        finally:
+            await ingestor.stop()
+            await runner.cleanup()
+
+    connections, candles, ticker, stats = asyncio.run(run())
+
+    assert connections[0] == 'btcusdt@kline_1m/btcusdt@miniTicker'
+    assert stats['reconnects'] >= 1
+    assert stats['backfills'] >= 2
+    assert gateway.calls  # ilk doldurma ve boşluk onarımı REST'ten
+    # Kaçırılan T0+2m dahil kesintisiz seri
+    assert [c[0] for c in candles] == [T0 + i * MINUTE for i in range(-5, 5)]
+    # Akıştan gelen değerler REST verisinin önüne geçer
+    assert candles[-1][4] == 999.0
+    assert ticker['last'] == 105.5
+
+
+class OpenSocket:
+    closed = False
+
+
+def test_subscriptions_are_ref_counted_and_idle_streams_evicted(tmp_path):
+    gateway = FakeGateway()
+
+    async def run():
+        ingestor = KlineStreamIngestor(url='http://127.0.0.1:9', capacity=10, gateway=gateway,
+                                       candle_store=CandleStore(cache_dir=str(tmp_path)),
+                                       reconnect_delay=60, idle_timeout=0.05)
+        try:
+            first = ingestor.subscribe('BTCUSDT', timeframes=('1m',))
+            second = ingestor.subscribe('BTC/USDT', timeframes=('1m',))
+            await _wait_for(lambda: ingestor.stats['backfills'] == 1)
+            counts = [ingestor.subscriber_count('BTCUSDT')]
+            first.close()
+            first.close()
+            counts.append(ingestor.subscriber_count('BTCUSDT'))
+            second.close()
+            counts.append(ingestor.subscriber_count('BTCUSDT'))
+
+            # Boşta kalma süresi dolmadan yeniden abone olan backfill'i tekrarlamaz
+            again = ingestor.subscribe('BTCUSDT', timeframes=('1m',))
+            kept = ('BTC/USDT', '1m') in ingestor._buffers and len(gateway.calls) == 1
+            again.close()
+
+            await asyncio.sleep(0.06)
+            other = ingestor.subscribe('ETHUSDT', timeframes=())
+            evicted = ('BTC/USDT', '1m') not in ingestor._buffers
+            streams = set(ingestor._streams)
+            other.close()
+            return counts, kept, evicted, streams, ingestor.stats['evictions']
+        finally:
+            await ingestor.stop()
+
+    counts, kept, evicted, streams, evictions = asyncio.run(run())
+
+    assert counts == [2, 1, 0]
+    assert kept and evicted
+    assert streams == {'ethusdt@miniTicker'}
+    assert evictions == 2
+
+
+def test_stale_ticker_falls_back_to_rest(tmp_path):
+    async def run():
+        ingestor = KlineStreamIngestor(url='http://127.0.0.1:9', gateway=FakeGateway(),
+                                       candle_store=CandleStore(cache_dir=str(tmp_path)),
+                                       reconnect_delay=60, ticker_max_age=10)
+        try:
+            ingestor.subscribe('BTCUSDT', timeframes=())
+            ingestor._ws = OpenSocket()
+            ingestor._handle(TICKER_FRAME)
+            fresh = ingestor.get_ticker('BTCUSDT')
+            ingestor._ticker_times['BTC/USDT'] -= 11
+            return fresh, ingestor.get_ticker('BTCUSDT'), ingestor.get_ticker('BTCUSDT', max_age=60)
+        finally:
+            ingestor._ws = None
+            await ingestor.stop()
+
+    fresh, stale, tolerant = asyncio.run(run())
+
+    assert fresh['last'] == 105.5
+    assert stale is None
+    assert tolerant is fresh
@@ -0,0 +1,58 @@
+import asyncio
+from telegram.error import BadRequest
+from src.bot.modules.utils.live_message import LiveMessage, ScanCancellation, until_cancelled
+
+
+class FakeMessage:
+    def __init__(self):
+        self.edits = []
+
+    async def edit_text(self, text, **kwargs):
+        if self.edits and self.edits[-1] == text:
+            raise BadRequest("Message is not modified")
+        self.edits.append(text)
+
+
+def test_live_message_throttles_and_skips_duplicates():
+    message = FakeMessage()
+    live = LiveMessage(message, min_interval=60)
+
+    async def run():
+        assert await live.update('1')
+        assert not await live.update('2')
+        assert not await live.update('1', force=True)
+        assert await live.update('3', force=True)
+
+    asyncio.run(run())
+
+    assert message.edits == ['1', '3']
+    assert live.stats == {'edits': 2, 'skipped': 2}
+
+
+def test_cancellation_stops_waiting_stream():
+    closed = []
+
+    async def slow_scan():
+        try:
+            for i in range(100):
+                yield i
+                await asyncio.sleep(0.05)
+        finally:
+            closed.append(True)
+
+    async def run():
+        cancellation = ScanCancellation()
+        stop = cancellation.begin(42)
+        seen = []
+        async for item in until_cancelled(slow_scan(), stop):
+            seen.append(item)
+            if item == 1:
+                asyncio.get_running_loop().call_later(0.01, cancellation.cancel, 42)
+        cancellation.finish(42, stop)
+        return seen, cancellation.cancel(42)
+
+    seen, cancelled_again = asyncio.run(run())
+
+    assert seen == [0, 1]
+    assert closed == [True]
+    assert cancelled_again is False
@@ -0,0 +1,138 @@
+import numpy as np
+from src.bot.modules.analysis.market import MarketAnalyzer
+from conftest import make_rows
+
+
+def test_batch_scores_match_scalar_scoring():
+    analyzer = MarketAnalyzer()
+    ohlcv_by_symbol = {f'C{s}USDT': make_rows(60, s) for s in range(20)}
+    market_data = {symbol: (float(ohlcv[-1][4]), 300.0 + 40 * i)
+                   for i, (symbol, ohlcv) in enumerate(ohlcv_by_symbol.items())}
+
+    table = analyzer._build_scan_table(ohlcv_by_symbol, market_data, min_length=30, volume_window=10)
+
+    assert len(table) == 20
+    for row in table.rows():
+        ohlcv = np.array(ohlcv_by_symbol[row['symbol']])
+        avg_volume = np.mean(ohlcv[-10:, 5])
+        volume = market_data[row['symbol']][1]
+        expected = analyzer._calculate_opportunity_score(
+            row['rsi'], row['macd_hist'], volume > avg_volume * 1.2,
+            "YUKARI" if row['ema20'] > row['ema50'] else "AŞAĞI", volume, avg_volume
+        )
+        assert isinstance(expected, float)
+        assert row['opportunity_score'] == expected
+
+
+def test_market_stream_reports_progress_and_running_top(monkeypatch):
+    import asyncio
+    from src.analysis.worker_pool import WorkerPool
+    from src.bot.modules.analysis import market as market_module
+    from src.data_collectors.ohlcv_array import OHLCVArray
+
+    candles = {f'C{s}USDT': OHLCVArray.from_rows(make_rows(60, s)) for s in range(25)}
+    tickers = [{'symbol': symbol, 'lastPrice': str(ohlcv.close[-1]), 'quoteVolume': str(1e6 + i)}
+               for i, (symbol, ohlcv) in enumerate(candles.items())]
+    pool = WorkerPool(max_workers=2)
+    monkeypatch.setattr(market_module, 'get_worker_pool', lambda: pool)
+    analyzer = MarketAnalyzer()
+
+    async def fetch(symbol, interval):
+        return candles[symbol]
+
+    monkeypatch.setattr(analyzer, '_fetch_coin_ohlcv', fetch)
+
+    async def run():
+        updates = [update async for update in analyzer.analyze_market_stream(tickers, '1h', worker_count=2, top_k=5)]
+        return updates, await analyzer.analyze_market_parallel(tickers, '1h', worker_count=2)
+
+    try:
+        updates, top = asyncio.run(run())
+    finally:
+        pool.shutdown()
+
+    assert len(updates) == 3
+    assert [update['scanned'] for update in updates] == sorted(update['scanned'] for update in updates)
+    assert updates[-1]['scanned'] == updates[-1]['total'] == 25
+    everything = [opp for update in updates for opp in update['new']]
+    assert updates[-1]['found'] == len(everything)
+    expected = sorted(everything, key=lambda x: x['opportunity_score'], reverse=True)
+    assert updates[-1]['top'] == expected[:5]
+    assert [opp['opportunity_score'] for opp in top] == [opp['opportunity_score'] for opp in expected[:10]]
+
+
+def test_prefilter_limits_ohlcv_fetches_and_reports_recall(monkeypatch):
+    import asyncio
+    from src.analysis.ticker_prefilter import TickerPrefilter
+    from src.analysis.worker_pool import WorkerPool
+    from src.bot.modules.analysis import market as market_module
+    from src.data_collectors.ohlcv_array import OHLCVArray
+
+    candles = {f'C{s}USDT': OHLCVArray.from_rows(make_rows(60, s)) for s in range(30)}
+    tickers = [{'symbol': symbol, 'lastPrice': str(ohlcv.close[-1]), 'quoteVolume': str(1e6 * (i + 1)),
+                'priceChangePercent': str(i % 7 - 3)}
+               for i, (symbol, ohlcv) in enumerate(candles.items())]
+    pool = WorkerPool(max_workers=2)
+    monkeypatch.setattr(market_module, 'get_worker_pool', lambda: pool)
+    analyzer = MarketAnalyzer()
+    analyzer.prefilter = TickerPrefilter(top_k=6)
+    fetched = []
+
+    async def fetch(symbol, interval):
+        fetched.append(symbol)
+        return candles[symbol]
+
+    monkeypatch.setattr(analyzer, '_fetch_coin_ohlcv', fetch)
+
+    async def run():
+        top = await analyzer.analyze_market_parallel(tickers, '1h', worker_count=2)
+        candidates, dropped = set(fetched), analyzer.analysis_stats['prefilter_dropped']
+        fetched.clear()
+        return top, candidates, dropped, await analyzer.measure_prefilter_recall(tickers, '1h', top_n=5)
+
+    try:
+        top, candidates, dropped, report = asyncio.run(run())
+    finally:
+        pool.shutdown()
+
+    assert len(candidates) == 6 and {opp['symbol'] for opp in top} <= candidates
+    assert dropped == 24
+    assert len(fetched) == 30
+    assert report['candidates'] == 6 and report['universe'] == 30
+    assert report['recall'] == (5 - len(report['missed'])) / 5
+    assert analyzer.prefilter.stats['last_recall'] == report['recall']
+
+
+def test_scan_counts_scored_symbols_apart_from_errors_and_short_data(monkeypatch):
+    import asyncio
+    from src.analysis.worker_pool import WorkerPool
+    from src.bot.modules.analysis import market as market_module
+    from src.data_collectors.ohlcv_array import OHLCVArray
+
+    candles = {f'C{s}USDT': OHLCVArray.from_rows(make_rows(60, s)) for s in range(12)}
+    tickers = [{'symbol': symbol, 'lastPrice': str(ohlcv.close[-1]), 'quoteVolume': str(1e6 + i)}
+               for i, (symbol, ohlcv) in enumerate(candles.items())]
+    pool = WorkerPool(max_workers=2)
+    monkeypatch.setattr(market_module, 'get_worker_pool', lambda: pool)
+    analyzer = MarketAnalyzer()
+
+    async def fetch(symbol, interval):
+        if symbol == 'C0USDT':
+            raise ConnectionError("timeout")
+        return None if symbol == 'C1USDT' else candles[symbol]
+
+    monkeypatch.setattr(analyzer, '_fetch_coin_ohlcv', fetch)
+
+    async def run():
+        return [update async for update in analyzer.analyze_market_stream(tickers, '1h', top_k=5)]
+
+    try:
+        updates = asyncio.run(run())
+    finally:
+        pool.shutdown()
+
+    # Başarılı = puanlanan sembol (fırsat sayısı değil); hata ve yetersiz veri ayrı sayılır
+    assert analyzer.analysis_stats['analysis_success'] == 10
+    assert analyzer.analysis_stats['analysis_failed'] == 1
+    assert analyzer.analysis_stats['data_skipped'] == 1
+    assert updates[-1]['scanned'] == updates[-1]['total'] == 12
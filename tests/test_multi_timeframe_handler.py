@@ -0,0 +1,58 @@
+import asyncio
+from src.analysis.background_scanner import BackgroundScanner
+from src.bot import multi_timeframe_handler as handler_module
+from src.bot.modules.utils.live_message import LiveMessage
+
+
+class FakeMessage:
+    def __init__(self):
+        self.edits = []
+
+    async def edit_text(self, text, **kwargs):
+        self.edits.append((text, kwargs))
+
+
+def opportunity(symbol, score):
+    return {'symbol': symbol, 'opportunity_score': score, 'signal': 'LONG', 'trend': 'BULLISH',
+            'price': 1.0, 'rsi': 55.0, 'risk_reward_ratio': 2.0}
+
+
+def test_general_multiscan_streams_progress_and_cancel_returns_partial_results(monkeypatch):
+    monkeypatch.setattr(handler_module, 'get_background_scanner', BackgroundScanner)
+    handler = handler_module.MultiTimeframeHandler()
+
+    async def run():
+        gate = asyncio.Event()
+
+        async def scan_market(report=None):
+            report({'scanned': 10, 'total': 40, 'found': 1, 'elapsed': 1.0, 'new': [],
+                    'top': [opportunity('AUSDT', 80.0)]})
+            await gate.wait()
+            return [opportunity('AUSDT', 80.0), opportunity('BUSDT', 70.0)]
+
+        handler.analyzer.scan_market = scan_market
+        message = FakeMessage()
+        waiting = asyncio.ensure_future(handler._show_general_scan(LiveMessage(message, min_interval=0.01), 1))
+        while not message.edits:
+            await asyncio.sleep(0.01)
+        assert handler.cancellation.cancel(1)
+        await waiting
+
+        # Tarama diğer kullanıcılar için sürer; bitince görüntü beklemeden sunulur
+        gate.set()
+        await handler.scanner.get('multiscan')
+        served = FakeMessage()
+        await handler._show_general_scan(LiveMessage(served), 2)
+        return message.edits, served.edits
+
+    edits, served = asyncio.run(run())
+    progress_text, progress_kwargs = edits[0]
+    assert '10/40' in progress_text and 'AUSDT' in progress_text
+    assert progress_kwargs['reply_markup'].inline_keyboard[0][0].callback_data == 'multicancel'
+
+    partial_text, partial_kwargs = edits[-1]
+    assert 'AUSDT' in partial_text and 'BUSDT' not in partial_text and 'durduruldu' in partial_text
+    assert partial_kwargs['reply_markup'].inline_keyboard[0][0].callback_data == 'refresh_multi'
+
+    assert len(served) == 1 and 'BUSDT' in served[0][0]
+    assert not handler.cancellation.cancel(1)
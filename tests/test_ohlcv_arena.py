@@ -0,0 +1,41 @@
+import os
+import numpy as np
+from src.analysis.worker_pool import pack_records, unpack_records
+from src.data_collectors.ohlcv_arena import OHLCVArena, read_block
+from conftest import make_candles
+
+
+def test_arena_blocks_map_back_without_copies(tmp_path):
+    first = {'AUSDT': make_candles(30, 1), 'BUSDT': make_candles(45, 2)}
+    second = {'CUSDT': make_candles(10, 3), 'DUSDT': make_candles(0, 4)}
+
+    with OHLCVArena(directory=str(tmp_path)) as arena:
+        blocks = [arena.write(first), arena.write(second)]
+        assert blocks[1].offset == 75 * first['AUSDT'].data.itemsize
+        assert arena.stats == {'blocks': 2, 'candles': 85, 'bytes': 85 * 28}
+
+        for block, expected in zip(blocks, (first, second)):
+            mapped = read_block(block)
+            assert list(mapped) == list(expected)
+            for symbol, candles in mapped.items():
+                assert np.array_equal(candles.data, expected[symbol].data)
+                assert np.array_equal(candles.as_columns(), expected[symbol].as_columns())
+        assert isinstance(read_block(blocks[0])['BUSDT'].data.base, np.memmap)
+        path = arena.path
+
+    assert not os.path.exists(path)
+
+
+def test_packed_records_round_trip():
+    records = [
+        {'symbol': 'AUSDT', 'price': np.float64(1.5), 'reasons': ['RSI'], 'surge': np.bool_(True)},
+        {'symbol': 'BUSDT', 'price': 2.0, 'reasons': [], 'surge': False},
+        {'symbol': 'CUSDT', 'price': 3.0, 'reasons': [], 'surge': False, 'atr': 0.1},
+    ]
+
+    packed = pack_records(records)
+
+    assert len(packed['layouts']) == 2
+    restored = unpack_records(packed)
+    assert restored == records
+    assert type(restored[0]['price']) is float and type(restored[0]['surge']) is bool
@@ -0,0 +1,38 @@
+import pickle
+import numpy as np
+from src.analysis import indicator_engine as ie
+from src.data_collectors.ohlcv_array import OHLCV_DTYPE, OHLCVArray
+from conftest import make_rows
+
+
+def test_columns_are_zero_copy_views_of_one_buffer():
+    candles = OHLCVArray.from_rows(make_rows(120, 2, start=1700000000000, step=60000, price=30000.0, scale=50.0, spread=20.0))
+
+    assert candles.data.dtype == OHLCV_DTYPE and candles.data.flags['C_CONTIGUOUS']
+    for column in (candles.timestamp, candles.open, candles.close, candles.volume):
+        assert np.shares_memory(column, candles.data)
+    tail = candles.tail(10)
+    assert len(tail) == 10 and np.shares_memory(tail.data, candles.data)
+    assert candles.timestamp.dtype == np.int64 and candles.timestamp[-1] == 1700000000000 + 119 * 60000
+
+
+def test_conversions_round_trip_within_float32_precision():
+    rows = make_rows(120, 2, start=1700000000000, step=60000, price=30000.0, scale=50.0, spread=20.0)
+    candles = OHLCVArray.from_rows(rows)
+
+    columns = candles.as_columns()
+    assert columns.dtype == np.float64 and columns.shape == (6, 120)
+    assert np.allclose(columns.T, np.array(rows), rtol=1e-6)
+    assert [row[0] for row in candles.tolist()] == [row[0] for row in rows]
+
+    features = ie.compute_features(candles)
+    expected = ie.compute_features(rows)
+    assert np.allclose(features['rsi'], expected['rsi'], rtol=1e-4, equal_nan=True)
+
+    frame = candles.to_dataframe(index=True)
+    assert list(frame.columns) == ['open', 'high', 'low', 'close', 'volume']
+    assert frame.index[0].value == rows[0][0] * 1_000_000
+    assert frame['close'].dtype == np.float64
+
+    restored = pickle.loads(pickle.dumps(candles))
+    assert np.array_equal(restored.data, candles.data)
@@ -0,0 +1,88 @@
+import asyncio
+from src.exchanges.price_feed import PriceFeed, normalize_symbol
+
+
+class FakeGateway:
+    def __init__(self):
+        self.calls = []
+
+    async def fetch_tickers(self, symbols=None):
+        self.calls.append(list(symbols))
+        return {s: {'symbol': s, 'last': 10.0 + len(self.calls)} for s in symbols}
+
+
+def test_normalize_symbol():
+    assert normalize_symbol('btcusdt') == 'BTC/USDT'
+    assert normalize_symbol('ETH/USDT') == 'ETH/USDT'
+
+
+def test_one_bulk_request_per_tick_for_all_subscribers():
+    gateway = FakeGateway()
+
+    async def run():
+        feed = PriceFeed(gateway=gateway, interval=0.01)
+        # Aynı sembolü takip eden iki chat + farklı bir sembol
+        subs = [feed.subscribe('BTCUSDT'), feed.subscribe('BTC/USDT'), feed.subscribe('ETHUSDT')]
+        tickers = await asyncio.gather(*[s.latest(timeout=1) for s in subs])
+        counts = (feed.subscriber_count('BTCUSDT'), feed.subscriber_count())
+
+        subs[0].close()
+        subs[2].close()
+        await asyncio.sleep(0.03)
+        symbols_after_close = feed.symbols
+
+        subs[1].close()
+        await asyncio.sleep(0.03)
+        stopped = feed._task is None
+        await feed.stop()
+        return tickers, counts, symbols_after_close, stopped
+
+    tickers, counts, symbols_after_close, stopped = asyncio.run(run())
+
+    assert all(t is not None for t in tickers)
+    assert counts == (2, 3)
+    assert sorted(gateway.calls[0]) == ['BTC/USDT', 'ETH/USDT']
+    assert ['BTC/USDT'] in gateway.calls
+    assert symbols_after_close == {'BTC/USDT'}
+    assert stopped
+
+
+def test_stream_subscription_is_held_per_symbol_and_released(monkeypatch):
+    from src.exchanges import price_feed as price_feed_module
+    gateway = FakeGateway()
+
+    class FakeSubscription:
+        def __init__(self, symbol):
+            self.symbol = symbol
+            self.closed = False
+
+        def close(self):
+            self.closed = True
+
+    class FakeStream:
+        def __init__(self):
+            self.subscriptions = []
+
+        def subscribe(self, symbol, timeframes=()):
+            self.subscriptions.append(FakeSubscription(symbol))
+            return self.subscriptions[-1]
+
+        def get_ticker(self, symbol):
+            return None  # bayat: REST'e düşülür
+
+    stream = FakeStream()
+    monkeypatch.setattr(price_feed_module, 'get_kline_stream', lambda: stream)
+
+    async def run():
+        feed = PriceFeed(gateway=gateway, interval=0.01)
+        sub = feed.subscribe('BTCUSDT')
+        await sub.next(timeout=1)
+        await sub.next(timeout=1)
+        sub.close()
+        await feed.stop()
+
+    asyncio.run(run())
+
+    assert [s.symbol for s in stream.subscriptions] == ['BTC/USDT']
+    assert stream.subscriptions[0].closed
+    assert len(gateway.calls) >= 2
@@ -0,0 +1,79 @@
+import time
+import asyncio
+import numpy as np
+from src.data_collectors.candle_store import CandleStore, timeframe_to_ms
+from src.data_collectors.resampler import (bucket_starts, can_resample, get_timeframes_async, plan_sources,
+                                           resample)
+from conftest import make_columns
+
+M15 = timeframe_to_ms('15m')
+H1 = timeframe_to_ms('1h')
+
+
+class AsyncFakeExchange:
+    """Zaman dilimi başına sabit serilerden async fetch_ohlcv taklidi"""
+
+    def __init__(self, series):
+        self.series = series
+        self.calls = []
+
+    async def fetch_ohlcv(self, symbol, timeframe, since=None, limit=100):
+        self.calls.append((timeframe, since, limit))
+        rows = [[int(row[0])] + row[1:].tolist() for row in self.series[timeframe].T]
+        rows = [row for row in rows if since is None or row[0] >= since]
+        return rows[-limit:] if since is None else rows[:limit]
+
+
+def test_resample_aligns_buckets_and_handles_partial_candles():
+    # Seri 1h kovasının ortasından başlar ve son kova açık kalır
+    base = make_columns(2 + 4 * 5 + 3, start=10 * H1 + 2 * M15, step=M15, price=100.0, volume=(1, 10))
+    hourly = resample(base, '15m', '1h')
+
+    assert hourly.shape[1] == 6
+    assert list(hourly[0]) == [(11 + i) * H1 for i in range(6)]
+    for i in range(5):
+        chunk = base[:, 2 + 4 * i: 6 + 4 * i]
+        assert hourly[1, i] == chunk[1, 0] and hourly[4, i] == chunk[4, -1]
+        assert hourly[2, i] == chunk[2].max() and hourly[3, i] == chunk[3].min()
+        assert np.isclose(hourly[5, i], chunk[5].sum())
+    assert hourly[4, -1] == base[4, -1] and np.isclose(hourly[5, -1], base[5, -3:].sum())
+
+
+def test_weekly_and_monthly_buckets_follow_exchange_calendar():
+    monday = np.datetime64('2024-01-08T00:00', 'ms').astype(np.int64)
+    sunday_night = monday - M15
+    assert list(bucket_starts([sunday_night, monday, monday + 6 * 24 * H1], '1w')) == \
+        [monday - 7 * 24 * H1, monday, monday]
+    feb = np.datetime64('2024-02-01', 'ms').astype(np.int64)
+    assert bucket_starts([feb + 5 * H1], '1M')[0] == feb
+    assert can_resample('15m', '1w') and can_resample('1h', '1M') and not can_resample('1h', '15m')
+    assert not can_resample('3d', '1w') and not can_resample('1h', '90m')
+
+
+def test_plan_derives_what_the_store_depth_can_cover():
+    sources, derived = plan_sources({'15m': 100, '1h': 100, '4h': 100, '1d': 100}, max_depth=1000)
+    assert sources == {'15m': 404, '4h': 606}
+    assert derived == {'1h': '15m', '1d': '4h'}
+
+    sources, derived = plan_sources({'1w': 200, '4h': 200, '1h': 200, '15m': 200}, max_depth=1000)
+    assert set(sources) == {'15m', '4h', '1w'} and derived == {'1h': '15m'}
+
+
+def test_store_fetches_base_once_and_derives_higher_timeframe(tmp_path):
+    now = int(time.time() * 1000) // M15 * M15
+    base = make_columns(1000, start=now - 999 * M15, step=M15, price=100.0, volume=(1, 10))
+    exchange = AsyncFakeExchange({'15m': base, '1h': resample(base, '15m', '1h')})
+    store = CandleStore(cache_dir=str(tmp_path))
+
+    async def run():
+        first = await get_timeframes_async(exchange, 'BTC/USDT', {'15m': 100, '1h': 100}, store=store)
+        second = await get_timeframes_async(exchange, 'BTC/USDT', {'15m': 100, '1h': 100}, store=store)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert [call[0] for call in exchange.calls] == ['15m', '15m']
+    assert exchange.calls[0][2] == 404
+    assert len(first['15m']) == len(first['1h']) == 100
+    expected = resample(base, '15m', '1h')[:, -100:]
+    np.testing.assert_allclose(first['1h'].as_columns(), expected, rtol=1e-6)
+    np.testing.assert_array_equal(second['1h'].as_columns(), first['1h'].as_columns())
@@ -0,0 +1,45 @@
+import asyncio
+import logging
+from src.analysis.background_scanner import BackgroundScanner
+from src.analysis.ticker_prefilter import TickerPrefilter
+from src.bot.modules.handlers import scan_handler as handler_module
+
+
+class FakeClient:
+    async def get_ticker(self):
+        return [{'symbol': 'AUSDT', 'lastPrice': '1', 'quoteVolume': '2000000'}]
+
+
+class FakeAnalyzer:
+    def __init__(self):
+        self.prefilter = TickerPrefilter(top_k=6)
+        self.recall_checks = []
+
+    async def analyze_market_stream(self, ticker_data, interval, top_k=10):
+        yield {'new': [], 'top': [], 'found': 0, 'scanned': 1, 'total': 1, 'elapsed': 0.1}
+
+    async def measure_prefilter_recall(self, ticker_data, interval):
+        self.recall_checks.append(interval)
+        self.prefilter.record_recall(0.8)
+
+
+def test_prefilter_recall_is_measured_every_nth_scan_and_reported(monkeypatch):
+    monkeypatch.setattr(handler_module, 'get_background_scanner', BackgroundScanner)
+    monkeypatch.setattr(handler_module, 'PREFILTER_RECALL_EVERY', 2)
+    handler = handler_module.ScanHandler(logging.getLogger('test'), None)
+    handler.client = FakeClient()
+    analyzer = handler._scan_analyzers['1h'] = FakeAnalyzer()
+
+    async def run():
+        notes = []
+        for _ in range(3):
+            await handler._scan_universe('1h', lambda update: None)
+            await asyncio.sleep(0)
+            notes.append(handler.prefilter_note('1h'))
+        return notes
+
+    notes = asyncio.run(run())
+    assert analyzer.recall_checks == ['1h']
+    assert notes[0] == "" and "%80" in notes[1] and notes[2] == notes[1]
+    assert analyzer.prefilter.stats['recall_checks'] == 1
+    assert handler.prefilter_note('4h') == ""
@@ -0,0 +1,78 @@
+import asyncio
+from src.analysis.scan_pipeline import ScanPipeline
+
+
+def test_pipeline_bounds_fetches_and_applies_backpressure():
+    state = {'fetching': 0, 'max_fetching': 0, 'buffered': 0, 'max_buffered': 0}
+
+    async def fetch(item):
+        state['fetching'] += 1
+        state['max_fetching'] = max(state['max_fetching'], state['fetching'])
+        await asyncio.sleep(0.001)
+        state['fetching'] -= 1
+        if item % 7 == 0:
+            return None
+        if item == 11:
+            raise RuntimeError('ağ hatası')
+        state['buffered'] += 1
+        state['max_buffered'] = max(state['max_buffered'], state['buffered'])
+        return item
+
+    async def process(chunk):
+        await asyncio.sleep(0.01)
+        state['buffered'] -= len(chunk)
+        return sum(chunk)
+
+    pipeline = ScanPipeline(fetch, process, fetch_concurrency=3, chunk_size=2, consumers=1, queue_size=1)
+    results = asyncio.run(pipeline.run(range(1, 41)))
+
+    expected = [n for n in range(1, 41) if n % 7 and n != 11]
+    assert sum(results) == sum(expected)
+    assert pipeline.stats['fetched'] == len(expected)
+    assert pipeline.stats['skipped'] == 5 and pipeline.stats['fetch_errors'] == 1
+    assert state['max_fetching'] == 3
+    # Bellekteki mumlar (işlenen + kuyruktaki + put'ta bekleyen getirici başına bir parça) ile sınırlı
+    assert state['max_buffered'] <= (1 + 1 + 3) * 2
+    assert pipeline.stats['max_queue'] <= 1 and pipeline.stats['fetch_wait'] > 0
+
+
+def test_pipeline_keeps_going_after_process_errors():
+    async def fetch(item):
+        return item
+
+    async def process(chunk):
+        if 3 in chunk:
+            raise ValueError('bozuk parça')
+        return chunk
+
+    pipeline = ScanPipeline(fetch, process, fetch_concurrency=1, chunk_size=2, consumers=2)
+    results = asyncio.run(pipeline.run(range(1, 8)))
+
+    assert sorted(item for chunk in results for item in chunk) == [1, 2, 5, 6, 7]
+    assert pipeline.stats['process_errors'] == 1 and pipeline.stats['chunks'] == 4
+
+
+def test_stream_yields_chunks_early_and_cancels_on_close():
+    fetched = []
+
+    async def fetch(item):
+        await asyncio.sleep(0.001)
+        fetched.append(item)
+        return item
+
+    async def process(chunk):
+        return list(chunk)
+
+    async def run():
+        pipeline = ScanPipeline(fetch, process, fetch_concurrency=2, chunk_size=3, consumers=1, queue_size=1)
+        stream = pipeline.stream(range(1000))
+        first = await stream.__anext__()
+        await stream.aclose()
+        count = len(fetched)
+        await asyncio.sleep(0.02)
+        return first, count, len(fetched)
+
+    first, at_close, later = asyncio.run(run())
+
+    assert len(first) == 3
+    assert at_close < 20 and later == at_close
@@ -0,0 +1,81 @@
+import json
+import asyncio
+import numpy as np
+from src.analysis import indicator_engine as ie
+from src.analysis.streaming_indicators import IndicatorState, IndicatorStateStore, sync_state_async
+from conftest import HOUR, make_rows
+
+
+def test_streaming_matches_engine_at_every_step():
+    candles = make_rows(120, 3, price=20000.0, scale=50.0, spread=40.0, volume=(10, 100))
+    data = ie.to_columns(candles)
+    high, low, close, volume = data[2], data[3], data[4], data[5]
+    macd, _, hist = ie.macd(close)
+    upper, _, _ = ie.bollinger(close)
+    expected = {
+        'rsi': ie.rsi(close), 'ema20': ie.ema(close, 20), 'ema50': ie.ema(close, 50),
+        'macd': macd, 'macd_hist': hist, 'atr': ie.atr(high, low, close), 'bb_upper': upper,
+        'volume_sma': ie.sma(volume, 20), 'obv': ie.obv(close, volume), 'vwap': ie.vwap(high, low, close, volume),
+    }
+
+    state = IndicatorState('BTC/USDT', '1h')
+    for i, candle in enumerate(candles):
+        values = state.update_candle(candle)
+        for key, series in expected.items():
+            if np.isnan(series[i]):
+                assert values[key] is None, (key, i)
+            else:
+                assert np.isclose(values[key], series[i], rtol=1e-9), (key, i)
+
+
+def test_peek_does_not_change_state_and_equals_next_update():
+    candles = make_rows(60, 3, price=20000.0, scale=50.0, spread=40.0, volume=(10, 100))
+    state = IndicatorState('BTC/USDT', '1h')
+    state.sync(candles)  # son mum açık kabul edilir
+
+    before = json.dumps(state.to_dict())
+    live = state.snapshot(candles[-1][4])
+    assert json.dumps(state.to_dict()) == before
+
+    closed = state.update_candle(candles[-1])
+    for key in ('rsi', 'ema20', 'ema50', 'macd_hist', 'bb_upper', 'bb_lower'):
+        assert np.isclose(live[key], closed[key])
+
+
+def test_state_survives_restart(tmp_path):
+    candles = make_rows(100, 3, price=20000.0, scale=50.0, spread=40.0, volume=(10, 100))
+    store = IndicatorStateStore(str(tmp_path))
+    state = store.get('BTC/USDT', '1h')
+    state.sync(candles[:70], include_last=True)
+    store.save(state)
+
+    restored = IndicatorStateStore(str(tmp_path)).get('BTC/USDT', '1h')
+    assert restored.last_ts == state.last_ts
+    for candle in candles[70:]:
+        state.update_candle(candle)
+        restored.update_candle(candle)
+    assert restored.values == state.values
+
+
+class FakeCandleStore:
+    def __init__(self, candles):
+        self.candles = candles
+        self.limits = []
+
+    async def get_ohlcv_async(self, exchange, symbol, timeframe, limit=100):
+        self.limits.append(limit)
+        return self.candles[-limit:]
+
+
+def test_sync_fetches_only_missed_candles(monkeypatch):
+    now = 1700000000000 - 1700000000000 % HOUR
+    candles = make_rows(300, 3, start=now - 299 * HOUR, price=20000.0, scale=50.0, spread=40.0, volume=(10, 100))
+    monkeypatch.setattr('time.time', lambda: (now + 60000) / 1000)
+    store = FakeCandleStore(candles[:-3])
+    state = IndicatorState('BTC/USDT', '1h')
+
+    assert asyncio.run(sync_state_async(state, None, candle_store=store)) == 199
+    store.candles = candles
+    assert asyncio.run(sync_state_async(state, None, candle_store=store)) == 3
+    assert store.limits[-1] == 5
+    assert state.last_ts == candles[-2][0]
@@ -0,0 +1,39 @@
+import numpy as np
+from src.analysis.ticker_prefilter import TickerPrefilter, prefilter_recall, ticker_features
+
+
+def make_ticker(symbol, change, last, high, low, volume, bid=None, ask=None):
+    return {'symbol': symbol, 'priceChangePercent': str(change), 'lastPrice': str(last),
+            'highPrice': str(high), 'lowPrice': str(low), 'quoteVolume': str(volume),
+            'bidPrice': str(bid if bid is not None else last * 0.9999),
+            'askPrice': str(ask if ask is not None else last * 1.0001)}
+
+
+def test_features_from_ticker_payload():
+    tickers = [make_ticker('AUSDT', -4.0, 90, 110, 90, 1e6, bid=89.9, ask=90.1),
+               {'symbol': 'BUSDT', 'lastPrice': '5', 'quoteVolume': '0'}]
+    features = ticker_features(tickers)
+
+    assert features['change'][0] == -4.0 and np.isnan(features['change'][1])
+    assert features['range_position'][0] == 0.0 and np.isnan(features['range_position'][1])
+    assert np.isclose(features['spread_bps'][0], 0.2 / 90 * 1e4)
+    assert np.isclose(features['log_volume'][0], np.log(1e6)) and np.isnan(features['log_volume'][1])
+
+
+def test_select_prefers_movers_and_measures_recall():
+    rng = np.random.default_rng(3)
+    quiet = [make_ticker(f'Q{i}USDT', rng.normal(0, 0.5), 100, 101, 99, 1e6 * rng.uniform(1, 2)) for i in range(40)]
+    movers = [make_ticker(f'M{i}USDT', 12 + i, 120, 121, 100, 5e7) for i in range(5)]
+    wide = make_ticker('WIDEUSDT', 15, 120, 121, 100, 5e7, bid=110, ask=130)
+
+    prefilter = TickerPrefilter(top_k=6)
+    selected = [ticker['symbol'] for ticker in prefilter.select(quiet + movers + [wide])]
+
+    assert len(selected) == 6 and set(selected) >= {ticker['symbol'] for ticker in movers}
+    assert prefilter.reduction == 46 / 6
+    assert TickerPrefilter(top_k=0).select(quiet) == quiet
+
+    full_scan = [{'symbol': 'M0USDT', 'opportunity_score': 90}, {'symbol': 'Q1USDT', 'opportunity_score': 80},
+                 {'symbol': 'Q2USDT', 'opportunity_score': 10}]
+    assert prefilter_recall(selected, full_scan, top_n=2) == 0.5
+    assert prefilter_recall(selected, [], top_n=2) == 1.0
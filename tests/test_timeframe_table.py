@@ -0,0 +1,119 @@
+import asyncio
+import numpy as np
+from src.analysis import multi_timeframe_analyzer as mtf_module
+from src.analysis.multi_timeframe_analyzer import SCAN_LIMITS, MultiTimeframeAnalyzer
+from src.analysis.timeframe_table import TREND_CODES, TimeframeTable, combined_scores, rank
+from src.analysis.worker_pool import WorkerPool
+from conftest import make_candles
+
+TIMEFRAMES = ('1w', '4h', '1h', '15m')
+TRENDS = list(TREND_CODES)
+
+
+def pairwise_scores(results_by_timeframe):
+    """Eski ardışık sözlük birleştirmesinin puanlaması (karşılaştırma için)"""
+    combined = {r['symbol']: {'trend': r['trend']} for r in results_by_timeframe[TIMEFRAMES[0]]}
+    for timeframe in TIMEFRAMES[1:]:
+        new_by_symbol = {r['symbol']: r for r in results_by_timeframe[timeframe]}
+        for symbol, row in combined.items():
+            prev_trend, new = row['trend'], new_by_symbol.get(symbol)
+            if new is None:
+                row.setdefault('score', 60 if 'STRONGLY' in prev_trend else 40 if 'ISH' in prev_trend else 20)
+                row['trend'] = 'UNKNOWN'
+                continue
+            score, sign = row.get('score', 0), (prev_trend.endswith('BULLISH') - prev_trend.endswith('BEARISH'))
+            if sign:
+                aligned = TREND_CODES[new['trend']] * sign
+                score += {2: 25, 1: 15, 0: 5, -1: -10, -2: -20}[aligned]
+            score += 10 if new['risk_reward'] >= 3 else 5 if new['risk_reward'] >= 2 else 0
+            row['score'], row['trend'] = min(max(score, 0), 100), new['trend']
+    return {symbol: row['score'] for symbol, row in combined.items()}
+
+
+def random_results(count, seed):
+    rng = np.random.default_rng(seed)
+    results = {}
+    for timeframe in TIMEFRAMES:
+        results[timeframe] = [{'symbol': f'C{i}USDT', 'trend': TRENDS[rng.integers(5)],
+                               'trend_strength': rng.uniform(), 'risk_reward': rng.choice([0, 1.5, 2.2, 3.5])}
+                              for i in rng.permutation(count) if rng.uniform() > 0.15]
+    return results
+
+
+def test_vectorized_scores_match_pairwise_combination():
+    results = random_results(400, seed=5)
+    table = MultiTimeframeAnalyzer()._combine_timeframe_results(results)
+    scores = combined_scores(table)
+
+    expected = pairwise_scores(results)
+    assert len(expected) > 300
+    for symbol, position in table.index.items():
+        if symbol in expected:
+            assert scores[position] == expected[symbol], symbol
+        else:
+            assert np.isnan(scores[position])
+
+    ranked = rank(table, scores)
+    assert len(ranked) == len(expected)
+    assert list(scores[ranked]) == sorted(expected.values(), reverse=True)
+
+
+def test_table_join_keeps_rows_per_symbol():
+    table = TimeframeTable(('4h', '1h'))
+    table.extend('1h', [{'symbol': 'BUSDT', 'trend': 'BEARISH', 'risk_reward': 2.5, 'stop_price': 11}])
+    table.extend('4h', [{'symbol': 'AUSDT', 'trend': 'BULLISH'}, {'symbol': 'BUSDT', 'trend': 'STRONGLY_BEARISH'}])
+
+    assert table.symbols == ['BUSDT', 'AUSDT']
+    assert list(table.present('1h')) == [True, False]
+    assert table.trend('1h', table.index['AUSDT']) == 'UNKNOWN'
+    assert table.column('1h', 'stop_price')[0] == 11
+    # BUSDT: 4h düşüşü 1h teyit eder (+15) ve R/R >= 2 (+5); AUSDT'de 1h yok, 4h BULLISH -> 40
+    assert list(combined_scores(table)) == [20, 40]
+
+
+def test_universe_scan_matches_in_process_analysis(monkeypatch):
+    steps = {'1w': 604800000.0, '4h': 14400000.0, '1h': 3600000.0, '15m': 900000.0}
+    coins = [{'symbol': f'C{s}USDT', 'price': 50.0, 'volume': 5e6, 'change': 1.0} for s in range(30)]
+    candles = {coin['symbol']: {tf: make_candles(limit, s * 10 + i, step=steps[tf], drift=0.08 * ((s * 10 + i) % 3 - 1), volume=(1e6, 2e6))
+                                for i, (tf, limit) in enumerate(SCAN_LIMITS.items())}
+               for s, coin in enumerate(coins)}
+
+    analyzer = MultiTimeframeAnalyzer()
+    expected = analyzer._combine_timeframe_results({
+        tf: [analyzer._analyze_frame(symbol, tf, frames[tf].to_dataframe(index=True))
+             for symbol, frames in candles.items()] for tf in SCAN_LIMITS})
+    expected_scores = combined_scores(expected)
+
+    pool = WorkerPool(max_workers=2)
+    monkeypatch.setattr(mtf_module, 'get_worker_pool', lambda: pool)
+
+    async def fetch(coin):
+        await asyncio.sleep(0.001)
+        return coin['symbol'], candles[coin['symbol']]
+
+    monkeypatch.setattr(analyzer, '_fetch_scan_timeframes', fetch)
+
+    async def stream():
+        return [update async for update in analyzer.analyze_market_stream(coins, top_k=5)]
+
+    try:
+        opportunities = asyncio.run(analyzer.analyze_market_parallel(coins))
+        updates = asyncio.run(stream())
+    finally:
+        pool.shutdown()
+
+    # Akış parça parça ilerler; son güncellemenin ilk 5'i tam taramanın ilk 5'idir
+    scanned = [update['scanned'] for update in updates]
+    assert len(updates) > 1 and scanned == sorted(scanned) and scanned[-1] == len(coins)
+    assert updates[-1]['found'] == len(opportunities)
+    assert updates[-1]['top'] == opportunities[:5]
+    assert sum(len(update['new']) for update in updates) == len(opportunities)
+
+    assert opportunities
+    scores = [opp['opportunity_score'] for opp in opportunities]
+    assert scores == sorted(scores, reverse=True)
+    for opp in opportunities:
+        position = expected.index[opp['symbol']]
+        assert opp['opportunity_score'] == round(expected_scores[position], 1)
+        assert opp['trend'] == opp['4h_trend'] == expected.trend('4h', position)
+        assert opp['signal'] == ('LONG' if opp['trend'].endswith('BULLISH') else 'SHORT')
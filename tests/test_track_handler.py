@@ -0,0 +1,99 @@
+import asyncio
+import logging
+from src.bot.modules.handlers import track_handler as track_module
+from src.bot.modules.handlers.track_handler import TrackHandler
+
+
+class FakeSubscription:
+    price = 101.0
+
+    async def latest(self, timeout=None):
+        return {'last': self.price}
+
+    def close(self):
+        pass
+
+
+class FakeFeed:
+    def subscribe(self, symbol):
+        return FakeSubscription()
+
+
+class FakeIndicators:
+    next_close_ms = None
+
+    def snapshot(self, price):
+        return {'rsi': 45.0, 'ema20': 101.0, 'ema50': 100.0, 'macd_hist': 0.1, 'volume_sma': 1000.0}
+
+
+class FakeStateStore:
+    def __init__(self, indicators):
+        self.indicators = indicators
+
+    def get(self, symbol, timeframe):
+        return self.indicators
+
+    def save(self, state):
+        pass
+
+
+class FakeMessage:
+    def __init__(self):
+        self.replies = []
+
+    async def reply_text(self, text):
+        self.replies.append(text)
+
+
+class FakeUpdate:
+    def __init__(self):
+        self.message = FakeMessage()
+
+
+def test_candle_close_refreshes_volume_and_position_inputs(monkeypatch):
+    indicators = FakeIndicators()
+    monkeypatch.setattr(track_module, 'get_price_feed', lambda: FakeFeed())
+    monkeypatch.setattr(track_module, 'get_indicator_state_store', lambda: FakeStateStore(indicators))
+
+    async def sync(state, exchange):
+        state.next_close_ms = float('inf')  # bir sonraki mum henüz kapanmadı
+        return 1
+
+    monkeypatch.setattr(track_module, 'sync_state_async', sync)
+
+    handler = TrackHandler(logging.getLogger('test'))
+    analyses = iter([
+        {'price': 100.0, 'volume': 500.0, 'volume_surge': False, 'position_recommendation': 'LONG'},
+        {'price': 100.0, 'volume': 4000.0, 'volume_surge': True, 'position_recommendation': 'STRONG_LONG'},
+    ])
+    analyze_calls = []
+
+    async def analyze_single_coin(symbol):
+        analyze_calls.append(symbol)
+        return next(analyses)
+
+    monkeypatch.setattr(handler.analyzer, 'analyze_single_coin', analyze_single_coin)
+    live_inputs = []
+    live_analysis = handler._live_analysis
+
+    def record(analysis, state, price):
+        live_inputs.append((analysis['volume'], analysis['volume_surge'], analysis['position_recommendation']))
+        return live_analysis(analysis, state, price)
+
+    monkeypatch.setattr(handler, '_live_analysis', record)
+    ticks = []
+
+    async def sleep(seconds):
+        ticks.append(seconds)
+        if len(ticks) == 2:
+            indicators.next_close_ms = 0  # mum kapandı
+        if len(ticks) == 3:
+            raise asyncio.CancelledError
+
+    monkeypatch.setattr(track_module.asyncio, 'sleep', sleep)
+    update = FakeUpdate()
+    asyncio.run(handler._track_price(update, 1, 'BTCUSDT', 100.0, '4h'))
+
+    assert len(analyze_calls) == 2
+    assert live_inputs == [(500.0, False, 'LONG'), (500.0, False, 'LONG'), (4000.0, True, 'STRONG_LONG')]
+    assert len(update.message.replies) == 3
@@ -0,0 +1,175 @@
+"""
+Vektörel trend çekirdeklerinin market_analyzer'daki eski döngülerle eşdeğerliği.
+
+Aşağıdaki referans fonksiyonlar, çekirdeklere geçmeden önceki
+MarketAnalyzer yöntemlerinin döngüleridir.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from src.analysis import indicator_engine as ie
+from src.analysis import trend_kernels as tk
+
+
+def reference_supertrend(highs, lows, closes, period=10, multiplier=3.0):
+    atr = ie.atr(highs, lows, closes, period)
+    hl2 = (highs + lows) / 2
+    upper_band = hl2 + (multiplier * atr)
+    lower_band = hl2 - (multiplier * atr)
+    supertrend = np.zeros_like(closes)
+    direction = np.zeros_like(closes)
+    supertrend[0] = closes[0]
+    direction[0] = 1
+    for i in range(1, len(closes)):
+        prev_upper = upper_band[i-1]
+        prev_lower = lower_band[i-1]
+        prev_supertrend = supertrend[i-1]
+        prev_direction = direction[i-1]
+        curr_upper = upper_band[i]
+        curr_lower = lower_band[i]
+        curr_close = closes[i]
+        if prev_supertrend <= prev_upper and curr_close > curr_upper:
+            curr_direction = -1
+        elif prev_supertrend >= prev_lower and curr_close < curr_lower:
+            curr_direction = 1
+        else:
+            curr_direction = prev_direction
+        supertrend[i] = curr_lower if curr_direction == 1 else curr_upper
+        direction[i] = curr_direction
+    return supertrend, direction
+
+
+def reference_ichimoku(highs, lows):
+    def band(window):
+        return (np.array(pd.Series(highs).rolling(window=window).max()) +
+                np.array(pd.Series(lows).rolling(window=window).min())) / 2
+    tenkan_sen, kijun_sen = band(9), band(26)
+    return tenkan_sen, kijun_sen, (tenkan_sen + kijun_sen) / 2, band(52)
+
+
+def reference_adx(highs, lows, closes, period=14):
+    tr1 = np.abs(highs[1:] - lows[1:])
+    tr2 = np.abs(highs[1:] - closes[:-1])
+    tr3 = np.abs(lows[1:] - closes[:-1])
+    tr = np.maximum(np.maximum(tr1, tr2), tr3)
+    tr = np.insert(tr, 0, tr[0])
+    atr = np.zeros_like(closes)
+    atr[0] = tr[0]
+    for i in range(1, len(tr)):
+        atr[i] = (atr[i-1] * (period - 1) + tr[i]) / period
+    plus_dm = np.zeros_like(closes)
+    minus_dm = np.zeros_like(closes)
+    for i in range(1, len(closes)):
+        up_move = highs[i] - highs[i-1]
+        down_move = lows[i-1] - lows[i]
+        plus_dm[i] = up_move if up_move > down_move and up_move > 0 else 0
+        minus_dm[i] = down_move if down_move > up_move and down_move > 0 else 0
+    plus_di = 100 * (plus_dm / atr)
+    minus_di = 100 * (minus_dm / atr)
+    dx = 100 * np.abs(plus_di - minus_di) / (plus_di + minus_di + 1e-10)
+    adx = np.zeros_like(closes)
+    adx[period-1] = np.mean(dx[:period])
+    for i in range(period, len(closes)):
+        adx[i] = (adx[i-1] * (period - 1) + dx[i]) / period
+    return adx
+
+
+def reference_parabolic_sar(highs, lows, acceleration=0.02, maximum=0.2):
+    sar = np.zeros_like(highs)
+    trend = np.zeros_like(highs)
+    extreme_point = np.zeros_like(highs)
+    acceleration_factor = np.zeros_like(highs)
+    trend[0] = 1
+    sar[0] = lows[0]
+    extreme_point[0] = highs[0]
+    acceleration_factor[0] = acceleration
+    for i in range(1, len(highs)):
+        prev_sar, prev_trend = sar[i-1], trend[i-1]
+        prev_ep, prev_af = extreme_point[i-1], acceleration_factor[i-1]
+        curr_high, curr_low = highs[i], lows[i]
+        if prev_trend == 1:
+            curr_sar = prev_sar + prev_af * (prev_ep - prev_sar)
+            curr_sar = min(curr_sar, lows[i-1], lows[i-2] if i > 1 else lows[i-1])
+            if curr_sar > curr_low:
+                curr_trend, curr_sar, curr_ep, curr_af = -1, prev_ep, curr_low, acceleration
+            else:
+                curr_trend = 1
+                if curr_high > prev_ep:
+                    curr_ep, curr_af = curr_high, min(prev_af + acceleration, maximum)
+                else:
+                    curr_ep, curr_af = prev_ep, prev_af
+        else:
+            curr_sar = prev_sar - prev_af * (prev_sar - prev_ep)
+            curr_sar = max(curr_sar, highs[i-1], highs[i-2] if i > 1 else highs[i-1])
+            if curr_sar < curr_high:
+                curr_trend, curr_sar, curr_ep, curr_af = 1, prev_ep, curr_high, acceleration
+            else:
+                curr_trend = -1
+                if curr_low < prev_ep:
+                    curr_ep, curr_af = curr_low, min(prev_af + acceleration, maximum)
+                else:
+                    curr_ep, curr_af = prev_ep, prev_af
+        sar[i], trend[i], extreme_point[i], acceleration_factor[i] = curr_sar, curr_trend, curr_ep, curr_af
+    return sar
+
+
+def make_batch(symbols=6, n=300):
+    rng = np.random.default_rng(11)
+    close = 100 + np.cumsum(rng.normal(0, 1.5, (symbols, n)), axis=1)
+    # Bir sembolde sabit fiyat (ATR = 0) kenar durumu
+    close[-1] = 50.0
+    high = close + rng.uniform(0, 2, (symbols, n)) * (close != 50.0)
+    low = close - rng.uniform(0, 2, (symbols, n)) * (close != 50.0)
+    return high, low, close
+
+
+@pytest.fixture(params=['numpy', 'jit'])
+def backend(request, monkeypatch):
+    if request.param == 'jit':
+        if tk._psar_jit is None:
+            pytest.skip('numba kurulu değil')
+        monkeypatch.setenv('USE_NUMBA', '1')
+    else:
+        monkeypatch.setenv('USE_NUMBA', '0')
+    return request.param
+
+
+@pytest.mark.parametrize('multiplier', [3.0, 0.1])
+def test_supertrend_parity(multiplier):
+    high, low, close = make_batch()
+    values, direction = tk.supertrend(high, low, close, multiplier=multiplier)
+    for i in range(len(close)):
+        expected_values, expected_direction = reference_supertrend(high[i], low[i], close[i], multiplier=multiplier)
+        single_values, single_direction = tk.supertrend(high[i], low[i], close[i], multiplier=multiplier)
+        assert np.array_equal(direction[i], expected_direction)
+        assert np.array_equal(single_direction, expected_direction)
+        assert np.allclose(values[i], expected_values, equal_nan=True)
+        assert np.allclose(single_values, expected_values, equal_nan=True)
+    if multiplier < 1:
+        assert (np.diff(direction, axis=1) != 0).any()  # dar bantlarda yön gerçekten değişiyor
+
+
+def test_ichimoku_parity():
+    high, low, _ = make_batch()
+    batch = tk.ichimoku(high, low)
+    for i in range(len(high)):
+        for got, expected in zip(batch, reference_ichimoku(high[i], low[i])):
+            assert np.allclose(got[i], expected, equal_nan=True)
+
+
+def test_adx_parity():
+    high, low, close = make_batch()
+    batch = tk.adx(high, low, close)
+    for i in range(len(close) - 1):  # son sembol sabit fiyat: referans 0/0 ile NaN üretir
+        assert np.allclose(batch[i], reference_adx(high[i], low[i], close[i]), rtol=1e-9)
+        assert np.allclose(tk.adx(high[i], low[i], close[i]), batch[i])
+    assert not tk.adx(high[0, :10], low[0, :10], close[0, :10]).any()
+
+
+def test_parabolic_sar_parity(backend):
+    high, low, _ = make_batch()
+    batch = tk.parabolic_sar(high, low)
+    for i in range(len(high)):
+        expected = reference_parabolic_sar(high[i], low[i])
+        assert np.array_equal(batch[i], expected)
+        assert np.array_equal(tk.parabolic_sar(high[i], low[i]), expected)
@@ -0,0 +1,161 @@
+"""
+Hacim profili motoru: örtüşme matrisi, kayan pencere ve sipariş blokları.
+
+reference_order_blocks, vektörleştirmeden önceki
+VolumeProfileAnalyzer.identify_order_blocks döngüsüdür.
+"""
+import numpy as np
+import pandas as pd
+from src.analysis.volume_profile import (
+    RollingVolumeProfile, VolumeProfileAnalyzer, analyze_volume_distribution,
+    overlap_matrix, price_edges, volume_histogram,
+)
+
+
+def make_frame(n=200, seed=4):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    open_ = close + rng.normal(0, 1.5, n)
+    high = np.maximum(open_, close) + rng.uniform(0, 1.5, n)
+    low = np.minimum(open_, close) - rng.uniform(0, 1.5, n)
+    return pd.DataFrame({'timestamp': np.arange(n) * 60000, 'open': open_, 'high': high,
+                         'low': low, 'close': close, 'volume': rng.uniform(100, 1000, n)})
+
+
+def exact_histogram(df, edges):
+    """Her mumun hacmi, aralığının her fiyat aralığına düşen oranında paylaştırılır"""
+    volumes = np.zeros(len(edges) - 1)
+    for _, row in df.iterrows():
+        for b in range(len(edges) - 1):
+            overlap = min(row['high'], edges[b + 1]) - max(row['low'], edges[b])
+            if overlap > 0:
+                volumes[b] += row['volume'] * overlap / (row['high'] - row['low'])
+    return volumes
+
+
+def reference_order_blocks(df):
+    """
+    Sipariş bloklarını (order blocks) tespit eder
+    
+    Args:
+        df: OHLCV verilerini içeren DataFrame
+        
+    Returns:
+        Dict: Tespit edilen sipariş blokları
+    """
+    if len(df) < 10:
+        return {'bullish_blocks': [], 'bearish_blocks': []}
+    
+    # Copy dataframe to avoid modifying original
+    df = df.copy()
+    
+    # Calculate candle body size and direction
+    df['body_size'] = abs(df['close'] - df['open'])
+    df['body_size_pct'] = df['body_size'] / ((df['high'] - df['low']).rolling(window=10).mean())
+    df['is_bullish'] = df['close'] > df['open']
+    
+    # Calculate momentum
+    df['momentum'] = df['close'].diff(3)
+    
+    bullish_blocks = []
+    bearish_blocks = []
+    
+    # Look for bullish order blocks (support)
+    for i in range(3, len(df)-3):
+        # Look for strong bearish candle followed by momentum shift upward
+        if (not df['is_bullish'].iloc[i] and 
+            df['body_size_pct'].iloc[i] > 1.2 and  # Large bearish candle
+            df['momentum'].iloc[i+3] > 0):  # Upward momentum after
+            
+            # Price area of interest is the bearish candle body
+            block_low = min(df['open'].iloc[i], df['close'].iloc[i])
+            block_high = max(df['open'].iloc[i], df['close'].iloc[i])
+            
+            bullish_blocks.append({
+                'index': i,
+                'low': round(block_low, 8),
+                'high': round(block_high, 8),
+                'strength': round(df['body_size_pct'].iloc[i] * df['volume'].iloc[i] / df['volume'].rolling(window=10).mean().iloc[i], 2)
+            })
+    
+    # Look for bearish order blocks (resistance)
+    for i in range(3, len(df)-3):
+        # Look for strong bullish candle followed by momentum shift downward
+        if (df['is_bullish'].iloc[i] and 
+            df['body_size_pct'].iloc[i] > 1.2 and  # Large bullish candle
+            df['momentum'].iloc[i+3] < 0):  # Downward momentum after
+            
+            # Price area of interest is the bullish candle body
+            block_low = min(df['open'].iloc[i], df['close'].iloc[i])
+            block_high = max(df['open'].iloc[i], df['close'].iloc[i])
+            
+            bearish_blocks.append({
+                'index': i,
+                'low': round(block_low, 8),
+                'high': round(block_high, 8),
+                'strength': round(df['body_size_pct'].iloc[i] * df['volume'].iloc[i] / df['volume'].rolling(window=10).mean().iloc[i], 2)
+            })
+    
+    # Sort blocks by strength
+    bullish_blocks.sort(key=lambda x: x['strength'], reverse=True)
+    bearish_blocks.sort(key=lambda x: x['strength'], reverse=True)
+    
+    # Take top 3 strongest blocks
+    return {
+        'bullish_blocks': bullish_blocks[:3],
+        'bearish_blocks': bearish_blocks[:3]
+    }
+
+
+def test_histogram_is_exact_and_conserves_volume():
+    df = make_frame()
+    edges = price_edges(df['low'].min(), df['high'].max(), 20)
+
+    ratios = overlap_matrix(df['high'], df['low'], edges)
+    assert np.allclose(ratios.sum(axis=1), 1.0)
+
+    volumes = volume_histogram(df['high'], df['low'], df['volume'], edges)
+    assert np.allclose(volumes, exact_histogram(df, edges))
+    assert np.isclose(volumes.sum(), df['volume'].sum())
+
+    # Gövdesiz mum tek aralığa yazılır
+    flat = overlap_matrix(np.array([edges[3]]), np.array([edges[3]]), edges)
+    assert flat.sum() == 1.0 and flat[0, 3] == 1.0
+
+
+def test_profile_summary_and_order_blocks():
+    df = make_frame()
+    analysis = VolumeProfileAnalyzer().analyze(df)
+
+    edges = price_edges(df['low'].min(), df['high'].max(), 20)
+    volumes = exact_histogram(df, edges)
+    assert analysis['poc'] == round(edges[np.argmax(volumes)], 8)
+    in_value_area = [p['volume'] for p in analysis['volume_profile']
+                     if analysis['value_area_low'] <= p['price_level'] < analysis['value_area_high']]
+    assert sum(in_value_area) >= 0.7 * volumes.sum()
+    assert analysis['high_liquidity'][0]['price_level'] == analysis['poc']
+    assert len(analysis['low_liquidity']) == 4
+
+    expected = reference_order_blocks(df)
+    assert expected['bullish_blocks'] and expected['bearish_blocks']
+    for key in ('bullish_blocks', 'bearish_blocks'):
+        assert analysis[key] == expected[key]
+
+    assert analyze_volume_distribution(df)['poc'] == analysis['poc']
+
+
+def test_rolling_profile_matches_batch_window():
+    df = make_frame(n=150, seed=9)
+    rolling = RollingVolumeProfile(bin_size=0.5, window=40)
+    for row in df[['timestamp', 'open', 'high', 'low', 'close', 'volume']].itertuples(index=False):
+        rolling.add(list(row))
+    assert len(rolling) == 40
+
+    window = df.iloc[-40:]
+    levels, volumes = rolling.profile()
+    edges = np.append(levels, levels[-1] + 0.5)
+    assert levels[0] <= window['low'].min() < levels[0] + 0.5
+    assert np.allclose(volumes, volume_histogram(window['high'], window['low'], window['volume'], edges))
+
+    snapshot = rolling.snapshot()
+    assert snapshot['poc'] == round(levels[np.argmax(volumes)], 8)
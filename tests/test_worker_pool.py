@@ -0,0 +1,62 @@
+import asyncio
+import numpy as np
+from src.analysis.worker_pool import WorkerPool, unpack_records
+from src.bot.modules.analysis.market import MarketAnalyzer, score_ohlcv_batch, score_ohlcv_block
+from src.data_collectors.ohlcv_arena import OHLCVArena
+from conftest import make_candles
+
+
+def test_pool_scores_pure_data_like_in_process():
+    ohlcv_by_symbol = {f'C{s}USDT': make_candles(50, s) for s in range(12)}
+    market_data = {symbol: (float(candles.close[-1]), 2000.0 + 100 * i)
+                   for i, (symbol, candles) in enumerate(ohlcv_by_symbol.items())}
+    expected = MarketAnalyzer()._score_batch(ohlcv_by_symbol, market_data, '1h')
+
+    pool = WorkerPool(max_workers=2)
+    try:
+        async def run():
+            return await asyncio.gather(*[pool.run(score_ohlcv_batch, '1h', ohlcv_by_symbol, market_data)
+                                          for _ in range(4)])
+        results = asyncio.run(run())
+    finally:
+        pool.shutdown()
+
+    assert expected['stats'] == {'scored': 12, 'failed': 0}
+    for result in results:
+        assert result == expected
+
+
+def test_pool_scores_shared_memory_blocks(tmp_path):
+    ohlcv_by_symbol = {f'C{s}USDT': make_candles(80, s) for s in range(8)}
+    market_data = {symbol: (float(candles.close[-1]), 5000.0) for symbol, candles in ohlcv_by_symbol.items()}
+    expected = MarketAnalyzer()._score_batch(ohlcv_by_symbol, market_data, '1h')
+
+    pool = WorkerPool(max_workers=2)
+    try:
+        with OHLCVArena(directory=str(tmp_path)) as arena:
+            block = arena.write(ohlcv_by_symbol)
+            packed = asyncio.run(pool.run(score_ohlcv_block, '1h', block, market_data))
+    finally:
+        pool.shutdown()
+
+    assert packed['stats'] == expected['stats']
+    assert unpack_records(packed['opportunities']) == expected['opportunities']
+
+
+def test_pool_reports_per_worker_utilization():
+    pool = WorkerPool(max_workers=2, preload=('src.analysis.indicator_engine',)).start()
+    try:
+        async def run():
+            await pool.run(np.sum, np.arange(10))
+            since = pool.snapshot()
+            values = await asyncio.gather(*[pool.run(np.sum, np.arange(n)) for n in range(6)])
+            return values, pool.utilization(since=since)
+        values, usage = asyncio.run(run())
+    finally:
+        pool.shutdown()
+
+    assert values == [n * (n - 1) // 2 for n in range(6)]
+    assert sum(worker['tasks'] for worker in usage.values()) == 6
+    assert sum(worker['tasks'] for worker in pool.utilization().values()) == 7
+    assert all(0.0 <= worker['utilization'] <= 1.0 for worker in usage.values())
+    assert pool.stats['tasks'] == 7 and not pool.running